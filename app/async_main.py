@@ -0,0 +1,315 @@
+"""
+Asyncio-native server for the webhook app (SERVER_MODE=async).
+
+Serves the same routes as app/main.py on a single aiohttp event loop. Every
+in-flight webhook is a coroutine rather than a blocked thread, so the
+InFlow / Graph round trips of hundreds of orders overlap in one process, and
+coalesced events are answered at once while their run waits in a background
+task. Blocking work (validators, error tracking, CSV logs,
+the idempotency ledger, the work queue) runs on the pipeline's thread pool.
+
+Requires requirements-async.txt. The Flask app in app/main.py stays the
+entry point for Lambda and for SERVER_MODE=flask.
+"""
+
+import functools
+
+from aiohttp import web
+
+from app.config import config
+from app.main import hmac_verifier, initialize_validators
+from app.clients.inflow_client import inflow_client
+from app.services.validation_service import validation_service
+from app.services.timing_service import timing_service
+from app.services.logger_service import logger_service
+from app.services.error_monitor_service import error_monitor_service
+from app.services.work_queue_service import work_queue_service
+from app.services.batch_validation_service import batch_validation_service
+from app.services.idempotency_ledger import idempotency_ledger, STATUS_COMPLETED
+from app.services.order_lock_service import order_lock_service
+from app.services.validation_scheduler import validation_scheduler, PRIORITY_MANUAL
+from app.services.product_catalog_service import product_catalog_service
+from app.utils.resilience import breaker_status
+from app.services.async_order_processing_service import async_order_processing_service as pipeline
+from app.utils.log import get_logger, should_log_payload
+from app.utils import json_codec
+
+logger = get_logger(__name__)
+
+json_response = functools.partial(web.json_response, dumps=json_codec.dumps)
+
+routes = web.RouteTableDef()
+
+
+@routes.get('/')
+async def index(request: web.Request) -> web.Response:
+    """
+    Health check endpoint.
+    """
+    return json_response({
+        'status': 'running',
+        'service': 'InFlow Error Check Gate',
+        'version': '1.0.0',
+        'server_mode': 'async'
+    })
+
+
+@routes.post('/webhook/inflow')
+async def inflow_webhook(request: web.Request) -> web.Response:
+    """
+    Webhook endpoint for InFlow events (see app.main.inflow_webhook).
+    """
+    payload = await request.read()
+    signature_header = request.headers.get('x-inflow-hmac-sha256')
+    
+    if not hmac_verifier.verify(payload, signature_header):
+        logger.warning("Invalid HMAC signature")
+        return json_response({'error': 'Invalid signature'}, status=401)
+    
+    if not idempotency_ledger:
+        response_body, status_code = await _process_webhook_payload(payload)
+        return json_response(response_body, status=status_code)
+    
+    # Replay the stored response for a delivery we have already seen
+    ledger_key = idempotency_ledger.make_key(payload, signature_header)
+    claimed, entry = await pipeline.run_blocking(idempotency_ledger.claim, ledger_key)
+    if not claimed:
+        if entry.status == STATUS_COMPLETED:
+            logger.info("Duplicate webhook delivery %s - replaying stored response", ledger_key[:12])
+            response = web.Response(text=entry.body, status=entry.status_code, content_type='application/json')
+        else:
+            logger.info("Duplicate webhook delivery %s - first delivery still in progress", ledger_key[:12])
+            response = json_response({'status': 'in_progress'}, status=202)
+        response.headers['X-Idempotent-Replay'] = 'true'
+        return response
+    
+    async def settle(succeeded: bool) -> None:
+        if succeeded:
+            await pipeline.run_blocking(idempotency_ledger.complete, ledger_key, status_code, body)
+        else:
+            # Let InFlow's retry run the pipeline again
+            await pipeline.run_blocking(idempotency_ledger.release, ledger_key)
+    
+    response_body, status_code = await _process_webhook_payload(payload, on_settled=settle)
+    body = json_codec.dumps(response_body)
+    # A background run settles its entry once it knows the outcome; until then
+    # a redelivery is answered 'in_progress' rather than replayed as done
+    if response_body.get('status') not in ('scheduled', 'coalesced'):
+        await settle(status_code < 500)
+    return web.Response(text=body, status=status_code, content_type='application/json')
+
+
+async def _process_webhook_payload(payload: bytes, on_settled=None):
+    """
+    Parse a verified webhook payload and run (or enqueue) validation.
+    
+    Args:
+        payload: Raw request body (signature already verified)
+        on_settled: Passed to schedule_event when the event is coalesced in the background
+    
+    Returns:
+        Tuple of (response body dict, HTTP status code)
+    """
+    try:
+        webhook_data = json_codec.loads(payload)
+        
+        if should_log_payload(logger):
+            logger.info("Webhook payload: %s", payload.decode('utf-8', errors='replace'))
+        
+        event_type = webhook_data.get('eventType', webhook_data.get('event', 'unknown'))
+        sales_order_id = webhook_data.get('salesOrderId') or webhook_data.get('data', {}).get('salesOrderId')
+        
+        logger.info("Received webhook event", extra={'event_type': event_type, 'order_id': sales_order_id})
+        
+        if not sales_order_id:
+            logger.warning("No salesOrderId in webhook payload. Keys present: %s", list(webhook_data.keys()))
+            return {'error': 'Missing salesOrderId', 'received_keys': list(webhook_data.keys())}, 400
+        
+        if not ('SalesOrder' in event_type or event_type in ['salesOrder.created', 'salesOrder.updated']):
+            logger.info("Ignoring event type: %s", event_type)
+            return {'status': 'ignored', 'message': 'Not a sales order event'}, 200
+        
+        if config.WEBHOOK_INGEST_MODE == 'queue' and work_queue_service:
+            message_id = await pipeline.run_blocking(work_queue_service.enqueue, sales_order_id, event_type)
+            logger.info("Queued order for validation", extra={'order_id': sales_order_id, 'message_id': message_id})
+            return {
+                'status': 'queued',
+                'order_id': sales_order_id,
+                'event_type': event_type,
+                'message_id': message_id
+            }, 202
+        
+        if pipeline.coalescer:
+            # Reply now; the coalesced run happens in the background
+            return pipeline.schedule_event(sales_order_id, event_type, on_settled), 202
+        
+        result = await pipeline.process_order(sales_order_id, event_type)
+        return result, 200
+    
+    except Exception as e:
+        logger.exception("Error processing webhook: %s", e)
+        return {'error': str(e)}, 500
+
+
+@routes.post('/validate/batch')
+async def validate_order_batch(request: web.Request) -> web.StreamResponse:
+    """
+    Batch validation endpoint (see app.main.validate_order_batch), streamed as NDJSON.
+    """
+    try:
+        body = await request.json(loads=json_codec.loads)
+    except ValueError:
+        body = None
+    try:
+        refs = batch_validation_service.parse_request(body)
+    except ValueError as e:
+        return json_response({'error': str(e)}, status=400)
+    
+    logger.info("Batch validation requested for %d orders", len(refs))
+    
+    response = web.StreamResponse(headers={'Content-Type': 'application/x-ndjson'})
+    await response.prepare(request)
+    counts = {}
+    async for line in pipeline.iter_batch_results(refs, batch_validation_service.max_concurrency):
+        counts[line['status']] = counts.get(line['status'], 0) + 1
+        await response.write(json_codec.dumps_bytes(line) + b'\n')
+    # Trailer line so clients can tell a complete stream from a cut-off one
+    await response.write(json_codec.dumps_bytes({'batch_complete': True, 'total': len(refs), 'status_counts': counts}) + b'\n')
+    await response.write_eof()
+    return response
+
+
+@routes.get('/validate/{order_id}')
+async def validate_order_manual(request: web.Request) -> web.Response:
+    """
+    Manual validation endpoint for testing.
+    """
+    order_id = request.match_info['order_id']
+    try:
+        logger.info("Manual validation requested for order: %s", order_id)
+        validation_result, _ = await pipeline.validate_order(order_id, PRIORITY_MANUAL)
+        return json_response(validation_result)
+    
+    except Exception as e:
+        logger.exception("Error in manual validation: %s", e)
+        return json_response({'error': str(e)}, status=500)
+
+
+@routes.get('/history/{order_id}')
+async def get_validation_history(request: web.Request) -> web.Response:
+    """
+    Get validation history for a specific order.
+    """
+    order_id = request.match_info['order_id']
+    try:
+        history = await pipeline.run_blocking(logger_service.get_validation_history, order_id)
+        return json_response({
+            'order_id': order_id,
+            'history_count': len(history),
+            'history': history
+        })
+    
+    except Exception as e:
+        logger.error("Error retrieving validation history: %s", e)
+        return json_response({'error': str(e)}, status=500)
+
+
+@routes.post('/monitor/check')
+async def trigger_monitor_check(request: web.Request) -> web.Response:
+    """
+    Manually trigger the error monitor to check for expired errors.
+    """
+    try:
+        logger.info("Manual monitor check triggered via API")
+        await pipeline.run_blocking(error_monitor_service.trigger_check)
+        return json_response({
+            'status': 'success',
+            'message': 'Error monitor check triggered'
+        })
+    
+    except Exception as e:
+        logger.exception("Error triggering monitor check: %s", e)
+        return json_response({'error': str(e)}, status=500)
+
+
+@routes.get('/monitor/status')
+async def get_monitor_status(request: web.Request) -> web.Response:
+    """
+    Get the current status of the error monitor service.
+    """
+    try:
+        status = error_monitor_service.get_status()
+        if pipeline.coalescer:
+            status['coalescer'] = pipeline.coalescer.get_status()
+        if work_queue_service:
+            status['work_queue'] = work_queue_service.get_status()
+        if idempotency_ledger:
+            status['idempotency'] = idempotency_ledger.get_status()
+        status['validators'] = validation_service.get_status()
+        if validation_service.result_cache:
+            status['validation_cache'] = validation_service.result_cache.get_status()
+        if order_lock_service:
+            status['order_locks'] = order_lock_service.get_status()
+        if validation_scheduler:
+            status['scheduler'] = validation_scheduler.get_status()
+        if inflow_client.rate_limiter:
+            status['inflow_rate_limit'] = inflow_client.rate_limiter.get_status()
+        if inflow_client.entity_cache:
+            status['entity_cache'] = inflow_client.entity_cache.get_status()
+        if inflow_client.readiness:
+            status['order_readiness'] = inflow_client.readiness.get_status()
+        if product_catalog_service:
+            status['product_catalog'] = product_catalog_service.get_status()
+        status['circuit_breakers'] = breaker_status()
+        return json_response(status)
+    
+    except Exception as e:
+        logger.error("Error getting monitor status: %s", e)
+        return json_response({'error': str(e)}, status=500)
+
+
+@routes.get('/monitor/timings')
+async def get_monitor_timings(request: web.Request) -> web.Response:
+    """
+    Get per-stage and per-validator timing percentiles (and memory peaks when sampled).
+    """
+    try:
+        return json_response(timing_service.get_status())
+    
+    except Exception as e:
+        logger.error("Error getting monitor timings: %s", e)
+        return json_response({'error': str(e)}, status=500)
+
+
+async def _on_cleanup(app: web.Application) -> None:
+    """
+    Close client sessions when the server shuts down.
+    """
+    await pipeline.close()
+
+
+def create_app() -> web.Application:
+    """
+    Build the aiohttp application.
+    
+    Returns:
+        aiohttp Application with all routes registered
+    """
+    if pipeline is None:
+        raise RuntimeError("Async server mode requires aiohttp (pip install -r requirements-async.txt)")
+    
+    app = web.Application(client_max_size=10 * 1024 * 1024)
+    app.add_routes(routes)
+    app.on_cleanup.append(_on_cleanup)
+    return app
+
+
+def run_async_server(port: int = None) -> None:
+    """
+    Initialize validators and serve the async app until interrupted.
+    
+    Args:
+        port: Port to listen on (defaults to FLASK_PORT)
+    """
+    initialize_validators()
+    web.run_app(create_app(), host='0.0.0.0', port=port or config.FLASK_PORT, print=None)
@@ -0,0 +1,294 @@
+"""
+Asyncio variant of InFlowClient for the async server (app/async_main.py).
+
+Requires the optional aiohttp dependency (requirements-async.txt). The
+synchronous InFlowClient remains the client used by Flask and Lambda.
+"""
+
+import asyncio
+import json
+from typing import Dict, Any, Optional, List
+
+try:
+    import aiohttp
+except ImportError:  # Optional dependency - only needed for SERVER_MODE=async
+    aiohttp = None
+
+from app.config import config
+from app.clients.inflow_client import InFlowClient, inflow_client
+from app.utils.log import get_logger
+from app.utils import json_codec
+from app.utils.rate_limiter import TokenBucket, parse_retry_after
+from app.utils.resilience import (
+    Deadline, DeadlineExceeded, RetryPolicy, call_with_retries_async, get_breaker, inflow_retry_policy
+)
+from app.clients.entity_cache import EntityCache, CUSTOMER, PRODUCT, TEAM_MEMBER
+from app.clients.order_readiness import OrderReadiness
+
+logger = get_logger(__name__)
+
+
+class AsyncInFlowClient:
+    """
+    Async client for the InFlow Inventory API.
+    Handles authentication, rate limiting, and retries on one shared aiohttp session.
+    """
+    
+    def __init__(self, api_key: str, company_id: str, base_url: str, max_connections: int = 100,
+                 rate_limiter: Optional[TokenBucket] = None, entity_cache: Optional[EntityCache] = None,
+                 readiness: Optional[OrderReadiness] = None):
+        """
+        Initialize the async InFlow API client.
+        
+        Args:
+            api_key: InFlow API key
+            company_id: InFlow company ID
+            base_url: Base URL for InFlow API
+            max_connections: Connection pool size of the shared session
+            rate_limiter: Token bucket pacing every request (share the sync client's
+                so both draw from one budget; None = unpaced)
+            entity_cache: Cache for customers, products and team members (share the sync
+                client's; None = always fetch)
+            readiness: Re-poll policy for orders still being saved (share the sync client's;
+                None = single read)
+        """
+        self.api_key = api_key
+        self.company_id = company_id
+        self.base_url = base_url.rstrip('/')
+        self.max_connections = max_connections
+        self.rate_limiter = rate_limiter
+        self.entity_cache = entity_cache
+        self.readiness = readiness
+        self.retry_policy = inflow_retry_policy()
+        self.breaker = get_breaker('inflow')
+        self.headers = {
+            'Authorization': f'Bearer {api_key}',
+            'Accept': 'application/json;version=2025-06-24'
+        }
+        self._session: Optional['aiohttp.ClientSession'] = None
+    
+    async def _get_session(self) -> 'aiohttp.ClientSession':
+        """
+        Get the shared session, creating it on the running event loop.
+        """
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                headers=self.headers,
+                connector=aiohttp.TCPConnector(limit=self.max_connections),
+                timeout=aiohttp.ClientTimeout(total=60)
+            )
+        return self._session
+    
+    async def close(self) -> None:
+        """
+        Close the shared session.
+        """
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+    
+    async def _make_request(self, method: str, endpoint: str, max_retries: Optional[int] = None, **kwargs) -> Any:
+        """
+        Make an API request with retry logic (same policy and 'inflow' circuit breaker as InFlowClient).
+        
+        Args:
+            method: HTTP method (GET, POST, etc.)
+            endpoint: API endpoint path
+            max_retries: Maximum number of attempts (None = RETRY_MAX_ATTEMPTS)
+            **kwargs: Additional arguments to pass to aiohttp
+        
+        Returns:
+            Decoded JSON response
+        
+        Raises:
+            aiohttp.ClientResponseError: If InFlow answers with an error status
+            CircuitOpenError: If InFlow is failing and the circuit is open
+            Exception: If request fails after all retries
+        """
+        url = f"{self.base_url}/{self.company_id}/{endpoint.lstrip('/')}"
+        session = await self._get_session()
+        
+        policy = self.retry_policy
+        if max_retries is not None:
+            policy = RetryPolicy(max_retries, policy.base_delay, policy.max_delay,
+                                 policy.attempt_timeout, policy.deadline_seconds)
+        
+        async def attempt(deadline: Deadline) -> Any:
+            throttled = 0
+            while True:
+                if self.rate_limiter:
+                    await self.rate_limiter.acquire_async(timeout=deadline.remaining())
+                timeout = aiohttp.ClientTimeout(total=deadline.timeout(policy.attempt_timeout))
+                async with session.request(method, url, timeout=timeout, **kwargs) as response:
+                    # Handle rate limiting (does not use up a retry attempt)
+                    if response.status == 429:
+                        throttled += 1
+                        if throttled > InFlowClient.MAX_THROTTLED_RETRIES:
+                            raise Exception(f"InFlow API rate limit exceeded after {throttled} attempts")
+                        retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                        if self.rate_limiter:
+                            self.rate_limiter.on_throttled(retry_after)
+                            logger.warning("Rate limited by InFlow (Retry-After: %s) - slowing down", retry_after)
+                        else:
+                            wait_time = min(retry_after or 60, max(0.0, deadline.remaining()))
+                            logger.warning("Rate limited. Retrying after %d seconds...", wait_time)
+                            await asyncio.sleep(wait_time)
+                        continue
+                    
+                    if response.status >= 400:
+                        body = await response.text()
+                        logger.error("HTTP Error: %s %s for url: %s", response.status, response.reason, url)
+                        logger.debug("Response body: %s", body)
+                        response.raise_for_status()
+                    
+                    if self.rate_limiter:
+                        self.rate_limiter.on_success()
+                    body = await response.read()
+                    return json_codec.loads(body) if body.strip() else None
+        
+        try:
+            return await call_with_retries_async(attempt, self.breaker, policy)
+        
+        except aiohttp.ClientResponseError:
+            raise
+        
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            if isinstance(e, DeadlineExceeded):
+                raise
+            raise Exception(f"InFlow API request failed after {policy.max_attempts} attempts: {e}")
+    
+    async def get_sales_order(self, order_id: str) -> Dict[Any, Any]:
+        """
+        Fetch full sales order details.
+        
+        Args:
+            order_id: Sales order ID
+        
+        Returns:
+            Sales order data with the relationships its consumers declared
+            (shared with the sync client's inflow_client.require_includes)
+        """
+        include = inflow_client.sales_order_include
+        order_data = await self._make_request(
+            'GET',
+            f'sales-orders/{order_id}',
+            params={'include': include} if include else None
+        )
+        if self.entity_cache:
+            self.entity_cache.prime_from_order(order_data)
+        return order_data
+    
+    async def get_sales_order_when_ready(self, order_id: str) -> Dict[Any, Any]:
+        """
+        Fetch a sales order once InFlow has finished saving it (see InFlowClient.get_sales_order_when_ready).
+        """
+        if not self.readiness:
+            return await self.get_sales_order(order_id)
+        return await self.readiness.fetch_when_ready_async(lambda: self.get_sales_order(order_id))
+    
+    async def list_sales_orders(self, filters: Optional[Dict[str, Any]] = None, include: Optional[str] = None,
+                                count: int = 100, skip: int = 0) -> List[Dict[Any, Any]]:
+        """
+        List sales orders (one page).
+        
+        Args:
+            filters: Filter values by name; dict values (date ranges) are sent as JSON
+            include: Relationships to include, e.g. 'lines.product,customer'
+            count: Page size
+            skip: Number of records to skip
+        
+        Returns:
+            List of sales orders
+        """
+        params = {'count': count, 'skip': skip}
+        if include:
+            params['include'] = include
+        for name, value in (filters or {}).items():
+            params[f'filter[{name}]'] = json.dumps(value) if isinstance(value, (dict, list)) else str(value)
+        return await self._make_request('GET', 'sales-orders', params=params)
+    
+    async def find_sales_order_by_number(self, order_number: str) -> Optional[Dict[Any, Any]]:
+        """
+        Look up a sales order by its order number.
+        
+        Args:
+            order_number: Order number shown in InFlow (e.g. 'SO-001234')
+        
+        Returns:
+            Sales order summary (includes salesOrderId), or None if not found
+        """
+        orders = await self.list_sales_orders(filters={'orderNumber': order_number}, count=5)
+        # The filter can match on a prefix - prefer the exact order number
+        for order in orders or []:
+            if order.get('orderNumber', '').lower() == order_number.lower():
+                return order
+        return None
+    
+    async def _get_entity(self, entity_type: str, entity_id: str, endpoint: str) -> Dict[Any, Any]:
+        """
+        Fetch a reference entity through the entity cache (see InFlowClient._get_entity).
+        """
+        if self.entity_cache:
+            cached = self.entity_cache.get(entity_type, entity_id)
+            if cached is not None:
+                return cached
+        
+        try:
+            entity = await self._make_request('GET', endpoint)
+        except aiohttp.ClientResponseError as e:
+            if self.entity_cache and e.status == 404:
+                self.entity_cache.put_missing(entity_type, entity_id, e)
+            raise
+        
+        if self.entity_cache:
+            self.entity_cache.put(entity_type, entity_id, entity)
+        return entity
+    
+    async def get_customer(self, customer_id: str) -> Dict[Any, Any]:
+        """
+        Fetch customer details including discount rules (cached).
+        
+        Args:
+            customer_id: Customer ID
+        
+        Returns:
+            Customer data with discount policies
+        """
+        return await self._get_entity(CUSTOMER, customer_id, f'customers/{customer_id}')
+    
+    async def get_product(self, product_id: str) -> Dict[Any, Any]:
+        """
+        Fetch product details (cached).
+        
+        Args:
+            product_id: Product ID
+        
+        Returns:
+            Product data including category and pricing info
+        """
+        return await self._get_entity(PRODUCT, product_id, f'products/{product_id}')
+    
+    async def get_team_member(self, team_member_id: str) -> Dict[Any, Any]:
+        """
+        Fetch team member details, e.g. an order's sales rep (cached).
+        
+        Args:
+            team_member_id: Team member ID
+        
+        Returns:
+            Team member data including name and email
+        """
+        return await self._get_entity(TEAM_MEMBER, team_member_id, f'team-members/{team_member_id}')
+
+# Create a singleton instance (None when aiohttp is not installed)
+async_inflow_client = None
+if aiohttp is not None:
+    async_inflow_client = AsyncInFlowClient(
+        api_key=config.INFLOW_API_KEY or '',
+        company_id=config.INFLOW_COMPANY_ID or '',
+        base_url=config.INFLOW_API_BASE_URL,
+        max_connections=config.ASYNC_MAX_CONNECTIONS,
+        rate_limiter=inflow_client.rate_limiter,
+        entity_cache=inflow_client.entity_cache,
+        readiness=inflow_client.readiness
+    )
@@ -0,0 +1,117 @@
+"""
+Asyncio variant of OutlookClient for the async server (app/async_main.py).
+
+Token acquisition is delegated to the synchronous OutlookClient's MSAL
+application (run off the event loop), so both share one token cache.
+"""
+
+import asyncio
+from typing import List, Dict, Any, Optional
+
+try:
+    import aiohttp
+except ImportError:  # Optional dependency - only needed for SERVER_MODE=async
+    aiohttp = None
+
+from app.clients.outlook_client import OutlookClient, outlook_client
+from app.utils.resilience import graph_request_async
+
+
+class AsyncOutlookClient:
+    """
+    Async client for sending emails via Microsoft Graph.
+    """
+    
+    def __init__(self, sync_client: OutlookClient):
+        """
+        Initialize the async Outlook client.
+        
+        Args:
+            sync_client: Configured OutlookClient providing MSAL authentication
+        """
+        self.sync_client = sync_client
+        self._session: Optional['aiohttp.ClientSession'] = None
+    
+    async def _get_session(self) -> 'aiohttp.ClientSession':
+        """
+        Get the shared session, creating it on the running event loop.
+        """
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=60))
+        return self._session
+    
+    async def close(self) -> None:
+        """
+        Close the shared session.
+        """
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+    
+    async def send_email(
+        self,
+        to_addresses: List[str],
+        subject: str,
+        body_html: str,
+        from_address: Optional[str] = None,
+        cc_addresses: Optional[List[str]] = None
+    ) -> Dict[Any, Any]:
+        """
+        Send an email via Outlook API.
+        
+        Args:
+            to_addresses: List of recipient email addresses
+            subject: Email subject
+            body_html: Email body in HTML format
+            from_address: Sender email address (if not provided, uses authenticated user)
+            cc_addresses: List of CC recipient email addresses
+        
+        Returns:
+            Response from the API
+        
+        Raises:
+            Exception: If email sending fails
+        """
+        # MSAL is synchronous (and may hit the network on a cold cache)
+        access_token = await asyncio.get_running_loop().run_in_executor(None, self.sync_client._get_access_token)
+        
+        message = {
+            "message": {
+                "subject": subject,
+                "body": {
+                    "contentType": "HTML",
+                    "content": body_html
+                },
+                "toRecipients": [
+                    {"emailAddress": {"address": addr}} for addr in to_addresses
+                ]
+            },
+            "saveToSentItems": "true"
+        }
+        
+        if cc_addresses:
+            message["message"]["ccRecipients"] = [
+                {"emailAddress": {"address": addr}} for addr in cc_addresses
+            ]
+        
+        if from_address:
+            endpoint = f"https://graph.microsoft.com/v1.0/users/{from_address}/sendMail"
+        else:
+            endpoint = "https://graph.microsoft.com/v1.0/me/sendMail"
+        
+        session = await self._get_session()
+        headers = {"Authorization": f"Bearer {access_token}"}
+        # Not idempotent: only retried when Graph did not act on it
+        status, body = await graph_request_async(session, 'outlook', 'POST', endpoint, idempotent=False,
+                                                 json=message, headers=headers)
+        if status not in [200, 202]:
+            raise Exception(
+                f"Failed to send email: {status} - {body.decode('utf-8', errors='replace')}"
+            )
+        return {"status": "sent", "status_code": status}
+
+
+# Create a singleton instance (None when aiohttp or Outlook credentials are missing)
+async_outlook_client = None
+if aiohttp is not None and outlook_client is not None:
+    async_outlook_client = AsyncOutlookClient(outlook_client)
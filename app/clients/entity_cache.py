@@ -0,0 +1,187 @@
+"""
+Read-through cache for InFlow reference entities (customers, products, team members).
+
+Customer discount rules, product categories and sales reps rarely change
+between orders, so InFlowClient keeps them in a bounded LRU with a TTL per
+entity type. Lookups for IDs that InFlow answered 404 for are cached briefly
+too (negative caching) so a bad reference does not cost an API call per
+order. Every fetched sales order refreshes the entities it includes.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+from app.config import config
+
+
+# Entity types
+CUSTOMER = 'customer'
+PRODUCT = 'product'
+TEAM_MEMBER = 'team_member'
+
+
+class _Missing:
+    """
+    Negative cache entry: the error InFlow returned for a nonexistent entity.
+    """
+    
+    __slots__ = ('error',)
+    
+    def __init__(self, error: Exception):
+        self.error = error
+
+
+class EntityCache:
+    """
+    Thread-safe TTL + LRU cache keyed by (entity type, entity ID).
+    
+    Cached dictionaries are shared between callers and must be treated as read-only.
+    """
+    
+    def __init__(self, ttls: Dict[str, float], max_entries: int = 5000, negative_ttl: float = 60.0):
+        """
+        Initialize the cache.
+        
+        Args:
+            ttls: Seconds an entity stays fresh, per entity type
+            max_entries: Entities kept before the least recently used are evicted
+            negative_ttl: Seconds a not-found answer is remembered
+        """
+        self.ttls = dict(ttls)
+        self.max_entries = max_entries
+        self.negative_ttl = negative_ttl
+        self._entries: 'OrderedDict[Tuple[str, str], tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'negative_hits': 0, 'misses': 0, 'evictions': 0, 'invalidations': 0}
+    
+    def get(self, entity_type: str, entity_id: str) -> Optional[Dict[Any, Any]]:
+        """
+        Get a fresh cached entity.
+        
+        Args:
+            entity_type: CUSTOMER, PRODUCT or TEAM_MEMBER
+            entity_id: InFlow ID
+        
+        Returns:
+            Cached entity, or None on a miss
+        
+        Raises:
+            Exception: The original not-found error for a negatively cached ID
+        """
+        key = (entity_type, entity_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self._stats['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            value = entry[1]
+            if isinstance(value, _Missing):
+                self._stats['negative_hits'] += 1
+            else:
+                self._stats['hits'] += 1
+        
+        if isinstance(value, _Missing):
+            # Drop the previous traceback so repeated raises do not grow it
+            raise value.error.with_traceback(None)
+        return value
+    
+    def put(self, entity_type: str, entity_id: str, entity: Dict[Any, Any]) -> None:
+        """
+        Store an entity for its type's TTL.
+        """
+        self._store((entity_type, entity_id), entity, self.ttls.get(entity_type, 0))
+    
+    def put_missing(self, entity_type: str, entity_id: str, error: Exception) -> None:
+        """
+        Remember that an entity does not exist (re-raised by get() for negative_ttl).
+        """
+        self._store((entity_type, entity_id), _Missing(error), self.negative_ttl)
+    
+    def _store(self, key: Tuple[str, str], value: Any, ttl: float) -> None:
+        if ttl <= 0 or self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+    
+    def invalidate(self, entity_type: Optional[str] = None, entity_id: Optional[str] = None) -> int:
+        """
+        Drop cached entities.
+        
+        Args:
+            entity_type: Type to drop (None = every type)
+            entity_id: Single ID to drop (None = every ID of the type)
+        
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            if entity_type is not None and entity_id is not None:
+                keys = [(entity_type, entity_id)] if (entity_type, entity_id) in self._entries else []
+            else:
+                keys = [key for key in self._entries if entity_type is None or key[0] == entity_type]
+            for key in keys:
+                del self._entries[key]
+            self._stats['invalidations'] += len(keys)
+        return len(keys)
+    
+    def prime_from_order(self, order_data: Dict[Any, Any]) -> None:
+        """
+        Refresh the cache from the entities included in a fetched sales order.
+        
+        Args:
+            order_data: Sales order fetched with SALES_ORDER_INCLUDE
+        """
+        customer = order_data.get('customer')
+        if isinstance(customer, dict) and customer.get('customerId'):
+            self.put(CUSTOMER, customer['customerId'], customer)
+        
+        team_member = order_data.get('salesRepTeamMember')
+        if isinstance(team_member, dict) and team_member.get('teamMemberId'):
+            self.put(TEAM_MEMBER, team_member['teamMemberId'], team_member)
+        
+        for line in order_data.get('lines') or []:
+            product = line.get('product') if isinstance(line, dict) else None
+            if isinstance(product, dict) and product.get('productId'):
+                self.put(PRODUCT, product['productId'], product)
+    
+    def get_status(self) -> Dict[str, Any]:
+        """
+        Get cache metrics.
+        
+        Returns:
+            Dictionary with entry count, limits and hit/miss/eviction counters
+        """
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': dict(self.ttls),
+                'negative_ttl_seconds': self.negative_ttl,
+                **self._stats
+            }
+
+
+def create_entity_cache() -> Optional[EntityCache]:
+    """
+    Create the entity cache from configuration (None when disabled).
+    """
+    if config.ENTITY_CACHE_MAX_ENTRIES <= 0:
+        return None
+    return EntityCache(
+        ttls={
+            CUSTOMER: config.ENTITY_CACHE_CUSTOMER_TTL_SECONDS,
+            PRODUCT: config.ENTITY_CACHE_PRODUCT_TTL_SECONDS,
+            TEAM_MEMBER: config.ENTITY_CACHE_TEAM_MEMBER_TTL_SECONDS
+        },
+        max_entries=config.ENTITY_CACHE_MAX_ENTRIES,
+        negative_ttl=config.ENTITY_CACHE_NEGATIVE_TTL_SECONDS
+    )
@@ -1,7 +1,43 @@
 import requests
-from typing import Dict, Any, Optional, List
+import threading
+from typing import Dict, Any, Optional, List, Iterable, Tuple
 import time
 from app.config import config
+from app.utils.log import get_logger
+from app.utils import json_codec
+from app.utils.rate_limiter import TokenBucket, create_inflow_rate_limiter, parse_retry_after
+from app.utils.resilience import Deadline, RetryPolicy, call_with_retries, get_breaker, inflow_retry_policy
+from app.clients.entity_cache import EntityCache, create_entity_cache, CUSTOMER, PRODUCT, TEAM_MEMBER
+from app.clients.order_readiness import OrderReadiness, create_order_readiness
+
+logger = get_logger(__name__)
+
+
+# Relationships requested for a sales order until its consumers (validators,
+# logger, notifications) have declared what they read - see require_includes()
+SALES_ORDER_INCLUDE = 'lines.product,customer,location,paymentLines,salesRepTeamMember'
+
+
+def build_include(paths: Iterable[str]) -> str:
+    """
+    Build a minimal include= value from relationship paths.
+    
+    Duplicates are dropped, as are paths already covered by a nested one
+    ('lines' by 'lines.product'). The result is sorted so equal sets give
+    equal URLs.
+    
+    Args:
+        paths: Relationship paths, e.g. ['lines.product', 'customer']
+    
+    Returns:
+        Comma-separated include value ('' for no relationships)
+    """
+    unique = {path.strip() for path in paths if path and path.strip()}
+    minimal = [
+        path for path in unique
+        if not any(other.startswith(path + '.') for other in unique)
+    ]
+    return ','.join(sorted(minimal))
 
 
 class InFlowClient:
@@ -10,7 +46,12 @@ class InFlowClient:
     Handles authentication, rate limiting, and retries.
     """
     
-    def __init__(self, api_key: str, company_id: str, base_url: str):
+    # 429 responses retried per attempt on top of max_retries
+    MAX_THROTTLED_RETRIES = 5
+    
+    def __init__(self, api_key: str, company_id: str, base_url: str,
+                 rate_limiter: Optional[TokenBucket] = None, entity_cache: Optional[EntityCache] = None,
+                 readiness: Optional[OrderReadiness] = None):
         """
         Initialize the InFlow API client.
         
@@ -18,30 +59,49 @@ class InFlowClient:
             api_key: InFlow API key
             company_id: InFlow company ID
             base_url: Base URL for InFlow API
+            rate_limiter: Shared token bucket pacing every request (None = unpaced)
+            entity_cache: Cache for customers, products and team members (None = always fetch)
+            readiness: Re-poll policy for orders still being saved (None = single read)
         """
         self.api_key = api_key
         self.company_id = company_id
         self.base_url = base_url.rstrip('/')
+        self.rate_limiter = rate_limiter
+        self.entity_cache = entity_cache
+        self.readiness = readiness
+        self.sales_order_include = SALES_ORDER_INCLUDE
+        self._required_includes: Dict[str, Tuple[str, ...]] = {}
+        self._include_lock = threading.Lock()
+        self.retry_policy = inflow_retry_policy()
+        self.breaker = get_breaker('inflow')
         self.session = requests.Session()
         self.session.headers.update({
             'Authorization': f'Bearer {api_key}',
             'Accept': 'application/json;version=2025-06-24'
         })
     
-    def _make_request(self, method: str, endpoint: str, max_retries: int = 3, **kwargs) -> Dict[Any, Any]:
+    def _make_request(self, method: str, endpoint: str, max_retries: Optional[int] = None, **kwargs) -> Dict[Any, Any]:
         """
         Make an API request with retry logic.
         
+        Transient failures (connection errors, timeouts, 408/5xx) are retried
+        with jittered backoff within the request deadline; 429 responses are
+        paced by the rate limiter without using up an attempt; other errors
+        are raised at once. Every attempt is reported to the 'inflow' circuit
+        breaker.
+        
         Args:
             method: HTTP method (GET, POST, etc.)
             endpoint: API endpoint path
-            max_retries: Maximum number of retry attempts
+            max_retries: Maximum number of attempts (None = RETRY_MAX_ATTEMPTS)
             **kwargs: Additional arguments to pass to requests
         
         Returns:
             JSON response as dictionary
         
         Raises:
+            requests.exceptions.HTTPError: If InFlow answers with an error status
+            CircuitOpenError: If InFlow is failing and the circuit is open
             Exception: If request fails after all retries
         """
         url = f"{self.base_url}/{self.company_id}/{endpoint.lstrip('/')}"
@@ -52,37 +112,72 @@ class InFlowClient:
                 kwargs['headers'] = {}
             kwargs['headers']['Content-Type'] = 'application/json'
         
-        for attempt in range(max_retries):
-            try:
-                response = self.session.request(method, url, **kwargs)
+        policy = self.retry_policy
+        if max_retries is not None:
+            policy = RetryPolicy(max_retries, policy.base_delay, policy.max_delay,
+                                 policy.attempt_timeout, policy.deadline_seconds)
+        
+        def attempt(deadline: Deadline) -> Dict[Any, Any]:
+            throttled = 0
+            while True:
+                if self.rate_limiter:
+                    self.rate_limiter.acquire(timeout=deadline.remaining())
+                response = self.session.request(method, url, timeout=deadline.timeout(policy.attempt_timeout), **kwargs)
                 
-                # Handle rate limiting
+                # Handle rate limiting (does not use up a retry attempt)
                 if response.status_code == 429:
-                    retry_after = int(response.headers.get('Retry-After', 60))
-                    print(f"Rate limited. Retrying after {retry_after} seconds...")
-                    time.sleep(retry_after)
+                    throttled += 1
+                    if throttled > self.MAX_THROTTLED_RETRIES:
+                        raise Exception(f"InFlow API rate limit exceeded after {throttled} attempts")
+                    retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                    if self.rate_limiter:
+                        self.rate_limiter.on_throttled(retry_after)
+                        logger.warning("Rate limited by InFlow (Retry-After: %s) - slowing down", retry_after)
+                    else:
+                        wait_time = min(retry_after or 60, max(0.0, deadline.remaining()))
+                        logger.warning("Rate limited. Retrying after %d seconds...", wait_time)
+                        time.sleep(wait_time)
                     continue
                 
                 response.raise_for_status()
-                return response.json()
-            
-            except requests.exceptions.HTTPError as e:
-                # Print detailed error for debugging
-                print(f"HTTP Error: {e}")
-                if hasattr(e.response, 'text'):
-                    print(f"Response body: {e.response.text}")
-                if attempt == max_retries - 1:
-                    raise
-            
-            except requests.exceptions.RequestException as e:
-                if attempt == max_retries - 1:
-                    raise Exception(f"InFlow API request failed after {max_retries} attempts: {e}")
-                
-                wait_time = 2 ** attempt  # Exponential backoff
-                print(f"Request failed, retrying in {wait_time} seconds... (Attempt {attempt + 1}/{max_retries})")
-                time.sleep(wait_time)
+                if self.rate_limiter:
+                    self.rate_limiter.on_success()
+                return json_codec.loads(response.content)
+        
+        try:
+            return call_with_retries(attempt, self.breaker, policy)
+        
+        except requests.exceptions.HTTPError as e:
+            # Log detailed error for debugging
+            logger.error("HTTP Error: %s", e)
+            if hasattr(e.response, 'text'):
+                logger.debug("Response body: %s", e.response.text)
+            raise
+        
+        except requests.exceptions.RequestException as e:
+            raise Exception(f"InFlow API request failed after {policy.max_attempts} attempts: {e}")
+        
+        except json_codec.JSONDecodeError as e:
+            raise Exception(f"InFlow API returned invalid JSON: {e}")
+    
+    def require_includes(self, consumer: str, includes: Iterable[str]) -> None:
+        """
+        Declare the sales order relationships a consumer reads.
+        
+        Sales orders are then fetched with the union of every consumer's
+        declaration instead of SALES_ORDER_INCLUDE, so relationships only
+        used by disabled validators are no longer requested. Declaring again
+        under the same consumer name replaces its previous declaration.
         
-        raise Exception("Failed to complete request")
+        Args:
+            consumer: Name of the validator or service
+            includes: Relationship paths, e.g. ['lines.product', 'customer']
+        """
+        with self._include_lock:
+            self._required_includes[consumer] = tuple(includes)
+            self.sales_order_include = build_include(
+                path for paths in self._required_includes.values() for path in paths
+            )
     
     def get_sales_order(self, order_id: str) -> Dict[Any, Any]:
         """
@@ -92,25 +187,133 @@ class InFlowClient:
             order_id: Sales order ID
         
         Returns:
-            Complete sales order data including line items, customer info, payment details
+            Sales order data with the relationships its consumers declared
+            (line products, customer, payment lines, sales rep, ...)
         """
-        # Add a small delay to allow InFlow to process the order
-        import time
-        time.sleep(2)  # Wait 2 seconds for InFlow to process
-        
-        # Include line items and other related data in the response
         # According to InFlow API docs, relationships must be explicitly included
-        # Use nested include to get product details within lines
-        # Include paymentLines for credit card fee validation
-        # Include salesRepTeamMember to get account manager details
-        return self._make_request(
-            'GET', 
-            f'sales-orders/{order_id}?include=lines.product,customer,location,paymentLines,salesRepTeamMember'
+        # (nested include for product details within lines)
+        include = self.sales_order_include
+        order_data = self._make_request(
+            'GET',
+            f'sales-orders/{order_id}',
+            params={'include': include} if include else None
         )
+        
+        # The included customer, products and sales rep are as fresh as it gets
+        if self.entity_cache:
+            self.entity_cache.prime_from_order(order_data)
+        return order_data
+    
+    def get_sales_order_when_ready(self, order_id: str) -> Dict[Any, Any]:
+        """
+        Fetch a sales order that a webhook just reported, once InFlow has finished saving it.
+        
+        Fetches at once, then re-reads with short doubling delays until two reads
+        agree on the order's `timestamp` rowversion and line count.
+        
+        Args:
+            order_id: Sales order ID
+        
+        Returns:
+            Sales order data (as get_sales_order)
+        """
+        if not self.readiness:
+            return self.get_sales_order(order_id)
+        return self.readiness.fetch_when_ready(lambda: self.get_sales_order(order_id))
+    
+    def list_sales_orders(self, filters: Optional[Dict[str, Any]] = None, include: Optional[str] = None,
+                          count: int = 100, skip: int = 0) -> List[Dict[Any, Any]]:
+        """
+        List sales orders (one page).
+        
+        Args:
+            filters: Filter values by name, e.g. {'orderNumber': 'SO-001234'};
+                     dict values (date ranges) are sent as JSON
+            include: Relationships to include, e.g. 'lines.product,customer'
+            count: Page size
+            skip: Number of records to skip
+        
+        Returns:
+            List of sales orders
+        """
+        return self._list('sales-orders', filters, include, count, skip)
+    
+    def list_products(self, filters: Optional[Dict[str, Any]] = None, include: Optional[str] = None,
+                      count: int = 100, skip: int = 0) -> List[Dict[Any, Any]]:
+        """
+        List products (one page).
+        
+        Args:
+            filters: Filter values by name, e.g. {'lastModifiedDateTime': {'fromDate': ...}}
+            include: Relationships to include, e.g. 'category'
+            count: Page size
+            skip: Number of records to skip
+        
+        Returns:
+            List of products
+        """
+        return self._list('products', filters, include, count, skip)
+    
+    def _list(self, endpoint: str, filters: Optional[Dict[str, Any]], include: Optional[str],
+              count: int, skip: int) -> List[Dict[Any, Any]]:
+        """
+        Fetch one page of a list endpoint (dict/list filter values are sent as JSON).
+        """
+        params = {'count': count, 'skip': skip}
+        if include:
+            params['include'] = include
+        for name, value in (filters or {}).items():
+            params[f'filter[{name}]'] = json_codec.dumps(value) if isinstance(value, (dict, list)) else value
+        return self._make_request('GET', endpoint, params=params)
+    
+    def find_sales_order_by_number(self, order_number: str) -> Optional[Dict[Any, Any]]:
+        """
+        Look up a sales order by its order number.
+        
+        Args:
+            order_number: Order number shown in InFlow (e.g. 'SO-001234')
+        
+        Returns:
+            Sales order summary (includes salesOrderId), or None if not found
+        """
+        orders = self.list_sales_orders(filters={'orderNumber': order_number}, count=5)
+        # The filter can match on a prefix - prefer the exact order number
+        for order in orders or []:
+            if order.get('orderNumber', '').lower() == order_number.lower():
+                return order
+        return None
+    
+    def _get_entity(self, entity_type: str, entity_id: str, endpoint: str) -> Dict[Any, Any]:
+        """
+        Fetch a reference entity through the entity cache.
+        
+        Args:
+            entity_type: CUSTOMER, PRODUCT or TEAM_MEMBER
+            entity_id: InFlow ID
+            endpoint: API endpoint path
+        
+        Returns:
+            Entity data (cached dictionaries are shared - do not modify)
+        """
+        if self.entity_cache:
+            cached = self.entity_cache.get(entity_type, entity_id)
+            if cached is not None:
+                return cached
+        
+        try:
+            entity = self._make_request('GET', endpoint)
+        except requests.exceptions.HTTPError as e:
+            if self.entity_cache and e.response is not None and e.response.status_code == 404:
+                self.entity_cache.put_missing(entity_type, entity_id, e)
+            raise
+        
+        if self.entity_cache:
+            self.entity_cache.put(entity_type, entity_id, entity)
+        return entity
     
     def get_customer(self, customer_id: str) -> Dict[Any, Any]:
         """
-        Fetch customer details including discount rules.
+        Fetch customer details including discount rules (cached).
         
         Args:
             customer_id: Customer ID
@@ -118,11 +321,11 @@ class InFlowClient:
         Returns:
             Customer data with discount policies
         """
-        return self._make_request('GET', f'customers/{customer_id}')
+        return self._get_entity(CUSTOMER, customer_id, f'customers/{customer_id}')
     
     def get_product(self, product_id: str) -> Dict[Any, Any]:
         """
-        Fetch product details.
+        Fetch product details (cached).
         
         Args:
             product_id: Product ID
@@ -130,7 +333,19 @@ class InFlowClient:
         Returns:
             Product data including category and pricing info
         """
-        return self._make_request('GET', f'products/{product_id}')
+        return self._get_entity(PRODUCT, product_id, f'products/{product_id}')
+    
+    def get_team_member(self, team_member_id: str) -> Dict[Any, Any]:
+        """
+        Fetch team member details, e.g. an order's sales rep (cached).
+        
+        Args:
+            team_member_id: Team member ID
+        
+        Returns:
+            Team member data including name and email
+        """
+        return self._get_entity(TEAM_MEMBER, team_member_id, f'team-members/{team_member_id}')
     
     def list_webhooks(self) -> List[Dict[Any, Any]]:
         """
@@ -190,6 +405,9 @@ class InFlowClient:
 inflow_client = InFlowClient(
     api_key=config.INFLOW_API_KEY or '',
     company_id=config.INFLOW_COMPANY_ID or '',
-    base_url=config.INFLOW_API_BASE_URL
+    base_url=config.INFLOW_API_BASE_URL,
+    rate_limiter=create_inflow_rate_limiter(),
+    entity_cache=create_entity_cache(),
+    readiness=create_order_readiness()
 )
 
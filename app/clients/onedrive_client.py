@@ -4,6 +4,7 @@ from typing import Dict, Any, Optional
 import io
 import time
 from app.config import config
+from app.utils.resilience import graph_request
 
 
 class OneDriveClient:
@@ -93,7 +94,7 @@ class OneDriveClient:
             "Authorization": f"Bearer {access_token}"
         }
         
-        response = requests.get(endpoint, headers=headers)
+        response = graph_request('onedrive', 'GET', endpoint, headers=headers)
         
         if response.status_code != 200:
             raise Exception(
@@ -0,0 +1,163 @@
+"""
+Readiness check for sales orders that InFlow may still be saving.
+
+A webhook can arrive while InFlow is still writing the order's lines, so the
+first read may be half-saved. Instead of sleeping a fixed time before the
+fetch, the order is fetched at once and re-read after a short delay that
+doubles each time, until two consecutive reads agree on InFlow's `timestamp`
+rowversion and the line count. Settled orders cost one extra read after
+initial_delay; orders still being saved are followed until they settle,
+max_polls re-reads have been made or the ambient request deadline (see
+resilience.deadline_scope) leaves no time for the next wait.
+"""
+
+import asyncio
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from app.config import config
+from app.utils.log import get_logger
+from app.utils.metrics import RollingStats
+from app.utils.resilience import current_deadline
+
+logger = get_logger(__name__)
+
+
+def order_version(order_data: Dict[Any, Any]) -> Tuple[Any, int]:
+    """
+    What must not change between two reads of a saved order: rowversion and line count.
+    """
+    return order_data.get('timestamp'), len(order_data.get('lines') or [])
+
+
+class OrderReadiness:
+    """
+    Re-polls a sales order until two consecutive reads agree (thread-safe counters).
+    """
+    
+    def __init__(self, max_polls: int = 4, initial_delay: float = 0.25, max_delay: float = 2.0):
+        """
+        Initialize the readiness check.
+        
+        Args:
+            max_polls: Re-reads after the first fetch before giving up
+            initial_delay: Seconds before the first re-read
+            max_delay: Cap of the doubling delay between re-reads
+        """
+        self.max_polls = max_polls
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self._lock = threading.Lock()
+        self._stats = {'orders': 0, 'reads': 0, 'changed': 0, 'unsettled': 0}
+        self._settle_ms = RollingStats()
+    
+    def fetch_when_ready(self, fetch: Callable[[], Dict[Any, Any]]) -> Dict[Any, Any]:
+        """
+        Fetch an order and re-read it until it stops changing.
+        
+        Args:
+            fetch: Reads the order from InFlow
+        
+        Returns:
+            The last read (settled, or the newest one if it never settled)
+        """
+        started = time.monotonic()
+        order_data = fetch()
+        reads, changed, settled = 1, False, False
+        delay = self.initial_delay
+        for _ in range(self.max_polls):
+            if not _can_wait(delay):
+                break
+            time.sleep(delay)
+            try:
+                latest = fetch()
+            except Exception as e:
+                logger.warning("Re-reading order for readiness failed (%s) - using the last read", e)
+                break
+            reads += 1
+            settled = order_version(latest) == order_version(order_data)
+            changed = changed or not settled
+            order_data = latest
+            if settled:
+                break
+            delay = min(delay * 2, self.max_delay)
+        self._record(order_data, reads, changed, settled, started)
+        return order_data
+    
+    async def fetch_when_ready_async(self, fetch: Callable[[], Awaitable[Dict[Any, Any]]]) -> Dict[Any, Any]:
+        """
+        Asyncio variant of fetch_when_ready() (waits without blocking the event loop).
+        """
+        started = time.monotonic()
+        order_data = await fetch()
+        reads, changed, settled = 1, False, False
+        delay = self.initial_delay
+        for _ in range(self.max_polls):
+            if not _can_wait(delay):
+                break
+            await asyncio.sleep(delay)
+            try:
+                latest = await fetch()
+            except Exception as e:
+                logger.warning("Re-reading order for readiness failed (%s) - using the last read", e)
+                break
+            reads += 1
+            settled = order_version(latest) == order_version(order_data)
+            changed = changed or not settled
+            order_data = latest
+            if settled:
+                break
+            delay = min(delay * 2, self.max_delay)
+        self._record(order_data, reads, changed, settled, started)
+        return order_data
+    
+    def _record(self, order_data: Dict[Any, Any], reads: int, changed: bool, settled: bool, started: float) -> None:
+        elapsed_ms = (time.monotonic() - started) * 1000
+        with self._lock:
+            self._stats['orders'] += 1
+            self._stats['reads'] += reads
+            self._stats['changed'] += int(changed)
+            self._stats['unsettled'] += int(not settled)
+        self._settle_ms.add(elapsed_ms)
+        if changed or not settled:
+            logger.info("Order %s %s after %d reads (%.0f ms)", order_data.get('orderNumber', 'N/A'),
+                        'settled' if settled else 'still changing', reads, elapsed_ms)
+    
+    def get_status(self) -> Dict[str, Any]:
+        """
+        Get readiness metrics.
+        
+        Returns:
+            Dictionary with settings, order/read counters (changed = an order that was
+            still being saved at the first read) and fetch-to-ready times in ms
+        """
+        with self._lock:
+            stats = dict(self._stats)
+        return {
+            'max_polls': self.max_polls,
+            'initial_delay_seconds': self.initial_delay,
+            **stats,
+            'ready_ms': self._settle_ms.snapshot()
+        }
+
+
+def _can_wait(delay: float) -> bool:
+    """
+    Whether the request deadline leaves time to wait and re-read (the last read is used otherwise).
+    """
+    deadline = current_deadline()
+    return deadline is None or deadline.remaining() > delay * 2
+
+
+def create_order_readiness() -> Optional[OrderReadiness]:
+    """
+    Create the readiness check from configuration (None when disabled).
+    """
+    if config.ORDER_READY_MAX_POLLS <= 0:
+        return None
+    return OrderReadiness(
+        max_polls=config.ORDER_READY_MAX_POLLS,
+        initial_delay=config.ORDER_READY_INITIAL_DELAY_SECONDS,
+        max_delay=config.ORDER_READY_MAX_DELAY_SECONDS
+    )
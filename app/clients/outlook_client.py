@@ -1,7 +1,7 @@
 import msal
-import requests
 from typing import List, Dict, Any, Optional
 from app.config import config
+from app.utils.resilience import graph_request
 
 
 class OutlookClient:
@@ -108,13 +108,13 @@ class OutlookClient:
         else:
             endpoint = "https://graph.microsoft.com/v1.0/me/sendMail"
         
-        # Send the email
+        # Send the email (not idempotent: only retried when Graph did not act on it)
         headers = {
             "Authorization": f"Bearer {access_token}",
             "Content-Type": "application/json"
         }
         
-        response = requests.post(endpoint, json=message, headers=headers)
+        response = graph_request('outlook', 'POST', endpoint, idempotent=False, json=message, headers=headers)
         
         if response.status_code not in [200, 202]:
             raise Exception(
@@ -3,6 +3,7 @@ import requests
 from typing import Dict, Any, Optional
 import time
 from app.config import config
+from app.utils.resilience import graph_request
 
 
 class SharePointClient:
@@ -88,7 +89,7 @@ class SharePointClient:
             "Authorization": f"Bearer {access_token}"
         }
         
-        response = requests.get(endpoint, headers=headers)
+        response = graph_request('sharepoint', 'GET', endpoint, headers=headers)
         
         if response.status_code != 200:
             raise Exception(
@@ -142,7 +143,7 @@ class SharePointClient:
             "Authorization": f"Bearer {access_token}"
         }
         
-        response = requests.get(endpoint, headers=headers)
+        response = graph_request('sharepoint', 'GET', endpoint, headers=headers)
         
         if response.status_code != 200:
             raise Exception(
@@ -207,7 +208,7 @@ class SharePointClient:
             "Authorization": f"Bearer {access_token}"
         }
         
-        response = requests.get(endpoint, headers=headers)
+        response = graph_request('sharepoint', 'GET', endpoint, headers=headers)
         
         if response.status_code != 200:
             raise Exception(
@@ -8,9 +8,172 @@ class Config:
     INFLOW_API_KEY = os.getenv('INFLOW_API_KEY')
     INFLOW_COMPANY_ID = os.getenv('INFLOW_COMPANY_ID')
     INFLOW_API_BASE_URL = os.getenv('INFLOW_API_BASE_URL', 'https://api.inflow.com/v1')
+    # Client-side pacing below InFlow's 60 requests/minute quota (0 disables)
+    INFLOW_RATE_LIMIT_PER_MINUTE = float(os.getenv('INFLOW_RATE_LIMIT_PER_MINUTE', '55'))
+    INFLOW_RATE_LIMIT_BURST = int(os.getenv('INFLOW_RATE_LIMIT_BURST', '5'))
+    INFLOW_RATE_LIMIT_MAX_PAUSE_SECONDS = float(os.getenv('INFLOW_RATE_LIMIT_MAX_PAUSE_SECONDS', '60'))
+    # 'local' (per process) or 'dynamodb' (one budget shared by all Lambda containers)
+    INFLOW_RATE_LIMIT_BACKEND = os.getenv(
+        'INFLOW_RATE_LIMIT_BACKEND',
+        'dynamodb' if os.getenv('AWS_LAMBDA_FUNCTION_NAME') else 'local'
+    ).lower()
+    INFLOW_RATE_LIMIT_TABLE = os.getenv('INFLOW_RATE_LIMIT_TABLE', 'inflow-rate-limits')
+    # Entity cache for customers, products and team members (0 entries disables)
+    ENTITY_CACHE_MAX_ENTRIES = int(os.getenv('ENTITY_CACHE_MAX_ENTRIES', '5000'))
+    ENTITY_CACHE_CUSTOMER_TTL_SECONDS = float(os.getenv('ENTITY_CACHE_CUSTOMER_TTL_SECONDS', '900'))
+    ENTITY_CACHE_PRODUCT_TTL_SECONDS = float(os.getenv('ENTITY_CACHE_PRODUCT_TTL_SECONDS', '3600'))
+    ENTITY_CACHE_TEAM_MEMBER_TTL_SECONDS = float(os.getenv('ENTITY_CACHE_TEAM_MEMBER_TTL_SECONDS', '3600'))
+    ENTITY_CACHE_NEGATIVE_TTL_SECONDS = float(os.getenv('ENTITY_CACHE_NEGATIVE_TTL_SECONDS', '60'))
+    # Order Readiness - webhook orders are fetched at once and re-read after
+    # ORDER_READY_INITIAL_DELAY_SECONDS (doubling up to ORDER_READY_MAX_DELAY_SECONDS) until two
+    # reads agree on InFlow's timestamp rowversion and line count (0 re-reads disables)
+    ORDER_READY_MAX_POLLS = int(os.getenv('ORDER_READY_MAX_POLLS', '4'))
+    ORDER_READY_INITIAL_DELAY_SECONDS = float(os.getenv('ORDER_READY_INITIAL_DELAY_SECONDS', '0.25'))
+    ORDER_READY_MAX_DELAY_SECONDS = float(os.getenv('ORDER_READY_MAX_DELAY_SECONDS', '2'))
+    # Product Catalog Mirror - InFlow products (name -> category) kept in a local SQLite file:
+    # a paged full sync every PRODUCT_CATALOG_FULL_SYNC_HOURS, incremental (last modified)
+    # syncs every PRODUCT_CATALOG_SYNC_INTERVAL_MINUTES. On Lambda each invocation syncs at
+    # most PRODUCT_CATALOG_LAMBDA_PAGE_BUDGET pages so a cold container fills its mirror gradually
+    PRODUCT_CATALOG_ENABLED = os.getenv('PRODUCT_CATALOG_ENABLED', 'True').lower() == 'true'
+    PRODUCT_CATALOG_DB_PATH = os.getenv('PRODUCT_CATALOG_DB_PATH', '')  # Defaults to <LOGS_DIR>/product_catalog.db
+    PRODUCT_CATALOG_PAGE_SIZE = int(os.getenv('PRODUCT_CATALOG_PAGE_SIZE', '100'))
+    PRODUCT_CATALOG_SYNC_INTERVAL_MINUTES = float(os.getenv('PRODUCT_CATALOG_SYNC_INTERVAL_MINUTES', '15'))
+    PRODUCT_CATALOG_FULL_SYNC_HOURS = float(os.getenv('PRODUCT_CATALOG_FULL_SYNC_HOURS', '24'))
+    PRODUCT_CATALOG_LAMBDA_PAGE_BUDGET = int(os.getenv('PRODUCT_CATALOG_LAMBDA_PAGE_BUDGET', '2'))
     
     # Webhook Configuration
     WEBHOOK_SECRET = os.getenv('WEBHOOK_SECRET')
+    # 'sync' runs validation inside the webhook request, 'queue' enqueues and returns 202
+    WEBHOOK_INGEST_MODE = os.getenv('WEBHOOK_INGEST_MODE', 'sync').lower()
+    
+    # Work Queue Configuration (used when WEBHOOK_INGEST_MODE=queue)
+    # Backend is 'sqlite' (local file) or 'sqs' (Amazon SQS / ElasticMQ)
+    WORK_QUEUE_BACKEND = os.getenv(
+        'WORK_QUEUE_BACKEND',
+        'sqs' if os.getenv('AWS_LAMBDA_FUNCTION_NAME') else 'sqlite'
+    ).lower()
+    WORK_QUEUE_DB_PATH = os.getenv('WORK_QUEUE_DB_PATH', '')  # Defaults to <LOGS_DIR>/work_queue.db
+    WORK_QUEUE_URL = os.getenv('WORK_QUEUE_URL', '')
+    WORK_QUEUE_REGION = os.getenv('WORK_QUEUE_REGION', 'us-east-2')
+    WORK_QUEUE_ENDPOINT_URL = os.getenv('WORK_QUEUE_ENDPOINT_URL') or None  # e.g. http://localhost:9324 for ElasticMQ
+    WORK_QUEUE_WORKERS = int(os.getenv('WORK_QUEUE_WORKERS', '4'))
+    WORK_QUEUE_VISIBILITY_TIMEOUT = int(os.getenv('WORK_QUEUE_VISIBILITY_TIMEOUT', '180'))
+    WORK_QUEUE_MAX_ATTEMPTS = int(os.getenv('WORK_QUEUE_MAX_ATTEMPTS', '5'))
+    
+    # Event Coalescing - queued (and async server) webhook events for the same order are
+    # collapsed until no new event has arrived for the quiet window; a leader hands further
+    # runs on after COALESCE_MAX_WAIT_SECONDS (0 disables coalescing)
+    COALESCE_WINDOW_SECONDS = float(os.getenv('COALESCE_WINDOW_SECONDS', '1'))
+    COALESCE_MAX_WAIT_SECONDS = float(os.getenv('COALESCE_MAX_WAIT_SECONDS', '10'))
+    
+    # Webhook Idempotency Ledger - redelivered webhooks are answered from the ledger
+    # Backend is 'sqlite', 'memory', 'dynamodb' or 'none' (disabled)
+    IDEMPOTENCY_BACKEND = os.getenv(
+        'IDEMPOTENCY_BACKEND',
+        'dynamodb' if os.getenv('AWS_LAMBDA_FUNCTION_NAME') else 'sqlite'
+    ).lower()
+    IDEMPOTENCY_TTL_SECONDS = int(os.getenv('IDEMPOTENCY_TTL_SECONDS', '86400'))
+    IDEMPOTENCY_CLAIM_TTL_SECONDS = int(os.getenv('IDEMPOTENCY_CLAIM_TTL_SECONDS', '300'))
+    IDEMPOTENCY_MAX_ENTRIES = int(os.getenv('IDEMPOTENCY_MAX_ENTRIES', '10000'))  # memory backend only
+    IDEMPOTENCY_DB_PATH = os.getenv('IDEMPOTENCY_DB_PATH', '')  # Defaults to <LOGS_DIR>/webhook_ledger.db
+    IDEMPOTENCY_TABLE = os.getenv('IDEMPOTENCY_TABLE', 'inflow-webhook-ledger')
+    
+    # DynamoDB (shared by the DynamoDB-backed services)
+    DYNAMODB_REGION = os.getenv('DYNAMODB_REGION', 'us-east-2')
+    DYNAMODB_ENDPOINT_URL = os.getenv('DYNAMODB_ENDPOINT_URL') or None  # e.g. http://localhost:8001 for DynamoDB Local
+    
+    # Validation Result Cache - orders whose validated fields are unchanged reuse
+    # the last validator results (0 disables the cache)
+    VALIDATION_CACHE_SIZE = int(os.getenv('VALIDATION_CACHE_SIZE', '1000'))
+    
+    # Validator Parallelism - rules whose dependencies have finished run concurrently on a
+    # pool of this many threads shared by all validations (1 runs them one after another)
+    VALIDATOR_PARALLELISM = int(os.getenv('VALIDATOR_PARALLELISM', '4'))
+    
+    # Validator Plugins - extra validators by import spec, comma-separated
+    # (e.g. 'app.validators.rule_2_credit_card:CreditCardFeeValidator'); validators that installed
+    # packages provide in the 'inflow_error_gate.validators' entry point group are registered too
+    VALIDATOR_PLUGINS = os.getenv('VALIDATOR_PLUGINS', '')
+    
+    # Timings - rolling per-stage/per-rule ms percentiles over TIMING_WINDOW samples
+    # (GET /monitor/timings); PROFILE_MEMORY_EVERY=N runs every Nth validation under
+    # tracemalloc for per-rule peak memory (0 disables)
+    TIMING_WINDOW = int(os.getenv('TIMING_WINDOW', '1000'))
+    PROFILE_MEMORY_EVERY = int(os.getenv('PROFILE_MEMORY_EVERY', '0'))
+    
+    # Deadlines - one webhook/queued event gets REQUEST_DEADLINE_SECONDS for fetch, validate,
+    # log and notify (on Lambda also at most the invocation's remaining time minus
+    # LAMBDA_DEADLINE_MARGIN_SECONDS). Each validator gets VALIDATOR_TIMEOUT_SECONDS of it
+    # (a rule's timeout_seconds overrides); rules over budget are reported as timed_out.
+    # Outbound API calls inside a budget time out with it (0 disables a budget)
+    REQUEST_DEADLINE_SECONDS = float(os.getenv('REQUEST_DEADLINE_SECONDS', '25'))
+    VALIDATOR_TIMEOUT_SECONDS = float(os.getenv('VALIDATOR_TIMEOUT_SECONDS', '10'))
+    LAMBDA_DEADLINE_MARGIN_SECONDS = float(os.getenv('LAMBDA_DEADLINE_MARGIN_SECONDS', '3'))
+    
+    # Batch Validation (POST /validate/batch)
+    BATCH_VALIDATE_CONCURRENCY = int(os.getenv('BATCH_VALIDATE_CONCURRENCY', '4'))
+    BATCH_VALIDATE_MAX_ORDERS = int(os.getenv('BATCH_VALIDATE_MAX_ORDERS', '500'))
+    
+    # Admission Control - at most ADMISSION_MAX_CONCURRENT webhooks run the pipeline at once
+    # (sync ingest mode); up to ADMISSION_MAX_QUEUE more wait ADMISSION_QUEUE_TIMEOUT_SECONDS
+    # for a slot, the rest get 503 + Retry-After (0 disables the limiter)
+    ADMISSION_MAX_CONCURRENT = int(os.getenv('ADMISSION_MAX_CONCURRENT', '8'))
+    ADMISSION_MAX_QUEUE = int(os.getenv('ADMISSION_MAX_QUEUE', '32'))
+    ADMISSION_QUEUE_TIMEOUT_SECONDS = float(os.getenv('ADMISSION_QUEUE_TIMEOUT_SECONDS', '5'))
+    ADMISSION_RETRY_AFTER_SECONDS = int(os.getenv('ADMISSION_RETRY_AFTER_SECONDS', '5'))
+    
+    # Per-Order Locking - events for the same order are serialized, other orders run in parallel
+    # Backend is 'local' (striped in-process locks), 'dynamodb' (leases shared by Lambda
+    # containers) or 'none' (disabled)
+    ORDER_LOCK_BACKEND = os.getenv(
+        'ORDER_LOCK_BACKEND',
+        'dynamodb' if os.getenv('AWS_LAMBDA_FUNCTION_NAME') else 'local'
+    ).lower()
+    ORDER_LOCK_STRIPES = int(os.getenv('ORDER_LOCK_STRIPES', '64'))  # local backend only
+    ORDER_LOCK_TIMEOUT_SECONDS = float(os.getenv('ORDER_LOCK_TIMEOUT_SECONDS', '20'))
+    ORDER_LOCK_LEASE_SECONDS = int(os.getenv('ORDER_LOCK_LEASE_SECONDS', '60'))  # dynamodb backend only
+    ORDER_LOCK_TABLE = os.getenv('ORDER_LOCK_TABLE', 'inflow-order-locks')
+    
+    # Validation Scheduler - at most VALIDATION_SCHEDULER_SLOTS validations run at once; waiting
+    # work is served by weighted priority class (manual, new_order, paid_order, order_update,
+    # quote, batch). VALIDATION_SCHEDULER_WEIGHTS overrides weights, e.g. 'quote=2,batch=1'
+    # (0 slots disables the scheduler)
+    VALIDATION_SCHEDULER_SLOTS = int(os.getenv('VALIDATION_SCHEDULER_SLOTS', '4'))
+    VALIDATION_SCHEDULER_WEIGHTS = os.getenv('VALIDATION_SCHEDULER_WEIGHTS', '')
+    
+    # Error Monitor - expired-error orders are refetched and notified this many at a time
+    ERROR_MONITOR_FETCH_CONCURRENCY = int(os.getenv('ERROR_MONITOR_FETCH_CONCURRENCY', '4'))
+
+    # Outbound Resilience (InFlow and Microsoft Graph clients) - transient failures are retried
+    # up to RETRY_MAX_ATTEMPTS times with jittered backoff inside the call's deadline; after
+    # CIRCUIT_BREAKER_FAILURE_THRESHOLD consecutive failures a dependency's circuit opens and
+    # calls fail fast for CIRCUIT_BREAKER_RESET_SECONDS before a probe is let through
+    CIRCUIT_BREAKER_FAILURE_THRESHOLD = int(os.getenv('CIRCUIT_BREAKER_FAILURE_THRESHOLD', '5'))
+    CIRCUIT_BREAKER_RESET_SECONDS = float(os.getenv('CIRCUIT_BREAKER_RESET_SECONDS', '30'))
+    RETRY_MAX_ATTEMPTS = int(os.getenv('RETRY_MAX_ATTEMPTS', '3'))
+    RETRY_BASE_DELAY_SECONDS = float(os.getenv('RETRY_BASE_DELAY_SECONDS', '0.5'))
+    RETRY_MAX_DELAY_SECONDS = float(os.getenv('RETRY_MAX_DELAY_SECONDS', '8'))
+    INFLOW_REQUEST_TIMEOUT_SECONDS = float(os.getenv('INFLOW_REQUEST_TIMEOUT_SECONDS', '30'))
+    INFLOW_DEADLINE_SECONDS = float(os.getenv('INFLOW_DEADLINE_SECONDS', '90'))
+    GRAPH_REQUEST_TIMEOUT_SECONDS = float(os.getenv('GRAPH_REQUEST_TIMEOUT_SECONDS', '30'))
+    GRAPH_DEADLINE_SECONDS = float(os.getenv('GRAPH_DEADLINE_SECONDS', '60'))
+
+    # Server mode for run.py: 'flask' (threaded WSGI) or 'async' (aiohttp event loop,
+    # needs requirements-async.txt). Lambda always uses the sync Flask app
+    SERVER_MODE = os.getenv('SERVER_MODE', 'flask').lower()
+    ASYNC_MAX_CONNECTIONS = int(os.getenv('ASYNC_MAX_CONNECTIONS', '100'))  # per async HTTP client
+    # Threads for blocking work in async mode (validators, error tracker, ledger, CSV logs)
+    ASYNC_EXECUTOR_WORKERS = int(os.getenv('ASYNC_EXECUTOR_WORKERS', '32'))
+    
+    # Logging - LOG_FORMAT is 'json' (one object per line) or 'text'.
+    # DEBUG adds per-validator details and full webhook payloads; at INFO only a
+    # LOG_PAYLOAD_SAMPLE_RATE fraction of payloads is logged (0 disables)
+    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+    LOG_FORMAT = os.getenv(
+        'LOG_FORMAT',
+        'json' if os.getenv('AWS_LAMBDA_FUNCTION_NAME') else 'text'
+    ).lower()
+    LOG_PAYLOAD_SAMPLE_RATE = float(os.getenv('LOG_PAYLOAD_SAMPLE_RATE', '0.01'))
     
     # OneDrive Configuration
     ONEDRIVE_CLIENT_ID = os.getenv('ONEDRIVE_CLIENT_ID')
@@ -1,21 +1,57 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context
+from flask.json.provider import DefaultJSONProvider
 from typing import Dict, Any
-import json
 
 from app.config import config
 from app.utils.hmac_verifier import HMACVerifier
 from app.clients.inflow_client import inflow_client
 from app.services.validation_service import validation_service
+from app.services.timing_service import timing_service
 from app.services.logger_service import logger_service
 from app.services.notification_service import notification_service
 from app.services.error_monitor_service import error_monitor_service
+from app.services.order_processing_service import order_processing_service
+from app.services.work_queue_service import work_queue_service
+from app.services.event_coalescer import event_coalescer
+from app.services.batch_validation_service import batch_validation_service
+from app.services.idempotency_ledger import idempotency_ledger, STATUS_COMPLETED
+from app.services.admission_control import admission_controller, AdmissionRejected
+from app.services.order_lock_service import order_lock_service
+from app.services.validation_scheduler import validation_scheduler, schedule_validation, PRIORITY_MANUAL
+from app.services.product_catalog_service import product_catalog_service
+from app.utils.resilience import breaker_status
+from app.utils.log import get_logger, should_log_payload
+from app.utils import json_codec
+
+
+class CodecJSONProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider backed by app.utils.json_codec (orjson when installed).
+    
+    Keeps Flask's defaults (sorted keys, its `default` conversions for dates,
+    decimals and UUIDs) but emits UTF-8 rather than ASCII escapes.
+    """
+    
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return json_codec.dumps(
+            obj,
+            sort_keys=kwargs.get('sort_keys', self.sort_keys),
+            indent=bool(kwargs.get('indent')),
+            default=kwargs.get('default', self.default)
+        )
+    
+    def loads(self, s: Any, **kwargs: Any) -> Any:
+        return json_codec.loads(s)
 
 
 app = Flask(__name__)
+app.json = CodecJSONProvider(app)
 
 # Initialize HMAC verifier
 hmac_verifier = HMACVerifier(config.WEBHOOK_SECRET or '')
 
+logger = get_logger(__name__)
+
 
 @app.route('/')
 def index():
@@ -34,6 +70,7 @@ def inflow_webhook():
     """
     Webhook endpoint for InFlow events.
     Receives salesOrder.created and salesOrder.updated events.
+    Redelivered events are answered from the idempotency ledger.
     """
     try:
         # Get raw payload and signature header
@@ -42,79 +79,122 @@ def inflow_webhook():
         
         # Verify HMAC signature
         if not hmac_verifier.verify(payload, signature_header):
-            print("Invalid HMAC signature")
+            logger.warning("Invalid HMAC signature")
             return jsonify({'error': 'Invalid signature'}), 401
-        
+    
+    except Exception as e:
+        logger.exception("Error processing webhook: %s", e)
+        return jsonify({'error': str(e)}), 500
+    
+    if not idempotency_ledger:
+        response_body, status_code = _process_webhook_payload(payload)
+        return _webhook_response(response_body, status_code)
+    
+    # Replay the stored response for a delivery we have already seen
+    ledger_key = idempotency_ledger.make_key(payload, signature_header)
+    claimed, entry = idempotency_ledger.claim(ledger_key)
+    if not claimed:
+        if entry.status == STATUS_COMPLETED:
+            logger.info("Duplicate webhook delivery %s - replaying stored response", ledger_key[:12])
+            response = app.response_class(entry.body, status=entry.status_code, mimetype='application/json')
+        else:
+            logger.info("Duplicate webhook delivery %s - first delivery still in progress", ledger_key[:12])
+            response = jsonify({'status': 'in_progress'})
+            response.status_code = 202
+        response.headers['X-Idempotent-Replay'] = 'true'
+        return response
+    
+    response_body, status_code = _process_webhook_payload(payload)
+    response = _webhook_response(response_body, status_code)
+    if status_code >= 500:
+        # Let InFlow's retry run the pipeline again
+        idempotency_ledger.release(ledger_key)
+    else:
+        idempotency_ledger.complete(ledger_key, status_code, response.get_data(as_text=True))
+    return response
+
+
+def _webhook_response(response_body: Dict[str, Any], status_code: int):
+    """
+    Build the webhook response, with Retry-After when the server is busy.
+    """
+    response = jsonify(response_body)
+    response.status_code = status_code
+    if status_code == 503 and 'retry_after' in response_body:
+        response.headers['Retry-After'] = str(response_body['retry_after'])
+    return response
+
+
+def _process_webhook_payload(payload: bytes):
+    """
+    Parse a verified webhook payload and run (or enqueue) validation.
+    
+    Args:
+        payload: Raw request body (signature already verified)
+    
+    Returns:
+        Tuple of (response body dict, HTTP status code)
+    """
+    try:
         # Parse webhook payload
-        webhook_data = json.loads(payload)
+        webhook_data = json_codec.loads(payload)
         
-        # Log the entire payload for debugging
-        print("="*60)
-        print("WEBHOOK RECEIVED:")
-        print(json.dumps(webhook_data, indent=2))
-        print("="*60)
+        # Full payloads only at DEBUG level or for a sampled fraction of events
+        if should_log_payload(logger):
+            logger.info("Webhook payload: %s", payload.decode('utf-8', errors='replace'))
         
         # Extract event details - InFlow uses 'eventType' and 'salesOrderId' at root level
         event_type = webhook_data.get('eventType', webhook_data.get('event', 'unknown'))
         sales_order_id = webhook_data.get('salesOrderId') or webhook_data.get('data', {}).get('salesOrderId')
         
-        print(f"Received webhook event: {event_type}")
+        logger.info("Received webhook event", extra={'event_type': event_type, 'order_id': sales_order_id})
         
         if not sales_order_id:
-            print(f"No salesOrderId in webhook payload. Keys present: {list(webhook_data.keys())}")
-            return jsonify({'error': 'Missing salesOrderId', 'received_keys': list(webhook_data.keys())}), 400
+            logger.warning("No salesOrderId in webhook payload. Keys present: %s", list(webhook_data.keys()))
+            return {'error': 'Missing salesOrderId', 'received_keys': list(webhook_data.keys())}, 400
         
         # Process only sales order events
         # InFlow uses event types like 'SalesOrderCreatedV1', 'SalesOrderUpdatedV1'
         if not ('SalesOrder' in event_type or event_type in ['salesOrder.created', 'salesOrder.updated']):
-            print(f"Ignoring event type: {event_type}")
-            return jsonify({'status': 'ignored', 'message': 'Not a sales order event'}), 200
+            logger.info("Ignoring event type: %s", event_type)
+            return {'status': 'ignored', 'message': 'Not a sales order event'}, 200
         
-        # Fetch full order data from InFlow API
-        print(f"Fetching order data for: {sales_order_id}")
-        order_data = inflow_client.get_sales_order(sales_order_id)
+        # Queue mode: hand the event to the durable work queue and reply immediately
+        if config.WEBHOOK_INGEST_MODE == 'queue' and work_queue_service:
+            message_id = work_queue_service.enqueue(sales_order_id, event_type)
+            logger.info("Queued order for validation", extra={'order_id': sales_order_id, 'message_id': message_id})
+            return {
+                'status': 'queued',
+                'order_id': sales_order_id,
+                'event_type': event_type,
+                'message_id': message_id
+            }, 202
         
-        # Extract order number for logging
-        order_number = order_data.get('orderNumber', 'N/A')
-        print(f"Order Number: {order_number}")
-        
-        # Run validation
-        print(f"Running validation for order: {sales_order_id} ({order_number})")
-        validation_result = validation_service.validate_order(order_data)
+        # Sync mode: fetch, validate, log and notify before replying
+        # (no coalescing window - the reply would wait for it; queue mode coalesces)
+        if not admission_controller:
+            return order_processing_service.process_order(sales_order_id, event_type), 200
         
-        # Log validation results (logs all statuses including pending and resolved)
-        logger_service.log_validation_result(validation_result, order_data)
-        
-        # Send notification only for confirmed errors (failed) or warnings
-        # Do NOT send for 'pending' status (grace period)
-        if validation_result['status'] in ['warning', 'failed']:
-            confirmed_count = validation_result.get('confirmed_count', 0)
-            print(f"Sending notification for order: {sales_order_id} ({order_number}) - Confirmed errors: {confirmed_count}")
-            notification_service.send_validation_failure_notification(
-                validation_result,
-                order_data
-            )
-        elif validation_result['status'] == 'pending':
-            pending_count = validation_result.get('pending_count', 0)
-            print(f"Order {order_number} has {pending_count} pending error(s) in 30-minute grace period - no notification sent yet")
+        # Bounded concurrency: shed load with 503 + Retry-After instead of slowing every request
+        try:
+            with admission_controller.admit():
+                result = order_processing_service.process_order(sales_order_id, event_type)
+        except AdmissionRejected as e:
+            logger.warning("Webhook for order %s rejected: server busy (%s), retry after %ds",
+                           sales_order_id, e.reason, e.retry_after_seconds)
+            return {
+                'status': 'busy',
+                'reason': e.reason,
+                'order_id': sales_order_id,
+                'retry_after': e.retry_after_seconds
+            }, 503
         
         # Return success response with tracking information
-        return jsonify({
-            'status': 'processed',
-            'order_id': sales_order_id,
-            'order_number': order_number,
-            'validation_status': validation_result['status'],
-            'issues_count': len(validation_result['issues']),
-            'confirmed_count': validation_result.get('confirmed_count', 0),
-            'pending_count': validation_result.get('pending_count', 0),
-            'resolved_count': len(validation_result.get('resolved_issues', []))
-        }), 200
+        return result, 200
     
     except Exception as e:
-        print(f"Error processing webhook: {e}")
-        import traceback
-        traceback.print_exc()
-        return jsonify({'error': str(e)}), 500
+        logger.exception("Error processing webhook: %s", e)
+        return {'error': str(e)}, 500
 
 
 @app.route('/validate/<order_id>', methods=['GET'])
@@ -125,15 +205,15 @@ def validate_order_manual(order_id: str):
     """
     try:
         # Fetch order data
-        print(f"Manual validation requested for order: {order_id}")
+        logger.info("Manual validation requested for order: %s", order_id)
         order_data = inflow_client.get_sales_order(order_id)
         
         # Extract order number for logging
         order_number = order_data.get('orderNumber', 'N/A')
-        print(f"Order Number: {order_number}")
+        logger.debug("Order Number: %s", order_number)
         
         # Run validation
-        validation_result = validation_service.validate_order(order_data)
+        validation_result = schedule_validation(order_data, PRIORITY_MANUAL)
         
         # Log results
         logger_service.log_validation_result(validation_result, order_data)
@@ -142,12 +222,35 @@ def validate_order_manual(order_id: str):
         return jsonify(validation_result), 200
     
     except Exception as e:
-        print(f"Error in manual validation: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error in manual validation: %s", e)
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/validate/batch', methods=['POST'])
+def validate_order_batch():
+    """
+    Batch validation endpoint for manual audits.
+    Accepts {"order_ids": [...], "order_numbers": [...]} and streams one
+    JSON line per order (application/x-ndjson) as each validation finishes.
+    """
+    try:
+        refs = batch_validation_service.parse_request(request.get_json(silent=True))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    logger.info("Batch validation requested for %d orders", len(refs))
+    
+    def generate():
+        counts = {}
+        for line in batch_validation_service.iter_results(refs):
+            counts[line['status']] = counts.get(line['status'], 0) + 1
+            yield json_codec.dumps_bytes(line) + b'\n'
+        # Trailer line so clients can tell a complete stream from a cut-off one
+        yield json_codec.dumps_bytes({'batch_complete': True, 'total': len(refs), 'status_counts': counts}) + b'\n'
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+
 @app.route('/history/<order_id>', methods=['GET'])
 def get_validation_history(order_id: str):
     """
@@ -162,7 +265,7 @@ def get_validation_history(order_id: str):
         }), 200
     
     except Exception as e:
-        print(f"Error retrieving validation history: {e}")
+        logger.error("Error retrieving validation history: %s", e)
         return jsonify({'error': str(e)}), 500
 
 
@@ -173,7 +276,7 @@ def trigger_monitor_check():
     Useful for testing or forcing immediate processing.
     """
     try:
-        print("Manual monitor check triggered via API")
+        logger.info("Manual monitor check triggered via API")
         error_monitor_service.trigger_check()
         return jsonify({
             'status': 'success',
@@ -181,9 +284,7 @@ def trigger_monitor_check():
         }), 200
     
     except Exception as e:
-        print(f"Error triggering monitor check: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error triggering monitor check: %s", e)
         return jsonify({'error': str(e)}), 500
 
 
@@ -194,10 +295,47 @@ def get_monitor_status():
     """
     try:
         status = error_monitor_service.get_status()
+        if event_coalescer:
+            status['coalescer'] = event_coalescer.get_status()
+        if work_queue_service:
+            status['work_queue'] = work_queue_service.get_status()
+        if idempotency_ledger:
+            status['idempotency'] = idempotency_ledger.get_status()
+        status['validators'] = validation_service.get_status()
+        if validation_service.result_cache:
+            status['validation_cache'] = validation_service.result_cache.get_status()
+        if admission_controller:
+            status['admission'] = admission_controller.get_status()
+        if order_lock_service:
+            status['order_locks'] = order_lock_service.get_status()
+        if validation_scheduler:
+            status['scheduler'] = validation_scheduler.get_status()
+        if inflow_client.rate_limiter:
+            status['inflow_rate_limit'] = inflow_client.rate_limiter.get_status()
+        if inflow_client.entity_cache:
+            status['entity_cache'] = inflow_client.entity_cache.get_status()
+        if inflow_client.readiness:
+            status['order_readiness'] = inflow_client.readiness.get_status()
+        if product_catalog_service:
+            status['product_catalog'] = product_catalog_service.get_status()
+        status['circuit_breakers'] = breaker_status()
         return jsonify(status), 200
     
     except Exception as e:
-        print(f"Error getting monitor status: {e}")
+        logger.error("Error getting monitor status: %s", e)
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/monitor/timings', methods=['GET'])
+def get_monitor_timings():
+    """
+    Get per-stage and per-validator timing percentiles (and memory peaks when sampled).
+    """
+    try:
+        return jsonify(timing_service.get_status()), 200
+    
+    except Exception as e:
+        logger.error("Error getting monitor timings: %s", e)
         return jsonify({'error': str(e)}), 500
 
 
@@ -206,8 +344,8 @@ def initialize_validators():
     Initialize and register all validators.
     This function will be expanded as we implement each validation rule.
     
-    IMPORTANT: OrderFetcher (Rule 0) must be registered FIRST!
-    It fetches and formats data for all other validators.
+    OrderFetcher (Rule 0) fetches and formats data for the other validators,
+    which declare it in depends_on and run after it.
     """
     from app.validators import (
         OrderFetcher, 
@@ -219,8 +357,9 @@ def initialize_validators():
         ReturnReasonValidator
     )
     
-    # Rule 0: Order Data Fetcher (MUST BE FIRST!)
-    # This fetches and formats all order data for other validators
+    # Rule 0: Order Data Fetcher
+    # This fetches and formats all order data for other validators; rules that read it
+    # declare it in depends_on and run (concurrently) once it has finished
     order_fetcher = OrderFetcher()
     validation_service.register_validator(order_fetcher)
     
@@ -248,7 +387,16 @@ def initialize_validators():
     return_reason_validator = ReturnReasonValidator()
     validation_service.register_validator(return_reason_validator)
     
-    print(f"Validators initialized: {len(validation_service.validators)} registered")
+    # Validators named in VALIDATOR_PLUGINS or installed as entry points
+    validation_service.register_plugins()
+    
+    # The logger and notifications read order relationships too; sales orders are
+    # fetched with the union of what they and the registered validators need
+    inflow_client.require_includes('logger_service', logger_service.required_includes)
+    inflow_client.require_includes('notification_service', notification_service.required_includes)
+    
+    logger.info("Validators initialized: %d registered", len(validation_service.validators))
+    logger.info("Sales order include: %s", inflow_client.sales_order_include)
 
 
 if __name__ == '__main__':
@@ -263,11 +411,15 @@ if __name__ == '__main__':
     initialize_validators()
     
     # Start error monitor service (background thread)
-    # Only start in the main process (not in Flask reloader's parent process)
+    # Only start in the serving process (not in Flask reloader's parent process)
     import os
-    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+    if not config.FLASK_DEBUG or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
         print("Starting error monitor service...")
         error_monitor_service.start()
+        
+        # Start queue workers when webhooks are ingested asynchronously
+        if config.WEBHOOK_INGEST_MODE == 'queue' and work_queue_service:
+            work_queue_service.start()
     else:
         print("Skipping error monitor in reloader parent process...")
     
@@ -283,3 +435,5 @@ if __name__ == '__main__':
         # Stop error monitor when app shuts down
         print("Stopping error monitor service...")
         error_monitor_service.stop()
+        if work_queue_service and work_queue_service.running:
+            work_queue_service.stop()
@@ -0,0 +1,160 @@
+"""
+Admission control for webhook processing.
+
+At most max_concurrent webhooks run the fetch/validate/notify pipeline at
+once. Further requests wait in a bounded queue for up to queue_timeout
+seconds; when the queue is full or the wait times out the request is
+rejected straight away so the webhook can answer 503 with Retry-After and
+let InFlow redeliver later, instead of every request slowing down together.
+"""
+
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, Iterator, Optional
+
+from app.config import config
+from app.utils.metrics import RollingStats
+
+
+class AdmissionRejected(Exception):
+    """
+    Raised when a request cannot be admitted.
+    """
+    
+    def __init__(self, reason: str, retry_after_seconds: int):
+        """
+        Args:
+            reason: 'queue_full' or 'timeout'
+            retry_after_seconds: Suggested Retry-After value
+        """
+        super().__init__(f"Server busy ({reason})")
+        self.reason = reason
+        self.retry_after_seconds = retry_after_seconds
+
+
+class AdmissionController:
+    """
+    Concurrency limiter with a bounded wait queue.
+    """
+    
+    def __init__(self, max_concurrent: int = 8, max_queue: int = 32,
+                 queue_timeout_seconds: float = 5.0, retry_after_seconds: int = 5):
+        """
+        Initialize the admission controller.
+        
+        Args:
+            max_concurrent: Requests allowed to run the pipeline at the same time
+            max_queue: Requests allowed to wait for a slot (0 = reject as soon as all slots are busy)
+            queue_timeout_seconds: Longest a request waits for a slot before it is rejected
+            retry_after_seconds: Minimum Retry-After returned with a rejection
+        """
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_queue = max(0, max_queue)
+        self.queue_timeout_seconds = queue_timeout_seconds
+        self.retry_after_seconds = retry_after_seconds
+        
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._waiting = 0
+        self._stats = {'admitted': 0, 'rejected_queue_full': 0, 'rejected_timeout': 0}
+        self._wait_ms = RollingStats()
+        self._service_ms = RollingStats()
+    
+    @contextmanager
+    def admit(self) -> Iterator[None]:
+        """
+        Hold a processing slot for the duration of the with-block.
+        
+        Raises:
+            AdmissionRejected: If no slot became free in time
+        """
+        self._acquire()
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self._service_ms.add((time.monotonic() - started) * 1000)
+            with self._cond:
+                self._in_flight -= 1
+                self._cond.notify()
+    
+    def _acquire(self) -> None:
+        """
+        Take a slot, waiting in the queue if necessary.
+        """
+        started = time.monotonic()
+        with self._cond:
+            if self._in_flight < self.max_concurrent and self._waiting == 0:
+                self._in_flight += 1
+                self._stats['admitted'] += 1
+                self._wait_ms.add(0.0)
+                return
+            
+            if self._waiting >= self.max_queue:
+                self._stats['rejected_queue_full'] += 1
+                raise AdmissionRejected('queue_full', self._retry_after())
+            
+            self._waiting += 1
+            try:
+                deadline = started + self.queue_timeout_seconds
+                while self._in_flight >= self.max_concurrent:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats['rejected_timeout'] += 1
+                        raise AdmissionRejected('timeout', self._retry_after())
+                    self._cond.wait(remaining)
+                self._in_flight += 1
+                self._stats['admitted'] += 1
+            finally:
+                self._waiting -= 1
+        
+        self._wait_ms.add((time.monotonic() - started) * 1000)
+    
+    def _retry_after(self) -> int:
+        """
+        Estimate when a slot will be free: the queue ahead drained at the recent
+        median service time, never less than the configured minimum.
+        """
+        p50_seconds = self._service_ms.snapshot()['p50'] / 1000
+        drain_seconds = math.ceil(p50_seconds * (self._waiting + 1) / self.max_concurrent)
+        return max(self.retry_after_seconds, drain_seconds)
+    
+    def get_status(self) -> Dict[str, Any]:
+        """
+        Get limiter state and counters for sizing the deployment.
+        
+        Returns:
+            Dictionary with limits, current depth, counters and wait/service time stats (ms)
+        """
+        with self._cond:
+            status = {
+                'max_concurrent': self.max_concurrent,
+                'max_queue': self.max_queue,
+                'queue_timeout_seconds': self.queue_timeout_seconds,
+                'in_flight': self._in_flight,
+                'queue_depth': self._waiting,
+                **self._stats
+            }
+        status['wait_ms'] = self._wait_ms.snapshot()
+        status['service_ms'] = self._service_ms.snapshot()
+        return status
+
+
+def create_admission_controller() -> Optional[AdmissionController]:
+    """
+    Create the controller from configuration (None when disabled).
+    """
+    if config.ADMISSION_MAX_CONCURRENT <= 0:
+        return None
+    return AdmissionController(
+        max_concurrent=config.ADMISSION_MAX_CONCURRENT,
+        max_queue=config.ADMISSION_MAX_QUEUE,
+        queue_timeout_seconds=config.ADMISSION_QUEUE_TIMEOUT_SECONDS,
+        retry_after_seconds=config.ADMISSION_RETRY_AFTER_SECONDS
+    )
+
+
+# Create a singleton instance
+admission_controller = create_admission_controller()
@@ -0,0 +1,369 @@
+"""
+Order pipeline for the async server (SERVER_MODE=async).
+
+Network I/O to InFlow and Microsoft Graph runs on the event loop through the
+async clients, so hundreds of orders can wait on round trips at once. Work
+that is still blocking - validators, the error tracker (file or DynamoDB),
+CSV logging and the idempotency ledger - runs on a bounded thread pool.
+
+With coalescing enabled, webhook events are answered right away and processed
+in background tasks (see schedule_event), so the quiet window never delays a
+reply. Each event's caller is told whether the run covering it succeeded, so
+the webhook can keep the delivery's idempotency entry open until then.
+"""
+
+import asyncio
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Dict, Any, AsyncIterator, Awaitable, Callable, List, Optional, Set, Tuple
+
+from app.config import config
+from app.clients.async_inflow_client import async_inflow_client
+from app.clients.async_outlook_client import async_outlook_client
+from app.services.validation_scheduler import schedule_validation, classify_order, PRIORITY_BATCH
+from app.services.logger_service import logger_service
+from app.services.notification_service import notification_service
+from app.services.timing_service import timing_service
+from app.services.event_coalescer import create_async_event_coalescer
+from app.services.order_lock_service import lock_order_async
+from app.utils.log import get_logger
+from app.utils.resilience import deadline_scope
+
+logger = get_logger(__name__)
+
+
+class AsyncOrderProcessingService:
+    """
+    Async counterpart of OrderProcessingService: fetch, validate, log and notify.
+    """
+    
+    def __init__(self, executor_workers: int = 32):
+        """
+        Initialize the async pipeline.
+        
+        Args:
+            executor_workers: Threads for blocking work (validation, tracking, logging)
+        """
+        self.executor = ThreadPoolExecutor(max_workers=max(1, executor_workers), thread_name_prefix='async-blocking')
+        self.coalescer = create_async_event_coalescer()
+        # Background coalescing runs (referenced so they are not garbage collected)
+        self._background: Set[asyncio.Task] = set()
+        # Per order: callbacks for scheduled events that no run has covered yet
+        self._unsettled: Dict[str, List[Callable[[bool], Awaitable[None]]]] = {}
+    
+    async def run_blocking(self, func: Callable, *args, **kwargs) -> Any:
+        """
+        Run a blocking callable on the pipeline's thread pool.
+        
+        The callable runs in a copy of the caller's context, so the request
+        deadline (see resilience.deadline_scope) also bounds its outbound calls.
+        
+        Args:
+            func: Callable to run
+            *args: Positional arguments
+            **kwargs: Keyword arguments
+        
+        Returns:
+            The callable's return value
+        """
+        context = contextvars.copy_context()
+        return await asyncio.get_running_loop().run_in_executor(
+            self.executor, partial(context.run, func, *args, **kwargs))
+    
+    def schedule_event(self, sales_order_id: str, event_type: str = 'unknown',
+                       on_settled: Optional[Callable[[bool], Awaitable[None]]] = None) -> Dict[str, Any]:
+        """
+        Hand a webhook event to a background coalescing run and return the reply for it.
+        
+        Must be called on the event loop.
+        
+        Args:
+            sales_order_id: InFlow sales order ID
+            event_type: Webhook event type
+            on_settled: Awaited with True once a run that started after this event
+                has succeeded, or False if the run covering it failed
+        
+        Returns:
+            'coalesced' if a run for the order is already pending, otherwise 'scheduled'
+        """
+        pending = self.coalescer.is_pending(sales_order_id)
+        if on_settled:
+            self._unsettled.setdefault(sales_order_id, []).append(on_settled)
+        task = asyncio.ensure_future(self._process_in_background(sales_order_id, event_type))
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+        return {
+            'status': 'coalesced' if pending else 'scheduled',
+            'order_id': sales_order_id,
+            'event_type': event_type
+        }
+    
+    async def _process_in_background(self, sales_order_id: str, event_type: str) -> None:
+        try:
+            await self.process_event(sales_order_id, event_type,
+                                     handoff=lambda: self.schedule_event(sales_order_id, event_type))
+        except Exception as e:
+            logger.exception("Error processing order %s in the background: %s", sales_order_id, e)
+    
+    async def _run_and_settle(self, sales_order_id: str, event_type: str) -> Dict[str, Any]:
+        """
+        Run the pipeline for a coalesced run and settle the scheduled events it covers.
+        
+        The run reads the order after every event scheduled so far, so those are
+        settled with its outcome. When it fails, events that arrived during the
+        run are failed too: the follow-up run that would have covered them is not
+        going to happen.
+        """
+        covered = self._unsettled.pop(sales_order_id, [])
+        try:
+            result = await self.process_order(sales_order_id, event_type)
+        except Exception:
+            await self._settle(covered + self._unsettled.pop(sales_order_id, []), False)
+            raise
+        await self._settle(covered, True)
+        return result
+    
+    async def _settle(self, callbacks: List[Callable[[bool], Awaitable[None]]], succeeded: bool) -> None:
+        for callback in callbacks:
+            try:
+                await callback(succeeded)
+            except Exception as e:
+                logger.exception("Error settling webhook event: %s", e)
+    
+    async def process_event(self, sales_order_id: str, event_type: str = 'unknown',
+                            handoff: Optional[Callable[[], Any]] = None) -> Dict[str, Any]:
+        """
+        Process a webhook event, coalescing bursts of events for the same order.
+        
+        The leader waits for the quiet window, so callers that reply to InFlow
+        use schedule_event instead.
+        
+        Args:
+            sales_order_id: InFlow sales order ID
+            event_type: Webhook event type
+            handoff: Re-submits the event once the leader has used up
+                COALESCE_MAX_WAIT_SECONDS (see EventCoalescer.submit)
+        
+        Returns:
+            Pipeline summary, or a 'coalesced' marker for folded events
+        """
+        if not self.coalescer:
+            return await self.process_order(sales_order_id, event_type)
+        
+        outcome = await self.coalescer.submit(
+            sales_order_id,
+            lambda: self._run_and_settle(sales_order_id, event_type),
+            handoff
+        )
+        
+        if not outcome.leader:
+            logger.info("Coalesced %s for order %s into pending run", event_type, sales_order_id)
+            return {'status': 'coalesced', 'order_id': sales_order_id}
+        
+        return outcome.result
+    
+    async def validate_order(self, sales_order_id: str, priority_class: Optional[str] = None,
+                             event_type: Optional[str] = None) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Fetch, validate and log one order (no notification).
+        
+        Args:
+            sales_order_id: InFlow sales order ID
+            priority_class: Scheduler class (classified from the order and event type if omitted)
+            event_type: Webhook event type, used for classification (webhook orders
+                may still be saving and are re-read until they settle)
+        
+        Returns:
+            Tuple of (validation result, order data)
+        """
+        stages = {}
+        with timing_service.stage('fetch', stages):
+            if event_type:
+                order_data = await async_inflow_client.get_sales_order_when_ready(sales_order_id)
+            else:
+                order_data = await async_inflow_client.get_sales_order(sales_order_id)
+        priority_class = priority_class or classify_order(order_data, event_type)
+        validation_result = await self.run_blocking(schedule_validation, order_data, priority_class)
+        stages = timing_service.merge_stages(validation_result, stages)
+        with timing_service.stage('log', stages):
+            await self.run_blocking(logger_service.log_validation_result, validation_result, order_data)
+        return validation_result, order_data
+    
+    async def process_order(self, sales_order_id: str, event_type: str = 'unknown') -> Dict[str, Any]:
+        """
+        Fetch, validate, log and notify for one sales order within REQUEST_DEADLINE_SECONDS.
+        
+        Runs under the order's lock, like OrderProcessingService.process_order,
+        so a concurrent run for the same order (another event, the error
+        monitor) cannot send a second notification.
+        
+        Args:
+            sales_order_id: InFlow sales order ID
+            event_type: Webhook event type that triggered processing (for logging)
+        
+        Returns:
+            Summary dictionary suitable for the webhook response body
+        
+        Raises:
+            OrderLockTimeout: If another run held the order's lock too long
+        """
+        with deadline_scope(config.REQUEST_DEADLINE_SECONDS):
+            async with lock_order_async(sales_order_id, self.run_blocking):
+                return await self._run_pipeline(sales_order_id, event_type)
+    
+    async def _run_pipeline(self, sales_order_id: str, event_type: str) -> Dict[str, Any]:
+        """
+        Pipeline body of process_order (caller holds the request deadline and the order lock).
+        """
+        logger.debug("Fetching order data for: %s (event: %s)", sales_order_id, event_type)
+        validation_result, order_data = await self.validate_order(sales_order_id, event_type=event_type)
+        order_number = order_data.get('orderNumber', 'N/A')
+        logger.info("Order validated", extra={
+            'order_id': sales_order_id,
+            'order_number': order_number,
+            'event_type': event_type,
+            'validation_status': validation_result['status'],
+            'issues_count': len(validation_result['issues']),
+            'cached_rules': len(validation_result.get('cached_rules', [])),
+            'skipped_rules': len(validation_result.get('skipped_rules', [])),
+            'timed_out_rules': len(validation_result.get('timed_out_rules', []))
+        })
+        
+        # Send notification only for confirmed errors (failed) or warnings
+        stages = validation_result['timings']['stages']
+        if validation_result['status'] in ['warning', 'failed']:
+            with timing_service.stage('notify', stages):
+                await self.send_notification(validation_result, order_data)
+        elif validation_result['status'] == 'pending':
+            logger.info("Order %s has %d pending error(s) in 30-minute grace period - no notification sent yet",
+                        order_number, validation_result.get('pending_count', 0))
+        
+        return {
+            'status': 'processed',
+            'order_id': sales_order_id,
+            'order_number': order_number,
+            'validation_status': validation_result['status'],
+            'issues_count': len(validation_result['issues']),
+            'confirmed_count': validation_result.get('confirmed_count', 0),
+            'pending_count': validation_result.get('pending_count', 0),
+            'resolved_count': len(validation_result.get('resolved_issues', [])),
+            'timings_ms': stages
+        }
+    
+    async def send_notification(self, validation_result: Dict[str, Any], order_data: Dict[str, Any]) -> None:
+        """
+        Build the notification email and send it through the async Outlook client.
+        
+        Args:
+            validation_result: Validation report
+            order_data: Complete sales order data from InFlow
+        """
+        email = notification_service.build_notification(validation_result, order_data)
+        if email is None:
+            return
+        
+        logger.info("Sending notification for order: %s (%s) - Confirmed errors: %d",
+                    validation_result['order_id'], validation_result['order_number'],
+                    validation_result.get('confirmed_count', 0))
+        try:
+            if async_outlook_client:
+                await async_outlook_client.send_email(**email)
+            else:
+                await self.run_blocking(notification_service.outlook_client.send_email, **email)
+            notification_service.report_sent(email)
+        except Exception as e:
+            notification_service.report_failed(e)
+            raise
+    
+    async def validate_reference(self, ref: Dict[str, str]) -> Dict[str, Any]:
+        """
+        Resolve, fetch, validate and log one order of a batch (see BatchValidationService).
+        
+        Args:
+            ref: {'order_id': ...} or {'order_number': ...}
+        
+        Returns:
+            Result line for the order (never raises)
+        """
+        started = time.time()
+        line = dict(ref)
+        try:
+            order_id = ref.get('order_id')
+            if not order_id:
+                summary = await async_inflow_client.find_sales_order_by_number(ref['order_number'])
+                if not summary:
+                    line.update({'status': 'not_found', 'error': 'Order number not found'})
+                    return line
+                order_id = summary['salesOrderId']
+            
+            validation_result, _ = await self.validate_order(order_id, PRIORITY_BATCH)
+            line.update({
+                'order_id': validation_result['order_id'],
+                'order_number': validation_result['order_number'],
+                'status': validation_result['status'],
+                'issues': validation_result['issues'],
+                'pending_count': validation_result.get('pending_count', 0),
+                'confirmed_count': validation_result.get('confirmed_count', 0),
+                'resolved_count': len(validation_result.get('resolved_issues', []))
+            })
+        except Exception as e:
+            logger.warning("Batch validation failed for %s: %s", ref, e)
+            line.update({'status': 'error', 'error': str(e)})
+        
+        line['elapsed_ms'] = int((time.time() - started) * 1000)
+        return line
+    
+    async def iter_batch_results(self, refs: List[Dict[str, str]],
+                                 max_concurrency: int) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Validate orders concurrently, yielding each result as it completes.
+        
+        Args:
+            refs: Order references from BatchValidationService.parse_request()
+            max_concurrency: Orders in flight at once
+        
+        Yields:
+            One result dictionary per order, in completion order
+        """
+        pending_refs = iter(refs)
+        in_flight = set()
+        try:
+            for ref in pending_refs:
+                in_flight.add(asyncio.ensure_future(self.validate_reference(ref)))
+                if len(in_flight) >= max_concurrency:
+                    break
+            
+            while in_flight:
+                done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    next_ref = next(pending_refs, None)
+                    if next_ref is not None:
+                        in_flight.add(asyncio.ensure_future(self.validate_reference(next_ref)))
+                    yield task.result()
+        finally:
+            # Client went away - don't leave orders running in the background
+            for task in in_flight:
+                task.cancel()
+    
+    async def close(self) -> None:
+        """
+        Close the async clients' sessions and the thread pool.
+        
+        Background runs still waiting for their quiet window are cancelled; their
+        deliveries stay claimed in the idempotency ledger until the claim expires,
+        so InFlow's redelivery runs them again.
+        """
+        for task in list(self._background):
+            task.cancel()
+        for client in (async_inflow_client, async_outlook_client):
+            if client:
+                await client.close()
+        self.executor.shutdown(wait=False)
+
+
+# Create a singleton instance (None when aiohttp is not installed)
+async_order_processing_service = None
+if async_inflow_client is not None:
+    async_order_processing_service = AsyncOrderProcessingService(executor_workers=config.ASYNC_EXECUTOR_WORKERS)
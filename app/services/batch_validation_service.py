@@ -0,0 +1,149 @@
+"""
+Batch validation for manual audits.
+
+Validates a list of orders (by ID or order number) with a bounded number of
+concurrent InFlow fetches and yields one result per order as soon as it
+finishes, so the /validate/batch endpoint can stream NDJSON.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Dict, Any, List, Iterator
+
+from app.config import config
+from app.clients.inflow_client import inflow_client
+from app.services.validation_scheduler import schedule_validation, PRIORITY_BATCH
+from app.services.logger_service import logger_service
+from app.utils.log import get_logger
+
+logger = get_logger(__name__)
+
+
+class BatchValidationService:
+    """
+    Validates many orders concurrently under a fixed concurrency limit.
+    """
+    
+    def __init__(self, max_concurrency: int = 4, max_orders: int = 500):
+        """
+        Initialize the batch validation service.
+        
+        Args:
+            max_concurrency: Orders fetched and validated at the same time. Kept low
+                because every order costs at least one InFlow request (60/min limit)
+            max_orders: Largest batch accepted in one request
+        """
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_orders = max_orders
+    
+    def parse_request(self, body: Any) -> List[Dict[str, str]]:
+        """
+        Build the list of order references from a request body.
+        
+        Args:
+            body: Decoded JSON body with 'order_ids' and/or 'order_numbers' lists
+        
+        Returns:
+            List of references like {'order_id': ...} or {'order_number': ...}
+        
+        Raises:
+            ValueError: If the body is malformed or the batch is too large
+        """
+        if not isinstance(body, dict):
+            raise ValueError("Request body must be a JSON object with 'order_ids' and/or 'order_numbers'")
+        
+        order_ids = body.get('order_ids') or []
+        order_numbers = body.get('order_numbers') or []
+        if not isinstance(order_ids, list) or not isinstance(order_numbers, list):
+            raise ValueError("'order_ids' and 'order_numbers' must be lists")
+        
+        refs = [{'order_id': str(order_id)} for order_id in order_ids if order_id]
+        refs += [{'order_number': str(number)} for number in order_numbers if number]
+        
+        if not refs:
+            raise ValueError("No order_ids or order_numbers provided")
+        if len(refs) > self.max_orders:
+            raise ValueError(f"Batch too large: {len(refs)} orders (max {self.max_orders})")
+        return refs
+    
+    def validate_reference(self, ref: Dict[str, str]) -> Dict[str, Any]:
+        """
+        Resolve, fetch, validate and log one order.
+        
+        Args:
+            ref: {'order_id': ...} or {'order_number': ...}
+        
+        Returns:
+            Result line for the order (never raises)
+        """
+        started = time.time()
+        line = dict(ref)
+        try:
+            order_id = ref.get('order_id')
+            if not order_id:
+                summary = inflow_client.find_sales_order_by_number(ref['order_number'])
+                if not summary:
+                    line.update({'status': 'not_found', 'error': 'Order number not found'})
+                    return line
+                order_id = summary['salesOrderId']
+            
+            order_data = inflow_client.get_sales_order(order_id)
+            validation_result = schedule_validation(order_data, PRIORITY_BATCH)
+            logger_service.log_validation_result(validation_result, order_data)
+            
+            line.update({
+                'order_id': validation_result['order_id'],
+                'order_number': validation_result['order_number'],
+                'status': validation_result['status'],
+                'issues': validation_result['issues'],
+                'pending_count': validation_result.get('pending_count', 0),
+                'confirmed_count': validation_result.get('confirmed_count', 0),
+                'resolved_count': len(validation_result.get('resolved_issues', []))
+            })
+        except Exception as e:
+            logger.warning("Batch validation failed for %s: %s", ref, e)
+            line.update({'status': 'error', 'error': str(e)})
+        
+        line['elapsed_ms'] = int((time.time() - started) * 1000)
+        return line
+    
+    def iter_results(self, refs: List[Dict[str, str]]) -> Iterator[Dict[str, Any]]:
+        """
+        Validate orders concurrently, yielding each result as it completes.
+        
+        At most max_concurrency orders are in flight; the next one is only
+        submitted when a slot frees up, so a client that disconnects stops
+        the batch instead of leaving it running in the background.
+        
+        Args:
+            refs: Order references from parse_request()
+        
+        Yields:
+            One result dictionary per order, in completion order
+        """
+        pending_refs = iter(refs)
+        executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix='batch-validate')
+        try:
+            in_flight = set()
+            for ref in pending_refs:
+                in_flight.add(executor.submit(self.validate_reference, ref))
+                if len(in_flight) >= self.max_concurrency:
+                    break
+            
+            while in_flight:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    # Refill the freed slot before handing the result to the caller
+                    next_ref = next(pending_refs, None)
+                    if next_ref is not None:
+                        in_flight.add(executor.submit(self.validate_reference, next_ref))
+                    yield future.result()
+        finally:
+            executor.shutdown(wait=False)
+
+
+# Create a singleton instance
+batch_validation_service = BatchValidationService(
+    max_concurrency=config.BATCH_VALIDATE_CONCURRENCY,
+    max_orders=config.BATCH_VALIDATE_MAX_ORDERS
+)
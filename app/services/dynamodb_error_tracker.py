@@ -3,7 +3,6 @@ DynamoDB-based error tracker service for persistent storage across Lambda invoca
 This replaces the file-based tracker to handle Lambda container recycling.
 """
 
-import json
 import boto3
 from boto3.dynamodb.types import TypeSerializer
 from decimal import Decimal
@@ -11,6 +10,11 @@ from datetime import datetime, timedelta
 from typing import Dict, Any, List
 import hashlib
 
+from app.utils.log import get_logger
+from app.utils import json_codec
+
+logger = get_logger(__name__)
+
 
 class DynamoDBErrorTracker:
     """
@@ -35,7 +39,7 @@ class DynamoDBErrorTracker:
         """
         Generate a unique hash for an error.
         """
-        hash_input = f"{order_id}:{rule_name}:{message}:{json.dumps(details, sort_keys=True)}"
+        hash_input = f"{order_id}:{rule_name}:{message}:{json_codec.stable_dumps(details)}"
         return hashlib.sha256(hash_input.encode()).hexdigest()[:16]
     
     def _convert_floats_to_decimals(self, obj: Any) -> Any:
@@ -74,7 +78,7 @@ class DynamoDBErrorTracker:
                     UpdateExpression='SET last_seen = :last_seen',
                     ExpressionAttributeValues={':last_seen': now.isoformat()}
                 )
-                print(f"Updated existing error: {error_hash}")
+                logger.debug("Updated existing error: %s", error_hash)
             else:
                 # New error - add to table
                 self.table.put_item(
@@ -88,12 +92,10 @@ class DynamoDBErrorTracker:
                         'ttl': int((now + timedelta(days=7)).timestamp())  # Auto-delete after 7 days
                     }
                 )
-                print(f"Added new pending error: {error_hash}")
+                logger.info("Added new pending error: %s", error_hash)
         
         except Exception as e:
-            print(f"Error tracking in DynamoDB: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Error tracking in DynamoDB: %s", e)
             # Fallback to just logging
     
     def is_error_confirmed(self, order_id: str, error_hash: str) -> bool:
@@ -115,7 +117,7 @@ class DynamoDBErrorTracker:
             return age.total_seconds() / 60 >= self.grace_period_minutes
         
         except Exception as e:
-            print(f"Error checking confirmation status: {e}")
+            logger.error("Error checking confirmation status: %s", e)
             return False
     
     def check_error_age(self, order_id: str, error_hash: str) -> float:
@@ -137,7 +139,7 @@ class DynamoDBErrorTracker:
             return age.total_seconds() / 60
         
         except Exception as e:
-            print(f"Error checking age: {e}")
+            logger.error("Error checking age: %s", e)
             return 0.0
     
     def get_tracked_error_hashes(self, order_id: str) -> List[str]:
@@ -153,7 +155,7 @@ class DynamoDBErrorTracker:
             return [item['error_hash'] for item in response.get('Items', [])]
         
         except Exception as e:
-            print(f"Error getting tracked hashes: {e}")
+            logger.error("Error getting tracked hashes: %s", e)
             return []
     
     def get_pending_errors(self, order_id: str) -> Dict[str, Any]:
@@ -178,7 +180,7 @@ class DynamoDBErrorTracker:
             return errors
         
         except Exception as e:
-            print(f"Error getting pending errors: {e}")
+            logger.error("Error getting pending errors: %s", e)
             return {}
     
     def clear_error(self, order_id: str, error_hash: str) -> None:
@@ -189,10 +191,10 @@ class DynamoDBErrorTracker:
             self.table.delete_item(
                 Key={'order_id': order_id, 'error_hash': error_hash}
             )
-            print(f"Cleared resolved error: {error_hash}")
+            logger.info("Cleared resolved error: %s", error_hash)
         
         except Exception as e:
-            print(f"Error clearing from DynamoDB: {e}")
+            logger.error("Error clearing from DynamoDB: %s", e)
     
     def get_all_expired_errors(self, grace_period_minutes: int = None) -> List[Dict[str, Any]]:
         """
@@ -233,17 +235,15 @@ class DynamoDBErrorTracker:
             return expired
         
         except Exception as e:
-            print(f"Error scanning for expired errors: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Error scanning for expired errors: %s", e)
             return []
 
 
 # Create singleton instance
 try:
     dynamodb_error_tracker = DynamoDBErrorTracker()
-    print("DynamoDB error tracker initialized")
+    logger.info("DynamoDB error tracker initialized")
 except Exception as e:
-    print(f"Warning: Could not initialize DynamoDB error tracker: {e}")
+    logger.warning("Could not initialize DynamoDB error tracker: %s", e)
     dynamodb_error_tracker = None
 
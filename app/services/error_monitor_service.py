@@ -3,6 +3,7 @@ import os
 from datetime import datetime
 from typing import Dict, Any, List
 from threading import Thread
+from concurrent.futures import ThreadPoolExecutor
 
 # Use DynamoDB tracker if running in Lambda (AWS), otherwise use file-based tracker
 if os.environ.get('AWS_LAMBDA_FUNCTION_NAME'):
@@ -12,9 +13,11 @@ else:
     from app.services.error_tracker_service import error_tracker_service
     print("Error Monitor: Using file-based error tracker (local development)")
 
+from app.config import config
 from app.clients.inflow_client import inflow_client
 from app.services.logger_service import logger_service
 from app.services.notification_service import notification_service
+from app.services.order_lock_service import lock_order
 
 
 class ErrorMonitorService:
@@ -128,14 +131,29 @@ class ErrorMonitorService:
                 orders_with_expired_errors[order_id] = []
             orders_with_expired_errors[order_id].append(expired_error)
         
-        # Process each order with expired errors
-        for order_id, errors in orders_with_expired_errors.items():
-            try:
-                self._process_expired_order(order_id, errors)
-            except Exception as e:
-                print(f"Error processing expired errors for order {order_id}: {e}")
-                import traceback
-                traceback.print_exc()
+        # Process each order with expired errors, several at a time. Each order
+        # is fetched under its lock so a webhook run cannot change it in between
+        workers = max(1, min(config.ERROR_MONITOR_FETCH_CONCURRENCY, len(orders_with_expired_errors)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='error-monitor') as executor:
+            for order_id, errors in orders_with_expired_errors.items():
+                executor.submit(self._process_order_locked, order_id, errors)
+    
+    def _process_order_locked(self, order_id: str, expired_errors: List[Dict[Any, Any]]):
+        """
+        Process an order with expired errors while holding its order lock.
+        
+        Args:
+            order_id: Sales order ID
+            expired_errors: List of expired error entries
+        """
+        try:
+            # Serialize with webhook runs for the same order
+            with lock_order(order_id):
+                self._process_expired_order(order_id, expired_errors)
+        except Exception as e:
+            print(f"Error processing expired errors for order {order_id}: {e}")
+            import traceback
+            traceback.print_exc()
     
     def _process_expired_order(self, order_id: str, expired_errors: List[Dict[Any, Any]]):
         """
@@ -145,6 +163,14 @@ class ErrorMonitorService:
             order_id: Sales order ID
             expired_errors: List of expired error entries
         """
+        # A webhook run may have resolved (or already notified) some of these
+        # while this check was waiting for the order lock
+        tracked_hashes = set(error_tracker_service.get_tracked_error_hashes(order_id))
+        expired_errors = [e for e in expired_errors if e['error_hash'] in tracked_hashes]
+        if not expired_errors:
+            print(f"\nOrder {order_id}: expired errors no longer tracked - skipping")
+            return
+        
         print(f"\nProcessing order: {order_id}")
         print(f"Order number: {expired_errors[0]['order_number']}")
         print(f"Expired errors: {len(expired_errors)}")
@@ -200,7 +226,7 @@ class ErrorMonitorService:
                 error_hash = expired_error['error_hash']
                 error_tracker_service.clear_error(order_id, error_hash)
                 print(f"Cleared confirmed error from tracking: {error_hash[:8]}...")
-            
+        
         except Exception as e:
             print(f"Failed to send notification: {e}")
             print(f"Errors will remain in tracking and retry on next check")
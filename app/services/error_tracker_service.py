@@ -1,10 +1,12 @@
-import json
 import os
 import hashlib
+import threading
 from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional
 from pathlib import Path
 
+from app.utils import json_codec
+
 
 class ErrorTrackerService:
     """
@@ -27,6 +29,8 @@ class ErrorTrackerService:
         
         self.storage_file = Path(storage_file)
         self.storage_file.parent.mkdir(exist_ok=True)
+        # Guards read-modify-write cycles on the storage file (queue workers run concurrently)
+        self._lock = threading.RLock()
         self._ensure_storage_file()
     
     def _ensure_storage_file(self) -> None:
@@ -34,8 +38,8 @@ class ErrorTrackerService:
         Ensure the storage file exists with valid JSON structure.
         """
         if not self.storage_file.exists():
-            with open(self.storage_file, 'w', encoding='utf-8') as f:
-                json.dump({}, f)
+            with open(self.storage_file, 'wb') as f:
+                f.write(json_codec.dumps_bytes({}))
     
     def _load_errors(self) -> Dict[str, Dict[str, Any]]:
         """
@@ -45,9 +49,10 @@ class ErrorTrackerService:
             Dictionary of pending errors by order_id
         """
         try:
-            with open(self.storage_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except (json.JSONDecodeError, FileNotFoundError):
+            with self._lock:
+                with open(self.storage_file, 'rb') as f:
+                    return json_codec.loads(f.read())
+        except (json_codec.JSONDecodeError, FileNotFoundError):
             return {}
     
     def _save_errors(self, errors: Dict[str, Dict[str, Any]]) -> None:
@@ -57,8 +62,8 @@ class ErrorTrackerService:
         Args:
             errors: Dictionary of pending errors to save
         """
-        with open(self.storage_file, 'w', encoding='utf-8') as f:
-            json.dump(errors, f, indent=2, ensure_ascii=False)
+        with open(self.storage_file, 'wb') as f:
+            f.write(json_codec.dumps_bytes(errors, indent=True))
     
     def generate_error_hash(self, order_id: str, rule_name: str, message: str, 
                            details: Dict[Any, Any] = None) -> str:
@@ -102,27 +107,28 @@ class ErrorTrackerService:
             error_data: Complete error information
             order_number: Order number for display
         """
-        errors = self._load_errors()
-        
-        # Initialize order entry if not exists
-        if order_id not in errors:
-            errors[order_id] = {}
-        
-        current_time = datetime.now().isoformat()
-        
-        # If error already exists, update last_seen
-        if error_hash in errors[order_id]:
-            errors[order_id][error_hash]['last_seen'] = current_time
-        else:
-            # New error - create entry
-            errors[order_id][error_hash] = {
-                'first_seen': current_time,
-                'last_seen': current_time,
-                'order_number': order_number,
-                'error_details': error_data
-            }
-        
-        self._save_errors(errors)
+        with self._lock:
+            errors = self._load_errors()
+            
+            # Initialize order entry if not exists
+            if order_id not in errors:
+                errors[order_id] = {}
+            
+            current_time = datetime.now().isoformat()
+            
+            # If error already exists, update last_seen
+            if error_hash in errors[order_id]:
+                errors[order_id][error_hash]['last_seen'] = current_time
+            else:
+                # New error - create entry
+                errors[order_id][error_hash] = {
+                    'first_seen': current_time,
+                    'last_seen': current_time,
+                    'order_number': order_number,
+                    'error_details': error_data
+                }
+            
+            self._save_errors(errors)
     
     def check_error_age(self, order_id: str, error_hash: str) -> Optional[float]:
         """
@@ -177,19 +183,20 @@ class ErrorTrackerService:
         Returns:
             True if error was removed, False if not found
         """
-        errors = self._load_errors()
-        
-        if order_id not in errors or error_hash not in errors[order_id]:
-            return False
-        
-        del errors[order_id][error_hash]
-        
-        # Clean up empty order entries
-        if not errors[order_id]:
-            del errors[order_id]
-        
-        self._save_errors(errors)
-        return True
+        with self._lock:
+            errors = self._load_errors()
+            
+            if order_id not in errors or error_hash not in errors[order_id]:
+                return False
+            
+            del errors[order_id][error_hash]
+            
+            # Clean up empty order entries
+            if not errors[order_id]:
+                del errors[order_id]
+            
+            self._save_errors(errors)
+            return True
     
     def get_pending_errors(self, order_id: str) -> Dict[str, Dict[Any, Any]]:
         """
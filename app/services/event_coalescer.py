@@ -0,0 +1,327 @@
+"""
+Per-order event coalescing.
+
+InFlow often sends several SalesOrderUpdatedV1 events for a single save.
+The first event for an order becomes the leader: it waits until no new event
+has arrived for the quiet window (capped by a maximum wait), then runs the
+pipeline once for the latest order state. Events that arrive while the leader
+is waiting are folded into that run; events that arrive while the pipeline is
+already running trigger exactly one follow-up run.
+
+The leader blocks for the whole window, so only callers whose reply does not
+wait on it coalesce: queue workers and the async server's background tasks.
+Once a leader has spent max_wait_seconds across its runs, it hands any further
+follow-up to a fresh leader (e.g. by re-enqueueing the event), so a steady
+stream of updates cannot hold one worker indefinitely.
+"""
+
+import asyncio
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from app.config import config
+
+
+class _PendingOrder:
+    """
+    Coalescing state for a single order.
+    """
+    
+    def __init__(self, now: float):
+        self.leader_since = now
+        self.first_event_at = now
+        self.last_event_at = now
+        self.event_count = 1
+        self.running = False
+        self.dirty = False
+
+
+class CoalesceResult:
+    """
+    Outcome of submitting an event to the coalescer.
+    """
+    
+    def __init__(self, leader: bool, result: Any = None, runs: int = 0, handed_off: bool = False):
+        """
+        Args:
+            leader: True if this caller ran the handler, False if the event was folded into another run
+            result: Return value of the last handler run (leader only)
+            runs: Number of handler runs performed by the leader
+            handed_off: True if the leader passed a pending follow-up run to a fresh leader
+        """
+        self.leader = leader
+        self.result = result
+        self.runs = runs
+        self.handed_off = handed_off
+
+
+class EventCoalescer:
+    """
+    Collapses bursts of events for the same key into a single handler run.
+    """
+    
+    def __init__(self, quiet_window_seconds: float = 2.0, max_wait_seconds: float = 10.0):
+        """
+        Initialize the coalescer.
+        
+        Args:
+            quiet_window_seconds: Time without new events before the handler runs
+            max_wait_seconds: Upper bound on how long a burst can delay the handler,
+                and on a leader's total time before follow-ups are handed off
+        """
+        self.quiet_window_seconds = quiet_window_seconds
+        self.max_wait_seconds = max_wait_seconds
+        self._lock = threading.Lock()
+        self._pending: Dict[str, _PendingOrder] = {}
+        self._stats = {'events': 0, 'coalesced': 0, 'runs': 0, 'handoffs': 0}
+    
+    def submit(self, key: str, handler: Callable[[], Any],
+               handoff: Optional[Callable[[], Any]] = None) -> CoalesceResult:
+        """
+        Submit an event for a key.
+        
+        The first caller for a key blocks until the quiet window has passed and
+        runs the handler; concurrent callers for the same key return immediately.
+        
+        Args:
+            key: Coalescing key (sales order ID)
+            handler: Zero-argument callable that processes the latest state
+            handoff: Called instead of another run once the leader has spent
+                max_wait_seconds (None keeps running follow-ups itself)
+        
+        Returns:
+            CoalesceResult describing whether this caller ran the handler
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._stats['events'] += 1
+            pending = self._pending.get(key)
+            if pending is not None:
+                pending.last_event_at = now
+                pending.event_count += 1
+                if pending.running:
+                    # State changed after the fetch started - run once more afterwards
+                    pending.dirty = True
+                self._stats['coalesced'] += 1
+                return CoalesceResult(leader=False)
+            
+            pending = _PendingOrder(now)
+            self._pending[key] = pending
+        
+        runs = 0
+        result = None
+        handed_off = False
+        try:
+            while True:
+                self._wait_for_quiet(pending)
+                result = handler()
+                runs += 1
+                
+                with self._lock:
+                    self._stats['runs'] += 1
+                    pending.running = False
+                    now = time.monotonic()
+                    # Past its time budget, the leader passes the follow-up on instead of running it
+                    handed_off = (pending.dirty and handoff is not None
+                                  and now - pending.leader_since >= self.max_wait_seconds)
+                    if not pending.dirty or handed_off:
+                        del self._pending[key]
+                        self._stats['handoffs'] += int(handed_off)
+                        break
+                    # New events arrived mid-run - start a fresh window for them
+                    pending.dirty = False
+                    pending.first_event_at = now
+        except Exception:
+            with self._lock:
+                self._pending.pop(key, None)
+            raise
+        
+        if handed_off:
+            # Later events for this order start (or join) the next leader
+            handoff()
+        return CoalesceResult(leader=True, result=result, runs=runs, handed_off=handed_off)
+    
+    def is_pending(self, key: str) -> bool:
+        """
+        Check whether an event for the key would be folded into a pending run.
+        
+        Args:
+            key: Coalescing key (sales order ID)
+        
+        Returns:
+            True if a leader is already waiting or running for the key
+        """
+        with self._lock:
+            return key in self._pending
+    
+    def _wait_for_quiet(self, pending: _PendingOrder) -> None:
+        """
+        Sleep until the quiet window (or max wait) has elapsed, then mark the entry running.
+        """
+        while True:
+            with self._lock:
+                deadline = min(
+                    pending.last_event_at + self.quiet_window_seconds,
+                    pending.first_event_at + self.max_wait_seconds
+                )
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    pending.running = True
+                    return
+            time.sleep(remaining)
+    
+    def get_status(self) -> Dict[str, Any]:
+        """
+        Get coalescing counters.
+        
+        Returns:
+            Dictionary with event, coalesced, run and handoff counts
+        """
+        with self._lock:
+            return {
+                'quiet_window_seconds': self.quiet_window_seconds,
+                'max_wait_seconds': self.max_wait_seconds,
+                'pending_orders': len(self._pending),
+                **self._stats
+            }
+
+
+class AsyncEventCoalescer:
+    """
+    Asyncio variant of EventCoalescer for the async server.
+    
+    All state is touched from a single event loop, so no lock is needed and
+    a waiting leader costs a sleeping coroutine instead of a thread.
+    """
+    
+    def __init__(self, quiet_window_seconds: float = 2.0, max_wait_seconds: float = 10.0):
+        """
+        Initialize the coalescer.
+        
+        Args:
+            quiet_window_seconds: Time without new events before the handler runs
+            max_wait_seconds: Upper bound on how long a burst can delay the handler
+        """
+        self.quiet_window_seconds = quiet_window_seconds
+        self.max_wait_seconds = max_wait_seconds
+        self._pending: Dict[str, _PendingOrder] = {}
+        self._stats = {'events': 0, 'coalesced': 0, 'runs': 0, 'handoffs': 0}
+    
+    async def submit(self, key: str, handler: Callable[[], Awaitable[Any]],
+                     handoff: Optional[Callable[[], Any]] = None) -> CoalesceResult:
+        """
+        Submit an event for a key (see EventCoalescer.submit).
+        
+        Args:
+            key: Coalescing key (sales order ID)
+            handler: Zero-argument coroutine function that processes the latest state
+            handoff: Called instead of another run once the leader has spent max_wait_seconds
+        
+        Returns:
+            CoalesceResult describing whether this caller ran the handler
+        """
+        now = time.monotonic()
+        self._stats['events'] += 1
+        pending = self._pending.get(key)
+        if pending is not None:
+            pending.last_event_at = now
+            pending.event_count += 1
+            if pending.running:
+                pending.dirty = True
+            self._stats['coalesced'] += 1
+            return CoalesceResult(leader=False)
+        
+        pending = _PendingOrder(now)
+        self._pending[key] = pending
+        
+        runs = 0
+        result = None
+        handed_off = False
+        try:
+            while True:
+                await self._wait_for_quiet(pending)
+                result = await handler()
+                runs += 1
+                
+                self._stats['runs'] += 1
+                pending.running = False
+                now = time.monotonic()
+                handed_off = (pending.dirty and handoff is not None
+                              and now - pending.leader_since >= self.max_wait_seconds)
+                if not pending.dirty or handed_off:
+                    del self._pending[key]
+                    self._stats['handoffs'] += int(handed_off)
+                    break
+                pending.dirty = False
+                pending.first_event_at = now
+        except BaseException:
+            self._pending.pop(key, None)
+            raise
+        
+        if handed_off:
+            handoff()
+        return CoalesceResult(leader=True, result=result, runs=runs, handed_off=handed_off)
+    
+    def is_pending(self, key: str) -> bool:
+        """
+        Check whether an event for the key would be folded into a pending run.
+        """
+        return key in self._pending
+    
+    async def _wait_for_quiet(self, pending: _PendingOrder) -> None:
+        """
+        Sleep until the quiet window (or max wait) has elapsed, then mark the entry running.
+        """
+        while True:
+            deadline = min(
+                pending.last_event_at + self.quiet_window_seconds,
+                pending.first_event_at + self.max_wait_seconds
+            )
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                pending.running = True
+                return
+            await asyncio.sleep(remaining)
+    
+    def get_status(self) -> Dict[str, Any]:
+        """
+        Get coalescing counters.
+        
+        Returns:
+            Dictionary with event, coalesced, run and handoff counts
+        """
+        return {
+            'quiet_window_seconds': self.quiet_window_seconds,
+            'max_wait_seconds': self.max_wait_seconds,
+            'pending_orders': len(self._pending),
+            **self._stats
+        }
+
+
+def create_event_coalescer() -> Optional[EventCoalescer]:
+    """
+    Create the coalescer from configuration (None when disabled).
+    """
+    if config.COALESCE_WINDOW_SECONDS <= 0:
+        return None
+    return EventCoalescer(
+        quiet_window_seconds=config.COALESCE_WINDOW_SECONDS,
+        max_wait_seconds=config.COALESCE_MAX_WAIT_SECONDS
+    )
+
+
+def create_async_event_coalescer() -> Optional[AsyncEventCoalescer]:
+    """
+    Create the asyncio coalescer from configuration (None when disabled).
+    """
+    if config.COALESCE_WINDOW_SECONDS <= 0:
+        return None
+    return AsyncEventCoalescer(
+        quiet_window_seconds=config.COALESCE_WINDOW_SECONDS,
+        max_wait_seconds=config.COALESCE_MAX_WAIT_SECONDS
+    )
+
+
+# Create a singleton instance
+event_coalescer = create_event_coalescer()
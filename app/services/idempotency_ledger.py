@@ -0,0 +1,482 @@
+"""
+Idempotency ledger for InFlow webhook deliveries.
+
+InFlow redelivers a webhook when it does not get a timely 2xx, and our own
+500 responses trigger retries too. Each verified delivery is keyed by a digest
+of the raw payload and its HMAC header; the first delivery claims the key and
+runs the pipeline, and its response body is stored for the TTL so that
+redeliveries are answered from the ledger without fetching or validating again.
+
+Backends:
+    - MemoryLedgerBackend: in-process LRU (single process / tests)
+    - SQLiteLedgerBackend: local file shared by all Flask workers on the host
+    - DynamoDBLedgerBackend: conditional put, shared across Lambda containers
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Any, Optional, Tuple
+
+from app.config import config
+from app.utils.log import get_logger
+
+logger = get_logger(__name__)
+
+
+# Ledger entry states
+STATUS_IN_PROGRESS = 'in_progress'
+STATUS_COMPLETED = 'completed'
+
+
+class LedgerEntry:
+    """
+    A recorded webhook delivery.
+    """
+    
+    def __init__(self, status: str, expires_at: float, status_code: Optional[int] = None,
+                 body: Optional[str] = None):
+        """
+        Args:
+            status: STATUS_IN_PROGRESS or STATUS_COMPLETED
+            expires_at: Epoch seconds after which the entry is ignored
+            status_code: HTTP status of the stored response (completed only)
+            body: JSON response body of the stored response (completed only)
+        """
+        self.status = status
+        self.expires_at = expires_at
+        self.status_code = status_code
+        self.body = body
+
+
+class MemoryLedgerBackend:
+    """
+    In-process LRU ledger with per-entry expiry.
+    """
+    
+    name = 'memory'
+    
+    def __init__(self, max_entries: int = 10000):
+        """
+        Args:
+            max_entries: Entries kept before the least recently used are evicted
+        """
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[str, LedgerEntry]' = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def claim(self, key: str, claim_ttl: float) -> Tuple[bool, Optional[LedgerEntry]]:
+        """
+        Atomically claim a key unless a live entry already exists.
+        
+        Args:
+            key: Delivery key
+            claim_ttl: Seconds the in-progress claim stays valid
+        
+        Returns:
+            (True, None) if claimed, otherwise (False, existing_entry)
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry.expires_at > now:
+                self._entries.move_to_end(key)
+                return False, entry
+            
+            self._entries[key] = LedgerEntry(STATUS_IN_PROGRESS, now + claim_ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return True, None
+    
+    def complete(self, key: str, status_code: int, body: str, ttl: float) -> None:
+        """
+        Store the response for a claimed key.
+        """
+        with self._lock:
+            self._entries[key] = LedgerEntry(STATUS_COMPLETED, time.time() + ttl, status_code, body)
+            self._entries.move_to_end(key)
+    
+    def release(self, key: str) -> None:
+        """
+        Drop a claim so the next delivery is processed again.
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+    
+    def count(self) -> int:
+        """
+        Number of entries currently held.
+        """
+        with self._lock:
+            return len(self._entries)
+
+
+class SQLiteLedgerBackend:
+    """
+    File-backed ledger using SQLite, shared by every process on the host.
+    """
+    
+    name = 'sqlite'
+    
+    def __init__(self, db_path: str):
+        """
+        Args:
+            db_path: Path to the SQLite database file
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._ensure_schema()
+    
+    def _connect(self) -> sqlite3.Connection:
+        """
+        Open a new connection (one per call keeps the backend thread-safe).
+        """
+        conn = sqlite3.connect(str(self.db_path), timeout=30, isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')
+        return conn
+    
+    def _ensure_schema(self) -> None:
+        """
+        Create the ledger table if it does not exist.
+        """
+        conn = self._connect()
+        try:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS webhook_ledger (
+                    idempotency_key TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    status_code INTEGER,
+                    body TEXT,
+                    expires_at REAL NOT NULL
+                )
+                """
+            )
+        finally:
+            conn.close()
+    
+    def claim(self, key: str, claim_ttl: float) -> Tuple[bool, Optional[LedgerEntry]]:
+        """
+        Atomically claim a key unless a live entry already exists.
+        
+        Args:
+            key: Delivery key
+            claim_ttl: Seconds the in-progress claim stays valid
+        
+        Returns:
+            (True, None) if claimed, otherwise (False, existing_entry)
+        """
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            row = conn.execute(
+                'SELECT status, status_code, body, expires_at FROM webhook_ledger '
+                'WHERE idempotency_key = ? AND expires_at > ?',
+                (key, now)
+            ).fetchone()
+            if row:
+                conn.execute('COMMIT')
+                status, status_code, body, expires_at = row
+                return False, LedgerEntry(status, expires_at, status_code, body)
+            
+            conn.execute(
+                'INSERT OR REPLACE INTO webhook_ledger (idempotency_key, status, expires_at) VALUES (?, ?, ?)',
+                (key, STATUS_IN_PROGRESS, now + claim_ttl)
+            )
+            # Opportunistically drop expired rows so the file stays small
+            conn.execute('DELETE FROM webhook_ledger WHERE expires_at <= ?', (now,))
+            conn.execute('COMMIT')
+            return True, None
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        finally:
+            conn.close()
+    
+    def complete(self, key: str, status_code: int, body: str, ttl: float) -> None:
+        """
+        Store the response for a claimed key.
+        """
+        conn = self._connect()
+        try:
+            conn.execute(
+                'INSERT OR REPLACE INTO webhook_ledger (idempotency_key, status, status_code, body, expires_at) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (key, STATUS_COMPLETED, status_code, body, time.time() + ttl)
+            )
+        finally:
+            conn.close()
+    
+    def release(self, key: str) -> None:
+        """
+        Drop a claim so the next delivery is processed again.
+        """
+        conn = self._connect()
+        try:
+            conn.execute('DELETE FROM webhook_ledger WHERE idempotency_key = ?', (key,))
+        finally:
+            conn.close()
+    
+    def count(self) -> int:
+        """
+        Number of live entries in the ledger.
+        """
+        conn = self._connect()
+        try:
+            return conn.execute(
+                'SELECT COUNT(*) FROM webhook_ledger WHERE expires_at > ?', (time.time(),)
+            ).fetchone()[0]
+        finally:
+            conn.close()
+
+
+class DynamoDBLedgerBackend:
+    """
+    Ledger stored in DynamoDB, shared across Lambda containers.
+    Claims use a conditional put; the table's TTL attribute (expires_at)
+    lets DynamoDB delete old entries on its own.
+    """
+    
+    name = 'dynamodb'
+    
+    def __init__(self, table_name: str = 'inflow-webhook-ledger', region_name: str = 'us-east-2',
+                 endpoint_url: Optional[str] = None):
+        """
+        Args:
+            table_name: DynamoDB table (partition key: idempotency_key)
+            region_name: AWS region
+            endpoint_url: Optional endpoint override (e.g. DynamoDB Local)
+        """
+        import boto3
+        
+        self.table_name = table_name
+        self.dynamodb = boto3.resource('dynamodb', region_name=region_name, endpoint_url=endpoint_url)
+        self.table = self.dynamodb.Table(table_name)
+    
+    def claim(self, key: str, claim_ttl: float) -> Tuple[bool, Optional[LedgerEntry]]:
+        """
+        Claim a key with a conditional put (fails if a live entry exists).
+        
+        Args:
+            key: Delivery key
+            claim_ttl: Seconds the in-progress claim stays valid
+        
+        Returns:
+            (True, None) if claimed, otherwise (False, existing_entry)
+        """
+        now = int(time.time())
+        try:
+            self.table.put_item(
+                Item={
+                    'idempotency_key': key,
+                    'status': STATUS_IN_PROGRESS,
+                    'expires_at': now + int(claim_ttl)
+                },
+                ConditionExpression='attribute_not_exists(idempotency_key) OR expires_at <= :now',
+                ExpressionAttributeValues={':now': now}
+            )
+            return True, None
+        except self.dynamodb.meta.client.exceptions.ConditionalCheckFailedException:
+            pass
+        
+        item = self.table.get_item(Key={'idempotency_key': key}, ConsistentRead=True).get('Item')
+        if not item:
+            # Entry vanished between the put and the read - treat as still in progress
+            return False, LedgerEntry(STATUS_IN_PROGRESS, now + claim_ttl)
+        status_code = item.get('status_code')
+        return False, LedgerEntry(
+            item['status'],
+            float(item['expires_at']),
+            int(status_code) if status_code is not None else None,
+            item.get('body')
+        )
+    
+    def complete(self, key: str, status_code: int, body: str, ttl: float) -> None:
+        """
+        Store the response for a claimed key.
+        """
+        self.table.put_item(
+            Item={
+                'idempotency_key': key,
+                'status': STATUS_COMPLETED,
+                'status_code': status_code,
+                'body': body,
+                'expires_at': int(time.time() + ttl)
+            }
+        )
+    
+    def release(self, key: str) -> None:
+        """
+        Drop a claim so the next delivery is processed again.
+        """
+        self.table.delete_item(Key={'idempotency_key': key})
+    
+    def count(self) -> Optional[int]:
+        """
+        Not tracked for DynamoDB (a scan would cost more than it is worth).
+        """
+        return None
+
+
+class IdempotencyLedger:
+    """
+    Records webhook deliveries so redelivered events are answered from the ledger.
+    """
+    
+    def __init__(self, backend, ttl_seconds: float = 86400, claim_ttl_seconds: float = 300):
+        """
+        Initialize the ledger.
+        
+        Args:
+            backend: Ledger backend (memory, SQLite or DynamoDB)
+            ttl_seconds: How long a completed response is replayed
+            claim_ttl_seconds: How long an in-progress claim blocks redeliveries
+                (bounds the damage if a worker dies mid-request)
+        """
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.claim_ttl_seconds = claim_ttl_seconds
+        
+        self._stats_lock = threading.Lock()
+        self.stats = {
+            'hits': 0,
+            'in_progress_hits': 0,
+            'misses': 0,
+            'released': 0,
+            'errors': 0
+        }
+    
+    @staticmethod
+    def make_key(payload: bytes, signature_header: Optional[str]) -> str:
+        """
+        Build the delivery key from the raw payload and its HMAC header.
+        
+        Args:
+            payload: Raw request body
+            signature_header: Value of the x-inflow-hmac-sha256 header
+        
+        Returns:
+            Hex SHA-256 digest
+        """
+        digest = hashlib.sha256()
+        digest.update((signature_header or '').encode('utf-8'))
+        digest.update(b'\n')
+        digest.update(payload)
+        return digest.hexdigest()
+    
+    def _count(self, stat: str) -> None:
+        with self._stats_lock:
+            self.stats[stat] += 1
+    
+    def claim(self, key: str) -> Tuple[bool, Optional[LedgerEntry]]:
+        """
+        Claim a delivery key before processing.
+        
+        Fails open: if the backend is unavailable the delivery is processed
+        as if it were new.
+        
+        Args:
+            key: Delivery key from make_key()
+        
+        Returns:
+            (True, None) if the caller should process the delivery,
+            otherwise (False, existing_entry) for a duplicate
+        """
+        try:
+            claimed, entry = self.backend.claim(key, self.claim_ttl_seconds)
+        except Exception as e:
+            logger.warning("Idempotency ledger unavailable, processing delivery anyway: %s", e)
+            self._count('errors')
+            return True, None
+        
+        if claimed:
+            self._count('misses')
+        elif entry.status == STATUS_COMPLETED:
+            self._count('hits')
+        else:
+            self._count('in_progress_hits')
+        return claimed, entry
+    
+    def complete(self, key: str, status_code: int, body: str) -> None:
+        """
+        Store the response for a processed delivery.
+        
+        Args:
+            key: Delivery key from make_key()
+            status_code: HTTP status returned to InFlow
+            body: JSON response body returned to InFlow
+        """
+        try:
+            self.backend.complete(key, status_code, body, self.ttl_seconds)
+        except Exception as e:
+            logger.warning("Could not record webhook delivery in idempotency ledger: %s", e)
+            self._count('errors')
+    
+    def release(self, key: str) -> None:
+        """
+        Release a claim after a failure so the retry is processed.
+        
+        Args:
+            key: Delivery key from make_key()
+        """
+        try:
+            self.backend.release(key)
+            self._count('released')
+        except Exception as e:
+            logger.warning("Could not release idempotency ledger claim: %s", e)
+            self._count('errors')
+    
+    def get_status(self) -> Dict[str, Any]:
+        """
+        Get ledger metrics.
+        
+        Returns:
+            Dictionary with backend name, hit/miss counters and entry count
+        """
+        with self._stats_lock:
+            status = dict(self.stats)
+        status['backend'] = self.backend.name
+        try:
+            status['entries'] = self.backend.count()
+        except Exception:
+            status['entries'] = None
+        return status
+
+
+def _create_backend():
+    """
+    Create the ledger backend selected by configuration.
+    """
+    if config.IDEMPOTENCY_BACKEND == 'dynamodb':
+        return DynamoDBLedgerBackend(
+            table_name=config.IDEMPOTENCY_TABLE,
+            region_name=config.DYNAMODB_REGION,
+            endpoint_url=config.DYNAMODB_ENDPOINT_URL
+        )
+    if config.IDEMPOTENCY_BACKEND == 'memory':
+        return MemoryLedgerBackend(max_entries=config.IDEMPOTENCY_MAX_ENTRIES)
+    
+    # Use LOGS_DIR environment variable if set (for Lambda)
+    db_path = config.IDEMPOTENCY_DB_PATH or os.path.join(os.environ.get('LOGS_DIR', 'logs'), 'webhook_ledger.db')
+    return SQLiteLedgerBackend(db_path=db_path)
+
+
+# Create a singleton instance
+if config.IDEMPOTENCY_BACKEND == 'none':
+    idempotency_ledger = None
+else:
+    try:
+        idempotency_ledger = IdempotencyLedger(
+            backend=_create_backend(),
+            ttl_seconds=config.IDEMPOTENCY_TTL_SECONDS,
+            claim_ttl_seconds=config.IDEMPOTENCY_CLAIM_TTL_SECONDS
+        )
+    except Exception as e:
+        logger.warning("Could not initialize idempotency ledger: %s", e)
+        idempotency_ledger = None
@@ -1,16 +1,29 @@
-import json
 import csv
 import os
+import threading
 from datetime import datetime
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
 from pathlib import Path
 
+from app.utils.log import get_logger
+from app.utils import json_codec
+
+logger = get_logger(__name__)
+
 
 class LoggerService:
     """
     Service for logging validation results to JSON and CSV files.
     """
     
+    CSV_FIELDNAMES = ['timestamp', 'order_number', 'status', 'account_manager', 
+                      'error_count', 'pending_count', 'discount_error', 'credit_card_error', 
+                      'assembly_error', 'delivery_fee_error', 'discount_remarks_error', 
+                      'return_reason_error', 'issues_summary', 'pending_summary']
+    
+    # Sales order relationships read for the CSV row (account manager column)
+    required_includes = ['salesRepTeamMember']
+    
     def __init__(self, log_directory: str = "logs"):
         """
         Initialize the logger service.
@@ -22,6 +35,8 @@ class LoggerService:
         log_directory = os.environ.get('LOGS_DIR', log_directory)
         self.log_directory = Path(log_directory)
         self.log_directory.mkdir(exist_ok=True)
+        # Serializes CSV appends from concurrent workers
+        self._write_lock = threading.Lock()
     
     def log_validation_result(self, validation_result: Dict[Any, Any], order_data: Dict[Any, Any] = None) -> None:
         """
@@ -72,18 +87,22 @@ class LoggerService:
         filepath = self.log_directory / filename
         
         # Write JSON file
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(validation_result, f, indent=2, ensure_ascii=False)
+        with open(filepath, 'wb') as f:
+            f.write(json_codec.dumps_bytes(validation_result, indent=True))
         
-        print(f"Validation result logged to JSON: {filepath} (Order: {order_number})")
+        logger.debug("Validation result logged to JSON: %s (Order: %s)", filepath, order_number)
     
-    def _log_to_csv(self, validation_result: Dict[Any, Any], order_data: Dict[Any, Any] = None) -> None:
+    def _build_csv_row(self, validation_result: Dict[Any, Any],
+                       order_data: Dict[Any, Any] = None) -> Tuple[Path, Dict[str, Any]]:
         """
-        Append validation result to monthly CSV log file.
+        Build the monthly CSV file path and row for a validation result.
         
         Args:
             validation_result: Validation result dictionary
             order_data: Complete sales order data from InFlow (optional)
+        
+        Returns:
+            Tuple of (CSV file path, row dictionary)
         """
         timestamp = validation_result.get('timestamp', datetime.now().isoformat())
         dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
@@ -185,23 +204,66 @@ class LoggerService:
             'pending_summary': pending_summary
         }
         
-        # Check if file exists to determine if we need to write headers
-        file_exists = filepath.exists()
+        return filepath, row
+    
+    def _log_to_csv(self, validation_result: Dict[Any, Any], order_data: Dict[Any, Any] = None) -> None:
+        """
+        Append validation result to monthly CSV log file.
         
-        # Write to CSV
-        with open(filepath, 'a', newline='', encoding='utf-8') as f:
-            fieldnames = ['timestamp', 'order_number', 'status', 'account_manager', 
-                          'error_count', 'pending_count', 'discount_error', 'credit_card_error', 
-                          'assembly_error', 'delivery_fee_error', 'discount_remarks_error', 
-                          'return_reason_error', 'issues_summary', 'pending_summary']
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            
-            if not file_exists:
-                writer.writeheader()
-            
-            writer.writerow(row)
+        Args:
+            validation_result: Validation result dictionary
+            order_data: Complete sales order data from InFlow (optional)
+        """
+        filepath, row = self._build_csv_row(validation_result, order_data)
+        self._write_csv_rows(filepath, [row])
+        
+        logger.debug("Validation result logged to CSV: %s (Order: %s, Status: %s)", filepath,
+                     validation_result.get('order_number', 'N/A'), validation_result.get('status', 'N/A'))
+    
+    def log_validation_results_bulk(self, entries: List[Tuple[Dict[Any, Any], Optional[Dict[Any, Any]]]]) -> int:
+        """
+        Log many validation results with one file write per monthly CSV.
+        Used by the backfill CLI, where per-row open/append dominates.
+        
+        Args:
+            entries: List of (validation_result, order_data) tuples
+        
+        Returns:
+            Number of rows written
+        """
+        rows_by_file: Dict[Path, List[Dict[str, Any]]] = {}
+        for validation_result, order_data in entries:
+            # Same resolved-status rule as log_validation_result
+            if validation_result.get('resolved_issues') and validation_result.get('status') == 'passed':
+                validation_result = dict(validation_result, status='resolved')
+            filepath, row = self._build_csv_row(validation_result, order_data)
+            rows_by_file.setdefault(filepath, []).append(row)
+        
+        for filepath, rows in rows_by_file.items():
+            self._write_csv_rows(filepath, rows)
+        
+        return len(entries)
+    
+    def _write_csv_rows(self, filepath: Path, rows: List[Dict[str, Any]]) -> None:
+        """
+        Append rows to a CSV log file, writing the header for a new file.
         
-        print(f"Validation result logged to CSV: {filepath} (Order: {validation_result.get('order_number', 'N/A')}, Status: {validation_result.get('status', 'N/A')})")
+        Args:
+            filepath: Monthly CSV file path
+            rows: Row dictionaries to append
+        """
+        with self._write_lock:
+            # Check if file exists to determine if we need to write headers
+            file_exists = filepath.exists()
+            
+            # Write to CSV
+            with open(filepath, 'a', newline='', encoding='utf-8') as f:
+                writer = csv.DictWriter(f, fieldnames=self.CSV_FIELDNAMES)
+                
+                if not file_exists:
+                    writer.writeheader()
+                
+                writer.writerows(rows)
     
     def get_validation_history(self, order_id: str) -> List[Dict[Any, Any]]:
         """
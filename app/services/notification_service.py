@@ -8,6 +8,9 @@ class NotificationService:
     Service for sending email notifications about validation failures.
     """
     
+    # Sales order relationships read for the email (customer name)
+    required_includes = ['customer']
+    
     def __init__(self, outlook_client_instance, admin_emails: List[str], 
                  from_address: str = None, testing_mode: bool = False, 
                  test_recipient: str = None):
@@ -40,6 +43,36 @@ class NotificationService:
             validation_result: Dictionary containing validation results
             order_data: Full sales order data from InFlow
         """
+        email = self.build_notification(validation_result, order_data)
+        if email is None:
+            return
+        
+        # Send email
+        try:
+            self.outlook_client.send_email(**email)
+            self.report_sent(email)
+        except Exception as e:
+            self.report_failed(e)
+            raise
+    
+    def build_notification(
+        self,
+        validation_result: Dict[Any, Any],
+        order_data: Dict[Any, Any]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Build the notification email without sending it.
+        
+        Shared by the synchronous path and the async server, which sends the
+        result with AsyncOutlookClient.send_email(**email).
+        
+        Args:
+            validation_result: Dictionary containing validation results
+            order_data: Full sales order data from InFlow
+        
+        Returns:
+            send_email() keyword arguments, or None if no email should be sent
+        """
         status = validation_result.get('status', 'unknown')
         
         # Only send notifications for confirmed failures and warnings
@@ -48,7 +81,7 @@ class NotificationService:
             if status == 'pending':
                 pending_count = validation_result.get('pending_count', 0)
                 print(f"Skipping notification for pending errors (count: {pending_count}, waiting for 30-minute grace period)")
-            return
+            return None
         
         # Check if Outlook client is configured
         if not self.outlook_client:
@@ -59,7 +92,7 @@ class NotificationService:
             print("  - OUTLOOK_CLIENT_SECRET")
             print("  - OUTLOOK_TENANT_ID")
             print("=" * 60)
-            return
+            return None
         
         # Extract recipient emails
         recipients = self._get_recipients(order_data)
@@ -79,31 +112,34 @@ class NotificationService:
             print(f"ADMIN_EMAILS in config: {self.admin_emails}")
             print("Please configure ADMIN_EMAILS in .env file")
             print("=" * 60)
-            return
+            return None
         
         # Generate email content
-        subject = self._generate_subject(validation_result, order_data)
-        body_html = self._generate_body_html(validation_result, order_data)
-        
-        # Send email
-        try:
-            self.outlook_client.send_email(
-                to_addresses=recipients,
-                subject=subject,
-                body_html=body_html,
-                from_address=self.from_address
-            )
-            print("=" * 60)
-            print(f"EMAIL SENT SUCCESSFULLY")
-            print(f"To: {', '.join(recipients)}")
-            print(f"Subject: {subject}")
-            print("=" * 60)
-        except Exception as e:
-            print("=" * 60)
-            print(f"EMAIL ERROR: Failed to send")
-            print(f"Error: {str(e)}")
-            print("=" * 60)
-            raise
+        return {
+            'to_addresses': recipients,
+            'subject': self._generate_subject(validation_result, order_data),
+            'body_html': self._generate_body_html(validation_result, order_data),
+            'from_address': self.from_address
+        }
+    
+    def report_sent(self, email: Dict[str, Any]) -> None:
+        """
+        Print confirmation for a sent email (also used by the async pipeline).
+        """
+        print("=" * 60)
+        print(f"EMAIL SENT SUCCESSFULLY")
+        print(f"To: {', '.join(email['to_addresses'])}")
+        print(f"Subject: {email['subject']}")
+        print("=" * 60)
+    
+    def report_failed(self, error: Exception) -> None:
+        """
+        Print details for an email that could not be sent.
+        """
+        print("=" * 60)
+        print(f"EMAIL ERROR: Failed to send")
+        print(f"Error: {str(error)}")
+        print("=" * 60)
     
     def _get_recipients(self, order_data: Dict[Any, Any]) -> List[str]:
         """
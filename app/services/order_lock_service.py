@@ -0,0 +1,367 @@
+"""
+Per-order locking.
+
+Two events for the same sales order must not interleave: one run reading the
+tracked error hashes while another is clearing them produces double
+notifications or lost resolutions. Work for one order is therefore serialized
+under a lock keyed by the order ID, while different orders keep running in
+parallel.
+
+Backends:
+    - LocalLockBackend: striped in-process locks (Flask threads, queue workers)
+    - DynamoDBLeaseBackend: conditional-put leases shared across Lambda containers
+"""
+
+import threading
+import time
+import uuid
+import zlib
+from contextlib import asynccontextmanager, contextmanager, nullcontext
+from contextvars import ContextVar
+from typing import Dict, Any, AsyncIterator, Awaitable, Callable, FrozenSet, Iterator, Optional
+
+from app.config import config
+from app.utils.log import get_logger
+from app.utils.metrics import RollingStats
+from app.utils.resilience import current_deadline
+
+logger = get_logger(__name__)
+
+# Marker for an acquire that failed because the backend itself errored
+_UNAVAILABLE = object()
+
+
+class OrderLockTimeout(Exception):
+    """
+    Raised when the lock for an order could not be acquired in time.
+    """
+    
+    def __init__(self, order_id: str, timeout_seconds: float):
+        super().__init__(f"Timed out after {timeout_seconds:g}s waiting for lock on order {order_id}")
+        self.order_id = order_id
+        self.timeout_seconds = timeout_seconds
+
+
+class LocalLockBackend:
+    """
+    Fixed pool of locks; each order ID hashes to one stripe.
+    
+    Orders sharing a stripe serialize with each other, so the stripe count
+    trades memory for the odds of two busy orders colliding. Stripes are plain
+    locks (not tied to a thread) so the async pipeline can release from
+    another pool thread; OrderLockService handles reentrancy per order.
+    """
+    
+    name = 'local'
+    
+    def __init__(self, stripes: int = 64):
+        """
+        Args:
+            stripes: Number of locks in the pool
+        """
+        self.stripes = max(1, stripes)
+        self._locks = [threading.Lock() for _ in range(self.stripes)]
+    
+    def _stripe(self, order_id: str) -> threading.Lock:
+        return self._locks[zlib.crc32(order_id.encode('utf-8')) % self.stripes]
+    
+    def acquire(self, order_id: str, timeout: float) -> Optional[object]:
+        """
+        Acquire the stripe for an order.
+        
+        Returns:
+            Token to pass to release(), or None on timeout
+        """
+        lock = self._stripe(order_id)
+        if lock.acquire(timeout=timeout):
+            return lock
+        return None
+    
+    def release(self, order_id: str, token: object) -> None:
+        token.release()
+
+
+class DynamoDBLeaseBackend:
+    """
+    Lease per order in DynamoDB, shared across Lambda containers.
+    
+    A lease is taken with a conditional put that only succeeds when no lease
+    exists or the existing one has expired, so a container that dies while
+    holding it blocks the order for at most lease_seconds. Releasing deletes
+    the item only if this caller still owns it; the table's TTL attribute
+    (expires_at) lets DynamoDB remove abandoned leases on its own.
+    """
+    
+    name = 'dynamodb'
+    
+    def __init__(self, table_name: str = 'inflow-order-locks', lease_seconds: int = 60,
+                 region_name: str = 'us-east-2', endpoint_url: Optional[str] = None,
+                 poll_interval: float = 0.1, max_poll_interval: float = 1.0):
+        """
+        Args:
+            table_name: DynamoDB table (partition key: order_id)
+            lease_seconds: Lease lifetime (keep above the Lambda timeout)
+            region_name: AWS region
+            endpoint_url: Optional endpoint override (e.g. DynamoDB Local)
+            poll_interval: First delay between acquire attempts
+            max_poll_interval: Longest delay between acquire attempts
+        """
+        import boto3
+        
+        self.table_name = table_name
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.dynamodb = boto3.resource('dynamodb', region_name=region_name, endpoint_url=endpoint_url)
+        self.table = self.dynamodb.Table(table_name)
+    
+    def _try_acquire(self, order_id: str, owner: str) -> bool:
+        now = int(time.time())
+        try:
+            self.table.put_item(
+                Item={
+                    'order_id': order_id,
+                    'owner': owner,
+                    'expires_at': now + self.lease_seconds
+                },
+                ConditionExpression='attribute_not_exists(order_id) OR expires_at <= :now',
+                ExpressionAttributeValues={':now': now}
+            )
+            return True
+        except self.dynamodb.meta.client.exceptions.ConditionalCheckFailedException:
+            return False
+    
+    def acquire(self, order_id: str, timeout: float) -> Optional[str]:
+        """
+        Take the lease for an order, polling with backoff until the timeout.
+        
+        Returns:
+            Owner token to pass to release(), or None on timeout
+        """
+        owner = uuid.uuid4().hex
+        deadline = time.monotonic() + timeout
+        delay = self.poll_interval
+        while True:
+            if self._try_acquire(order_id, owner):
+                return owner
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            time.sleep(min(delay, remaining))
+            delay = min(delay * 2, self.max_poll_interval)
+    
+    def release(self, order_id: str, token: str) -> None:
+        try:
+            self.table.delete_item(
+                Key={'order_id': order_id},
+                ConditionExpression='#owner = :owner',
+                ExpressionAttributeNames={'#owner': 'owner'},
+                ExpressionAttributeValues={':owner': token}
+            )
+        except self.dynamodb.meta.client.exceptions.ConditionalCheckFailedException:
+            # Lease expired and was taken over - nothing of ours to release
+            logger.warning("Lease on order %s expired before release", order_id)
+
+
+class OrderLockService:
+    """
+    Serializes work per sales order.
+    
+    Locks are reentrant per context: code already holding the lock for an
+    order (e.g. the pipeline around validate_order) passes straight through.
+    Each thread has its own context, and the async pipeline's blocking calls
+    run in a copy of the task's (see lock_async).
+    """
+    
+    def __init__(self, backend, timeout_seconds: float = 20.0):
+        """
+        Initialize the lock service.
+        
+        Args:
+            backend: Lock backend (local stripes or DynamoDB leases)
+            timeout_seconds: Longest a caller waits for an order's lock (less when
+                the request deadline ends sooner, see resilience.deadline_scope)
+        """
+        self.backend = backend
+        self.timeout_seconds = timeout_seconds
+        
+        # Orders whose lock the current context holds
+        self._held: ContextVar[FrozenSet[str]] = ContextVar(f'order_locks_{id(self)}', default=frozenset())
+        self._stats_lock = threading.Lock()
+        self.stats = {'acquired': 0, 'timeouts': 0, 'errors': 0}
+        self._wait_ms = RollingStats()
+    
+    def _count(self, stat: str) -> None:
+        with self._stats_lock:
+            self.stats[stat] += 1
+    
+    def _acquire(self, order_id: str) -> Any:
+        """
+        Wait for an order's lock from the backend.
+        
+        Returns:
+            Backend token, or _UNAVAILABLE if the backend itself failed
+        
+        Raises:
+            OrderLockTimeout: If the lock was not acquired in time
+        """
+        timeout = self.timeout_seconds
+        deadline = current_deadline()
+        if deadline is not None:
+            timeout = max(0.0, min(timeout, deadline.remaining()))
+        
+        started = time.monotonic()
+        try:
+            token = self.backend.acquire(order_id, timeout)
+        except Exception as e:
+            logger.warning("Order lock unavailable, processing %s unlocked: %s", order_id, e)
+            self._count('errors')
+            return _UNAVAILABLE
+        
+        waited_ms = (time.monotonic() - started) * 1000
+        self._wait_ms.add(waited_ms)
+        if token is None:
+            self._count('timeouts')
+            raise OrderLockTimeout(order_id, round(timeout, 2))
+        self._count('acquired')
+        return token
+    
+    def _release(self, order_id: str, token: Any) -> None:
+        try:
+            self.backend.release(order_id, token)
+        except Exception as e:
+            logger.warning("Could not release lock on order %s: %s", order_id, e)
+            self._count('errors')
+    
+    @contextmanager
+    def lock(self, order_id: str) -> Iterator[None]:
+        """
+        Hold the lock for an order for the duration of the with-block.
+        
+        Fails open if the backend itself is unavailable, matching the
+        idempotency ledger: processing unlocked beats not processing.
+        
+        Args:
+            order_id: InFlow sales order ID
+        
+        Raises:
+            OrderLockTimeout: If another holder kept the lock past the timeout
+                or the request deadline
+        """
+        held = self._held.get()
+        if order_id in held:
+            yield
+            return
+        
+        token = self._acquire(order_id)
+        if token is _UNAVAILABLE:
+            yield
+            return
+        
+        reset_token = self._held.set(held | {order_id})
+        try:
+            yield
+        finally:
+            self._held.reset(reset_token)
+            self._release(order_id, token)
+    
+    @asynccontextmanager
+    async def lock_async(self, order_id: str,
+                         run_blocking: Callable[..., Awaitable[Any]]) -> AsyncIterator[None]:
+        """
+        Asyncio variant of lock() for the async pipeline.
+        
+        The backend is waited on through run_blocking, and the order counts as
+        held for blocking calls the task makes through run_blocking while inside
+        the block (they run in a copy of the task's context).
+        
+        Args:
+            order_id: InFlow sales order ID
+            run_blocking: Runs a blocking callable off the event loop in a copy of the current context
+        
+        Raises:
+            OrderLockTimeout: If another holder kept the lock past the timeout
+                or the request deadline
+        """
+        held = self._held.get()
+        if order_id in held:
+            yield
+            return
+        
+        token = await run_blocking(self._acquire, order_id)
+        if token is _UNAVAILABLE:
+            yield
+            return
+        
+        reset_token = self._held.set(held | {order_id})
+        try:
+            yield
+        finally:
+            self._held.reset(reset_token)
+            await run_blocking(self._release, order_id, token)
+    
+    def get_status(self) -> Dict[str, Any]:
+        """
+        Get lock metrics.
+        
+        Returns:
+            Dictionary with backend name, counters and wait time stats (ms)
+        """
+        with self._stats_lock:
+            status = dict(self.stats)
+        status['backend'] = self.backend.name
+        status['wait_ms'] = self._wait_ms.snapshot()
+        return status
+
+
+def _create_backend():
+    """
+    Create the lock backend selected by configuration.
+    """
+    if config.ORDER_LOCK_BACKEND == 'dynamodb':
+        return DynamoDBLeaseBackend(
+            table_name=config.ORDER_LOCK_TABLE,
+            lease_seconds=config.ORDER_LOCK_LEASE_SECONDS,
+            region_name=config.DYNAMODB_REGION,
+            endpoint_url=config.DYNAMODB_ENDPOINT_URL
+        )
+    return LocalLockBackend(stripes=config.ORDER_LOCK_STRIPES)
+
+
+# Create a singleton instance
+if config.ORDER_LOCK_BACKEND == 'none':
+    order_lock_service = None
+else:
+    try:
+        order_lock_service = OrderLockService(
+            backend=_create_backend(),
+            timeout_seconds=config.ORDER_LOCK_TIMEOUT_SECONDS
+        )
+    except Exception as e:
+        logger.warning("Could not initialize order locks: %s", e)
+        order_lock_service = None
+
+
+def lock_order(order_id: str):
+    """
+    Context manager holding the lock for an order (no-op when locking is disabled).
+    
+    Args:
+        order_id: InFlow sales order ID
+    """
+    if order_lock_service is None:
+        return nullcontext()
+    return order_lock_service.lock(order_id)
+
+
+def lock_order_async(order_id: str, run_blocking: Callable[..., Awaitable[Any]]):
+    """
+    Async context manager holding the lock for an order (no-op when locking is disabled).
+    
+    Args:
+        order_id: InFlow sales order ID
+        run_blocking: Runs a blocking callable off the event loop in a copy of the current context
+    """
+    if order_lock_service is None:
+        return nullcontext()
+    return order_lock_service.lock_async(order_id, run_blocking)
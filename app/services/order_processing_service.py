@@ -0,0 +1,144 @@
+from typing import Dict, Any, Callable, Optional
+
+from app.config import config
+
+from app.clients.inflow_client import inflow_client
+from app.services.logger_service import logger_service
+from app.services.notification_service import notification_service
+from app.services.event_coalescer import event_coalescer
+from app.services.order_lock_service import lock_order
+from app.services.validation_scheduler import schedule_validation, classify_order
+from app.services.timing_service import timing_service
+from app.utils.log import get_logger
+from app.utils.resilience import deadline_scope
+
+logger = get_logger(__name__)
+
+
+class OrderProcessingService:
+    """
+    Runs the full pipeline for a single sales order event:
+    fetch from InFlow, validate, log, and notify.
+    Shared by the synchronous webhook path and the queue workers.
+    """
+
+    def process_event(self, sales_order_id: str, event_type: str = 'unknown',
+                      handoff: Optional[Callable[[], Any]] = None) -> Dict[str, Any]:
+        """
+        Process a queued webhook event, coalescing bursts of events for the same order.
+        
+        The first event for an order waits for the quiet window and then runs
+        the pipeline once for the latest state; events that arrive meanwhile are
+        answered immediately with status 'coalesced'. The caller is blocked for
+        the window, so the webhook handler itself calls process_order instead.
+        
+        Args:
+            sales_order_id: InFlow sales order ID
+            event_type: Webhook event type
+            handoff: Re-submits the event once the leader has used up
+                COALESCE_MAX_WAIT_SECONDS (see EventCoalescer.submit)
+        
+        Returns:
+            Pipeline summary, or a 'coalesced' marker for folded events
+        """
+        if not event_coalescer:
+            return self.process_order(sales_order_id, event_type)
+        
+        outcome = event_coalescer.submit(
+            sales_order_id,
+            lambda: self.process_order(sales_order_id, event_type),
+            handoff
+        )
+        
+        if not outcome.leader:
+            logger.info("Coalesced %s for order %s into pending run", event_type, sales_order_id)
+            return {'status': 'coalesced', 'order_id': sales_order_id}
+        
+        return outcome.result
+    
+    def process_order(self, sales_order_id: str, event_type: str = 'unknown') -> Dict[str, Any]:
+        """
+        Fetch, validate, log and notify for one sales order.
+
+        Runs under the order's lock so a concurrent event for the same order
+        waits and then fetches the state this run left behind, instead of
+        interleaving error tracking and sending a second notification. The
+        whole run (lock wait included) shares REQUEST_DEADLINE_SECONDS.
+        
+        Args:
+            sales_order_id: InFlow sales order ID
+            event_type: Webhook event type that triggered processing (for logging)
+
+        Returns:
+            Summary dictionary suitable for the webhook response body
+        
+        Raises:
+            OrderLockTimeout: If another run held the order's lock too long
+        """
+        with deadline_scope(config.REQUEST_DEADLINE_SECONDS), lock_order(sales_order_id):
+            return self._run_pipeline(sales_order_id, event_type)
+    
+    def _run_pipeline(self, sales_order_id: str, event_type: str) -> Dict[str, Any]:
+        """
+        Pipeline body of process_order (caller holds the order lock).
+        """
+        stages = {}
+        
+        # Fetch full order data from InFlow API
+        logger.debug("Fetching order data for: %s (event: %s)", sales_order_id, event_type)
+        with timing_service.stage('fetch', stages):
+            order_data = inflow_client.get_sales_order_when_ready(sales_order_id)
+
+        # Extract order number for logging
+        order_number = order_data.get('orderNumber', 'N/A')
+
+        # Run validation
+        logger.debug("Running validation for order: %s (%s)", sales_order_id, order_number)
+        validation_result = schedule_validation(order_data, classify_order(order_data, event_type))
+        stages = timing_service.merge_stages(validation_result, stages)
+
+        # Log validation results (logs all statuses including pending and resolved)
+        with timing_service.stage('log', stages):
+            logger_service.log_validation_result(validation_result, order_data)
+        logger.info("Order validated", extra={
+            'order_id': sales_order_id,
+            'order_number': order_number,
+            'event_type': event_type,
+            'validation_status': validation_result['status'],
+            'issues_count': len(validation_result['issues']),
+            'cached_rules': len(validation_result.get('cached_rules', [])),
+            'skipped_rules': len(validation_result.get('skipped_rules', [])),
+            'timed_out_rules': len(validation_result.get('timed_out_rules', []))
+        })
+
+        # Send notification only for confirmed errors (failed) or warnings
+        # Do NOT send for 'pending' status (grace period)
+        if validation_result['status'] in ['warning', 'failed']:
+            confirmed_count = validation_result.get('confirmed_count', 0)
+            logger.info("Sending notification for order: %s (%s) - Confirmed errors: %d",
+                        sales_order_id, order_number, confirmed_count)
+            with timing_service.stage('notify', stages):
+                notification_service.send_validation_failure_notification(
+                    validation_result,
+                    order_data
+                )
+        elif validation_result['status'] == 'pending':
+            pending_count = validation_result.get('pending_count', 0)
+            logger.info("Order %s has %d pending error(s) in 30-minute grace period - no notification sent yet",
+                        order_number, pending_count)
+
+        return {
+            'status': 'processed',
+            'order_id': sales_order_id,
+            'order_number': order_number,
+            'validation_status': validation_result['status'],
+            'issues_count': len(validation_result['issues']),
+            'confirmed_count': validation_result.get('confirmed_count', 0),
+            'pending_count': validation_result.get('pending_count', 0),
+            'resolved_count': len(validation_result.get('resolved_issues', [])),
+            'timings_ms': stages
+        }
+
+
+# Create a singleton instance
+order_processing_service = OrderProcessingService()
@@ -0,0 +1,467 @@
+"""
+Local mirror of the InFlow product catalog.
+
+AssemblyFeeValidator needs each line's product category, which used to come
+from a hand-maintained CSV that drifts from InFlow, and fetching products one
+by one would cost an API call per line. Instead the whole catalog is paged
+into a SQLite file (a full sync), then kept current by asking only for
+products modified since the last sync (incremental syncs). A full sync is
+repeated periodically to drop products deleted in InFlow.
+
+Lookups never touch SQLite or the API: the name -> category index is held in
+a dictionary rebuilt after every sync. Full syncs record their position, so
+on Lambda - where each container has its own /tmp - a page budget per
+invocation fills a cold mirror over a few invocations while validators fall
+back to the CSV.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable, Dict, Any, Optional, List
+
+from app.config import config
+from app.clients.inflow_client import inflow_client
+from app.utils.log import get_logger
+
+logger = get_logger(__name__)
+
+
+# Relationships fetched with each product page
+PRODUCT_INCLUDE = 'category'
+
+# Sync modes
+SYNC_FULL = 'full'
+SYNC_INCREMENTAL = 'incremental'
+
+# Incremental cursor set by a full sync is rewound by this much to cover
+# products modified while the full sync was paging and clock skew with InFlow
+CURSOR_OVERLAP = timedelta(minutes=10)
+
+
+def _name_key(name: str) -> str:
+    """
+    Normalize a product name for lookups.
+    """
+    return name.strip().upper()
+
+
+def _parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    """
+    Parse an InFlow ISO 8601 timestamp (None if missing or invalid).
+    """
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _format_timestamp(value: datetime) -> str:
+    return value.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+class ProductCatalogService:
+    """
+    SQLite-backed product mirror with an in-memory category index.
+    """
+    
+    def __init__(self, client, db_path: str, page_size: int = 100, sync_interval_minutes: float = 15,
+                 full_sync_hours: float = 24):
+        """
+        Initialize the mirror (loads the index from an existing database file).
+        
+        Args:
+            client: InFlowClient (anything with list_products)
+            db_path: Path to the SQLite database file
+            page_size: Products per API request
+            sync_interval_minutes: Age after which the mirror is synced again
+            full_sync_hours: Age after which a full sync replaces incremental ones
+        """
+        self.client = client
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.page_size = page_size
+        self.sync_interval_seconds = sync_interval_minutes * 60
+        self.full_sync_seconds = full_sync_hours * 3600
+        
+        self._categories: Dict[str, str] = {}
+        self._sync_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.stats = {
+            'full_syncs': 0,
+            'incremental_syncs': 0,
+            'products_synced': 0,
+            'errors': 0,
+            'lookups': 0,
+            'hits': 0
+        }
+        self.last_sync: Optional[Dict[str, Any]] = None
+        
+        self.running = False
+        self.sync_thread = None
+        self._stop_event = threading.Event()
+        
+        self._ensure_schema()
+        self._load_index()
+    
+    def _connect(self) -> sqlite3.Connection:
+        """
+        Open a new connection (one per call keeps the service thread-safe).
+        """
+        conn = sqlite3.connect(str(self.db_path), timeout=30, isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')
+        return conn
+    
+    def _ensure_schema(self) -> None:
+        """
+        Create the product and sync state tables if they do not exist.
+        """
+        conn = self._connect()
+        try:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS products (
+                    product_id TEXT PRIMARY KEY,
+                    name TEXT NOT NULL,
+                    name_key TEXT NOT NULL,
+                    sku TEXT,
+                    category TEXT,
+                    is_active INTEGER,
+                    last_modified TEXT,
+                    synced_at REAL NOT NULL
+                )
+                """
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_products_name_key ON products (name_key)')
+            conn.execute('CREATE TABLE IF NOT EXISTS sync_state (key TEXT PRIMARY KEY, value TEXT)')
+        finally:
+            conn.close()
+    
+    def _get_state(self, conn: sqlite3.Connection) -> Dict[str, str]:
+        return dict(conn.execute('SELECT key, value FROM sync_state').fetchall())
+    
+    def _set_state(self, conn: sqlite3.Connection, **values: Optional[Any]) -> None:
+        for key, value in values.items():
+            if value is None:
+                conn.execute('DELETE FROM sync_state WHERE key = ?', (key,))
+            else:
+                conn.execute('INSERT OR REPLACE INTO sync_state (key, value) VALUES (?, ?)', (key, str(value)))
+    
+    def _load_index(self) -> None:
+        """
+        Rebuild the in-memory name -> category index from the database.
+        """
+        conn = self._connect()
+        try:
+            rows = conn.execute('SELECT name_key, category FROM products WHERE category IS NOT NULL').fetchall()
+        finally:
+            conn.close()
+        # Swap in a new dict so concurrent lookups never see a partial index
+        self._categories = dict(rows)
+    
+    def get_category(self, product_name: str) -> Optional[str]:
+        """
+        Look up a product's category by name (case-insensitive).
+        
+        Args:
+            product_name: Product name as shown on the order line
+        
+        Returns:
+            Category name, or None if the product is not in the mirror
+        """
+        category = self._categories.get(_name_key(product_name)) if product_name else None
+        with self._stats_lock:
+            self.stats['lookups'] += 1
+            if category is not None:
+                self.stats['hits'] += 1
+        return category
+    
+    def sync_if_due(self, max_pages: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        Sync if the mirror is incomplete or older than the sync interval.
+        
+        Args:
+            max_pages: Page budget for this call (None = until done)
+        
+        Returns:
+            Sync summary, or None if no sync was due or another sync is running
+        """
+        conn = self._connect()
+        try:
+            state = self._get_state(conn)
+        finally:
+            conn.close()
+        
+        last_sync = max(float(state.get('last_full_sync', 0)), float(state.get('last_incremental_sync', 0)))
+        if 'full_sync_skip' not in state and time.time() - last_sync < self.sync_interval_seconds:
+            return None
+        return self.sync(max_pages=max_pages)
+    
+    def sync(self, full: bool = False, max_pages: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        Sync the mirror with InFlow.
+        
+        A full sync runs when requested, when none has completed yet, when one
+        was left unfinished or when the last one is older than full_sync_hours;
+        otherwise only products modified since the last sync are fetched.
+        
+        Args:
+            full: Force a full sync
+            max_pages: Page budget for this call (None = until done); an
+                       unfinished full sync resumes on the next call
+        
+        Returns:
+            Sync summary (mode, pages, products, seconds, products_per_second,
+            complete), or None if another sync is already running
+        """
+        if not self._sync_lock.acquire(blocking=False):
+            return None
+        started = time.monotonic()
+        try:
+            conn = self._connect()
+            try:
+                state = self._get_state(conn)
+                last_full_sync = float(state.get('last_full_sync', 0))
+                if (full or 'full_sync_skip' in state or 'cursor' not in state
+                        or time.time() - last_full_sync >= self.full_sync_seconds):
+                    summary = self._full_sync(conn, state, max_pages)
+                else:
+                    summary = self._incremental_sync(conn, state, max_pages)
+            finally:
+                conn.close()
+        except Exception as e:
+            logger.warning("Product catalog sync failed: %s", e)
+            with self._stats_lock:
+                self.stats['errors'] += 1
+            raise
+        finally:
+            self._sync_lock.release()
+        
+        seconds = time.monotonic() - started
+        summary['seconds'] = round(seconds, 3)
+        summary['products_per_second'] = round(summary['products'] / seconds, 1) if seconds > 0 else None
+        summary['finished_at'] = datetime.now(timezone.utc).isoformat()
+        
+        self._load_index()
+        with self._stats_lock:
+            self.stats['products_synced'] += summary['products']
+            if summary['complete']:
+                self.stats['full_syncs' if summary['mode'] == SYNC_FULL else 'incremental_syncs'] += 1
+            self.last_sync = summary
+        logger.info(
+            "Product catalog %s sync: %d products in %d pages, %.1fs%s",
+            summary['mode'], summary['products'], summary['pages'], seconds,
+            '' if summary['complete'] else ' (will resume)'
+        )
+        return summary
+    
+    def _full_sync(self, conn: sqlite3.Connection, state: Dict[str, str],
+                   max_pages: Optional[int]) -> Dict[str, Any]:
+        """
+        Page through every product, resuming an unfinished full sync.
+        
+        Rows not seen since the full sync started are deleted when it completes.
+        """
+        skip = int(state.get('full_sync_skip', 0))
+        full_sync_started = float(state.get('full_sync_started', time.time()))
+        
+        def save_position(position: int) -> None:
+            self._set_state(conn, full_sync_skip=position, full_sync_started=full_sync_started)
+        
+        pages, products, complete, _ = self._fetch_pages(conn, None, skip, max_pages, save_position)
+        summary = {'mode': SYNC_FULL, 'pages': pages, 'products': products, 'complete': complete}
+        if not complete:
+            return summary
+        
+        cursor = datetime.fromtimestamp(full_sync_started, timezone.utc) - CURSOR_OVERLAP
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            summary['removed'] = conn.execute(
+                'DELETE FROM products WHERE synced_at < ?', (full_sync_started,)
+            ).rowcount
+            self._set_state(conn, full_sync_skip=None, full_sync_started=None,
+                            cursor=_format_timestamp(cursor), last_full_sync=time.time())
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return summary
+    
+    def _incremental_sync(self, conn: sqlite3.Connection, state: Dict[str, str],
+                          max_pages: Optional[int]) -> Dict[str, Any]:
+        """
+        Fetch products modified since the cursor and advance it.
+        """
+        filters = {'lastModifiedDateTime': {'fromDate': state['cursor']}}
+        pages, products, complete, newest = self._fetch_pages(conn, filters, 0, max_pages)
+        
+        # Pages are not ordered by modification time, so the cursor only moves
+        # once every modified product has been stored
+        if complete:
+            self._set_state(conn, last_incremental_sync=time.time())
+            if newest:
+                self._set_state(conn, cursor=_format_timestamp(newest))
+        return {'mode': SYNC_INCREMENTAL, 'pages': pages, 'products': products, 'complete': complete}
+    
+    def _fetch_pages(self, conn: sqlite3.Connection, filters: Optional[Dict[str, Any]], skip: int,
+                     max_pages: Optional[int], on_page: Optional[Callable[[int], None]] = None):
+        """
+        Fetch and store product pages until a short page or the page budget.
+        
+        Returns:
+            Tuple of (pages, products, complete, newest last-modified timestamp)
+        """
+        pages = products = 0
+        newest = None
+        while max_pages is None or pages < max_pages:
+            page = self.client.list_products(filters=filters, include=PRODUCT_INCLUDE,
+                                             count=self.page_size, skip=skip) or []
+            self._store(conn, page)
+            pages += 1
+            products += len(page)
+            skip += len(page)
+            for product in page:
+                modified = _parse_timestamp(product.get('lastModifiedDateTime'))
+                if modified and (newest is None or modified > newest):
+                    newest = modified
+            if len(page) < self.page_size:
+                return pages, products, True, newest
+            if on_page:
+                on_page(skip)
+        return pages, products, False, newest
+    
+    def _store(self, conn: sqlite3.Connection, products: List[Dict[Any, Any]]) -> None:
+        """
+        Upsert one page of products.
+        """
+        now = time.time()
+        rows = []
+        for product in products:
+            if not product.get('productId') or not product.get('name'):
+                continue
+            category = product.get('category')
+            rows.append((
+                product['productId'],
+                product['name'],
+                _name_key(product['name']),
+                product.get('sku'),
+                category.get('name') if isinstance(category, dict) else None,
+                1 if product.get('isActive', True) else 0,
+                product.get('lastModifiedDateTime'),
+                now
+            ))
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.executemany(
+                'INSERT OR REPLACE INTO products '
+                '(product_id, name, name_key, sku, category, is_active, last_modified, synced_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                rows
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+    
+    def start(self):
+        """
+        Start the background sync thread (long-running servers; Lambda uses sync_if_due).
+        """
+        if self.running:
+            return
+        self.running = True
+        self._stop_event.clear()
+        self.sync_thread = threading.Thread(target=self._sync_loop, daemon=True)
+        self.sync_thread.start()
+        logger.info("Product catalog sync started - every %.0f minutes", self.sync_interval_seconds / 60)
+    
+    def stop(self):
+        """
+        Stop the background sync thread.
+        """
+        self.running = False
+        self._stop_event.set()
+        if self.sync_thread:
+            self.sync_thread.join(timeout=5)
+    
+    def _sync_loop(self):
+        """
+        Sync whenever due until stopped.
+        """
+        while self.running:
+            try:
+                self.sync_if_due()
+            except Exception:
+                # Already logged and counted by sync(); try again next interval
+                pass
+            self._stop_event.wait(min(self.sync_interval_seconds, 60))
+    
+    def get_status(self) -> Dict[str, Any]:
+        """
+        Get mirror size, freshness and sync throughput.
+        
+        Returns:
+            Dictionary with product count, last full/incremental sync times,
+            staleness (seconds since the last completed sync), the last sync
+            summary and counters
+        """
+        conn = self._connect()
+        try:
+            state = self._get_state(conn)
+            products = conn.execute('SELECT COUNT(*) FROM products').fetchone()[0]
+        finally:
+            conn.close()
+        
+        last_full_sync = float(state.get('last_full_sync', 0)) or None
+        last_incremental_sync = float(state.get('last_incremental_sync', 0)) or None
+        last_synced = max(last_full_sync or 0, last_incremental_sync or 0)
+        
+        def iso(value):
+            return datetime.fromtimestamp(value, timezone.utc).isoformat() if value else None
+        
+        with self._stats_lock:
+            status = {
+                'products': products,
+                'indexed': len(self._categories),
+                'last_full_sync': iso(last_full_sync),
+                'last_incremental_sync': iso(last_incremental_sync),
+                'staleness_seconds': round(time.time() - last_synced, 1) if last_synced else None,
+                'full_sync_in_progress': 'full_sync_skip' in state,
+                'cursor': state.get('cursor'),
+                'last_sync': self.last_sync,
+                'sync_thread_alive': self.sync_thread.is_alive() if self.sync_thread else False,
+                **self.stats
+            }
+        return status
+
+
+def _create_service() -> ProductCatalogService:
+    """
+    Create the product catalog mirror from configuration.
+    """
+    # Use LOGS_DIR environment variable if set (for Lambda)
+    db_path = config.PRODUCT_CATALOG_DB_PATH or os.path.join(os.environ.get('LOGS_DIR', 'logs'), 'product_catalog.db')
+    return ProductCatalogService(
+        client=inflow_client,
+        db_path=db_path,
+        page_size=config.PRODUCT_CATALOG_PAGE_SIZE,
+        sync_interval_minutes=config.PRODUCT_CATALOG_SYNC_INTERVAL_MINUTES,
+        full_sync_hours=config.PRODUCT_CATALOG_FULL_SYNC_HOURS
+    )
+
+
+# Create a singleton instance
+if not config.PRODUCT_CATALOG_ENABLED:
+    product_catalog_service = None
+else:
+    try:
+        product_catalog_service = _create_service()
+    except Exception as e:
+        logger.warning("Could not initialize product catalog mirror: %s", e)
+        product_catalog_service = None
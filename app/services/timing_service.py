@@ -0,0 +1,165 @@
+"""
+Where validation time goes: rolling latency per pipeline stage and per rule.
+
+Stages are the steps of the webhook pipeline (fetch, validate, error_tracking,
+log, notify); rules are the individual validators. Both keep call counts and
+p50/p95/p99 over the last TIMING_WINDOW samples, reported by
+GET /monitor/timings, and every validation report carries its own numbers.
+
+With PROFILE_MEMORY_EVERY=N, every Nth validation runs its rules one at a
+time under tracemalloc and records each rule's peak allocation. tracemalloc
+traces the whole process while a sample runs, so the peaks are approximate
+(allocations of concurrent work are included) and the sampled validation is
+slower; only one validation is sampled at a time.
+"""
+
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+from app.config import config
+from app.utils.metrics import RollingStats
+
+
+class TimingService:
+    """
+    Rolling per-stage and per-rule timings (thread-safe).
+    """
+    
+    def __init__(self, window: int = 1000, memory_sample_every: int = 0):
+        """
+        Initialize the timing service.
+        
+        Args:
+            window: Samples kept per stage/rule for percentiles
+            memory_sample_every: Profile memory of every Nth validation (0 disables)
+        """
+        self.window = window
+        self.memory_sample_every = memory_sample_every
+        self._lock = threading.Lock()
+        self._stages: Dict[str, RollingStats] = {}
+        self._rules: Dict[str, RollingStats] = {}
+        self._rule_peaks: Dict[str, RollingStats] = {}
+        self._validations = 0
+        self._sampling = threading.Lock()
+    
+    def record_stage(self, name: str, elapsed_ms: float) -> None:
+        """
+        Record one run of a pipeline stage.
+        """
+        self._stats(self._stages, name).add(elapsed_ms)
+    
+    def record_rule(self, name: str, elapsed_ms: float, peak_kb: Optional[float] = None) -> None:
+        """
+        Record one validate() call of a rule (and its peak allocation when sampled).
+        """
+        self._stats(self._rules, name).add(elapsed_ms)
+        if peak_kb is not None:
+            self._stats(self._rule_peaks, name).add(peak_kb)
+    
+    @contextmanager
+    def stage(self, name: str, timings: Optional[Dict[str, float]] = None) -> Iterator[None]:
+        """
+        Time a block as a pipeline stage.
+        
+        Args:
+            name: Stage name (e.g. 'fetch')
+            timings: Per-run dictionary that also receives the elapsed ms
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self.record_stage(name, elapsed_ms)
+            if timings is not None:
+                timings[name] = round(elapsed_ms, 2)
+    
+    def merge_stages(self, validation_result: Dict[str, Any], stages: Dict[str, float]) -> Dict[str, float]:
+        """
+        Put pipeline stage timings (e.g. fetch) ahead of the validation's own in its report.
+        
+        Args:
+            validation_result: Validation report
+            stages: Stage timings measured before validation
+        
+        Returns:
+            The report's stage dictionary, for timing the stages that follow
+        """
+        timings = validation_result.setdefault('timings', {})
+        timings['stages'] = {**stages, **timings.get('stages', {})}
+        return timings['stages']
+    
+    @contextmanager
+    def memory_sample(self) -> Iterator[bool]:
+        """
+        Decide whether this validation profiles memory, and trace it if so.
+        
+        Yields:
+            True while tracemalloc is tracing this validation
+        """
+        with self._lock:
+            self._validations += 1
+            due = self.memory_sample_every > 0 and self._validations % self.memory_sample_every == 0
+        if not due or not self._sampling.acquire(blocking=False):
+            yield False
+            return
+        
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        try:
+            yield True
+        finally:
+            if started_tracing:
+                tracemalloc.stop()
+            self._sampling.release()
+    
+    def call_traced(self, fn: Callable[[], Any]) -> Tuple[Any, float]:
+        """
+        Call fn inside a memory sample and measure its peak allocation.
+        
+        Returns:
+            Tuple of (fn's return value, peak KiB allocated above the starting level)
+        """
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        value = fn()
+        peak = tracemalloc.get_traced_memory()[1]
+        return value, round(max(peak - baseline, 0) / 1024, 1)
+    
+    def get_status(self) -> Dict[str, Any]:
+        """
+        Get timing histograms.
+        
+        Returns:
+            Dictionary with per-stage and per-rule call counts and ms percentiles,
+            and per-rule peak KiB from memory samples
+        """
+        with self._lock:
+            stages = dict(self._stages)
+            rules = dict(self._rules)
+            peaks = dict(self._rule_peaks)
+        return {
+            'window': self.window,
+            'memory_sample_every': self.memory_sample_every,
+            'stages_ms': {name: stats.snapshot() for name, stats in stages.items()},
+            'rules_ms': {name: stats.snapshot() for name, stats in rules.items()},
+            'rules_peak_kb': {name: stats.snapshot() for name, stats in peaks.items()}
+        }
+    
+    def _stats(self, table: Dict[str, RollingStats], name: str) -> RollingStats:
+        with self._lock:
+            stats = table.get(name)
+            if stats is None:
+                stats = table[name] = RollingStats(self.window)
+            return stats
+
+
+# Create a singleton instance
+timing_service = TimingService(
+    window=config.TIMING_WINDOW,
+    memory_sample_every=config.PROFILE_MEMORY_EVERY
+)
@@ -0,0 +1,132 @@
+"""
+Order-content fingerprint cache for validator results.
+
+Many SalesOrderUpdated events only touch fields no validator reads (pick,
+pack and ship lines, assignment, ...). Each validator declares the order
+fields it depends on; the fingerprint is a hash of just those fields. When an
+order's fingerprint matches the last validated state, the cached validator
+results are reused and only error tracking re-runs.
+"""
+
+import copy
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Iterable
+
+
+def _extract(value: Any, parts: List[str]) -> Any:
+    """
+    Follow a split dotted path through nested dicts/lists.
+    A part ending in '[]' maps the rest of the path over a list.
+    """
+    if not parts:
+        return value
+    head, rest = parts[0], parts[1:]
+    if head.endswith('[]'):
+        items = value.get(head[:-2]) if isinstance(value, dict) else None
+        if not isinstance(items, list):
+            return None
+        return [_extract(item, rest) for item in items]
+    return _extract(value.get(head) if isinstance(value, dict) else None, rest)
+
+
+def compute_order_fingerprint(order_data: Dict[Any, Any], fields: Iterable[str],
+                              salt: str = '') -> str:
+    """
+    Compute a canonical fingerprint of the given order fields.
+    
+    Args:
+        order_data: Sales order data from InFlow
+        fields: Dotted field paths, e.g. 'customFields' or 'lines[].discount'
+        salt: Extra input mixed into the hash (e.g. the set of cached rules)
+    
+    Returns:
+        Hex SHA-256 digest
+    """
+    projection = {path: _extract(order_data, path.split('.')) for path in sorted(set(fields))}
+    canonical = json.dumps(projection, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(f"{salt}|{canonical}".encode('utf-8')).hexdigest()
+
+
+class ValidationResultCache:
+    """
+    Bounded LRU cache of validator results, keyed by order ID.
+    Only the last validated fingerprint is kept per order.
+    """
+    
+    def __init__(self, max_entries: int = 1000):
+        """
+        Initialize the cache.
+        
+        Args:
+            max_entries: Orders kept before the least recently used are evicted
+        """
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[str, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def get(self, order_id: str, fingerprint: str) -> Optional[Dict[str, Dict[str, Any]]]:
+        """
+        Get cached validator results if the order content is unchanged.
+        
+        Args:
+            order_id: Sales order ID
+            fingerprint: Current order fingerprint
+        
+        Returns:
+            Dictionary of result dicts by rule name, or None on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(order_id)
+            if entry is None or entry[0] != fingerprint:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(order_id)
+            self.hits += 1
+            return copy.deepcopy(entry[1])
+    
+    def put(self, order_id: str, fingerprint: str, results: Dict[str, Dict[str, Any]]) -> None:
+        """
+        Store validator results for the order's current fingerprint.
+        
+        Args:
+            order_id: Sales order ID
+            fingerprint: Order fingerprint the results were computed for
+            results: Dictionary of result dicts by rule name
+        """
+        with self._lock:
+            self._entries[order_id] = (fingerprint, copy.deepcopy(results))
+            self._entries.move_to_end(order_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def invalidate(self, order_id: str) -> None:
+        """
+        Drop the cached results for an order.
+        """
+        with self._lock:
+            self._entries.pop(order_id, None)
+    
+    def get_status(self) -> Dict[str, Any]:
+        """
+        Get cache counters.
+        
+        Returns:
+            Dictionary with size, hits, misses and evictions
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0
+            }
@@ -0,0 +1,252 @@
+"""
+Priority scheduling for validation work.
+
+Validation runs in a fixed number of slots. When every slot is busy, waiting
+work is granted slots by weighted fair (stride) scheduling across priority
+classes: a class with weight 6 is served six times as often as one with
+weight 1 while both have work queued, so a bulk quote import cannot hold up a
+just-placed order, yet low classes always keep a share and never starve.
+
+Classes (highest weight first by default):
+    manual       - GET /validate/<order_id> (someone is waiting on the response)
+    new_order    - SalesOrderCreated event for an order (not a quote)
+    paid_order   - update to an order that is Paid or Partial (about to ship)
+    order_update - any other order update
+    quote        - quotes
+    batch        - POST /validate/batch and other bulk audits
+"""
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Any, Iterator, Optional
+
+from app.config import config
+from app.services.order_lock_service import lock_order
+from app.services.validation_service import validation_service
+from app.utils.metrics import RollingStats
+from app.utils.resilience import DeadlineExceeded, current_deadline
+
+
+PRIORITY_MANUAL = 'manual'
+PRIORITY_NEW_ORDER = 'new_order'
+PRIORITY_PAID_ORDER = 'paid_order'
+PRIORITY_ORDER_UPDATE = 'order_update'
+PRIORITY_QUOTE = 'quote'
+PRIORITY_BATCH = 'batch'
+
+DEFAULT_WEIGHTS = {
+    PRIORITY_MANUAL: 8,
+    PRIORITY_NEW_ORDER: 6,
+    PRIORITY_PAID_ORDER: 4,
+    PRIORITY_ORDER_UPDATE: 2,
+    PRIORITY_QUOTE: 1,
+    PRIORITY_BATCH: 1
+}
+
+# InFlow paymentStatus values for orders that have (at least partly) been paid
+PAID_STATUSES = {'paid', 'partial'}
+
+
+def classify_order(order_data: Dict[Any, Any], event_type: Optional[str] = None) -> str:
+    """
+    Pick the priority class for a webhook event from the event type and order data.
+    
+    Args:
+        order_data: Complete sales order data from InFlow
+        event_type: Webhook event type (e.g. 'SalesOrderCreatedV1')
+    
+    Returns:
+        Priority class name
+    """
+    payment_status = str(order_data.get('paymentStatus') or '').lower()
+    if order_data.get('isQuote') or payment_status == 'quote':
+        return PRIORITY_QUOTE
+    if event_type and 'created' in event_type.lower():
+        return PRIORITY_NEW_ORDER
+    if payment_status in PAID_STATUSES:
+        return PRIORITY_PAID_ORDER
+    return PRIORITY_ORDER_UPDATE
+
+
+def parse_weights(spec: str) -> Dict[str, int]:
+    """
+    Parse a weight override such as 'quote=2,batch=1'.
+    
+    Args:
+        spec: Comma-separated class=weight pairs (empty for none)
+    
+    Returns:
+        Dictionary of class name to weight
+    """
+    weights = {}
+    for pair in spec.split(','):
+        if not pair.strip():
+            continue
+        name, _, value = pair.partition('=')
+        weights[name.strip()] = max(1, int(value))
+    return weights
+
+
+class _Waiter:
+    __slots__ = ('granted',)
+    
+    def __init__(self):
+        self.granted = False
+
+
+class PriorityScheduler:
+    """
+    Weighted fair scheduler with a fixed number of slots.
+    """
+    
+    def __init__(self, max_concurrent: int = 4, weights: Optional[Dict[str, int]] = None):
+        """
+        Initialize the scheduler.
+        
+        Args:
+            max_concurrent: Validations allowed to run at the same time
+            weights: Per-class weight overrides (merged over DEFAULT_WEIGHTS)
+        """
+        self.max_concurrent = max(1, max_concurrent)
+        self.weights = dict(DEFAULT_WEIGHTS)
+        self.weights.update(weights or {})
+        
+        self._cond = threading.Condition()
+        self._running = 0
+        self._queues = {name: deque() for name in self.weights}
+        # Stride scheduling: each grant advances the class's pass by 1/weight and
+        # the class with the lowest pass is served next
+        self._pass = {name: 0.0 for name in self.weights}
+        self._virtual_time = 0.0
+        
+        self._completed = {name: 0 for name in self.weights}
+        self._timed_out = {name: 0 for name in self.weights}
+        self._wait_ms = {name: RollingStats() for name in self.weights}
+        self._run_ms = {name: RollingStats() for name in self.weights}
+    
+    @contextmanager
+    def slot(self, priority_class: str) -> Iterator[None]:
+        """
+        Hold a validation slot for the duration of the with-block.
+        
+        Args:
+            priority_class: Priority class name (unknown names count as order_update)
+        
+        Raises:
+            DeadlineExceeded: If the request deadline passes while queued
+        """
+        if priority_class not in self.weights:
+            priority_class = PRIORITY_ORDER_UPDATE
+        
+        deadline = current_deadline()
+        queued_at = time.monotonic()
+        with self._cond:
+            if self._running < self.max_concurrent and not any(self._queues.values()):
+                self._grant(priority_class)
+            else:
+                waiter = _Waiter()
+                self._queues[priority_class].append(waiter)
+                while not waiter.granted:
+                    if deadline is not None and deadline.remaining() <= 0:
+                        self._queues[priority_class].remove(waiter)
+                        self._timed_out[priority_class] += 1
+                        raise DeadlineExceeded(f"Request deadline passed while queued for a {priority_class} slot")
+                    self._cond.wait(deadline.remaining() if deadline is not None else None)
+        
+        started = time.monotonic()
+        self._wait_ms[priority_class].add((started - queued_at) * 1000)
+        try:
+            yield
+        finally:
+            self._run_ms[priority_class].add((time.monotonic() - started) * 1000)
+            with self._cond:
+                self._running -= 1
+                self._completed[priority_class] += 1
+                self._dispatch()
+    
+    def _grant(self, priority_class: str) -> None:
+        """
+        Account a slot to a class (caller holds the condition).
+        """
+        # A class that was idle starts from the current virtual time, so it
+        # cannot bank credit while it had nothing queued
+        start = max(self._pass[priority_class], self._virtual_time)
+        self._virtual_time = start
+        self._pass[priority_class] = start + 1.0 / self.weights[priority_class]
+        self._running += 1
+    
+    def _dispatch(self) -> None:
+        """
+        Hand free slots to waiting work, lowest pass first (caller holds the condition).
+        """
+        granted = False
+        while self._running < self.max_concurrent:
+            ready = [name for name, queue in self._queues.items() if queue]
+            if not ready:
+                break
+            name = min(ready, key=lambda n: (max(self._pass[n], self._virtual_time), -self.weights[n]))
+            self._queues[name].popleft().granted = True
+            self._grant(name)
+            granted = True
+        if granted:
+            self._cond.notify_all()
+    
+    def get_status(self) -> Dict[str, Any]:
+        """
+        Get slot usage and per-class latency for /monitor/status.
+        
+        Returns:
+            Dictionary with running count and, per class, weight, queue depth,
+            completed and timed-out counts and queue wait / run time stats (ms)
+        """
+        with self._cond:
+            status = {
+                'max_concurrent': self.max_concurrent,
+                'running': self._running,
+                'classes': {
+                    name: {
+                        'weight': self.weights[name],
+                        'queued': len(self._queues[name]),
+                        'completed': self._completed[name],
+                        'timed_out': self._timed_out[name]
+                    }
+                    for name in self.weights
+                }
+            }
+        for name, class_status in status['classes'].items():
+            class_status['wait_ms'] = self._wait_ms[name].snapshot()
+            class_status['run_ms'] = self._run_ms[name].snapshot()
+        return status
+
+
+def schedule_validation(order_data: Dict[Any, Any], priority_class: str) -> Dict[Any, Any]:
+    """
+    Run validation_service.validate_order in a scheduler slot.
+    
+    The order lock is taken before the slot, so work holding a slot never
+    waits on an order lock held by work still queued for a slot.
+    
+    Args:
+        order_data: Complete sales order data from InFlow
+        priority_class: Priority class name (see classify_order)
+    
+    Returns:
+        Validation report from validate_order()
+    """
+    if validation_scheduler is None:
+        return validation_service.validate_order(order_data)
+    
+    with lock_order(order_data.get('salesOrderId', 'unknown')):
+        with validation_scheduler.slot(priority_class):
+            return validation_service.validate_order(order_data)
+
+
+# Create a singleton instance (None when disabled)
+validation_scheduler = None
+if config.VALIDATION_SCHEDULER_SLOTS > 0:
+    validation_scheduler = PriorityScheduler(
+        max_concurrent=config.VALIDATION_SCHEDULER_SLOTS,
+        weights=parse_weights(config.VALIDATION_SCHEDULER_WEIGHTS)
+    )
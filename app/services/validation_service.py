@@ -1,15 +1,60 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, Callable, List, Optional
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from datetime import datetime
-from app.validators.base import BaseValidator, ValidationResult
+from app.validators.base import (
+    BaseValidator, ValidationContext, ValidationResult, ORDER_FETCHER_RULE, resolve_dispatch
+)
+from app.validators.order_summary import OrderSummary
+from app.validators.plugins import load_validator, entry_point_validators
+from app.clients.inflow_client import inflow_client
+from app.services.validation_cache import ValidationResultCache, compute_order_fingerprint
+from app.services.order_lock_service import lock_order
+from app.services.timing_service import timing_service
+from app.config import config
+from app.utils.log import get_logger
+from app.utils.resilience import Deadline, DeadlineExceeded, current_deadline, deadline_scope
+import logging
 import os
+import threading
+import time
+
+logger = get_logger(__name__)
+
+# Per-rule counter for each RuleOutcome source
+_OUTCOME_COUNTERS = {'run': 'runs', 'skipped': 'skipped', 'cached': 'cached', 'timed_out': 'timed_out'}
 
 # Use DynamoDB tracker if running in Lambda (AWS), otherwise use file-based tracker
 if os.environ.get('AWS_LAMBDA_FUNCTION_NAME'):
     from app.services.dynamodb_error_tracker import dynamodb_error_tracker as error_tracker_service
-    print("Using DynamoDB error tracker (persistent)")
+    logger.info("Using DynamoDB error tracker (persistent)")
 else:
     from app.services.error_tracker_service import error_tracker_service
-    print("Using file-based error tracker (local development)")
+    logger.info("Using file-based error tracker (local development)")
+
+
+class RuleOutcome:
+    """
+    What happened to one rule in a validation run.
+    """
+    
+    __slots__ = ('result', 'error', 'source', 'elapsed_ms', 'peak_kb')
+    
+    def __init__(self, result: Optional[ValidationResult], error: Optional[Exception] = None,
+                 source: str = 'run', elapsed_ms: float = 0.0, peak_kb: Optional[float] = None):
+        """
+        Args:
+            result: Result of the rule (None if it raised)
+            error: Exception the rule raised
+            source: 'run', 'cached' (reused result), 'skipped' (not applicable)
+                or 'timed_out' (out of time - result unknown)
+            elapsed_ms: Time spent in the rule
+            peak_kb: Peak allocation when the run was memory-profiled
+        """
+        self.result = result
+        self.error = error
+        self.source = source
+        self.elapsed_ms = elapsed_ms
+        self.peak_kb = peak_kb
 
 
 class ValidationService:
@@ -22,6 +67,30 @@ class ValidationService:
         Initialize the validation service.
         """
         self.validators: List[BaseValidator] = []
+        
+        # Registered rule names each rule waits for (its depends_on)
+        self.dependencies: Dict[str, List[str]] = {}
+        
+        # How each rule is called (resolved once at registration, see resolve_dispatch)
+        self._dispatch: Dict[str, Callable[[ValidationContext], ValidationResult]] = {}
+        self._plugins_registered = False
+        
+        # Rules whose dependencies have finished run concurrently on this pool
+        # (shared by all validations; None runs them one after another)
+        self.executor = (
+            ThreadPoolExecutor(max_workers=config.VALIDATOR_PARALLELISM, thread_name_prefix='validator')
+            if config.VALIDATOR_PARALLELISM > 1 else None
+        )
+        
+        # Validator results keyed by order fingerprint (0 disables the cache)
+        self.result_cache = (
+            ValidationResultCache(config.VALIDATION_CACHE_SIZE)
+            if config.VALIDATION_CACHE_SIZE > 0 else None
+        )
+        
+        # Per-rule counters: validate() calls, skips (not applicable), cache reuses, errors
+        self._stats_lock = threading.Lock()
+        self._rule_stats: Dict[str, Dict[str, int]] = {}
     
     def register_validator(self, validator: BaseValidator) -> None:
         """
@@ -30,15 +99,46 @@ class ValidationService:
         
         Args:
             validator: Instance of a validator class
+        
+        Raises:
+            ValueError: If the validator's dependencies form a cycle
+            TypeError: If the validator implements neither check() nor validate()
         """
         # Check if this validator class is already registered
         validator_class = type(validator)
         if any(isinstance(v, validator_class) for v in self.validators):
-            print(f"Validator '{validator.rule_name}' already registered - skipping duplicate")
+            logger.info("Validator '%s' already registered - skipping duplicate", validator.rule_name)
             return
         
+        dispatch = resolve_dispatch(validator)
+        self.dependencies = self._resolve_dependencies(self.validators + [validator])
+        self._dispatch[validator.rule_name] = dispatch
         self.validators.append(validator)
-        print(f"Registered validator: {validator.rule_name}")
+        inflow_client.require_includes(validator.rule_name, validator.required_includes)
+        logger.info("Registered validator: %s", validator.rule_name)
+    
+    def register_plugins(self, specs: Optional[List[str]] = None) -> None:
+        """
+        Register validators named by import spec and those installed as entry points.
+        
+        Only the first successful call loads anything.
+        
+        Args:
+            specs: 'package.module:ClassName' specs (defaults to VALIDATOR_PLUGINS)
+        
+        Raises:
+            ValueError, ImportError, TypeError: If a configured spec cannot be loaded
+        """
+        if self._plugins_registered:
+            return  # initialize_validators() runs on every Lambda invocation
+        
+        if specs is None:
+            specs = [spec.strip() for spec in config.VALIDATOR_PLUGINS.split(',') if spec.strip()]
+        for spec in specs:
+            self.register_validator(load_validator(spec))
+        for validator in entry_point_validators():
+            self.register_validator(validator)
+        self._plugins_registered = True
     
     def validate_order(self, order_data: Dict[Any, Any]) -> Dict[Any, Any]:
         """
@@ -63,77 +163,22 @@ class ValidationService:
         order_number = order_data.get('orderNumber', 'N/A')
         timestamp = datetime.now().isoformat()
         
-        all_issues = []
-        all_suggested_fixes = []
-        validator_results = []
-        fetched_data = None
+        stages = {}
         
-        # Run all validators
-        for validator in self.validators:
-            try:
-                # Check if this is the OrderFetcher (Rule 0)
-                # OrderFetcher should always run first and provide data to other validators
-                if validator.rule_name == "Order Data Fetcher":
-                    result = validator.validate(order_data)
-                    # Capture the fetched data for other validators
-                    fetched_data = result.fetched_data if hasattr(result, 'fetched_data') else None
-                else:
-                    # Pass fetched data to other validators
-                    # Check if validator accepts fetched_data parameter
-                    try:
-                        result = validator.validate(order_data, fetched_data=fetched_data)
-                    except TypeError:
-                        # Fallback for validators that don't accept fetched_data yet
-                        result = validator.validate(order_data)
-                
-                validator_results.append(result.to_dict())
-                
-                # Collect issues and fixes
-                all_issues.extend(result.issues)
-                all_suggested_fixes.extend(result.suggested_fixes)
-                
-                # Display validation result with details
-                status_text = 'PASSED' if result.passed else 'FAILED'
-                print(f"\n{'='*60}")
-                print(f"Validator '{validator.rule_name}': {status_text}")
-                print(f"{'='*60}")
-                
-                # Display info messages (e.g., line item details)
-                if hasattr(result, 'info_messages') and result.info_messages:
-                    print(f"\nDetails:")
-                    for info in result.info_messages:
-                        print(f"  - {info}")
-                
-                # Display issues if any
-                if result.issues:
-                    print(f"\nIssues Found ({len(result.issues)}):")
-                    for idx, issue in enumerate(result.issues, 1):
-                        print(f"  {idx}. [{issue['severity'].upper()}] {issue['message']}")
-                
-                # Display suggested fixes if any
-                if result.suggested_fixes:
-                    print(f"\nSuggested Fixes:")
-                    for idx, fix in enumerate(result.suggested_fixes, 1):
-                        print(f"  {idx}. {fix}")
-                
-                print(f"{'='*60}\n")
-            
-            except Exception as e:
-                print(f"Error running validator '{validator.rule_name}': {e}")
-                # Add error as an issue
-                all_issues.append({
-                    'rule': validator.rule_name,
-                    'message': f"Validator error: {str(e)}",
-                    'severity': 'error',
-                    'details': {}
-                })
+        # Run validators (reusing cached results when the order content is unchanged)
+        with timing_service.stage('validate', stages):
+            run = self.run_validators(order_data)
         
         # Process errors through error tracking system
-        tracked_errors = self._process_error_tracking(
-            order_id, 
-            order_number, 
-            all_issues
-        )
+        # (always re-runs so grace periods advance and resolved errors clear;
+        # the order lock keeps concurrent runs for this order from interleaving)
+        with lock_order(order_id), timing_service.stage('error_tracking', stages):
+            tracked_errors = self._process_error_tracking(
+                order_id, 
+                order_number, 
+                run['issues'],
+                unverified_rules=run['timed_out_rules']
+            )
         
         # Determine overall status
         status = self._determine_status(tracked_errors['current_issues'])
@@ -145,17 +190,471 @@ class ValidationService:
             'timestamp': timestamp,
             'status': status,
             'issues': tracked_errors['current_issues'],
-            'suggested_fixes': all_suggested_fixes,
-            'validator_results': validator_results,
+            'suggested_fixes': run['suggested_fixes'],
+            'validator_results': run['validator_results'],
             'resolved_issues': tracked_errors['resolved_issues'],
             'pending_count': tracked_errors['pending_count'],
-            'confirmed_count': tracked_errors['confirmed_count']
+            'confirmed_count': tracked_errors['confirmed_count'],
+            'cached_rules': run['cached_rules'],
+            'skipped_rules': run['skipped_rules'],
+            'timed_out_rules': run['timed_out_rules'],
+            'timings': {'stages': stages, **run['timings']}
         }
         
         return validation_report
     
+    def audit_order(self, order_data: Dict[Any, Any]) -> Dict[Any, Any]:
+        """
+        Validate an order without touching error tracking.
+        
+        Used for historical audits (backfill): there is no grace period for
+        past orders, so every error is reported as confirmed, and nothing is
+        added to the pending-error store (which would trigger notifications).
+        
+        Args:
+            order_data: Complete sales order data from InFlow
+        
+        Returns:
+            Validation report with the same structure as validate_order()
+        """
+        stages = {}
+        with timing_service.stage('validate', stages):
+            run = self.run_validators(order_data)
+        
+        issues = []
+        confirmed_count = 0
+        for issue in run['issues']:
+            if issue.get('severity') == 'error':
+                issue = dict(issue, tracking_status='confirmed', error_age_minutes=0)
+                confirmed_count += 1
+            issues.append(issue)
+        
+        return {
+            'order_id': order_data.get('salesOrderId', 'unknown'),
+            'order_number': order_data.get('orderNumber', 'N/A'),
+            'timestamp': datetime.now().isoformat(),
+            'status': self._determine_status(issues),
+            'issues': issues,
+            'suggested_fixes': run['suggested_fixes'],
+            'validator_results': run['validator_results'],
+            'resolved_issues': [],
+            'pending_count': 0,
+            'confirmed_count': confirmed_count,
+            'cached_rules': run['cached_rules'],
+            'skipped_rules': run['skipped_rules'],
+            'timed_out_rules': run['timed_out_rules'],
+            'timings': {'stages': stages, **run['timings']}
+        }
+    
+    def run_validators(self, order_data: Dict[Any, Any]) -> Dict[str, Any]:
+        """
+        Run all registered validators without touching error tracking.
+        
+        Rules that do not apply to the order (applies_to() on its summary) are
+        skipped. Results of cacheable validators are reused when the order's
+        fingerprint (the fields those validators read) matches the last
+        validated state. Each rule has its own time budget (see _run_graph);
+        rules that exceed it are reported as timed out instead of holding up
+        the rest.
+        
+        Args:
+            order_data: Complete sales order data from InFlow
+        
+        Returns:
+            Dictionary with:
+                - issues: All issues reported by validators
+                - suggested_fixes: All suggested fixes
+                - validator_results: Result dictionaries in registration order
+                - cached_rules: Names of rules whose results came from the cache
+                - skipped_rules: Names of rules that did not apply to the order
+                - timed_out_rules: Names of rules that ran out of time (no result)
+                - timings: ms per rule that ran ('rules') and, when this run
+                  was memory-profiled, peak KiB per rule ('memory_peak_kb')
+        """
+        order_id = order_data.get('salesOrderId', 'unknown')
+        
+        all_issues = []
+        all_suggested_fixes = []
+        validator_results = []
+        cached_rules = []
+        skipped_rules = []
+        timed_out_rules = []
+        
+        # Look up results from the last validation of this exact order content
+        fingerprint = None
+        cached_results = None
+        if self.result_cache is not None and order_id != 'unknown':
+            fingerprint = self._compute_fingerprint(order_data)
+            cached_results = self.result_cache.get(order_id, fingerprint)
+        fresh_results = {}
+        
+        # Run the validators along their dependencies, then merge in registration order
+        with timing_service.memory_sample() as trace_memory:
+            outcomes = self._run_graph(order_data, OrderSummary(order_data), cached_results or {}, trace_memory)
+        self._count_outcomes(outcomes)
+        timings = {'rules': {}}
+        if trace_memory:
+            timings['memory_peak_kb'] = {}
+        
+        for validator in self.validators:
+            outcome = outcomes[validator.rule_name]
+            result = outcome.result
+            if outcome.source == 'run':
+                timings['rules'][validator.rule_name] = round(outcome.elapsed_ms, 2)
+                if outcome.peak_kb is not None:
+                    timings['memory_peak_kb'][validator.rule_name] = outcome.peak_kb
+            
+            if outcome.error is not None:
+                # Add error as an issue
+                all_issues.append({
+                    'rule': validator.rule_name,
+                    'message': f"Validator error: {str(outcome.error)}",
+                    'severity': 'error',
+                    'details': {}
+                })
+                continue
+            
+            if outcome.source == 'cached':
+                cached_rules.append(validator.rule_name)
+            elif outcome.source == 'skipped':
+                skipped_rules.append(validator.rule_name)
+            elif outcome.source == 'timed_out':
+                timed_out_rules.append(validator.rule_name)
+            elif self._is_cacheable(validator):
+                fresh_results[validator.rule_name] = result.to_dict()
+            
+            validator_results.append(result.to_dict())
+            
+            # Collect issues and fixes
+            all_issues.extend(result.issues)
+            all_suggested_fixes.extend(result.suggested_fixes)
+            
+            self._log_result(validator, result, cached=outcome.source == 'cached')
+        
+        # Remember results for the next event with the same order content
+        if fingerprint is not None and fresh_results:
+            if cached_results:
+                fresh_results = {**cached_results, **fresh_results}
+            self.result_cache.put(order_id, fingerprint, fresh_results)
+        
+        return {
+            'issues': all_issues,
+            'suggested_fixes': all_suggested_fixes,
+            'validator_results': validator_results,
+            'cached_rules': cached_rules,
+            'skipped_rules': skipped_rules,
+            'timed_out_rules': timed_out_rules,
+            'timings': timings
+        }
+    
+    def _run_graph(self, order_data: Dict[Any, Any], summary: OrderSummary,
+                   cached_results: Dict[str, Any], trace_memory: bool = False) -> Dict[str, RuleOutcome]:
+        """
+        Run every validator once all of its dependencies have finished.
+        
+        Rules that become ready together are submitted to the thread pool; a
+        lone ready rule with nothing else in flight and no time budget runs on
+        the calling thread.
+        
+        Each rule gets its timeout_seconds (default VALIDATOR_TIMEOUT_SECONDS),
+        capped by what is left of the request deadline (deadline_scope) when
+        it starts. Outbound calls in the rule time out with that budget and
+        ValidationContext.check_deadline() raises once it is spent. A pooled
+        rule still running at its deadline is abandoned - the thread cannot be
+        stopped, so it finishes in the background and its result is dropped -
+        and reported as timed out. Rules depending on it are reported as timed
+        out without running; the others carry on.
+        
+        Args:
+            order_data: Complete sales order data from InFlow
+            summary: Summary of the order for the rules' applies_to() checks
+            cached_results: Reusable result dictionaries keyed by rule name
+            trace_memory: Run rules one at a time on this thread and measure
+                each one's peak allocation (inside a memory sample)
+        
+        Returns:
+            RuleOutcome per rule name
+        """
+        by_name = {validator.rule_name: validator for validator in self.validators}
+        waiting = {name: set(self.dependencies.get(name, [])) for name in by_name}
+        outcomes = {}
+        running = {}
+        deadlines = {}
+        request_deadline = current_deadline()
+        
+        def finish(name, outcome):
+            outcomes[name] = outcome
+            for deps in waiting.values():
+                deps.discard(name)
+        
+        while waiting or running:
+            ready = [name for name in by_name if name in waiting and not waiting[name]]
+            if not ready and not running:
+                raise RuntimeError(f"Validator dependencies cannot be satisfied: {sorted(waiting)}")
+            
+            for name in ready:
+                del waiting[name]
+                if not self._applies(by_name[name], summary):
+                    # Nothing for this rule to check (e.g. no Z_DISCOUNT line) - skip it
+                    skipped = ValidationResult(name)
+                    skipped.add_info("Not applicable to this order - skipped")
+                    finish(name, RuleOutcome(skipped, source='skipped'))
+                    continue
+                if name in cached_results:
+                    # Order content this rule reads is unchanged - reuse the last result
+                    finish(name, RuleOutcome(ValidationResult.from_dict(cached_results[name]), source='cached'))
+                    continue
+                late = [dep for dep in self.dependencies.get(name, []) if outcomes[dep].source == 'timed_out']
+                if late:
+                    # Without its dependency's data the rule would pass blindly - its result is unknown too
+                    finish(name, self._timed_out(by_name[name], f"Dependency {', '.join(late)} timed out"))
+                    continue
+                deadline = deadlines[name] = self._rule_deadline(by_name[name], request_deadline)
+                context = ValidationContext(order_data, self._dependency_data(name, outcomes), summary, deadline)
+                if (self.executor is None or trace_memory
+                        or (len(ready) == 1 and not running and deadline is None)):
+                    finish(name, self._call_validator(by_name[name], context, trace_memory))
+                else:
+                    running[self.executor.submit(self._call_validator, by_name[name], context)] = name
+            
+            if running and not any(not deps for deps in waiting.values()):
+                budgets = [deadlines[name].remaining() for name in running.values() if deadlines[name]]
+                timeout = max(0.0, min(budgets)) if budgets else None
+                done, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    finish(running.pop(future), future.result())
+                for future, name in list(running.items()):
+                    if deadlines[name] and deadlines[name].remaining() <= 0:
+                        # Out of time - stop waiting (the thread finishes in the background)
+                        future.cancel()
+                        del running[future]
+                        finish(name, self._timed_out(by_name[name], 'Timed out'))
+        
+        return outcomes
+    
+    def _call_validator(self, validator: BaseValidator, context: ValidationContext,
+                        trace_memory: bool = False) -> RuleOutcome:
+        """
+        Run and time one validator, capturing an exception in the outcome instead of raising.
+        """
+        dispatch = self._dispatch[validator.rule_name]
+        deadline = context.deadline
+        if deadline is not None and deadline.remaining() <= 0:
+            return self._timed_out(validator, 'Request deadline reached before the rule started')
+        
+        started = time.perf_counter()
+        result, error, peak_kb = None, None, None
+        try:
+            with deadline_scope(deadline.remaining() if deadline is not None else None):
+                if trace_memory:
+                    result, peak_kb = timing_service.call_traced(lambda: dispatch(context))
+                else:
+                    result = dispatch(context)
+        except Exception as e:
+            if isinstance(e, DeadlineExceeded) and deadline is not None and deadline.remaining() <= 0:
+                return self._timed_out(validator, 'Timed out')
+            logger.exception("Error running validator '%s': %s", validator.rule_name, e)
+            error = e
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        timing_service.record_rule(validator.rule_name, elapsed_ms, peak_kb)
+        return RuleOutcome(result, error, 'run', elapsed_ms, peak_kb)
+    
+    def _rule_deadline(self, validator: BaseValidator, request_deadline: Optional[Deadline]) -> Optional[Deadline]:
+        """
+        Deadline of one rule starting now: its own timeout or the request's, whichever ends sooner.
+        """
+        timeout = validator.timeout_seconds
+        if timeout is None:
+            timeout = config.VALIDATOR_TIMEOUT_SECONDS
+        seconds = timeout if timeout > 0 else None
+        if request_deadline is not None:
+            remaining = request_deadline.remaining()
+            if seconds is None or remaining < seconds:
+                seconds = remaining
+        return Deadline(seconds) if seconds is not None else None
+    
+    def _timed_out(self, validator: BaseValidator, reason: str) -> RuleOutcome:
+        """
+        Outcome of a rule that ran out of time (or whose dependency did): no issues, and not cached.
+        """
+        logger.warning("Validator '%s': %s - result unknown", validator.rule_name, reason)
+        result = ValidationResult(validator.rule_name, passed=False)
+        result.add_info(f"{reason} - result unknown")
+        return RuleOutcome(result, source='timed_out')
+    
+    def _applies(self, validator: BaseValidator, summary: OrderSummary) -> bool:
+        """
+        Evaluate a rule's applicability check (a failing check means the rule runs).
+        """
+        try:
+            return bool(validator.applies_to(summary))
+        except Exception as e:
+            logger.warning("Applicability check of '%s' failed (%s) - running the rule", validator.rule_name, e)
+            return True
+    
+    def _count_outcomes(self, outcomes: Dict[str, RuleOutcome]) -> None:
+        with self._stats_lock:
+            for name, outcome in outcomes.items():
+                stats = self._rule_stats.setdefault(name, self._empty_stats())
+                stats[_OUTCOME_COUNTERS[outcome.source]] += 1
+                stats['errors'] += int(outcome.error is not None)
+    
+    @staticmethod
+    def _empty_stats() -> Dict[str, int]:
+        return {counter: 0 for counter in (*_OUTCOME_COUNTERS.values(), 'errors')}
+    
+    def get_status(self) -> Dict[str, Any]:
+        """
+        Get per-rule counters.
+        
+        Returns:
+            Dictionary with the thread pool size and, per registered rule, its
+            dependencies and how often it ran, was skipped (not applicable to
+            the order), was reused from the cache, ran out of time or failed
+        """
+        with self._stats_lock:
+            stats = {name: dict(counts) for name, counts in self._rule_stats.items()}
+        return {
+            'parallelism': config.VALIDATOR_PARALLELISM,
+            'rules': {
+                validator.rule_name: {
+                    'depends_on': self.dependencies.get(validator.rule_name, []),
+                    **stats.get(validator.rule_name, self._empty_stats())
+                }
+                for validator in self.validators
+            }
+        }
+    
+    def _dependency_data(self, rule_name: str, outcomes: Dict[str, RuleOutcome]) -> Optional[Dict[str, Any]]:
+        """
+        Collect the fetched_data a rule's dependencies produced (None if there is none).
+        """
+        provided = [
+            outcomes[dep].result.fetched_data for dep in self.dependencies.get(rule_name, [])
+            if outcomes[dep].result is not None and outcomes[dep].source == 'run'
+        ]
+        if not provided:
+            return None
+        if len(provided) == 1:
+            return provided[0]
+        merged = {}
+        for data in provided:
+            merged.update(data or {})
+        return merged
+    
+    def _resolve_dependencies(self, validators: List[BaseValidator]) -> Dict[str, List[str]]:
+        """
+        Map each rule to the registered rules it depends on, checking for cycles.
+        
+        Dependencies on rules that are not registered (e.g. a disabled rule)
+        are dropped with a warning.
+        
+        Args:
+            validators: Validators in registration order
+        
+        Returns:
+            Registered dependency names per rule name
+        
+        Raises:
+            ValueError: If the dependencies form a cycle
+        """
+        names = {validator.rule_name for validator in validators}
+        dependencies = {}
+        for validator in validators:
+            deps = []
+            for dep in getattr(validator, 'depends_on', None) or []:
+                if dep in names and dep != validator.rule_name:
+                    deps.append(dep)
+                else:
+                    logger.warning("Validator '%s' depends on unregistered rule '%s' - ignoring",
+                                   validator.rule_name, dep)
+            dependencies[validator.rule_name] = deps
+        
+        # Kahn's algorithm - whatever cannot be ordered is part of a cycle
+        remaining = {name: set(deps) for name, deps in dependencies.items()}
+        while True:
+            ready = [name for name, deps in remaining.items() if not deps]
+            if not ready:
+                break
+            for name in ready:
+                del remaining[name]
+            for deps in remaining.values():
+                deps.difference_update(ready)
+        if remaining:
+            raise ValueError(f"Validator dependency cycle between: {', '.join(sorted(remaining))}")
+        
+        return dependencies
+    
+    def _log_result(self, validator: BaseValidator, result: ValidationResult, cached: bool = False) -> None:
+        """
+        Log a validator result with details (DEBUG level only).
+        
+        Nothing is formatted unless DEBUG is enabled - on large orders the
+        details are one line per order line.
+        
+        Args:
+            validator: Validator that produced the result
+            result: Validation result to log
+            cached: Whether the result was reused from the cache
+        """
+        if not logger.isEnabledFor(logging.DEBUG):
+            return
+        
+        status_text = 'PASSED' if result.passed else 'FAILED'
+        if cached:
+            status_text += ' (cached - order content unchanged)'
+        lines = [f"Validator '{validator.rule_name}': {status_text}"]
+        
+        # Info messages (e.g., line item details)
+        if result.info_messages:
+            lines.append("Details:")
+            lines.extend(f"  - {info}" for info in result.info_messages)
+        
+        if result.issues:
+            lines.append(f"Issues Found ({len(result.issues)}):")
+            lines.extend(
+                f"  {idx}. [{issue['severity'].upper()}] {issue['message']}"
+                for idx, issue in enumerate(result.issues, 1)
+            )
+        
+        if result.suggested_fixes:
+            lines.append("Suggested Fixes:")
+            lines.extend(f"  {idx}. {fix}" for idx, fix in enumerate(result.suggested_fixes, 1))
+        
+        logger.debug('\n'.join(lines))
+    
+    def _is_cacheable(self, validator: BaseValidator) -> bool:
+        """
+        Check whether a validator's result can be reused for unchanged orders.
+        """
+        return (
+            validator.rule_name != ORDER_FETCHER_RULE
+            and getattr(validator, 'cacheable', False)
+            and getattr(validator, 'fingerprint_fields', None) is not None
+        )
+    
+    def _compute_fingerprint(self, order_data: Dict[Any, Any]) -> str:
+        """
+        Fingerprint the order fields read by the cacheable validators.
+        
+        Args:
+            order_data: Complete sales order data from InFlow
+        
+        Returns:
+            Fingerprint string
+        """
+        fields = set()
+        rule_names = []
+        for validator in self.validators:
+            if self._is_cacheable(validator):
+                fields.update(validator.fingerprint_fields)
+                rule_names.append(validator.rule_name)
+        # Rule names are part of the salt so registering a new rule invalidates old entries
+        return compute_order_fingerprint(order_data, fields, salt='|'.join(sorted(rule_names)))
+    
     def _process_error_tracking(self, order_id: str, order_number: str, 
-                                issues: List[Dict[Any, Any]]) -> Dict[str, Any]:
+                                issues: List[Dict[Any, Any]],
+                                unverified_rules: List[str] = ()) -> Dict[str, Any]:
         """
         Process errors through the error tracking system with 30-minute grace period.
         
@@ -163,6 +662,8 @@ class ValidationService:
             order_id: Sales order ID
             order_number: Order number for display
             issues: List of validation issues from validators
+            unverified_rules: Rules without a result this run (timed out); errors
+                they reported before stay tracked instead of being resolved
         
         Returns:
             Dictionary with:
@@ -229,6 +730,8 @@ class ValidationService:
                 pending_errors = error_tracker_service.get_pending_errors(order_id)
                 if prev_hash in pending_errors:
                     resolved_error_data = pending_errors[prev_hash]['error_details']
+                    if resolved_error_data.get('rule') in unverified_rules:
+                        continue  # Rule timed out - the error may still be there
                     resolved_issues.append({
                         'rule': resolved_error_data.get('rule', 'Unknown'),
                         'message': resolved_error_data.get('message', 'Unknown error'),
@@ -0,0 +1,540 @@
+"""
+Durable work queue between the webhook endpoint and the validation pipeline.
+
+In 'queue' ingest mode the webhook only verifies the signature and enqueues
+the event; a pool of worker threads drains the queue through the normal
+fetch -> validate -> log -> notify pipeline.
+
+Backends:
+    - SQLiteWorkQueueBackend: local file-backed queue for the Flask deployment
+    - SQSWorkQueueBackend: Amazon SQS (or a compatible stand-in such as ElasticMQ)
+"""
+
+import math
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Callable
+
+from app.config import config
+from app.utils.log import get_logger
+from app.utils import json_codec
+
+logger = get_logger(__name__)
+
+
+class WorkQueueMessage:
+    """
+    A message leased from a work queue backend.
+    """
+
+    def __init__(self, message_id: str, body: Dict[str, Any], receipt: str, attempts: int = 1):
+        """
+        Initialize a leased message.
+
+        Args:
+            message_id: Backend message ID
+            body: Decoded message body
+            receipt: Lease token / receipt handle needed to ack or nack
+            attempts: Number of times this message has been received
+        """
+        self.message_id = message_id
+        self.body = body
+        self.receipt = receipt
+        self.attempts = attempts
+
+
+class SQLiteWorkQueueBackend:
+    """
+    File-backed work queue using SQLite.
+    Received messages are leased for a visibility timeout; if a worker dies
+    before acknowledging, the message becomes visible again.
+    """
+
+    def __init__(self, db_path: str, visibility_timeout: int = 180, max_attempts: int = 5):
+        """
+        Initialize the SQLite queue backend.
+
+        Args:
+            db_path: Path to the SQLite database file
+            visibility_timeout: Seconds a received message stays hidden before redelivery
+            max_attempts: Deliveries before a message is moved to the dead state
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        self._ensure_schema()
+
+    def _connect(self) -> sqlite3.Connection:
+        """
+        Open a new connection (one per call keeps the backend thread-safe).
+        """
+        conn = sqlite3.connect(str(self.db_path), timeout=30, isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')
+        return conn
+
+    def _ensure_schema(self) -> None:
+        """
+        Create the queue table if it does not exist.
+        """
+        conn = self._connect()
+        try:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS work_queue (
+                    id TEXT PRIMARY KEY,
+                    body TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'ready',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    available_at REAL NOT NULL,
+                    created_at REAL NOT NULL,
+                    lease_token TEXT
+                )
+                """
+            )
+            conn.execute(
+                'CREATE INDEX IF NOT EXISTS idx_work_queue_available ON work_queue (status, available_at)'
+            )
+        finally:
+            conn.close()
+
+    def enqueue(self, body: Dict[str, Any]) -> str:
+        """
+        Add a message to the queue.
+
+        Args:
+            body: JSON-serializable message body
+
+        Returns:
+            Message ID
+        """
+        message_id = str(uuid.uuid4())
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute(
+                'INSERT INTO work_queue (id, body, status, attempts, available_at, created_at) '
+                'VALUES (?, ?, ?, 0, ?, ?)',
+                (message_id, json_codec.dumps(body), 'ready', now, now)
+            )
+        finally:
+            conn.close()
+        return message_id
+
+    def receive(self, max_messages: int = 1, wait_seconds: float = 0) -> List[WorkQueueMessage]:
+        """
+        Lease up to max_messages visible messages.
+
+        Args:
+            max_messages: Maximum number of messages to lease
+            wait_seconds: Unused (callers poll); kept for interface parity with SQS
+
+        Returns:
+            List of leased messages (may be empty)
+        """
+        now = time.time()
+        messages = []
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            rows = conn.execute(
+                "SELECT id, body, attempts FROM work_queue "
+                "WHERE status IN ('ready', 'inflight') AND available_at <= ? "
+                "ORDER BY available_at LIMIT ?",
+                (now, max_messages)
+            ).fetchall()
+
+            for message_id, body, attempts in rows:
+                if attempts >= self.max_attempts:
+                    # Exhausted retries - park it for inspection instead of redelivering
+                    conn.execute(
+                        "UPDATE work_queue SET status = 'dead', lease_token = NULL WHERE id = ?",
+                        (message_id,)
+                    )
+                    logger.error("Work queue message %s moved to dead state after %d attempts", message_id, attempts)
+                    continue
+
+                lease_token = str(uuid.uuid4())
+                conn.execute(
+                    "UPDATE work_queue SET status = 'inflight', attempts = attempts + 1, "
+                    "available_at = ?, lease_token = ? WHERE id = ?",
+                    (now + self.visibility_timeout, lease_token, message_id)
+                )
+                messages.append(WorkQueueMessage(message_id, json_codec.loads(body), lease_token, attempts + 1))
+
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        finally:
+            conn.close()
+
+        return messages
+
+    def ack(self, message: WorkQueueMessage) -> None:
+        """
+        Delete a successfully processed message.
+
+        Args:
+            message: Message previously returned by receive()
+        """
+        conn = self._connect()
+        try:
+            conn.execute(
+                'DELETE FROM work_queue WHERE id = ? AND lease_token = ?',
+                (message.message_id, message.receipt)
+            )
+        finally:
+            conn.close()
+
+    def nack(self, message: WorkQueueMessage, delay_seconds: float = 0) -> None:
+        """
+        Return a message to the queue for a later retry.
+
+        Args:
+            message: Message previously returned by receive()
+            delay_seconds: How long to keep the message hidden before redelivery
+        """
+        conn = self._connect()
+        try:
+            conn.execute(
+                "UPDATE work_queue SET status = 'ready', available_at = ?, lease_token = NULL "
+                "WHERE id = ? AND lease_token = ?",
+                (time.time() + delay_seconds, message.message_id, message.receipt)
+            )
+        finally:
+            conn.close()
+
+    def get_depth(self) -> Dict[str, int]:
+        """
+        Count messages by state.
+
+        Returns:
+            Dictionary with ready, inflight and dead counts
+        """
+        conn = self._connect()
+        try:
+            rows = conn.execute('SELECT status, COUNT(*) FROM work_queue GROUP BY status').fetchall()
+        finally:
+            conn.close()
+        depth = {'ready': 0, 'inflight': 0, 'dead': 0}
+        depth.update({status: count for status, count in rows})
+        return depth
+
+
+class SQSWorkQueueBackend:
+    """
+    Work queue backed by Amazon SQS.
+    Point endpoint_url at ElasticMQ (e.g. http://localhost:9324) to test locally.
+    Dead-lettering is handled by the queue's redrive policy.
+    """
+
+    def __init__(self, queue_url: str, region_name: str = 'us-east-2',
+                 endpoint_url: Optional[str] = None, visibility_timeout: int = 180,
+                 delay_seconds: int = 0):
+        """
+        Initialize the SQS queue backend.
+
+        Args:
+            queue_url: SQS queue URL
+            region_name: AWS region
+            endpoint_url: Optional endpoint override for SQS-compatible servers
+            visibility_timeout: Seconds a received message stays hidden before redelivery
+            delay_seconds: Delivery delay for new messages, so a burst of events for
+                one order lands in the same consumer batch
+        """
+        import boto3
+
+        self.queue_url = queue_url
+        self.visibility_timeout = visibility_timeout
+        self.delay_seconds = delay_seconds
+        self.sqs = boto3.client('sqs', region_name=region_name, endpoint_url=endpoint_url)
+
+    def enqueue(self, body: Dict[str, Any]) -> str:
+        """
+        Send a message to the queue.
+
+        Args:
+            body: JSON-serializable message body
+
+        Returns:
+            SQS message ID
+        """
+        response = self.sqs.send_message(
+            QueueUrl=self.queue_url,
+            MessageBody=json_codec.dumps(body),
+            DelaySeconds=self.delay_seconds
+        )
+        return response['MessageId']
+
+    def receive(self, max_messages: int = 1, wait_seconds: float = 0) -> List[WorkQueueMessage]:
+        """
+        Receive up to max_messages messages using long polling.
+
+        Args:
+            max_messages: Maximum number of messages (SQS caps this at 10)
+            wait_seconds: Long-poll wait time (SQS caps this at 20)
+
+        Returns:
+            List of received messages (may be empty)
+        """
+        response = self.sqs.receive_message(
+            QueueUrl=self.queue_url,
+            MaxNumberOfMessages=min(max_messages, 10),
+            WaitTimeSeconds=int(min(wait_seconds, 20)),
+            VisibilityTimeout=self.visibility_timeout,
+            AttributeNames=['ApproximateReceiveCount']
+        )
+
+        messages = []
+        for raw in response.get('Messages', []):
+            attempts = int(raw.get('Attributes', {}).get('ApproximateReceiveCount', 1))
+            messages.append(
+                WorkQueueMessage(raw['MessageId'], json_codec.loads(raw['Body']), raw['ReceiptHandle'], attempts)
+            )
+        return messages
+
+    def ack(self, message: WorkQueueMessage) -> None:
+        """
+        Delete a successfully processed message.
+        """
+        self.sqs.delete_message(QueueUrl=self.queue_url, ReceiptHandle=message.receipt)
+
+    def nack(self, message: WorkQueueMessage, delay_seconds: float = 0) -> None:
+        """
+        Make a message visible again after delay_seconds.
+        """
+        self.sqs.change_message_visibility(
+            QueueUrl=self.queue_url,
+            ReceiptHandle=message.receipt,
+            VisibilityTimeout=int(delay_seconds)
+        )
+
+    def get_depth(self) -> Dict[str, int]:
+        """
+        Approximate message counts reported by SQS.
+
+        Returns:
+            Dictionary with ready and inflight counts
+        """
+        response = self.sqs.get_queue_attributes(
+            QueueUrl=self.queue_url,
+            AttributeNames=['ApproximateNumberOfMessages', 'ApproximateNumberOfMessagesNotVisible']
+        )
+        attributes = response.get('Attributes', {})
+        return {
+            'ready': int(attributes.get('ApproximateNumberOfMessages', 0)),
+            'inflight': int(attributes.get('ApproximateNumberOfMessagesNotVisible', 0))
+        }
+
+
+class WorkQueueService:
+    """
+    Enqueues webhook events and drains them through a pool of worker threads.
+    """
+
+    def __init__(self, backend, num_workers: int = 4, poll_interval_seconds: float = 1.0,
+                 retry_delay_seconds: float = 30.0):
+        """
+        Initialize the work queue service.
+
+        Args:
+            backend: Queue backend (SQLiteWorkQueueBackend or SQSWorkQueueBackend)
+            num_workers: Number of worker threads
+            poll_interval_seconds: Idle poll interval when the queue is empty
+            retry_delay_seconds: Base delay before a failed message is retried
+        """
+        self.backend = backend
+        self.num_workers = num_workers
+        self.poll_interval_seconds = poll_interval_seconds
+        self.retry_delay_seconds = retry_delay_seconds
+        self.running = False
+        self.worker_threads: List[threading.Thread] = []
+        self._wakeup = threading.Event()
+        self._stats_lock = threading.Lock()
+        self._stats = {'enqueued': 0, 'processed': 0, 'failed': 0}
+
+    def enqueue(self, sales_order_id: str, event_type: str) -> str:
+        """
+        Enqueue a sales order event for asynchronous processing.
+
+        Args:
+            sales_order_id: InFlow sales order ID
+            event_type: Webhook event type
+
+        Returns:
+            Message ID assigned by the backend
+        """
+        message_id = self.backend.enqueue({
+            'sales_order_id': sales_order_id,
+            'event_type': event_type,
+            'enqueued_at': time.time()
+        })
+        with self._stats_lock:
+            self._stats['enqueued'] += 1
+        self._wakeup.set()
+        return message_id
+
+    def process_message(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Run the order pipeline for a single queue message body.
+
+        Events for an order that keeps changing past COALESCE_MAX_WAIT_SECONDS
+        are re-enqueued instead of holding this worker.
+
+        Args:
+            body: Message body produced by enqueue()
+
+        Returns:
+            Pipeline summary from OrderProcessingService
+        """
+        from app.services.order_processing_service import order_processing_service
+
+        sales_order_id = body['sales_order_id']
+        event_type = body.get('event_type', 'unknown')
+        return order_processing_service.process_event(
+            sales_order_id,
+            event_type,
+            handoff=lambda: self.enqueue(sales_order_id, event_type)
+        )
+
+    def start(self, handler: Optional[Callable[[Dict[str, Any]], Any]] = None) -> None:
+        """
+        Start the worker threads.
+
+        Args:
+            handler: Optional override for the message handler (defaults to process_message)
+        """
+        if self.running:
+            logger.info("Work queue workers are already running")
+            return
+
+        self._handler = handler or self.process_message
+        self.running = True
+        self.worker_threads = []
+        for index in range(self.num_workers):
+            thread = threading.Thread(
+                target=self._worker_loop,
+                name=f"work-queue-worker-{index}",
+                daemon=True
+            )
+            thread.start()
+            self.worker_threads.append(thread)
+        logger.info("Work queue started with %d worker(s) (%s)", self.num_workers, type(self.backend).__name__)
+
+    def stop(self) -> None:
+        """
+        Stop the worker threads.
+        """
+        self.running = False
+        self._wakeup.set()
+        for thread in self.worker_threads:
+            thread.join(timeout=5)
+        self.worker_threads = []
+        logger.info("Work queue stopped")
+
+    def get_status(self) -> Dict[str, Any]:
+        """
+        Get worker and queue depth information.
+
+        Returns:
+            Dictionary with queue status
+        """
+        try:
+            depth = self.backend.get_depth()
+        except Exception as e:
+            depth = {'error': str(e)}
+
+        with self._stats_lock:
+            stats = dict(self._stats)
+
+        return {
+            'backend': type(self.backend).__name__,
+            'running': self.running,
+            'workers': self.num_workers,
+            'workers_alive': sum(1 for t in self.worker_threads if t.is_alive()),
+            'depth': depth,
+            **stats
+        }
+
+    def _worker_loop(self) -> None:
+        """
+        Main loop for a worker thread.
+        """
+        while self.running:
+            try:
+                messages = self.backend.receive(max_messages=1, wait_seconds=self.poll_interval_seconds)
+            except Exception as e:
+                logger.error("Error receiving from work queue: %s", e)
+                time.sleep(self.poll_interval_seconds)
+                continue
+
+            if not messages:
+                # Sleep until the poll interval passes or a local enqueue wakes us up
+                self._wakeup.wait(self.poll_interval_seconds)
+                self._wakeup.clear()
+                continue
+
+            for message in messages:
+                self._handle(message)
+
+    def _handle(self, message: WorkQueueMessage) -> None:
+        """
+        Process one message and ack or nack it.
+
+        Args:
+            message: Leased queue message
+        """
+        try:
+            self._handler(message.body)
+            self.backend.ack(message)
+            with self._stats_lock:
+                self._stats['processed'] += 1
+        except Exception as e:
+            # Back off linearly with the number of attempts
+            delay = self.retry_delay_seconds * message.attempts
+            logger.exception("Error processing work queue message %s (attempt %d): %s - retrying in %.0fs",
+                             message.message_id, message.attempts, e, delay)
+            with self._stats_lock:
+                self._stats['failed'] += 1
+            try:
+                self.backend.nack(message, delay_seconds=delay)
+            except Exception as nack_error:
+                logger.error("Error returning message to work queue: %s", nack_error)
+
+
+def _create_backend():
+    """
+    Create the queue backend selected by configuration.
+    """
+    if config.WORK_QUEUE_BACKEND == 'sqs':
+        return SQSWorkQueueBackend(
+            queue_url=config.WORK_QUEUE_URL,
+            region_name=config.WORK_QUEUE_REGION,
+            endpoint_url=config.WORK_QUEUE_ENDPOINT_URL,
+            visibility_timeout=config.WORK_QUEUE_VISIBILITY_TIMEOUT,
+            delay_seconds=int(math.ceil(config.COALESCE_WINDOW_SECONDS))
+        )
+
+    # Use LOGS_DIR environment variable if set (for Lambda)
+    db_path = config.WORK_QUEUE_DB_PATH or os.path.join(os.environ.get('LOGS_DIR', 'logs'), 'work_queue.db')
+    return SQLiteWorkQueueBackend(
+        db_path=db_path,
+        visibility_timeout=config.WORK_QUEUE_VISIBILITY_TIMEOUT,
+        max_attempts=config.WORK_QUEUE_MAX_ATTEMPTS
+    )
+
+
+# Create a singleton instance
+try:
+    work_queue_service = WorkQueueService(
+        backend=_create_backend(),
+        num_workers=config.WORK_QUEUE_WORKERS
+    )
+except Exception as e:
+    logger.warning("Could not initialize work queue: %s", e)
+    work_queue_service = None
@@ -0,0 +1,100 @@
+"""
+JSON encoding and decoding for the request path.
+
+Uses orjson (C-backed, several times faster on large orders) when it is
+installed and the stdlib json module otherwise. Output is compatible with
+json.dumps(..., ensure_ascii=False): compact separators unless indent is
+set, datetimes and other unsupported types handed to `default`.
+
+orjson cannot encode integers beyond 64 bits; those payloads fall back to
+the stdlib encoder. Hashes persisted across releases must not depend on
+the backend and use stable_dumps() instead.
+"""
+
+import json
+from typing import Any, Callable, Optional, Union
+
+try:
+    import orjson
+except ImportError:  # Optional dependency - the stdlib json module is used instead
+    orjson = None
+
+
+BACKEND = 'orjson' if orjson is not None else 'json'
+
+# Raised for malformed input by either backend (orjson's error subclasses it)
+JSONDecodeError = json.JSONDecodeError
+
+
+def loads(data: Union[str, bytes, bytearray, memoryview]) -> Any:
+    """
+    Decode a JSON document.
+    
+    Args:
+        data: JSON text or UTF-8 bytes
+    
+    Raises:
+        JSONDecodeError: If the document is not valid JSON
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # Retry with the stdlib decoder, which also accepts NaN/Infinity and huge integers
+            pass
+    if not isinstance(data, str):
+        data = bytes(data).decode('utf-8')
+    return json.loads(data)
+
+
+def dumps_bytes(obj: Any, sort_keys: bool = False, indent: bool = False,
+                default: Optional[Callable[[Any], Any]] = None) -> bytes:
+    """
+    Encode an object as UTF-8 JSON.
+    
+    Args:
+        obj: Object to encode
+        sort_keys: Sort dictionary keys
+        indent: Pretty-print with two-space indentation
+        default: Called for objects the encoder does not support (e.g. str)
+    
+    Raises:
+        TypeError: If the object cannot be encoded
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        try:
+            return orjson.dumps(obj, default=default, option=option)
+        except orjson.JSONEncodeError:
+            pass  # e.g. an integer beyond 64 bits - the stdlib encoder handles it (or raises TypeError)
+    return _stdlib_dumps(obj, sort_keys, indent, default).encode('utf-8')
+
+
+def dumps(obj: Any, sort_keys: bool = False, indent: bool = False,
+          default: Optional[Callable[[Any], Any]] = None) -> str:
+    """
+    Encode an object as a JSON string (see dumps_bytes).
+    """
+    if orjson is None:
+        return _stdlib_dumps(obj, sort_keys, indent, default)
+    return dumps_bytes(obj, sort_keys, indent, default).decode('utf-8')
+
+
+def stable_dumps(obj: Any) -> str:
+    """
+    Encode exactly like json.dumps(obj, sort_keys=True), whatever the backend.
+    
+    For values that are hashed and persisted (e.g. DynamoDB error hashes),
+    which must not change when orjson is installed or upgraded.
+    """
+    return json.dumps(obj, sort_keys=True)
+
+
+def _stdlib_dumps(obj: Any, sort_keys: bool, indent: bool, default: Optional[Callable[[Any], Any]]) -> str:
+    if indent:
+        return json.dumps(obj, sort_keys=sort_keys, indent=2, ensure_ascii=False, default=default)
+    return json.dumps(obj, sort_keys=sort_keys, separators=(',', ':'), ensure_ascii=False, default=default)
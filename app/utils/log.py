@@ -0,0 +1,132 @@
+"""
+Structured, level-gated logging.
+
+All application loggers live under the 'app' namespace and share one
+stdout handler configured from LOG_LEVEL and LOG_FORMAT:
+
+- 'text': human-readable lines for local development
+- 'json': one JSON object per line (CloudWatch friendly); fields passed
+  with extra={...} become top-level keys
+
+Messages use %-style arguments (logger.debug("Order %s", order_id)) so no
+formatting happens unless the record is actually emitted. Code that has to
+build something expensive before logging it should check
+logger.isEnabledFor(logging.DEBUG) first.
+"""
+
+import json
+import logging
+import random
+import sys
+from datetime import datetime, timezone
+
+from app.config import config
+
+
+ROOT_LOGGER_NAME = 'app'
+
+# Attributes every LogRecord has - anything else came from extra={...}
+_RESERVED_ATTRS = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formats a record as a single-line JSON object.
+    """
+    
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage()
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """
+    Formats a record as 'time LEVEL logger: message key=value ...'.
+    """
+    
+    def __init__(self):
+        super().__init__('%(asctime)s %(levelname)s %(name)s: %(message)s')
+    
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        extras = [
+            f"{key}={value}" for key, value in record.__dict__.items()
+            if key not in _RESERVED_ATTRS and not key.startswith('_')
+        ]
+        if extras:
+            # Keep the traceback (if any) on the lines after the fields
+            first, _, rest = line.partition('\n')
+            line = f"{first} {' '.join(extras)}" + (f"\n{rest}" if rest else '')
+        return line
+
+
+def configure_logging(level: str = None, fmt: str = None, stream=None) -> logging.Logger:
+    """
+    Configure the 'app' logger hierarchy (safe to call more than once).
+    
+    Args:
+        level: Log level name (defaults to LOG_LEVEL)
+        fmt: 'json' or 'text' (defaults to LOG_FORMAT)
+        stream: Output stream (defaults to stdout)
+    
+    Returns:
+        The root application logger
+    """
+    root = logging.getLogger(ROOT_LOGGER_NAME)
+    root.setLevel((level or config.LOG_LEVEL).upper())
+    
+    handler = logging.StreamHandler(stream or sys.stdout)
+    handler.setFormatter(JsonFormatter() if (fmt or config.LOG_FORMAT) == 'json' else TextFormatter())
+    
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    # Lambda installs its own root handler - don't emit every line twice
+    root.propagate = False
+    return root
+
+
+def get_logger(name: str) -> logging.Logger:
+    """
+    Get a logger under the 'app' namespace.
+    
+    Args:
+        name: Module name (usually __name__)
+    
+    Returns:
+        Logger instance
+    """
+    if not logging.getLogger(ROOT_LOGGER_NAME).handlers:
+        configure_logging()
+    if name != ROOT_LOGGER_NAME and not name.startswith(ROOT_LOGGER_NAME + '.'):
+        name = f"{ROOT_LOGGER_NAME}.{name}"
+    return logging.getLogger(name)
+
+
+def should_log_payload(logger: logging.Logger) -> bool:
+    """
+    Decide whether to log a full webhook payload.
+    
+    Payloads are always logged at DEBUG level; otherwise only a
+    LOG_PAYLOAD_SAMPLE_RATE fraction of them is logged.
+    
+    Args:
+        logger: Logger the payload would be written to
+    
+    Returns:
+        True if the payload should be logged
+    """
+    if logger.isEnabledFor(logging.DEBUG):
+        return True
+    rate = config.LOG_PAYLOAD_SAMPLE_RATE
+    return rate > 0 and logger.isEnabledFor(logging.INFO) and random.random() < rate
@@ -0,0 +1,65 @@
+"""
+Lightweight in-process metrics for /monitor/status.
+"""
+
+import math
+import threading
+from collections import deque
+from typing import Dict, Any
+
+
+class RollingStats:
+    """
+    Summary statistics over the most recent N samples (thread-safe).
+    """
+    
+    def __init__(self, window: int = 1000):
+        """
+        Args:
+            window: Number of recent samples kept for percentiles
+        """
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self._count = 0
+        self._max = 0.0
+    
+    def add(self, value: float) -> None:
+        """
+        Record one sample.
+        """
+        with self._lock:
+            self._samples.append(value)
+            self._count += 1
+            if value > self._max:
+                self._max = value
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Get count, mean, percentiles (over the window) and all-time max.
+        
+        Returns:
+            Dictionary with count, avg, p50, p95, p99 and max
+        """
+        with self._lock:
+            samples = sorted(self._samples)
+            count = self._count
+            maximum = self._max
+        
+        if not samples:
+            return {'count': count, 'avg': 0.0, 'p50': 0.0, 'p95': 0.0, 'p99': 0.0, 'max': round(maximum, 2)}
+        return {
+            'count': count,
+            'avg': round(sum(samples) / len(samples), 2),
+            'p50': round(percentile(samples, 50), 2),
+            'p95': round(percentile(samples, 95), 2),
+            'p99': round(percentile(samples, 99), 2),
+            'max': round(maximum, 2)
+        }
+
+
+def percentile(sorted_samples, pct: float) -> float:
+    """
+    Nearest-rank percentile of an already sorted, non-empty sequence.
+    """
+    rank = max(1, math.ceil(pct / 100 * len(sorted_samples)))
+    return sorted_samples[rank - 1]
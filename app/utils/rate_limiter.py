@@ -0,0 +1,383 @@
+"""
+Client-side rate limiting for outgoing InFlow API calls.
+
+InFlow allows 60 requests per minute per company. Instead of firing requests
+until a 429 comes back and then stalling, every call first takes a token from
+a bucket refilled slightly below the quota, shared by all threads (and the
+async client) in the process. When a 429 still arrives - another process is
+using the same quota - the refill rate is halved and climbs back gradually
+with each successful call (additive increase, multiplicative decrease).
+
+On Lambda every concurrent container has its own process, so the bucket's
+tokens are kept in DynamoDB instead (DynamoDBTokenBucket) and all containers
+draw from one company-wide budget.
+"""
+
+import asyncio
+import random
+import threading
+import time
+from decimal import Decimal
+from typing import Dict, Any, Optional
+
+from app.config import config
+from app.utils.log import get_logger
+from app.utils.metrics import RollingStats
+from app.utils.resilience import DeadlineExceeded
+
+logger = get_logger(__name__)
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket with an adaptive refill rate.
+    """
+    
+    name = 'local'
+    
+    # Refill rate never drops below this fraction of the configured rate
+    MIN_RATE_FRACTION = 0.1
+    # Fraction of the configured rate restored by each successful call
+    RECOVERY_FRACTION = 0.05
+    
+    def __init__(self, rate_per_minute: float, burst: int = 5, max_pause_seconds: float = 60.0):
+        """
+        Initialize the bucket (starts full).
+        
+        Args:
+            rate_per_minute: Target request rate
+            burst: Bucket capacity - requests allowed back to back after an idle period
+            max_pause_seconds: Cap on the Retry-After pause honoured after a 429
+        """
+        self.target_rate = rate_per_minute / 60.0
+        self.capacity = max(1, burst)
+        self.max_pause_seconds = max_pause_seconds
+        
+        self._lock = threading.Lock()
+        self._rate = self.target_rate
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        
+        self._stats = {'acquired': 0, 'delayed': 0, 'throttled': 0, 'timed_out': 0}
+        self._wait_ms = RollingStats()
+    
+    def _refill(self, now: float) -> None:
+        """
+        Add tokens for the time elapsed since the last update (caller holds the lock).
+        """
+        elapsed = max(0.0, now - self._updated)
+        self._tokens = min(self.capacity, self._tokens + elapsed * self._rate)
+        self._updated = now
+    
+    def try_acquire(self) -> float:
+        """
+        Take a token if one is available.
+        
+        Returns:
+            0.0 if a token was taken, otherwise seconds until one should be
+        """
+        now = time.monotonic()
+        with self._lock:
+            if now < self._paused_until:
+                return self._paused_until - now
+            self._refill(now)
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self._rate
+    
+    def acquire(self, timeout: Optional[float] = None) -> float:
+        """
+        Block until a token is available and take it.
+        
+        Args:
+            timeout: Longest wait in seconds (None waits as long as it takes)
+        
+        Returns:
+            Seconds spent waiting
+        
+        Raises:
+            DeadlineExceeded: If no token can be had within the timeout
+        """
+        started = time.monotonic()
+        waited = 0.0
+        while True:
+            wait = self.try_acquire()
+            if wait <= 0:
+                break
+            self._check_timeout(started, wait, timeout)
+            time.sleep(wait)
+            waited = time.monotonic() - started
+        return self._record_wait(waited)
+    
+    async def acquire_async(self, timeout: Optional[float] = None) -> float:
+        """
+        Wait for a token without blocking the event loop and take it.
+        
+        Args:
+            timeout: Longest wait in seconds (None waits as long as it takes)
+        
+        Returns:
+            Seconds spent waiting
+        
+        Raises:
+            DeadlineExceeded: If no token can be had within the timeout
+        """
+        started = time.monotonic()
+        waited = 0.0
+        while True:
+            wait = self.try_acquire()
+            if wait <= 0:
+                break
+            self._check_timeout(started, wait, timeout)
+            await asyncio.sleep(wait)
+            waited = time.monotonic() - started
+        return self._record_wait(waited)
+    
+    def _check_timeout(self, started: float, wait: float, timeout: Optional[float]) -> None:
+        """
+        Give up instead of waiting past the caller's deadline.
+        """
+        if timeout is not None and time.monotonic() - started + wait > timeout:
+            with self._lock:
+                self._stats['timed_out'] += 1
+            raise DeadlineExceeded(f"No InFlow rate limit token available within {max(timeout, 0.0):.1f}s")
+    
+    def _record_wait(self, waited: float) -> float:
+        self._wait_ms.add(waited * 1000)
+        with self._lock:
+            self._stats['acquired'] += 1
+            if waited > 0:
+                self._stats['delayed'] += 1
+        return waited
+    
+    def on_throttled(self, retry_after: Optional[float] = None) -> None:
+        """
+        Slow down after a 429: halve the rate, drain the bucket and pause for Retry-After.
+        
+        Args:
+            retry_after: Seconds from the Retry-After header, if present
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._stats['throttled'] += 1
+            self._rate = max(self.target_rate * self.MIN_RATE_FRACTION, self._rate / 2)
+            self._tokens = 0.0
+            self._updated = now
+            if retry_after:
+                self._paused_until = max(self._paused_until, now + min(retry_after, self.max_pause_seconds))
+    
+    def on_success(self) -> None:
+        """
+        Speed back up towards the target rate after a successful call.
+        """
+        with self._lock:
+            if self._rate < self.target_rate:
+                self._rate = min(self.target_rate, self._rate + self.target_rate * self.RECOVERY_FRACTION)
+    
+    def get_status(self) -> Dict[str, Any]:
+        """
+        Get bucket state and wait-time metrics.
+        
+        Returns:
+            Dictionary with current and target rate (per minute), available tokens,
+            remaining pause, counters and wait time stats (ms)
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._refill(now)
+            status = {
+                'backend': self.name,
+                'rate_per_minute': round(self._rate * 60, 2),
+                'target_rate_per_minute': round(self.target_rate * 60, 2),
+                'tokens': round(self._tokens, 2),
+                'capacity': self.capacity,
+                'paused_seconds': round(max(0.0, self._paused_until - now), 2),
+                **self._stats
+            }
+        status['wait_ms'] = self._wait_ms.snapshot()
+        return status
+
+
+class DynamoDBTokenBucket(TokenBucket):
+    """
+    Token bucket whose tokens live in a single DynamoDB item shared by every
+    Lambda container (and any other process configured with the same table).
+    
+    Taking a token reads the item, refills it for the elapsed time and writes
+    it back with a conditional update on the previous updated_at, so two
+    containers can never spend the same token; the loser of a race re-reads
+    and tries again. A 429 pauses every container through paused_until.
+    Falls back to the in-process bucket if DynamoDB is unavailable.
+    """
+    
+    name = 'dynamodb'
+    
+    # Optimistic update attempts before backing off briefly
+    CONFLICT_RETRIES = 5
+    
+    def __init__(self, bucket_id: str, rate_per_minute: float, burst: int = 5,
+                 max_pause_seconds: float = 60.0, table_name: str = 'inflow-rate-limits',
+                 region_name: str = 'us-east-2', endpoint_url: Optional[str] = None):
+        """
+        Initialize the shared bucket.
+        
+        Args:
+            bucket_id: Item key - one bucket per quota (e.g. per InFlow company)
+            rate_per_minute: Target request rate across all processes
+            burst: Bucket capacity
+            max_pause_seconds: Cap on the Retry-After pause honoured after a 429
+            table_name: DynamoDB table (partition key: bucket_id)
+            region_name: AWS region
+            endpoint_url: Optional endpoint override (e.g. DynamoDB Local)
+        """
+        import boto3
+        
+        super().__init__(rate_per_minute, burst, max_pause_seconds)
+        self.bucket_id = bucket_id
+        self.table_name = table_name
+        self.dynamodb = boto3.resource('dynamodb', region_name=region_name, endpoint_url=endpoint_url)
+        self.table = self.dynamodb.Table(table_name)
+        self._stats.update({'conflicts': 0, 'errors': 0})
+    
+    def try_acquire(self) -> float:
+        """
+        Take a token from the shared bucket if one is available.
+        
+        Returns:
+            0.0 if a token was taken, otherwise seconds until one should be
+        """
+        try:
+            return self._try_acquire_shared()
+        except Exception as e:
+            logger.warning("Shared InFlow rate limit unavailable, using local bucket: %s", e)
+            with self._lock:
+                self._stats['errors'] += 1
+            return super().try_acquire()
+    
+    def _try_acquire_shared(self) -> float:
+        conditional_check_failed = self.dynamodb.meta.client.exceptions.ConditionalCheckFailedException
+        for _ in range(self.CONFLICT_RETRIES):
+            now = time.time()
+            item = self.table.get_item(Key={'bucket_id': self.bucket_id}, ConsistentRead=True).get('Item')
+            with self._lock:
+                rate = self._rate
+            
+            if item:
+                paused_until = float(item.get('paused_until', 0))
+                if now < paused_until:
+                    return paused_until - now
+                previous = item['updated_at']
+                elapsed = max(0.0, now - float(previous))
+                tokens = min(self.capacity, float(item['tokens']) + elapsed * rate)
+            else:
+                previous = None
+                tokens = float(self.capacity)
+            
+            if tokens < 1:
+                # Jitter so waiting containers do not all re-read at the same instant
+                return (1 - tokens) / rate * random.uniform(1.0, 1.2)
+            
+            try:
+                self.table.update_item(
+                    Key={'bucket_id': self.bucket_id},
+                    UpdateExpression='SET tokens = :tokens, updated_at = :now',
+                    ConditionExpression=(
+                        'attribute_not_exists(bucket_id)' if previous is None else 'updated_at = :previous'
+                    ),
+                    ExpressionAttributeValues={
+                        ':tokens': _decimal(tokens - 1),
+                        ':now': _decimal(now),
+                        **({} if previous is None else {':previous': previous})
+                    }
+                )
+                return 0.0
+            except conditional_check_failed:
+                with self._lock:
+                    self._stats['conflicts'] += 1
+        
+        return random.uniform(0.01, 0.05)
+    
+    def on_throttled(self, retry_after: Optional[float] = None) -> None:
+        """
+        Slow down locally and pause every container for Retry-After.
+        
+        Args:
+            retry_after: Seconds from the Retry-After header, if present
+        """
+        super().on_throttled(retry_after)
+        now = time.time()
+        pause = min(retry_after or 0.0, self.max_pause_seconds)
+        try:
+            self.table.update_item(
+                Key={'bucket_id': self.bucket_id},
+                UpdateExpression='SET tokens = :zero, updated_at = :now, paused_until = :until',
+                ExpressionAttributeValues={
+                    ':zero': Decimal(0),
+                    ':now': _decimal(now),
+                    ':until': _decimal(now + pause)
+                }
+            )
+        except Exception as e:
+            logger.warning("Could not record InFlow throttling in shared rate limit: %s", e)
+    
+    def get_status(self) -> Dict[str, Any]:
+        """
+        Get bucket state (tokens and pause read from the shared item) and this process's metrics.
+        """
+        status = super().get_status()
+        status['bucket_id'] = self.bucket_id
+        try:
+            item = self.table.get_item(Key={'bucket_id': self.bucket_id}, ConsistentRead=True).get('Item')
+        except Exception:
+            return status
+        if item:
+            now = time.time()
+            elapsed = max(0.0, now - float(item['updated_at']))
+            status['tokens'] = round(min(self.capacity, float(item['tokens']) + elapsed * self._rate), 2)
+            status['paused_seconds'] = round(max(0.0, float(item.get('paused_until', 0)) - now), 2)
+        return status
+
+
+def _decimal(value: float) -> Decimal:
+    """
+    Convert a float for DynamoDB (which rejects binary floats), to the millisecond.
+    """
+    return Decimal(str(round(value, 3)))
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a Retry-After header given in seconds (HTTP dates are ignored).
+    """
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def create_inflow_rate_limiter() -> Optional[TokenBucket]:
+    """
+    Create the InFlow limiter from configuration (None when disabled).
+    """
+    if config.INFLOW_RATE_LIMIT_PER_MINUTE <= 0:
+        return None
+    if config.INFLOW_RATE_LIMIT_BACKEND == 'dynamodb':
+        try:
+            return DynamoDBTokenBucket(
+                bucket_id=f"inflow:{config.INFLOW_COMPANY_ID or 'default'}",
+                rate_per_minute=config.INFLOW_RATE_LIMIT_PER_MINUTE,
+                burst=config.INFLOW_RATE_LIMIT_BURST,
+                max_pause_seconds=config.INFLOW_RATE_LIMIT_MAX_PAUSE_SECONDS,
+                table_name=config.INFLOW_RATE_LIMIT_TABLE,
+                region_name=config.DYNAMODB_REGION,
+                endpoint_url=config.DYNAMODB_ENDPOINT_URL
+            )
+        except Exception as e:
+            logger.warning("Could not initialize shared InFlow rate limit, using local bucket: %s", e)
+    return TokenBucket(
+        rate_per_minute=config.INFLOW_RATE_LIMIT_PER_MINUTE,
+        burst=config.INFLOW_RATE_LIMIT_BURST,
+        max_pause_seconds=config.INFLOW_RATE_LIMIT_MAX_PAUSE_SECONDS
+    )
@@ -0,0 +1,542 @@
+"""
+Retries, deadlines and circuit breakers for outbound API calls.
+
+Every client (InFlow, Outlook, SharePoint, OneDrive - sync and async) runs
+its requests through call_with_retries(), which:
+
+- gives the whole call a deadline and each attempt a timeout bounded by it,
+- retries only transient failures (connection errors, timeouts, 408/5xx),
+  waiting with decorrelated jitter so clients do not retry in lockstep,
+- raises other errors (e.g. 4xx) immediately, and
+- records the outcome in the dependency's CircuitBreaker. After
+  failure_threshold consecutive failures the breaker opens and calls fail
+  with CircuitOpenError without touching the network; after reset_seconds
+  one probe call is let through and its outcome closes or reopens it.
+
+Breakers are kept per dependency in a registry (get_breaker) so the sync
+and async clients of one API share state, and breaker_status() reports all
+of them for /monitor/status. graph_request() / graph_request_async() wrap
+a Microsoft Graph call in all of the above.
+
+deadline_scope() sets an ambient budget (e.g. what is left of the Lambda
+invocation, or one validator's time limit) in a context variable. Every
+call_with_retries() inside the block shortens its own deadline to it, so
+attempt timeouts and retries stop when the budget runs out.
+"""
+
+import asyncio
+import contextvars
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, Iterator, Optional, Tuple, TypeVar
+
+import requests
+
+try:
+    import aiohttp
+except ImportError:  # Optional dependency - only needed for SERVER_MODE=async
+    aiohttp = None
+
+from app.config import config
+from app.utils.log import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar('T')
+
+
+# Breaker states
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+# HTTP statuses worth retrying (InFlow 429s are paced by the rate limiter instead)
+TRANSIENT_STATUSES = frozenset({408, 500, 502, 503, 504})
+GRAPH_TRANSIENT_STATUSES = TRANSIENT_STATUSES | {429}
+# Statuses Graph returns without acting on the request - the only ones safe to
+# retry for calls that are not idempotent (sendMail)
+GRAPH_NOT_PROCESSED_STATUSES = frozenset({429, 503})
+
+
+class CircuitOpenError(Exception):
+    """
+    Raised instead of calling a dependency whose circuit breaker is open.
+    """
+    
+    def __init__(self, name: str, retry_in: float):
+        self.name = name
+        self.retry_in = retry_in
+        super().__init__(f"{name} is unavailable (circuit open, next attempt in {retry_in:.0f}s)")
+
+
+class DeadlineExceeded(TimeoutError):
+    """
+    Raised when a call's deadline passes before it could complete.
+    """
+
+
+class TransientError(Exception):
+    """
+    A failed response worth retrying (dependency overloaded or temporarily down).
+    """
+    
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
+
+class CircuitBreaker:
+    """
+    Thread-safe consecutive-failure circuit breaker for one dependency.
+    """
+    
+    def __init__(self, name: str, failure_threshold: int = 5, reset_seconds: float = 30.0):
+        """
+        Initialize the breaker (closed).
+        
+        Args:
+            name: Dependency name shown in status and errors
+            failure_threshold: Consecutive failures that open the circuit
+            reset_seconds: Time the circuit stays open before a probe call
+        """
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_seconds = reset_seconds
+        
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._stats = {'calls': 0, 'failures': 0, 'rejected': 0, 'opened': 0}
+    
+    def before_call(self) -> None:
+        """
+        Admit a call or fail fast.
+        
+        Raises:
+            CircuitOpenError: If the circuit is open, or half-open with a probe already running
+        """
+        with self._lock:
+            if self._state == OPEN:
+                retry_in = self._opened_at + self.reset_seconds - time.monotonic()
+                if retry_in > 0:
+                    self._stats['rejected'] += 1
+                    raise CircuitOpenError(self.name, retry_in)
+                self._state = HALF_OPEN
+                self._probe_in_flight = False
+            
+            if self._state == HALF_OPEN:
+                if self._probe_in_flight:
+                    self._stats['rejected'] += 1
+                    raise CircuitOpenError(self.name, 0.0)
+                self._probe_in_flight = True
+            
+            self._stats['calls'] += 1
+    
+    def record_success(self) -> None:
+        """
+        Record a call the dependency answered (closes a half-open circuit).
+        """
+        with self._lock:
+            if self._state != CLOSED:
+                logger.info("Circuit for %s closed", self.name)
+            self._state = CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+    
+    def release_probe(self) -> None:
+        """
+        Record a call that never reached the dependency (state and failure count are unchanged).
+        """
+        with self._lock:
+            self._probe_in_flight = False
+    
+    def record_failure(self) -> None:
+        """
+        Record a failed call (opens the circuit at the threshold or after a failed probe).
+        """
+        with self._lock:
+            self._stats['failures'] += 1
+            self._failures += 1
+            self._probe_in_flight = False
+            if self._state == HALF_OPEN or (self._state == CLOSED and self._failures >= self.failure_threshold):
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+                self._stats['opened'] += 1
+                logger.warning("Circuit for %s opened after %d consecutive failures", self.name, self._failures)
+    
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state
+    
+    def get_status(self) -> Dict[str, Any]:
+        """
+        Get breaker state and counters.
+        
+        Returns:
+            Dictionary with state, consecutive failures, seconds until the next
+            probe (when open) and call/failure/rejection counters
+        """
+        with self._lock:
+            retry_in = self._opened_at + self.reset_seconds - time.monotonic() if self._state == OPEN else 0.0
+            return {
+                'state': self._state,
+                'consecutive_failures': self._failures,
+                'retry_in_seconds': round(max(0.0, retry_in), 1),
+                **self._stats
+            }
+
+
+class RetryPolicy:
+    """
+    Retry budget with decorrelated-jitter backoff.
+    """
+    
+    def __init__(self, max_attempts: int = 3, base_delay: float = 0.5, max_delay: float = 8.0,
+                 attempt_timeout: float = 30.0, deadline_seconds: float = 60.0):
+        """
+        Args:
+            max_attempts: Attempts per call, including the first
+            base_delay: Smallest wait between attempts (seconds)
+            max_delay: Largest wait between attempts (seconds)
+            attempt_timeout: Timeout of a single attempt (seconds)
+            deadline_seconds: Budget for the whole call, retries included
+        """
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.attempt_timeout = attempt_timeout
+        self.deadline_seconds = deadline_seconds
+    
+    def next_delay(self, previous: Optional[float]) -> float:
+        """
+        Decorrelated jitter: a random wait between the base delay and three times the previous one.
+        """
+        upper = max(self.base_delay, (previous or self.base_delay) * 3)
+        return min(self.max_delay, random.uniform(self.base_delay, upper))
+
+
+class Deadline:
+    """
+    Point in time by which a call must finish.
+    """
+    
+    def __init__(self, seconds: float):
+        self.expires_at = time.monotonic() + seconds
+    
+    def remaining(self) -> float:
+        return self.expires_at - time.monotonic()
+    
+    def check(self) -> None:
+        """
+        Cooperative cancellation point for long-running work.
+        
+        Raises:
+            DeadlineExceeded: If no time is left
+        """
+        if self.remaining() <= 0:
+            raise DeadlineExceeded("Deadline exceeded")
+    
+    def timeout(self, cap: float) -> float:
+        """
+        Timeout for the next attempt: the cap, or what is left of the deadline if less.
+        
+        Raises:
+            DeadlineExceeded: If no time is left
+        """
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise DeadlineExceeded("Deadline exceeded before the request could be sent")
+        return min(cap, remaining)
+
+
+# Ambient budget of the current request / validator (see deadline_scope)
+_ambient_deadline: contextvars.ContextVar = contextvars.ContextVar('ambient_deadline', default=None)
+
+
+def current_deadline() -> Optional[Deadline]:
+    """
+    Get the ambient deadline set by the innermost deadline_scope(), if any.
+    """
+    return _ambient_deadline.get()
+
+
+@contextmanager
+def deadline_scope(seconds: Optional[float]) -> Iterator[Optional[Deadline]]:
+    """
+    Bound all outbound calls in the block to a time budget.
+    
+    An enclosing scope that ends sooner stays in force. Context variables are
+    not inherited by thread pools, so work handed to another thread needs its
+    own scope (see ValidationService) or contextvars.copy_context().
+    
+    Args:
+        seconds: Budget from now (None or <= 0 keeps the enclosing budget only)
+    
+    Yields:
+        The deadline in force inside the block (None if unbounded)
+    """
+    outer = _ambient_deadline.get()
+    deadline = outer
+    if seconds is not None and seconds > 0 and (outer is None or outer.remaining() > seconds):
+        deadline = Deadline(seconds)
+    token = _ambient_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _ambient_deadline.reset(token)
+
+
+def _call_deadline(seconds: float) -> Deadline:
+    """
+    Deadline of one call_with_retries(): its own budget, or the ambient one if sooner.
+    """
+    ambient = _ambient_deadline.get()
+    if ambient is not None and ambient.remaining() < seconds:
+        return ambient
+    return Deadline(seconds)
+
+
+def is_transient(error: BaseException) -> bool:
+    """
+    Default retry classification for requests-based clients.
+    """
+    if isinstance(error, TransientError):
+        return True
+    if isinstance(error, requests.exceptions.HTTPError):
+        return error.response is not None and error.response.status_code in TRANSIENT_STATUSES
+    return isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout))
+
+
+def is_transient_aiohttp(error: BaseException) -> bool:
+    """
+    Default retry classification for aiohttp-based clients.
+    """
+    if isinstance(error, TransientError):
+        return True
+    if isinstance(error, aiohttp.ClientResponseError):
+        return error.status in TRANSIENT_STATUSES
+    return isinstance(error, (aiohttp.ClientError, asyncio.TimeoutError))
+
+
+def call_with_retries(attempt: Callable[[Deadline], T], breaker: Optional[CircuitBreaker],
+                      policy: RetryPolicy, retryable: Callable[[BaseException], bool] = is_transient,
+                      is_failure: Optional[Callable[[BaseException], bool]] = None) -> T:
+    """
+    Run attempt(deadline) until it succeeds, fails permanently or the budget runs out.
+    
+    The budget is policy.deadline_seconds, or the ambient deadline_scope() if it ends sooner.
+    
+    Args:
+        attempt: Performs one request; use deadline.timeout(cap) as its timeout
+        breaker: Dependency circuit breaker (None = no breaker)
+        policy: Retry budget and backoff
+        retryable: Whether an error is a transient failure worth retrying
+        is_failure: Whether an error counts against the breaker (default: retryable)
+    
+    Returns:
+        The attempt's result
+    
+    Raises:
+        CircuitOpenError: If the breaker is open
+        Exception: The last error when it is not retryable or the budget is spent
+    """
+    deadline = _call_deadline(policy.deadline_seconds)
+    delay = None
+    for attempt_number in range(1, policy.max_attempts + 1):
+        if breaker:
+            breaker.before_call()
+        try:
+            result = attempt(deadline)
+        except DeadlineExceeded:
+            if breaker:
+                breaker.release_probe()  # Nothing was sent - says nothing about the dependency
+            raise
+        except Exception as e:
+            if breaker:
+                if (is_failure or retryable)(e):
+                    breaker.record_failure()
+                else:
+                    # The dependency answered (e.g. 404): it is up, and retrying will not help
+                    breaker.record_success()
+            if not retryable(e):
+                raise
+            delay = policy.next_delay(delay)
+            if (attempt_number == policy.max_attempts or delay >= deadline.remaining()
+                    or (breaker and breaker.state == OPEN)):
+                raise
+            logger.warning("%s request failed (%s), retrying in %.1fs (attempt %d/%d)",
+                           breaker.name if breaker else 'Outbound', e, delay, attempt_number, policy.max_attempts)
+            time.sleep(delay)
+            continue
+        if breaker:
+            breaker.record_success()
+        return result
+    raise RuntimeError("unreachable")
+
+
+async def call_with_retries_async(attempt: Callable[[Deadline], Awaitable[T]], breaker: Optional[CircuitBreaker],
+                                  policy: RetryPolicy, retryable: Callable[[BaseException], bool] = is_transient_aiohttp,
+                                  is_failure: Optional[Callable[[BaseException], bool]] = None) -> T:
+    """
+    Asyncio variant of call_with_retries() (waits without blocking the event loop).
+    """
+    deadline = _call_deadline(policy.deadline_seconds)
+    delay = None
+    for attempt_number in range(1, policy.max_attempts + 1):
+        if breaker:
+            breaker.before_call()
+        try:
+            result = await attempt(deadline)
+        except DeadlineExceeded:
+            if breaker:
+                breaker.release_probe()
+            raise
+        except Exception as e:
+            if breaker:
+                if (is_failure or retryable)(e):
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+            if not retryable(e):
+                raise
+            delay = policy.next_delay(delay)
+            if (attempt_number == policy.max_attempts or delay >= deadline.remaining()
+                    or (breaker and breaker.state == OPEN)):
+                raise
+            logger.warning("%s request failed (%s), retrying in %.1fs (attempt %d/%d)",
+                           breaker.name if breaker else 'Outbound', e, delay, attempt_number, policy.max_attempts)
+            await asyncio.sleep(delay)
+            continue
+        if breaker:
+            breaker.record_success()
+        return result
+    raise RuntimeError("unreachable")
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    """
+    Get (or create from configuration) the circuit breaker for a dependency.
+    
+    Args:
+        name: Dependency name, e.g. 'inflow' or 'outlook'
+    """
+    with _breakers_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                name,
+                failure_threshold=config.CIRCUIT_BREAKER_FAILURE_THRESHOLD,
+                reset_seconds=config.CIRCUIT_BREAKER_RESET_SECONDS
+            )
+            _breakers[name] = breaker
+        return breaker
+
+
+def breaker_status() -> Dict[str, Dict[str, Any]]:
+    """
+    Get the status of every dependency's circuit breaker.
+    """
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {breaker.name: breaker.get_status() for breaker in breakers}
+
+
+def inflow_retry_policy() -> RetryPolicy:
+    """
+    Retry policy for InFlow API calls, from configuration.
+    """
+    return RetryPolicy(
+        max_attempts=config.RETRY_MAX_ATTEMPTS,
+        base_delay=config.RETRY_BASE_DELAY_SECONDS,
+        max_delay=config.RETRY_MAX_DELAY_SECONDS,
+        attempt_timeout=config.INFLOW_REQUEST_TIMEOUT_SECONDS,
+        deadline_seconds=config.INFLOW_DEADLINE_SECONDS
+    )
+
+
+def graph_retry_policy() -> RetryPolicy:
+    """
+    Retry policy for Microsoft Graph calls (Outlook, SharePoint, OneDrive), from configuration.
+    """
+    return RetryPolicy(
+        max_attempts=config.RETRY_MAX_ATTEMPTS,
+        base_delay=config.RETRY_BASE_DELAY_SECONDS,
+        max_delay=config.RETRY_MAX_DELAY_SECONDS,
+        attempt_timeout=config.GRAPH_REQUEST_TIMEOUT_SECONDS,
+        deadline_seconds=config.GRAPH_DEADLINE_SECONDS
+    )
+
+
+def graph_request(dependency: str, method: str, url: str, idempotent: bool = True, **kwargs) -> requests.Response:
+    """
+    Send a Microsoft Graph request under the dependency's retry policy and circuit breaker.
+    
+    Args:
+        dependency: Breaker name ('outlook', 'sharepoint' or 'onedrive')
+        method: HTTP method
+        url: Graph URL
+        idempotent: False for calls that must not be repeated once Graph may have
+            acted on them (only connect failures and 429/503 are retried)
+        **kwargs: Additional arguments to pass to requests
+    
+    Returns:
+        The response (callers check the status of permanent failures)
+    
+    Raises:
+        TransientError: If Graph kept failing until the retry budget ran out
+        CircuitOpenError: If the dependency's circuit is open
+    """
+    policy = graph_retry_policy()
+    statuses = GRAPH_TRANSIENT_STATUSES if idempotent else GRAPH_NOT_PROCESSED_STATUSES
+    
+    def attempt(deadline: Deadline) -> requests.Response:
+        response = requests.request(method, url, timeout=deadline.timeout(policy.attempt_timeout), **kwargs)
+        if response.status_code in statuses:
+            raise TransientError(f"{dependency} returned {response.status_code} - {response.text}",
+                                 response.status_code)
+        return response
+    
+    def retryable(error: BaseException) -> bool:
+        if idempotent:
+            return is_transient(error)
+        return isinstance(error, (TransientError, requests.exceptions.ConnectTimeout))
+    
+    return call_with_retries(attempt, get_breaker(dependency), policy, retryable, is_failure=is_transient)
+
+
+async def graph_request_async(session: 'aiohttp.ClientSession', dependency: str, method: str, url: str,
+                              idempotent: bool = True, **kwargs) -> Tuple[int, bytes]:
+    """
+    Asyncio variant of graph_request() on an aiohttp session.
+    
+    Returns:
+        Response status and body
+    """
+    policy = graph_retry_policy()
+    statuses = GRAPH_TRANSIENT_STATUSES if idempotent else GRAPH_NOT_PROCESSED_STATUSES
+    
+    async def attempt(deadline: Deadline) -> Tuple[int, bytes]:
+        timeout = aiohttp.ClientTimeout(total=deadline.timeout(policy.attempt_timeout))
+        async with session.request(method, url, timeout=timeout, **kwargs) as response:
+            body = await response.read()
+            if response.status in statuses:
+                raise TransientError(f"{dependency} returned {response.status} - "
+                                     f"{body.decode('utf-8', errors='replace')}", response.status)
+            return response.status, body
+    
+    def retryable(error: BaseException) -> bool:
+        if idempotent:
+            return is_transient_aiohttp(error)
+        return isinstance(error, (TransientError, aiohttp.ClientConnectorError))
+    
+    return await call_with_retries_async(attempt, get_breaker(dependency), policy, retryable,
+                                         is_failure=is_transient_aiohttp)
@@ -1,80 +1,65 @@
 """
 Validators package for InFlow Error Check Gate.
 Exports all validator classes for easy importing.
+
+The rule files have hyphenated names (rule-N-name.py) that an import statement
+cannot reach. Each one is loaded here and registered in sys.modules as
+app.validators.rule_N_name, so its classes can also be imported by that name,
+named in VALIDATOR_PLUGINS and pickled for worker processes.
 """
 
 # Import validators using importlib to handle filenames with hyphens
 import importlib.util
 import os
+import sys
 
 # Get the directory of this __init__.py file
 _validators_dir = os.path.dirname(__file__)
 
-# Import OrderFetcher from rule-0-order_fetcher.py
-_spec_0 = importlib.util.spec_from_file_location(
-    "rule_0_order_fetcher",
-    os.path.join(_validators_dir, "rule-0-order_fetcher.py")
-)
-_rule_0_module = importlib.util.module_from_spec(_spec_0)
-_spec_0.loader.exec_module(_rule_0_module)
-OrderFetcher = _rule_0_module.OrderFetcher
 
-# Import DiscountValidator from rule-1-discount.py
-_spec_1 = importlib.util.spec_from_file_location(
-    "rule_1_discount",
-    os.path.join(_validators_dir, "rule-1-discount.py")
-)
-_rule_1_module = importlib.util.module_from_spec(_spec_1)
-_spec_1.loader.exec_module(_rule_1_module)
-DiscountValidator = _rule_1_module.DiscountValidator
+def _load_rule_module(filename: str):
+    """
+    Load a rule file as the importable module app.validators.<name with '_' for '-'>.
+    """
+    short_name = filename[:-len('.py')].replace('-', '_')
+    module_name = f"{__name__}.{short_name}"
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(_validators_dir, filename))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[module_name]
+        raise
+    globals()[short_name] = module
+    return module
+
+
+# Rule 0: OrderFetcher from rule-0-order_fetcher.py
+OrderFetcher = _load_rule_module("rule-0-order_fetcher.py").OrderFetcher
 
-# Import CreditCardFeeValidator from rule-2-credit_card.py
-_spec_2 = importlib.util.spec_from_file_location(
-    "rule_2_credit_card",
-    os.path.join(_validators_dir, "rule-2-credit_card.py")
-)
-_rule_2_module = importlib.util.module_from_spec(_spec_2)
-_spec_2.loader.exec_module(_rule_2_module)
-CreditCardFeeValidator = _rule_2_module.CreditCardFeeValidator
+# Rule 1: DiscountValidator from rule-1-discount.py
+DiscountValidator = _load_rule_module("rule-1-discount.py").DiscountValidator
 
-# Import AssemblyFeeValidator from rule-3-assembly_fee.py
-_spec_3 = importlib.util.spec_from_file_location(
-    "rule_3_assembly_fee",
-    os.path.join(_validators_dir, "rule-3-assembly_fee.py")
-)
-_rule_3_module = importlib.util.module_from_spec(_spec_3)
-_spec_3.loader.exec_module(_rule_3_module)
-AssemblyFeeValidator = _rule_3_module.AssemblyFeeValidator
+# Rule 2: CreditCardFeeValidator from rule-2-credit_card.py
+CreditCardFeeValidator = _load_rule_module("rule-2-credit_card.py").CreditCardFeeValidator
 
-# Import DeliveryFeeValidator from rule-4-delivery_fee.py
-_spec_4 = importlib.util.spec_from_file_location(
-    "rule_4_delivery_fee",
-    os.path.join(_validators_dir, "rule-4-delivery_fee.py")
-)
-_rule_4_module = importlib.util.module_from_spec(_spec_4)
-_spec_4.loader.exec_module(_rule_4_module)
-DeliveryFeeValidator = _rule_4_module.DeliveryFeeValidator
+# Rule 3: AssemblyFeeValidator from rule-3-assembly_fee.py
+AssemblyFeeValidator = _load_rule_module("rule-3-assembly_fee.py").AssemblyFeeValidator
 
-# Import DiscountRemarkValidator from rule-5-discount_remark.py
-_spec_5 = importlib.util.spec_from_file_location(
-    "rule_5_discount_remark",
-    os.path.join(_validators_dir, "rule-5-discount_remark.py")
-)
-_rule_5_module = importlib.util.module_from_spec(_spec_5)
-_spec_5.loader.exec_module(_rule_5_module)
-DiscountRemarkValidator = _rule_5_module.DiscountRemarkValidator
+# Rule 4: DeliveryFeeValidator from rule-4-delivery_fee.py
+DeliveryFeeValidator = _load_rule_module("rule-4-delivery_fee.py").DeliveryFeeValidator
 
-# Import ReturnReasonValidator from rule-6-return_reason.py
-_spec_6 = importlib.util.spec_from_file_location(
-    "rule_6_return_reason",
-    os.path.join(_validators_dir, "rule-6-return_reason.py")
-)
-_rule_6_module = importlib.util.module_from_spec(_spec_6)
-_spec_6.loader.exec_module(_rule_6_module)
-ReturnReasonValidator = _rule_6_module.ReturnReasonValidator
+# Rule 5: DiscountRemarkValidator from rule-5-discount_remark.py
+DiscountRemarkValidator = _load_rule_module("rule-5-discount_remark.py").DiscountRemarkValidator
+
+# Rule 6: ReturnReasonValidator from rule-6-return_reason.py
+ReturnReasonValidator = _load_rule_module("rule-6-return_reason.py").ReturnReasonValidator
 
 # Import other validators
 # TODO: Add other validator imports as they are implemented
 
 __all__ = ['OrderFetcher', 'DiscountValidator', 'CreditCardFeeValidator', 'AssemblyFeeValidator', 'DeliveryFeeValidator', 'DiscountRemarkValidator', 'ReturnReasonValidator']
-
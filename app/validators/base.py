@@ -1,5 +1,28 @@
-from abc import ABC, abstractmethod
-from typing import Dict, Any, List
+import functools
+import inspect
+from abc import ABC
+from typing import Dict, Any, Callable, List, Optional
+from app.validators.order_summary import OrderSummary
+from app.utils.resilience import Deadline
+
+
+# Raw line fields the OrderFetcher formats into fetched_data['line_items'].
+# Validators that read line_items include these in their fingerprint_fields.
+LINE_ITEM_FIELDS = [
+    'lines[].productId',
+    'lines[].product.name',
+    'lines[].product.sku',
+    'lines[].quantity',
+    'lines[].unitPrice',
+    'lines[].discount',
+    'lines[].lineTotal',
+    'lines[].total',
+    'lines[].subTotal',
+]
+
+# Rule name of the OrderFetcher, which formats the order into fetched_data.
+# Rules that read fetched_data list it in depends_on.
+ORDER_FETCHER_RULE = 'Order Data Fetcher'
 
 
 class ValidationResult:
@@ -71,13 +94,101 @@ class ValidationResult:
             'suggested_fixes': self.suggested_fixes,
             'info_messages': self.info_messages
         }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'ValidationResult':
+        """
+        Rebuild a validation result from its dictionary form.
+        
+        Args:
+            data: Dictionary produced by to_dict()
+        
+        Returns:
+            ValidationResult object
+        """
+        result = cls(data['rule'], data.get('passed', True))
+        result.issues = list(data.get('issues', []))
+        result.suggested_fixes = list(data.get('suggested_fixes', []))
+        result.info_messages = list(data.get('info_messages', []))
+        return result
+
+
+class ValidationContext:
+    """
+    Everything a validator receives for one order (validator protocol v2).
+    
+    Holds plain data only, so it can be pickled and handed to a worker process.
+    Long-running rules call check_deadline() between steps so they stop once
+    their time is up.
+    """
+    
+    def __init__(self, order_data: Dict[Any, Any], fetched_data: Optional[Dict[str, Any]] = None,
+                 summary: Optional[OrderSummary] = None, deadline: Optional[Deadline] = None):
+        """
+        Initialize the context.
+        
+        Args:
+            order_data: Complete sales order data from InFlow
+            fetched_data: Data the rule's dependencies produced (None if there is none)
+            summary: Precomputed order summary (built from order_data if omitted)
+            deadline: When the rule's time budget runs out (None if unbounded)
+        """
+        self.order_data = order_data
+        self.fetched_data = fetched_data
+        self.summary = summary if summary is not None else OrderSummary(order_data)
+        self.deadline = deadline
+    
+    @property
+    def order_id(self) -> str:
+        return self.order_data.get('salesOrderId', 'unknown')
+    
+    @property
+    def order_number(self) -> str:
+        return self.order_data.get('orderNumber', 'N/A')
+    
+    def check_deadline(self) -> None:
+        """
+        Stop the rule if its time budget is spent.
+        
+        Raises:
+            DeadlineExceeded: If the deadline has passed (the rule is reported as timed out)
+        """
+        if self.deadline is not None:
+            self.deadline.check()
 
 
 class BaseValidator(ABC):
     """
     Abstract base class for all validation rules.
+    
+    Protocol v2 rules override check(context). Protocol v1 rules override
+    validate(order_data) or validate(order_data, fetched_data=None) and keep
+    working unchanged; resolve_dispatch() picks the call once at registration.
     """
     
+    # Order fields this rule reads, as dotted paths (e.g. 'customFields',
+    # 'lines[].discount'). Orders whose declared fields are unchanged reuse the
+    # cached result. None means the rule is always re-run.
+    fingerprint_fields: Optional[List[str]] = None
+    
+    # Set to False for rules that depend on data outside the order
+    # (e.g. SharePoint records), so their results are never cached
+    cacheable: bool = True
+    
+    # InFlow relationships this rule reads (include= paths, e.g. 'lines.product').
+    # Sales orders are fetched with the union over all registered rules, the
+    # logger and the notification service
+    required_includes: List[str] = []
+    
+    # Rule names whose results this rule needs. It runs once they have finished
+    # and receives their fetched_data; rules with no dependency between them
+    # run concurrently
+    depends_on: List[str] = []
+    
+    # Seconds this rule may run per order (None uses VALIDATOR_TIMEOUT_SECONDS,
+    # 0 lets it use whatever is left of the request deadline)
+    timeout_seconds: Optional[float] = None
+    
     def __init__(self, rule_name: str):
         """
         Initialize the base validator.
@@ -87,10 +198,21 @@ class BaseValidator(ABC):
         """
         self.rule_name = rule_name
     
-    @abstractmethod
+    def check(self, context: ValidationContext) -> ValidationResult:
+        """
+        Validate an order (protocol v2).
+        
+        Args:
+            context: Order data, dependency data and order summary
+        
+        Returns:
+            ValidationResult object containing validation results
+        """
+        raise NotImplementedError
+    
     def validate(self, order_data: Dict[Any, Any]) -> ValidationResult:
         """
-        Validate the order data.
+        Validate the order data (protocol v1).
         
         Args:
             order_data: Complete sales order data from InFlow
@@ -98,7 +220,23 @@ class BaseValidator(ABC):
         Returns:
             ValidationResult object containing validation results
         """
-        pass
+        raise NotImplementedError
+    
+    def applies_to(self, summary: OrderSummary) -> bool:
+        """
+        Check whether this rule has anything to check on an order.
+        
+        Rules with a trigger (e.g. a Z_ line item) override this with a cheap
+        check so the service can skip them without calling validate(). It must
+        never return False for an order the rule could flag.
+        
+        Args:
+            summary: Precomputed summary of the order
+        
+        Returns:
+            False to skip the rule for this order
+        """
+        return True
     
     def _get_line_items(self, order_data: Dict[Any, Any]) -> List[Dict[Any, Any]]:
         """
@@ -142,3 +280,35 @@ class BaseValidator(ABC):
         
         return matching_items
 
+
+def resolve_dispatch(validator: BaseValidator) -> Callable[[ValidationContext], ValidationResult]:
+    """
+    Decide once how a validator is called, instead of probing it on every order.
+    
+    Args:
+        validator: Validator being registered
+    
+    Returns:
+        Callable taking a ValidationContext (picklable when the validator is)
+    
+    Raises:
+        TypeError: If the validator implements neither check() nor validate()
+    """
+    validator_class = type(validator)
+    if validator_class.check is not BaseValidator.check:
+        return validator.check
+    if validator_class.validate is BaseValidator.validate:
+        raise TypeError(f"Validator '{validator.rule_name}' implements neither check(context) nor validate(order_data)")
+    
+    parameters = inspect.signature(validator.validate).parameters.values()
+    if any(p.name == 'fetched_data' or p.kind is inspect.Parameter.VAR_KEYWORD for p in parameters):
+        return functools.partial(_validate_with_fetched_data, validator)
+    return functools.partial(_validate_order_data, validator)
+
+
+def _validate_with_fetched_data(validator: BaseValidator, context: ValidationContext) -> ValidationResult:
+    return validator.validate(context.order_data, fetched_data=context.fetched_data)
+
+
+def _validate_order_data(validator: BaseValidator, context: ValidationContext) -> ValidationResult:
+    return validator.validate(context.order_data)
@@ -0,0 +1,54 @@
+from typing import Dict, Any
+
+
+class OrderSummary:
+    """
+    Cheap facts about a sales order, computed once per validation before any rule runs.
+    
+    Validators check them in applies_to() so the service can skip rules whose
+    trigger (e.g. a Z_DISCOUNT line or a return line) is absent without calling
+    validate(). Names, SKUs and quantities are read the way the OrderFetcher
+    formats them, so a rule is never skipped for an order it would flag.
+    """
+    
+    def __init__(self, order_data: Dict[Any, Any]):
+        """
+        Summarize an order.
+        
+        Args:
+            order_data: Complete sales order data from InFlow
+        """
+        lines = order_data.get('lines', [])
+        if not lines:
+            lines = order_data.get('lineItems', [])
+        
+        self.line_count = len(lines)
+        self.payment_line_count = len(order_data.get('paymentLines') or [])
+        self.has_return_lines = False
+        
+        # Upper-cased product names and SKUs of all lines
+        self._labels = set()
+        for line in lines:
+            product = line.get('product', {})
+            if isinstance(product, dict):
+                self._labels.add(str(product.get('name') or '').upper())
+                self._labels.add(str(product.get('sku') or '').upper())
+            
+            quantity = line.get('quantity', {})
+            if isinstance(quantity, dict):
+                quantity = quantity.get('standardQuantity', '0')
+            try:
+                if float(quantity) < 0:
+                    self.has_return_lines = True
+            except (ValueError, TypeError):
+                pass
+    
+    def has_item(self, marker: str) -> bool:
+        """
+        Check whether any line's product name or SKU contains a marker (case-insensitive).
+        
+        Args:
+            marker: Text to look for, e.g. 'Z_DISCOUNT'
+        """
+        marker = marker.upper()
+        return any(marker in label for label in self._labels)
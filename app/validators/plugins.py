@@ -0,0 +1,82 @@
+"""
+Loading validators by importable name or from installed entry points.
+
+A spec names a validator class (or instance) as 'package.module:ClassName',
+e.g. 'app.validators.rule_2_credit_card:CreditCardFeeValidator'. Installed
+packages can provide validators in the ENTRY_POINT_GROUP entry point group,
+each entry pointing at a validator class the same way.
+"""
+
+import importlib
+import importlib.metadata
+from typing import Any, List
+
+from app.validators.base import BaseValidator
+from app.utils.log import get_logger
+
+logger = get_logger(__name__)
+
+ENTRY_POINT_GROUP = 'inflow_error_gate.validators'
+
+
+def load_validator(spec: str) -> BaseValidator:
+    """
+    Import and instantiate a validator from a 'module:ClassName' spec.
+    
+    Args:
+        spec: Importable module name and attribute, separated by ':'
+    
+    Returns:
+        Validator instance
+    
+    Raises:
+        ValueError: If the spec is malformed
+        ImportError: If the module cannot be imported
+        TypeError: If the attribute is not a validator
+    """
+    module_name, _, attribute = spec.strip().partition(':')
+    if not module_name or not attribute:
+        raise ValueError(f"Validator spec must look like 'package.module:ClassName', got {spec!r}")
+    
+    target: Any = importlib.import_module(module_name)
+    for part in attribute.split('.'):
+        try:
+            target = getattr(target, part)
+        except AttributeError:
+            raise ImportError(f"{module_name!r} has no attribute {attribute!r}") from None
+    return _instantiate(target, spec)
+
+
+def entry_point_validators(group: str = ENTRY_POINT_GROUP) -> List[BaseValidator]:
+    """
+    Instantiate the validators installed packages provide in an entry point group.
+    
+    Entries that fail to load are logged and skipped.
+    
+    Args:
+        group: Entry point group name
+    
+    Returns:
+        Validator instances in entry point name order
+    """
+    entry_points = importlib.metadata.entry_points()
+    if hasattr(entry_points, 'select'):
+        selected = entry_points.select(group=group)
+    else:  # Python < 3.10
+        selected = entry_points.get(group, [])
+    
+    validators = []
+    for entry_point in sorted(selected, key=lambda ep: ep.name):
+        try:
+            validators.append(_instantiate(entry_point.load(), entry_point.value))
+        except Exception as e:
+            logger.exception("Could not load validator entry point '%s' (%s): %s", entry_point.name, entry_point.value, e)
+    return validators
+
+
+def _instantiate(target: Any, spec: str) -> BaseValidator:
+    if isinstance(target, type) and issubclass(target, BaseValidator):
+        return target()
+    if isinstance(target, BaseValidator):
+        return target
+    raise TypeError(f"{spec!r} is not a BaseValidator subclass or instance")
@@ -1,5 +1,5 @@
 from typing import Dict, Any, List
-from app.validators.base import BaseValidator, ValidationResult
+from app.validators.base import BaseValidator, ValidationResult, ORDER_FETCHER_RULE
 
 
 class OrderFetcher(BaseValidator):
@@ -11,8 +11,11 @@ class OrderFetcher(BaseValidator):
     Other validators will use the formatted data from this fetcher.
     """
     
+    # Customer info is formatted when included; rules that read it declare 'customer'
+    required_includes = ['lines.product']
+    
     def __init__(self):
-        super().__init__("Order Data Fetcher")
+        super().__init__(ORDER_FETCHER_RULE)
     
     def validate(self, order_data: Dict[Any, Any]) -> ValidationResult:
         """
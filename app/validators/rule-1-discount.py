@@ -1,5 +1,5 @@
 from typing import Dict, Any
-from app.validators.base import BaseValidator, ValidationResult
+from app.validators.base import BaseValidator, ValidationResult, LINE_ITEM_FIELDS, ORDER_FETCHER_RULE
 
 
 class DiscountValidator(BaseValidator):
@@ -10,6 +10,10 @@ class DiscountValidator(BaseValidator):
     Uses pre-fetched data from OrderFetcher (Rule 0).
     """
     
+    fingerprint_fields = LINE_ITEM_FIELDS + ['subTotal', 'customer.discount']
+    required_includes = ['lines.product', 'customer']
+    depends_on = [ORDER_FETCHER_RULE]
+    
     def __init__(self):
         super().__init__("Discount Validation")
     
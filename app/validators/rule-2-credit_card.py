@@ -1,5 +1,5 @@
 from typing import Dict, Any
-from app.validators.base import BaseValidator, ValidationResult
+from app.validators.base import BaseValidator, ValidationResult, OrderSummary
 from app.config import config
 
 
@@ -10,9 +10,18 @@ class CreditCardFeeValidator(BaseValidator):
     Verify that a 3% credit card fee is correctly applied when payment method is credit card.
     """
     
+    fingerprint_fields = ['paymentLines', 'lines', 'subTotal', 'total']
+    required_includes = ['lines.product', 'paymentLines']
+    
     def __init__(self):
         super().__init__("Credit Card Fee Validation")
     
+    def applies_to(self, summary: OrderSummary) -> bool:
+        """
+        Only orders with payment lines can carry a credit card fee.
+        """
+        return summary.payment_line_count > 0
+    
     def validate(self, order_data: Dict[Any, Any]) -> ValidationResult:
         """
         Validate credit card fee for all orders.
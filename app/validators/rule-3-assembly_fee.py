@@ -1,21 +1,46 @@
 from typing import Dict, Any, Optional
-from app.validators.base import BaseValidator, ValidationResult
+from app.validators.base import BaseValidator, ValidationResult, OrderSummary, LINE_ITEM_FIELDS, ORDER_FETCHER_RULE
 from app.config import config
+from app.services.product_catalog_service import product_catalog_service
+from app.utils.log import get_logger
 import csv
 import os
 import re
 
+logger = get_logger(__name__)
+
 
 class AssemblyFeeValidator(BaseValidator):
     """
     Validator for Rule 3: Assembly Fee Validation
     
     Assembly fee should always be correct and must not have any discount applied.
+    
+    Product categories come from the local InFlow product mirror; the CSV in
+    app/validators/data is the fallback for products the mirror has not synced
+    and for mirror categories the fee table does not know.
     """
     
+    # Assembly fee per unit by product category (the CSV's category labels)
+    FEE_PER_UNIT = {
+        'Accessories': 0.0,
+        'Base Cabinet': 15.0,
+        'Vanity Cabinet': 15.0,
+        'Wall Cabinet': 15.0,
+        'Tall Cabinet': 30.0,
+    }
+    
+    fingerprint_fields = LINE_ITEM_FIELDS
+    required_includes = ['lines.product']
+    depends_on = [ORDER_FETCHER_RULE]
+    # Categories come from the product mirror, which syncs without the order changing
+    cacheable = False
+    
     def __init__(self):
         super().__init__("Assembly Fee Validation")
         self.product_categories = self._load_product_categories()
+        self.product_catalog = product_catalog_service
+        self._unknown_catalog_categories = set()
     
     def _load_product_categories(self) -> Dict[str, str]:
         """
@@ -64,7 +89,11 @@ class AssemblyFeeValidator(BaseValidator):
     
     def _get_product_category(self, product_name: str) -> Optional[str]:
         """
-        Get product category by looking up the search name.
+        Get product category from the product mirror, falling back to the
+        CSV lookup by search name.
+        
+        A mirror category that is not one of the fee table's labels (InFlow
+        naming it differently) is not trusted - the CSV decides instead.
         
         Args:
             product_name: Product name to look up
@@ -72,8 +101,19 @@ class AssemblyFeeValidator(BaseValidator):
         Returns:
             Product category or None if not found
         """
+        catalog_category = None
+        if self.product_catalog:
+            catalog_category = self.product_catalog.get_category(product_name)
+            if catalog_category in self.FEE_PER_UNIT:
+                return catalog_category
+        
         search_name = self._get_search_name_from_product(product_name)
-        return self.product_categories.get(search_name)
+        category = self.product_categories.get(search_name)
+        if catalog_category and catalog_category not in self._unknown_catalog_categories:
+            self._unknown_catalog_categories.add(catalog_category)
+            logger.warning("InFlow category '%s' (product %s) is not an assembly fee category - using the CSV (%s)",
+                           catalog_category, product_name, category or 'not listed')
+        return category
     
     def _calculate_assembly_fee_for_product(self, product_name: str, quantity: float) -> float:
         """
@@ -88,18 +128,14 @@ class AssemblyFeeValidator(BaseValidator):
         """
         category = self._get_product_category(product_name)
         
-        if not category:
-            return 0.0  # Default to free if category not found
-        
-        # Assembly fee rules based on category
-        if category == 'Accessories':
-            return 0.0
-        elif category in ['Base Cabinet', 'Vanity Cabinet', 'Wall Cabinet']:
-            return quantity * 15.0
-        elif category == 'Tall Cabinet':
-            return quantity * 30.0
-        else:
-            return 0.0  # Default to free for unknown categories
+        # Unknown or missing categories are free
+        return quantity * self.FEE_PER_UNIT.get(category, 0.0)
+    
+    def applies_to(self, summary: OrderSummary) -> bool:
+        """
+        Only orders with an assembly fee line are checked.
+        """
+        return summary.has_item('Z_ASSEMBLY FEE')
     
     def validate(self, order_data: Dict[Any, Any], fetched_data: Dict[Any, Any] = None) -> ValidationResult:
         """
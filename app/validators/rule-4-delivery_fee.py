@@ -1,7 +1,7 @@
 from typing import Dict, Any, Optional
 import io
 import pandas as pd
-from app.validators.base import BaseValidator, ValidationResult
+from app.validators.base import BaseValidator, ValidationResult, LINE_ITEM_FIELDS, ORDER_FETCHER_RULE
 
 
 class DeliveryFeeValidator(BaseValidator):
@@ -21,6 +21,12 @@ class DeliveryFeeValidator(BaseValidator):
     4. Shipment Quote Amount must not exceed orderFreight
     """
     
+    fingerprint_fields = LINE_ITEM_FIELDS + ['orderNumber', 'orderFreight']
+    required_includes = ['lines.product']
+    depends_on = [ORDER_FETCHER_RULE]
+    # Delivery records live in SharePoint and can change without the order changing
+    cacheable = False
+    
     def __init__(self):
         super().__init__("Delivery Fee Validation")
         # NO CACHING - removed self._delivery_records_cache
@@ -1,5 +1,5 @@
 from typing import Dict, Any
-from app.validators.base import BaseValidator, ValidationResult
+from app.validators.base import BaseValidator, ValidationResult, OrderSummary, LINE_ITEM_FIELDS, ORDER_FETCHER_RULE
 
 
 class DiscountRemarkValidator(BaseValidator):
@@ -10,9 +10,19 @@ class DiscountRemarkValidator(BaseValidator):
     remarks notes are present when Z_DISCOUNT is used.
     """
     
+    fingerprint_fields = LINE_ITEM_FIELDS + ['orderRemarks']
+    required_includes = ['lines.product']
+    depends_on = [ORDER_FETCHER_RULE]
+    
     def __init__(self):
         super().__init__("Discount Remark Validation")
     
+    def applies_to(self, summary: OrderSummary) -> bool:
+        """
+        Only orders with a Z_DISCOUNT line need remarks.
+        """
+        return summary.has_item('Z_DISCOUNT')
+    
     def validate(self, order_data: Dict[Any, Any], fetched_data: Dict[Any, Any] = None) -> ValidationResult:
         """
         Validate that remarks are present when Z_DISCOUNT is used.
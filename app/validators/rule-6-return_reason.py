@@ -1,5 +1,5 @@
 from typing import Dict, Any
-from app.validators.base import BaseValidator, ValidationResult
+from app.validators.base import BaseValidator, ValidationResult, OrderSummary, LINE_ITEM_FIELDS, ORDER_FETCHER_RULE
 
 
 class ReturnReasonValidator(BaseValidator):
@@ -10,9 +10,19 @@ class ReturnReasonValidator(BaseValidator):
     the "Return Reason (Require If Return)" field (Custom Field 4) is present.
     """
     
+    fingerprint_fields = LINE_ITEM_FIELDS + ['customFields']
+    required_includes = ['lines.product']
+    depends_on = [ORDER_FETCHER_RULE]
+    
     def __init__(self):
         super().__init__("Return Reason Validation")
     
+    def applies_to(self, summary: OrderSummary) -> bool:
+        """
+        Only orders with return (negative quantity) lines need a reason.
+        """
+        return summary.has_return_lines
+    
     def validate(self, order_data: Dict[Any, Any], fetched_data: Dict[Any, Any] = None) -> ValidationResult:
         """
         Validate that return reason is present when return items exist.
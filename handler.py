@@ -18,6 +18,58 @@ if 'AWS_LAMBDA_FUNCTION_NAME' in os.environ:
     os.makedirs('/tmp/logs', exist_ok=True)
 
 from app.main import app, initialize_validators
+from app.utils.log import get_logger
+from app.utils import json_codec
+from app.utils.resilience import current_deadline, deadline_scope
+
+logger = get_logger('app.handler')
+
+
+def _sync_product_catalog():
+    """
+    Bring this container's product mirror up to date when a sync is due.
+    
+    Containers have no background threads between invocations, so each
+    invocation spends at most PRODUCT_CATALOG_LAMBDA_PAGE_BUDGET pages; a cold
+    container completes its full sync over a few invocations. Called after the
+    invocation's own work, inside its deadline scope, so the sync only uses
+    the time that is left.
+    """
+    from app.config import config
+    from app.services.product_catalog_service import product_catalog_service
+    
+    if not product_catalog_service:
+        return
+    deadline = current_deadline()
+    if deadline is not None and deadline.remaining() <= 0:
+        logger.info("Product catalog sync skipped: no invocation time left")
+        return
+    try:
+        product_catalog_service.sync_if_due(max_pages=config.PRODUCT_CATALOG_LAMBDA_PAGE_BUDGET)
+    except Exception as e:
+        # Validators fall back to the bundled CSV; retried on the next invocation
+        logger.warning("Product catalog sync skipped: %s", e)
+
+
+def _invocation_deadline(context):
+    """
+    Bound the invocation's outbound calls and validators to the time Lambda has left.
+    
+    Keeps LAMBDA_DEADLINE_MARGIN_SECONDS in reserve so a slow InFlow or Graph
+    call times out (and the run is reported) before Lambda kills the container.
+    
+    Args:
+        context: Lambda context object (None outside Lambda)
+    
+    Returns:
+        deadline_scope context manager (unbounded without a Lambda context)
+    """
+    from app.config import config
+    
+    get_remaining = getattr(context, 'get_remaining_time_in_millis', None)
+    if get_remaining is None:
+        return deadline_scope(None)
+    return deadline_scope(max(get_remaining() / 1000 - config.LAMBDA_DEADLINE_MARGIN_SECONDS, 0.001))
 
 
 def lambda_handler(event, context):
@@ -41,29 +93,91 @@ def lambda_handler(event, context):
     headers = event.get('headers', {})
     body = event.get('body', '')
     
-    # Create a test request context
-    with app.test_request_context(
-        path=path,
-        method=http_method,
-        headers=headers,
-        data=body
-    ):
+    with _invocation_deadline(context):
+        # Create a test request context
+        with app.test_request_context(
+            path=path,
+            method=http_method,
+            headers=headers,
+            data=body
+        ):
+            try:
+                # Process the request
+                response = app.full_dispatch_request()
+                
+                # Convert Flask response to Lambda response
+                result = {
+                    'statusCode': response.status_code,
+                    'headers': dict(response.headers),
+                    'body': response.get_data(as_text=True)
+                }
+            except Exception as e:
+                result = {
+                    'statusCode': 500,
+                    'headers': {'Content-Type': 'application/json'},
+                    'body': json.dumps({'error': str(e)})
+                }
+        
+        # Catalog sync gets whatever time the request left over
+        _sync_product_catalog()
+    
+    return result
+
+
+def sqs_handler(event, context):
+    """
+    AWS Lambda handler for the SQS work queue (WEBHOOK_INGEST_MODE=queue).
+
+    Runs the validation pipeline for each queued webhook event and reports
+    failed records so SQS only redelivers those (partial batch response).
+
+    Args:
+        event: Lambda SQS event object
+        context: Lambda context object
+
+    Returns:
+        Dictionary with batchItemFailures
+    """
+    from app.services.order_processing_service import order_processing_service
+
+    # Initialize validators on cold start
+    initialize_validators()
+
+    # Collapse the batch to one run per order - InFlow often sends several
+    # update events for a single save, and only the latest state matters
+    records_by_order = {}
+    failures = []
+    for record in event.get('Records', []):
         try:
-            # Process the request
-            response = app.full_dispatch_request()
-            
-            # Convert Flask response to Lambda response
-            return {
-                'statusCode': response.status_code,
-                'headers': dict(response.headers),
-                'body': response.get_data(as_text=True)
-            }
+            body = json_codec.loads(record['body'])
+            order_id = body['sales_order_id']
         except Exception as e:
-            return {
-                'statusCode': 500,
-                'headers': {'Content-Type': 'application/json'},
-                'body': json.dumps({'error': str(e)})
-            }
+            logger.error("Invalid queued event %s: %s", record.get('messageId'), e)
+            failures.append({'itemIdentifier': record.get('messageId')})
+            continue
+        records_by_order.setdefault(order_id, []).append((record, body))
+    
+    with _invocation_deadline(context):
+        for order_id, entries in records_by_order.items():
+            deadline = current_deadline()
+            if deadline is not None and deadline.remaining() <= 0:
+                # Out of invocation time - leave the rest for SQS to redeliver
+                logger.warning("Invocation deadline reached - returning order %s to the queue", order_id)
+                failures.extend({'itemIdentifier': record.get('messageId')} for record, _ in entries)
+                continue
+            latest_body = entries[-1][1]
+            if len(entries) > 1:
+                logger.info("Coalesced %d queued events for order %s", len(entries), order_id)
+            try:
+                order_processing_service.process_order(order_id, latest_body.get('event_type', 'unknown'))
+            except Exception as e:
+                logger.exception("Error processing queued events for order %s: %s", order_id, e)
+                failures.extend({'itemIdentifier': record.get('messageId')} for record, _ in entries)
+        
+        # Catalog sync gets whatever time the batch left over
+        _sync_product_catalog()
+
+    return {'batchItemFailures': failures}
 
 
 def azure_function_handler(req):
@@ -13,6 +13,8 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 # Now import and run the app
 from app.main import app, initialize_validators, config
 from app.services.error_monitor_service import error_monitor_service
+from app.services.work_queue_service import work_queue_service
+from app.services.product_catalog_service import product_catalog_service
 
 if __name__ == '__main__':
     # Validate basic configuration first
@@ -45,23 +47,43 @@ if __name__ == '__main__':
     initialize_validators()
     
     # Start error monitor service (background thread)
-    # Only start in the main process (not in Flask reloader's parent process)
-    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+    # Only start in the serving process: without the reloader (FLASK_DEBUG off,
+    # or the async server) that is this one, otherwise the reloader's child
+    reloader = config.SERVER_MODE != 'async' and config.FLASK_DEBUG
+    if not reloader or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
         print("\nStarting error monitor service...")
         error_monitor_service.start()
+        
+        # Start queue workers when webhooks are ingested asynchronously
+        if config.WEBHOOK_INGEST_MODE == 'queue' and work_queue_service:
+            print("\nStarting work queue workers...")
+            work_queue_service.start()
+        
+        # Keep the local product mirror in sync with InFlow (background thread)
+        if product_catalog_service:
+            print("\nStarting product catalog sync...")
+            product_catalog_service.start()
     else:
         print("\nSkipping error monitor in reloader parent process...")
     
-    # Run Flask app
-    print(f"\nStarting InFlow Error Check Gate on port {config.FLASK_PORT}")
+    # Run the app (Flask dev server, or the aiohttp event loop for SERVER_MODE=async)
+    print(f"\nStarting InFlow Error Check Gate on port {config.FLASK_PORT} ({config.SERVER_MODE} mode)")
     try:
-        app.run(
-            host='0.0.0.0',
-            port=config.FLASK_PORT,
-            debug=config.FLASK_DEBUG
-        )
+        if config.SERVER_MODE == 'async':
+            from app.async_main import run_async_server
+            run_async_server(config.FLASK_PORT)
+        else:
+            app.run(
+                host='0.0.0.0',
+                port=config.FLASK_PORT,
+                debug=config.FLASK_DEBUG
+            )
     finally:
         # Stop error monitor when app shuts down
         print("\nStopping error monitor service...")
         error_monitor_service.stop()
+        if work_queue_service and work_queue_service.running:
+            work_queue_service.stop()
+        if product_catalog_service and product_catalog_service.running:
+            product_catalog_service.stop()
 
@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+Re-validate historical InFlow sales orders (backfill / audit).
+
+Pages through sales orders by order date range or modified-since, prefetching
+the next page while the current one is validated across a process pool, and
+writes results to the monthly CSV logs in bulk. Progress is checkpointed after
+every page so an interrupted run resumes where it stopped.
+
+Orders are validated with ValidationService.audit_order: no grace period and
+no pending-error tracking, so a backfill never triggers notifications.
+
+Usage:
+    python scripts/backfill_orders.py --from 2025-01-01 --to 2025-01-31
+    python scripts/backfill_orders.py --modified-since 2025-06-01 --workers 8
+    python scripts/backfill_orders.py --from 2025-01-01 --to 2025-01-31 --reset
+
+Benchmark against a local InFlow stand-in (see scripts/inflow_standin.py):
+    python scripts/inflow_standin.py --orders 5000 &
+    python scripts/backfill_orders.py --from 2025-01-01 --to 2025-12-31 \
+        --base-url http://localhost:8099 --checkpoint /tmp/bench.json --reset --no-log
+"""
+
+import argparse
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.clients.inflow_client import inflow_client
+
+
+# Order fields the logger needs besides the validation report (account manager column)
+_LOGGER_ORDER_FIELDS = ('salesRepTeamMember', 'salesRep')
+
+
+def _init_worker(quiet: bool) -> None:
+    """
+    Process pool initializer: register validators once per worker process.
+    """
+    if quiet:
+        # Per-validator output across many processes is pure overhead
+        from app.utils.log import configure_logging
+        configure_logging(level='WARNING')
+        sys.stdout = open(os.devnull, 'w')
+    
+    from app.main import initialize_validators
+    initialize_validators()
+
+
+def _audit_order(order_data: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Validate one order in a worker process.
+    
+    Returns:
+        Tuple of (validation report, order fields needed by the logger)
+    """
+    from app.services.validation_service import validation_service
+    
+    try:
+        report = validation_service.audit_order(order_data)
+    except Exception as e:
+        report = {
+            'order_id': order_data.get('salesOrderId', 'unknown'),
+            'order_number': order_data.get('orderNumber', 'N/A'),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'status': 'error',
+            'issues': [{'rule': 'Backfill', 'message': f"Validation error: {e}", 'severity': 'error',
+                        'tracking_status': 'confirmed', 'details': {}}]
+        }
+    # Send back only what the logger reads, not the whole order
+    return report, {field: order_data.get(field) for field in _LOGGER_ORDER_FIELDS if order_data.get(field)}
+
+
+class Checkpoint:
+    """
+    Resumable cursor stored as JSON next to the logs.
+    """
+    
+    def __init__(self, path: str, query: Dict[str, Any]):
+        """
+        Args:
+            path: Checkpoint file path
+            query: Filters and page size of this run (a checkpoint for a different query is ignored)
+        """
+        self.path = path
+        self.query = query
+        self.state = {'query': query, 'next_skip': 0, 'processed': 0, 'status_counts': {}}
+    
+    def load(self) -> bool:
+        """
+        Load an existing checkpoint for the same query.
+        
+        Returns:
+            True if a matching checkpoint was loaded
+        """
+        if not os.path.exists(self.path):
+            return False
+        with open(self.path, 'r', encoding='utf-8') as f:
+            saved = json.load(f)
+        if saved.get('query') != self.query:
+            print(f"Checkpoint {self.path} is for a different query - starting from the beginning")
+            return False
+        self.state = saved
+        return True
+    
+    def save(self) -> None:
+        """
+        Write the checkpoint atomically (a crash mid-write never corrupts it).
+        """
+        self.state['updated_at'] = time.strftime('%Y-%m-%dT%H:%M:%S')
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+def iter_pages(filters: Dict[str, Any], page_size: int, start_skip: int,
+               prefetch: int = 2) -> Iterator[Tuple[int, List[Dict[str, Any]]]]:
+    """
+    Yield (skip, orders) pages, fetching ahead on a background thread.
+    
+    Args:
+        filters: InFlow list filters
+        page_size: Orders per page
+        start_skip: Offset to start from (checkpoint cursor)
+        prefetch: Pages buffered ahead of the consumer
+    
+    Yields:
+        Tuple of (skip offset of the page, orders on the page)
+    """
+    pages: 'queue.Queue' = queue.Queue(maxsize=prefetch)
+    stop = threading.Event()
+    
+    def fetch():
+        skip = start_skip
+        try:
+            while not stop.is_set():
+                orders = inflow_client.list_sales_orders(
+                    filters=filters, include=inflow_client.sales_order_include, count=page_size, skip=skip
+                )
+                pages.put((skip, orders or []))
+                if len(orders or []) < page_size:
+                    break
+                skip += page_size
+        except Exception as e:
+            pages.put(e)
+            return
+        pages.put(None)
+    
+    fetcher = threading.Thread(target=fetch, daemon=True, name='backfill-prefetch')
+    fetcher.start()
+    try:
+        while True:
+            item = pages.get()
+            if item is None:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        stop.set()
+
+
+def run_backfill(filters: Dict[str, Any], page_size: int, workers: int, checkpoint: Checkpoint,
+                 write_logs: bool = True, limit: Optional[int] = None, quiet: bool = True) -> Dict[str, Any]:
+    """
+    Validate every order matching the filters.
+    
+    Returns:
+        Final checkpoint state with throughput figures
+    """
+    from app.main import initialize_validators
+    from app.services.logger_service import logger_service
+    
+    # Registering the rules here too declares the relationships they read,
+    # so pages are listed with the same minimal include as webhook fetches
+    initialize_validators()
+    
+    state = checkpoint.state
+    started = time.time()
+    processed_this_run = 0
+    
+    print(f"Backfill: filters={filters} page_size={page_size} workers={workers} starting at skip={state['next_skip']}")
+    
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(quiet,)) as pool:
+        for skip, orders in iter_pages(filters, page_size, state['next_skip']):
+            if limit is not None:
+                orders = orders[:max(0, limit - processed_this_run)]
+            if not orders:
+                break
+            
+            chunksize = max(1, len(orders) // (workers * 4))
+            results = list(pool.map(_audit_order, orders, chunksize=chunksize))
+            
+            if write_logs:
+                logger_service.log_validation_results_bulk(results)
+            
+            for report, _ in results:
+                status = report.get('status', 'unknown')
+                state['status_counts'][status] = state['status_counts'].get(status, 0) + 1
+            
+            processed_this_run += len(orders)
+            state['processed'] += len(orders)
+            state['next_skip'] = skip + len(orders)
+            checkpoint.save()
+            
+            elapsed = time.time() - started
+            print(f"  skip={skip:>6} page={len(orders):>4} total={state['processed']:>6} "
+                  f"rate={processed_this_run / elapsed:.1f} orders/sec")
+            
+            if limit is not None and processed_this_run >= limit:
+                break
+    
+    elapsed = time.time() - started
+    state['last_run'] = {
+        'orders': processed_this_run,
+        'seconds': round(elapsed, 2),
+        'orders_per_sec': round(processed_this_run / elapsed, 2) if elapsed > 0 else 0.0
+    }
+    checkpoint.save()
+    return state
+
+
+def build_filters(args: argparse.Namespace) -> Dict[str, Any]:
+    """
+    Translate CLI arguments into InFlow list filters.
+    """
+    filters: Dict[str, Any] = {}
+    if args.date_from or args.date_to:
+        date_range = {}
+        if args.date_from:
+            date_range['fromDate'] = args.date_from
+        if args.date_to:
+            date_range['toDate'] = args.date_to
+        filters['orderDate'] = date_range
+    if args.modified_since:
+        filters['lastModifiedDateTime'] = {'fromDate': args.modified_since}
+    return filters
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Re-validate historical InFlow sales orders.')
+    parser.add_argument('--from', dest='date_from', help='Order date from (YYYY-MM-DD)')
+    parser.add_argument('--to', dest='date_to', help='Order date to (YYYY-MM-DD)')
+    parser.add_argument('--modified-since', help='Only orders modified since (YYYY-MM-DD), '
+                                                 'via filter[lastModifiedDateTime]')
+    parser.add_argument('--page-size', type=int, default=100, help='Orders per InFlow page (default 100)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='Validation processes (default: CPU cores)')
+    parser.add_argument('--checkpoint', default=os.path.join(os.environ.get('LOGS_DIR', 'logs'),
+                                                             'backfill_checkpoint.json'),
+                        help='Checkpoint file (default: logs/backfill_checkpoint.json)')
+    parser.add_argument('--reset', action='store_true', help='Ignore an existing checkpoint')
+    parser.add_argument('--limit', type=int, help='Stop after this many orders')
+    parser.add_argument('--base-url', help='Override INFLOW_API_BASE_URL (e.g. a local stand-in)')
+    parser.add_argument('--no-log', action='store_true', help='Do not write CSV logs (benchmarking)')
+    parser.add_argument('--verbose', action='store_true', help='Show validator output from workers')
+    args = parser.parse_args()
+    
+    filters = build_filters(args)
+    if not filters:
+        parser.error('Provide --from/--to and/or --modified-since')
+    
+    if args.base_url:
+        inflow_client.base_url = args.base_url.rstrip('/')
+    
+    checkpoint = Checkpoint(args.checkpoint, {'filters': filters, 'page_size': args.page_size})
+    if not args.reset and checkpoint.load():
+        print(f"Resuming from checkpoint: {checkpoint.state['processed']} orders done, "
+              f"next skip {checkpoint.state['next_skip']}")
+    
+    try:
+        state = run_backfill(
+            filters,
+            args.page_size,
+            max(1, args.workers),
+            checkpoint,
+            write_logs=not args.no_log,
+            limit=args.limit,
+            quiet=not args.verbose
+        )
+    except KeyboardInterrupt:
+        print(f"\nInterrupted - rerun the same command to resume from {checkpoint.path}")
+        sys.exit(130)
+    
+    print()
+    print(f"Backfill complete: {state['processed']} orders total")
+    print(f"This run: {state['last_run']['orders']} orders in {state['last_run']['seconds']}s "
+          f"({state['last_run']['orders_per_sec']} orders/sec)")
+    print(f"Status counts: {state['status_counts']}")
+
+
+if __name__ == '__main__':
+    main()
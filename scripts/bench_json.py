@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Benchmark the JSON codec against the stdlib json module on large orders.
+
+Times the request-path operations routed through app.utils.json_codec:
+decoding InFlow sales orders, encoding /validate responses and rewriting the
+pending-errors file, on synthetic orders from scripts/inflow_standin.py.
+
+Usage:
+    python scripts/bench_json.py [--orders 200] [--lines 60] [--rounds 5]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils import json_codec
+from scripts.inflow_standin import build_orders
+
+
+def build_fixtures(count: int, lines: int):
+    """
+    Synthetic orders grown to `lines` lines each, plus matching validation results and pending errors.
+    """
+    orders = build_orders(count)
+    for order in orders:
+        order['lines'] = (order['lines'] * (lines // len(order['lines']) + 1))[:lines]
+    results = [{
+        'order_id': order['salesOrderId'],
+        'order_number': order['orderNumber'],
+        'status': 'failed',
+        'validation_results': [
+            {'rule_name': 'Discount Validation', 'passed': False, 'errors': [
+                {'message': f"Line {i + 1} discount exceeds customer discount", 'line_number': i + 1,
+                 'sku': line['product']['sku'], 'details': line} for i, line in enumerate(order['lines'])
+            ]}
+        ]
+    } for order in orders]
+    pending = {result['order_id']: result for result in results}
+    return orders, results, pending
+
+
+def timed(fn, rounds: int) -> float:
+    """
+    Best-of-rounds wall time of fn() in milliseconds.
+    """
+    best = float('inf')
+    for _ in range(rounds):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark the JSON codec on large order fixtures.')
+    parser.add_argument('--orders', type=int, default=200, help='Number of synthetic orders')
+    parser.add_argument('--lines', type=int, default=60, help='Lines per order')
+    parser.add_argument('--rounds', type=int, default=5, help='Repetitions (best time is reported)')
+    args = parser.parse_args()
+    
+    orders, results, pending = build_fixtures(args.orders, args.lines)
+    order_bodies = [json.dumps(order).encode('utf-8') for order in orders]
+    payload_mb = sum(len(body) for body in order_bodies) / 1e6
+    
+    cases = [
+        ('decode InFlow orders',
+         lambda: [json.loads(body) for body in order_bodies],
+         lambda: [json_codec.loads(body) for body in order_bodies]),
+        ('encode /validate responses',
+         lambda: [json.dumps(result, sort_keys=True) for result in results],
+         lambda: [json_codec.dumps(result, sort_keys=True) for result in results]),
+        ('rewrite pending-errors file',
+         lambda: json.dumps(pending, indent=2, ensure_ascii=False).encode('utf-8'),
+         lambda: json_codec.dumps_bytes(pending, indent=True)),
+    ]
+    
+    print(f"{args.orders} orders x {args.lines} lines ({payload_mb:.1f} MB of order JSON), "
+          f"codec backend: {json_codec.BACKEND}")
+    print(f"{'operation':<30}{'stdlib ms':>12}{'codec ms':>12}{'speedup':>10}")
+    for name, stdlib_fn, codec_fn in cases:
+        stdlib_ms = timed(stdlib_fn, args.rounds)
+        codec_ms = timed(codec_fn, args.rounds)
+        print(f"{name:<30}{stdlib_ms:>12.1f}{codec_ms:>12.1f}{stdlib_ms / codec_ms:>9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
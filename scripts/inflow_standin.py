@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Minimal local stand-in for the InFlow sales order API, for benchmarking.
+
+Serves deterministic synthetic sales orders (with lines, customer and
+remarks) and products (with category) so the backfill CLI, batch endpoint
+and product mirror sync can be measured without touching the real account
+or its 60 requests/minute limit.
+
+Usage:
+    python scripts/inflow_standin.py --orders 5000 --products 2000 --port 8099 [--latency-ms 150]
+
+Then point a client at it:
+    python scripts/backfill_orders.py --from 2025-01-01 --to 2025-12-31 \
+        --base-url http://localhost:8099 --reset --no-log
+"""
+
+import argparse
+import json
+import random
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Any, List
+
+from flask import Flask, jsonify, request, abort
+
+
+SKUS = [
+    ('B12', 'Base Cabinet 12"'), ('W3030', 'Wall Cabinet 30x30'), ('SB36', 'Sink Base 36"'),
+    ('TUK-WH', 'Touch Up Kit - White'), ('DB18', 'Drawer Base 18"'), ('Z_DISCOUNT', 'Z_DISCOUNT'),
+]
+
+
+def build_orders(count: int, seed: int = 42) -> List[Dict[str, Any]]:
+    """
+    Generate deterministic synthetic orders spread over 2025.
+    """
+    rng = random.Random(seed)
+    orders = []
+    for i in range(count):
+        lines = []
+        for _ in range(rng.randint(1, 12)):
+            sku, name = rng.choice(SKUS)
+            # Occasional negative quantity = return line (exercises the return reason rule)
+            quantity = rng.randint(1, 6) * (-1 if rng.random() < 0.05 else 1)
+            unit_price = round(rng.uniform(20, 600), 2)
+            discount = rng.choice(['0', '0', '5', '10', '30'])
+            lines.append({
+                'salesOrderLineId': str(uuid.UUID(int=rng.getrandbits(128))),
+                'productId': str(uuid.UUID(int=rng.getrandbits(128))),
+                'product': {'name': name, 'sku': sku},
+                'quantity': {'standardQuantity': str(quantity)},
+                'unitPrice': f"{unit_price:.2f}",
+                'discount': {'value': discount, 'isPercent': True},
+                'subTotal': f"{quantity * unit_price * (1 - int(discount) / 100):.2f}"
+            })
+        subtotal = sum(float(line['subTotal']) for line in lines)
+        orders.append({
+            'salesOrderId': str(uuid.UUID(int=rng.getrandbits(128))),
+            'orderNumber': f"SO-{i + 1:06d}",
+            'timestamp': f"{i + 1:016X}",
+            'orderDate': (date(2025, 1, 1) + timedelta(days=i % 365)).isoformat(),
+            'customerId': 'c-1',
+            'customer': {'name': 'Acme Cabinets', 'discount': rng.choice(['0', '10'])},
+            'orderRemarks': rng.choice(['', 'Promo discount approved by manager']),
+            'customFields': {'custom4': rng.choice(['', 'Damaged'])},
+            'salesRep': 'Test Rep',
+            'subTotal': f"{subtotal:.2f}",
+            'total': f"{subtotal:.2f}",
+            'orderFreight': '0',
+            'lines': lines
+        })
+    return orders
+
+
+def build_products(count: int, seed: int = 42) -> List[Dict[str, Any]]:
+    """
+    Generate deterministic synthetic products with categories and modification times.
+    """
+    rng = random.Random(seed)
+    categories = [
+        ('B', 'Base Cabinet'), ('W', 'Wall Cabinet'), ('VS', 'Vanity Cabinet'),
+        ('T', 'Tall Cabinet'), ('ACC', 'Accessories')
+    ]
+    products = []
+    for i in range(count):
+        code, category = rng.choice(categories)
+        modified = datetime(2025, 1, 1, tzinfo=timezone.utc) + timedelta(minutes=i)
+        products.append({
+            'productId': str(uuid.UUID(int=rng.getrandbits(128))),
+            'name': f"SW-{code}{i + 1:05d}",
+            'sku': f"{code}{i + 1:05d}",
+            'isActive': True,
+            'category': {'name': category},
+            'lastModifiedDateTime': modified.strftime('%Y-%m-%dT%H:%M:%SZ')
+        })
+    return products
+
+
+def create_app(orders: List[Dict[str, Any]], latency_ms: int = 0,
+               products: List[Dict[str, Any]] = ()) -> Flask:
+    """
+    Build the stand-in Flask app.
+    """
+    app = Flask(__name__)
+    by_id = {order['salesOrderId']: order for order in orders}
+    
+    @app.route('/<company_id>/sales-orders', methods=['GET'])
+    def list_sales_orders(company_id):
+        time.sleep(latency_ms / 1000)
+        count = int(request.args.get('count', 100))
+        skip = int(request.args.get('skip', 0))
+        matches = orders
+        order_number = request.args.get('filter[orderNumber]')
+        if order_number:
+            matches = [o for o in matches if o['orderNumber'] == order_number]
+        return jsonify(matches[skip:skip + count])
+    
+    @app.route('/<company_id>/sales-orders/<order_id>', methods=['GET'])
+    def get_sales_order(company_id, order_id):
+        time.sleep(latency_ms / 1000)
+        if order_id not in by_id:
+            abort(404)
+        return jsonify(by_id[order_id])
+    
+    @app.route('/<company_id>/products', methods=['GET'])
+    def list_products(company_id):
+        time.sleep(latency_ms / 1000)
+        count = int(request.args.get('count', 100))
+        skip = int(request.args.get('skip', 0))
+        matches = list(products)
+        modified = request.args.get('filter[lastModifiedDateTime]')
+        if modified:
+            from_date = json.loads(modified).get('fromDate', '')
+            matches = [p for p in matches if p['lastModifiedDateTime'] >= from_date]
+        return jsonify(matches[skip:skip + count])
+    
+    return app
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Local InFlow API stand-in for benchmarks.')
+    parser.add_argument('--orders', type=int, default=1000, help='Number of synthetic orders')
+    parser.add_argument('--products', type=int, default=2000, help='Number of synthetic products')
+    parser.add_argument('--port', type=int, default=8099)
+    parser.add_argument('--latency-ms', type=int, default=0, help='Artificial latency per request')
+    args = parser.parse_args()
+    
+    print(f"Serving {args.orders} synthetic orders and {args.products} products on http://localhost:{args.port}")
+    create_app(build_orders(args.orders), args.latency_ms, build_products(args.products)).run(port=args.port, threaded=True)
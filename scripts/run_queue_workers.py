@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Drain the validation work queue without the web server (WEBHOOK_INGEST_MODE=queue).
+
+run.py starts the queue workers next to the Flask development server. When
+the webhook is served by something else (e.g. gunicorn app.main:app), run
+this process alongside it so queued events are validated.
+
+Usage:
+    python scripts/run_queue_workers.py
+    python scripts/run_queue_workers.py --workers 8
+"""
+
+import argparse
+import os
+import signal
+import sys
+import threading
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.config import config
+from app.main import initialize_validators
+from app.services.work_queue_service import work_queue_service
+from app.services.product_catalog_service import product_catalog_service
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Drain the validation work queue")
+    parser.add_argument('--workers', type=int, help="Worker threads (default WORK_QUEUE_WORKERS)")
+    args = parser.parse_args()
+
+    if not work_queue_service:
+        print(f"No work queue configured (WORK_QUEUE_BACKEND={config.WORK_QUEUE_BACKEND})")
+        return 1
+    if args.workers:
+        work_queue_service.num_workers = args.workers
+
+    initialize_validators()
+
+    stopping = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stopping.set())
+
+    # Validators in this process read categories from its product mirror
+    if product_catalog_service:
+        product_catalog_service.start()
+    work_queue_service.start()
+    print(f"Draining the work queue ({config.WORK_QUEUE_BACKEND}) - Ctrl+C to stop")
+    try:
+        stopping.wait()
+    finally:
+        work_queue_service.stop()
+        if product_catalog_service and product_catalog_service.running:
+            product_catalog_service.stop()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
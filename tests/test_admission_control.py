@@ -0,0 +1,88 @@
+import threading
+import time
+import unittest
+from app.services.admission_control import AdmissionController, AdmissionRejected
+from app.utils.metrics import RollingStats
+
+
+class TestAdmissionController(unittest.TestCase):
+    """
+    Test cases for the webhook concurrency limiter.
+    """
+    
+    def _occupy(self, controller, release: threading.Event, started: threading.Event):
+        def hold():
+            with controller.admit():
+                started.set()
+                release.wait(5)
+        thread = threading.Thread(target=hold)
+        thread.start()
+        started.wait(5)
+        return thread
+    
+    def test_rejects_when_queue_full(self):
+        controller = AdmissionController(max_concurrent=1, max_queue=0, queue_timeout_seconds=1)
+        release = threading.Event()
+        holder = self._occupy(controller, release, threading.Event())
+        
+        with self.assertRaises(AdmissionRejected) as ctx:
+            with controller.admit():
+                pass
+        
+        release.set()
+        holder.join()
+        self.assertEqual(ctx.exception.reason, 'queue_full')
+        self.assertGreaterEqual(ctx.exception.retry_after_seconds, controller.retry_after_seconds)
+        self.assertEqual(controller.get_status()['rejected_queue_full'], 1)
+    
+    def test_queued_request_times_out(self):
+        controller = AdmissionController(max_concurrent=1, max_queue=1, queue_timeout_seconds=0.1)
+        release = threading.Event()
+        holder = self._occupy(controller, release, threading.Event())
+        
+        started = time.monotonic()
+        with self.assertRaises(AdmissionRejected) as ctx:
+            with controller.admit():
+                pass
+        
+        release.set()
+        holder.join()
+        self.assertEqual(ctx.exception.reason, 'timeout')
+        self.assertLess(time.monotonic() - started, 1)
+        self.assertEqual(controller.get_status()['queue_depth'], 0)
+    
+    def test_queued_request_admitted_when_slot_frees(self):
+        controller = AdmissionController(max_concurrent=1, max_queue=1, queue_timeout_seconds=2)
+        release = threading.Event()
+        holder = self._occupy(controller, release, threading.Event())
+        
+        threading.Timer(0.1, release.set).start()
+        with controller.admit():
+            pass
+        holder.join()
+        
+        status = controller.get_status()
+        self.assertEqual(status['admitted'], 2)
+        self.assertEqual(status['in_flight'], 0)
+        self.assertGreaterEqual(status['wait_ms']['max'], 50)
+
+
+class TestRollingStats(unittest.TestCase):
+    """
+    Test cases for rolling percentiles.
+    """
+    
+    def test_percentiles(self):
+        stats = RollingStats(window=100)
+        for value in range(1, 101):
+            stats.add(value)
+        
+        snapshot = stats.snapshot()
+        self.assertEqual(snapshot['count'], 100)
+        self.assertEqual(snapshot['p50'], 50)
+        self.assertEqual(snapshot['p95'], 95)
+        self.assertEqual(snapshot['max'], 100)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import asyncio
+import json
+import unittest
+from unittest.mock import AsyncMock, patch
+
+try:
+    from aiohttp import web
+    from aiohttp.test_utils import TestClient, TestServer
+    from app import async_main
+except ImportError:  # Optional dependency - only needed for SERVER_MODE=async
+    async_main = None
+
+from app.services.event_coalescer import AsyncEventCoalescer
+from app.services.idempotency_ledger import IdempotencyLedger, MemoryLedgerBackend
+
+
+PAYLOAD = json.dumps({'eventType': 'SalesOrderUpdatedV1', 'salesOrderId': 'order-1'})
+
+
+@unittest.skipIf(async_main is None or async_main.pipeline is None, 'requires requirements-async.txt')
+class TestAsyncWebhookLedger(unittest.TestCase):
+    """
+    Test cases for settling idempotency entries of coalesced async webhook events.
+    """
+    
+    def _run(self, process_order):
+        pipeline = async_main.pipeline
+        
+        async def scenario():
+            app = web.Application()
+            app.add_routes(async_main.routes)
+            replies = []
+            async with TestClient(TestServer(app)) as client:
+                async def post():
+                    response = await client.post('/webhook/inflow', data=PAYLOAD,
+                                                 headers={'x-inflow-hmac-sha256': 'signature'})
+                    replies.append((response.status, (await response.json())['status'],
+                                    response.headers.get('X-Idempotent-Replay')))
+                
+                async def drain():
+                    while pipeline._background:
+                        await asyncio.gather(*pipeline._background)
+                
+                await post()
+                await post()  # Redelivered while the first run is pending
+                await drain()
+                await post()  # Redelivered after that run finished
+                await drain()
+                await post()
+            return replies
+        
+        with patch.object(async_main.hmac_verifier, 'verify', return_value=True), \
+                patch.object(async_main, 'idempotency_ledger', IdempotencyLedger(MemoryLedgerBackend())), \
+                patch.object(async_main.config, 'WEBHOOK_INGEST_MODE', 'sync'), \
+                patch.object(pipeline, 'coalescer', AsyncEventCoalescer(quiet_window_seconds=0.01)), \
+                patch.object(pipeline, 'process_order', process_order):
+            return asyncio.run(scenario())
+    
+    def test_failed_background_run_is_not_replayed_as_done(self):
+        process_order = AsyncMock(side_effect=[RuntimeError('InFlow unavailable'), {'status': 'processed'}])
+        
+        replies = self._run(process_order)
+        
+        self.assertEqual(replies[0], (202, 'scheduled', None))
+        self.assertEqual(replies[1], (202, 'in_progress', 'true'))
+        # The failed run released the entry, so the redelivery is processed again
+        self.assertEqual(replies[2], (202, 'scheduled', None))
+        self.assertEqual(replies[3], (202, 'scheduled', 'true'))
+        self.assertEqual(process_order.await_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
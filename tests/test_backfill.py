@@ -0,0 +1,54 @@
+import csv
+import os
+import tempfile
+import unittest
+from app.services.logger_service import LoggerService
+from scripts.backfill_orders import Checkpoint
+
+
+class TestBackfill(unittest.TestCase):
+    """
+    Test cases for the backfill checkpoint and bulk CSV logging.
+    """
+    
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+    
+    def tearDown(self):
+        self.temp_dir.cleanup()
+    
+    def test_checkpoint_resumes_same_query_only(self):
+        path = os.path.join(self.temp_dir.name, 'checkpoint.json')
+        query = {'filters': {'orderDate': {'fromDate': '2025-01-01'}}, 'page_size': 100}
+        
+        checkpoint = Checkpoint(path, query)
+        checkpoint.state['next_skip'] = 300
+        checkpoint.save()
+        
+        resumed = Checkpoint(path, query)
+        self.assertTrue(resumed.load())
+        self.assertEqual(resumed.state['next_skip'], 300)
+        
+        other = Checkpoint(path, dict(query, page_size=50))
+        self.assertFalse(other.load())
+        self.assertEqual(other.state['next_skip'], 0)
+    
+    def test_bulk_log_writes_header_once(self):
+        logger = LoggerService(log_directory=self.temp_dir.name)
+        entries = [
+            ({'order_number': f'SO-{i}', 'status': 'passed', 'timestamp': '2025-03-01T10:00:00', 'issues': []},
+             {'salesRep': 'Rep'})
+            for i in range(3)
+        ]
+        
+        logger.log_validation_results_bulk(entries[:2])
+        logger.log_validation_results_bulk(entries[2:])
+        
+        with open(os.path.join(self.temp_dir.name, 'validation_log_202503.csv'), encoding='utf-8') as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual([row['order_number'] for row in rows], ['SO-0', 'SO-1', 'SO-2'])
+        self.assertEqual(rows[0]['account_manager'], 'Rep')
+
+
+if __name__ == '__main__':
+    unittest.main()
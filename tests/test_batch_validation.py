@@ -0,0 +1,55 @@
+import threading
+import time
+import unittest
+from app.services.batch_validation_service import BatchValidationService
+
+
+class RecordingBatchService(BatchValidationService):
+    """
+    Batch service that records concurrency instead of calling InFlow.
+    """
+    
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+    
+    def validate_reference(self, ref):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(0.02)
+        with self.lock:
+            self.active -= 1
+        return dict(ref, status='passed')
+
+
+class TestBatchValidationService(unittest.TestCase):
+    """
+    Test cases for batch validation.
+    """
+    
+    def test_parse_request(self):
+        service = BatchValidationService(max_orders=3)
+        refs = service.parse_request({'order_ids': ['a'], 'order_numbers': ['SO-1']})
+        self.assertEqual(refs, [{'order_id': 'a'}, {'order_number': 'SO-1'}])
+        
+        with self.assertRaises(ValueError):
+            service.parse_request({'order_ids': []})
+        with self.assertRaises(ValueError):
+            service.parse_request({'order_ids': ['a', 'b', 'c', 'd']})
+    
+    def test_results_stream_under_concurrency_limit(self):
+        service = RecordingBatchService(max_concurrency=3)
+        refs = [{'order_id': str(i)} for i in range(10)]
+        
+        results = list(service.iter_results(refs))
+        
+        self.assertEqual(sorted(r['order_id'] for r in results), sorted(r['order_id'] for r in refs))
+        self.assertLessEqual(service.peak, 3)
+        self.assertGreater(service.peak, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
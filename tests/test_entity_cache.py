@@ -0,0 +1,55 @@
+import time
+import unittest
+from app.clients.entity_cache import EntityCache, CUSTOMER, PRODUCT, TEAM_MEMBER
+
+
+class TestEntityCache(unittest.TestCase):
+    """
+    Test cases for the customer/product/team member cache.
+    """
+    
+    def test_ttl_per_entity_type(self):
+        cache = EntityCache({CUSTOMER: 0.05, PRODUCT: 60})
+        cache.put(CUSTOMER, 'c1', {'customerId': 'c1'})
+        cache.put(PRODUCT, 'p1', {'productId': 'p1'})
+        
+        time.sleep(0.1)
+        self.assertIsNone(cache.get(CUSTOMER, 'c1'))
+        self.assertEqual(cache.get(PRODUCT, 'p1'), {'productId': 'p1'})
+    
+    def test_lru_eviction(self):
+        cache = EntityCache({PRODUCT: 60}, max_entries=2)
+        cache.put(PRODUCT, 'p1', {})
+        cache.put(PRODUCT, 'p2', {})
+        cache.get(PRODUCT, 'p1')
+        cache.put(PRODUCT, 'p3', {})
+        
+        self.assertIsNone(cache.get(PRODUCT, 'p2'))
+        self.assertIsNotNone(cache.get(PRODUCT, 'p1'))
+        self.assertEqual(cache.get_status()['evictions'], 1)
+    
+    def test_negative_caching(self):
+        cache = EntityCache({CUSTOMER: 60}, negative_ttl=60)
+        cache.put_missing(CUSTOMER, 'gone', LookupError('404 Not Found'))
+        
+        with self.assertRaises(LookupError):
+            cache.get(CUSTOMER, 'gone')
+        self.assertEqual(cache.get_status()['negative_hits'], 1)
+    
+    def test_prime_from_order_and_invalidate(self):
+        cache = EntityCache({CUSTOMER: 60, PRODUCT: 60, TEAM_MEMBER: 60})
+        cache.prime_from_order({
+            'customer': {'customerId': 'c1', 'name': 'Acme'},
+            'salesRepTeamMember': {'teamMemberId': 't1'},
+            'lines': [{'product': {'productId': 'p1'}}, {'product': {'productId': 'p2'}}]
+        })
+        
+        self.assertEqual(cache.get(CUSTOMER, 'c1')['name'], 'Acme')
+        self.assertIsNotNone(cache.get(TEAM_MEMBER, 't1'))
+        self.assertEqual(cache.invalidate(PRODUCT), 2)
+        self.assertEqual(cache.invalidate(CUSTOMER, 'c1'), 1)
+        self.assertIsNone(cache.get(CUSTOMER, 'c1'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+import asyncio
+import threading
+import time
+import unittest
+from app.services.event_coalescer import EventCoalescer, AsyncEventCoalescer
+
+
+class TestEventCoalescer(unittest.TestCase):
+    """
+    Test cases for per-order event coalescing.
+    """
+    
+    def test_burst_runs_handler_once(self):
+        coalescer = EventCoalescer(quiet_window_seconds=0.2, max_wait_seconds=2)
+        calls = []
+        outcomes = []
+        
+        def submit():
+            outcomes.append(coalescer.submit('order-1', lambda: calls.append(1) or 'done'))
+        
+        leader = threading.Thread(target=submit)
+        leader.start()
+        for _ in range(4):
+            time.sleep(0.05)
+            submit()
+        leader.join()
+        
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(sum(1 for o in outcomes if o.leader), 1)
+        self.assertEqual(coalescer.get_status()['coalesced'], 4)
+        self.assertEqual(coalescer.get_status()['pending_orders'], 0)
+    
+    def test_event_during_run_triggers_follow_up(self):
+        coalescer = EventCoalescer(quiet_window_seconds=0.05, max_wait_seconds=1)
+        calls = []
+        
+        def handler():
+            calls.append(1)
+            if len(calls) == 1:
+                # A new event arrives while the first fetch is in progress
+                coalescer.submit('order-2', lambda: None)
+        
+        outcome = coalescer.submit('order-2', handler)
+        
+        self.assertTrue(outcome.leader)
+        self.assertEqual(outcome.runs, 2)
+        self.assertEqual(len(calls), 2)
+    
+    def test_different_orders_are_independent(self):
+        coalescer = EventCoalescer(quiet_window_seconds=0.01, max_wait_seconds=1)
+        
+        first = coalescer.submit('order-a', lambda: 'a')
+        second = coalescer.submit('order-b', lambda: 'b')
+        
+        self.assertEqual((first.result, second.result), ('a', 'b'))
+    
+    def test_handler_error_releases_order(self):
+        coalescer = EventCoalescer(quiet_window_seconds=0.01, max_wait_seconds=1)
+        
+        def failing():
+            raise ValueError('boom')
+        
+        with self.assertRaises(ValueError):
+            coalescer.submit('order-3', failing)
+        
+        self.assertTrue(coalescer.submit('order-3', lambda: 'ok').leader)
+    
+    def test_leader_hands_off_a_steady_stream(self):
+        coalescer = EventCoalescer(quiet_window_seconds=0.01, max_wait_seconds=0.1)
+        handoffs = []
+        
+        def handler():
+            # Every run sees another update arrive mid-run
+            time.sleep(0.02)
+            coalescer.submit('order-4', lambda: None)
+        
+        started = time.monotonic()
+        outcome = coalescer.submit('order-4', handler, handoff=lambda: handoffs.append(1))
+        
+        self.assertTrue(outcome.handed_off)
+        self.assertLess(time.monotonic() - started, 0.5)
+        self.assertEqual(handoffs, [1])
+        self.assertFalse(coalescer.is_pending('order-4'))
+        self.assertEqual(coalescer.get_status()['handoffs'], 1)
+
+
+
+class TestAsyncEventCoalescer(unittest.TestCase):
+    """
+    Test cases for the asyncio coalescer used by the async server.
+    """
+    
+    def test_burst_runs_handler_once(self):
+        coalescer = AsyncEventCoalescer(quiet_window_seconds=0.2, max_wait_seconds=2)
+        calls = []
+        
+        async def handler():
+            calls.append(1)
+            await asyncio.sleep(0)
+            return 'done'
+        
+        async def burst():
+            leader = asyncio.ensure_future(coalescer.submit('order-1', handler))
+            followers = []
+            for _ in range(4):
+                await asyncio.sleep(0.05)
+                followers.append(await coalescer.submit('order-1', handler))
+            return await leader, followers
+        
+        leader, followers = asyncio.run(burst())
+        
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(leader.leader)
+        self.assertEqual(leader.result, 'done')
+        self.assertFalse(any(outcome.leader for outcome in followers))
+        self.assertEqual(coalescer.get_status()['pending_orders'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
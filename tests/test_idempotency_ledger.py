@@ -0,0 +1,93 @@
+import os
+import tempfile
+import unittest
+from app.services.idempotency_ledger import (
+    IdempotencyLedger,
+    MemoryLedgerBackend,
+    SQLiteLedgerBackend,
+    STATUS_COMPLETED,
+    STATUS_IN_PROGRESS
+)
+
+
+class LedgerBehaviour:
+    """
+    Shared test cases run against each ledger backend.
+    """
+    
+    def make_backend(self):
+        raise NotImplementedError
+    
+    def setUp(self):
+        self.ledger = IdempotencyLedger(self.make_backend(), ttl_seconds=60, claim_ttl_seconds=60)
+        self.key = IdempotencyLedger.make_key(b'{"salesOrderId": "order-1"}', 'signature')
+    
+    def test_duplicate_replays_stored_response(self):
+        claimed, _ = self.ledger.claim(self.key)
+        self.assertTrue(claimed)
+        self.ledger.complete(self.key, 200, '{"status": "processed"}')
+        
+        claimed, entry = self.ledger.claim(self.key)
+        self.assertFalse(claimed)
+        self.assertEqual(entry.status, STATUS_COMPLETED)
+        self.assertEqual((entry.status_code, entry.body), (200, '{"status": "processed"}'))
+        self.assertEqual((self.ledger.stats['misses'], self.ledger.stats['hits']), (1, 1))
+    
+    def test_concurrent_delivery_sees_in_progress(self):
+        self.ledger.claim(self.key)
+        
+        claimed, entry = self.ledger.claim(self.key)
+        self.assertFalse(claimed)
+        self.assertEqual(entry.status, STATUS_IN_PROGRESS)
+    
+    def test_release_allows_retry(self):
+        self.ledger.claim(self.key)
+        self.ledger.release(self.key)
+        
+        claimed, _ = self.ledger.claim(self.key)
+        self.assertTrue(claimed)
+    
+    def test_expired_entry_is_reclaimed(self):
+        ledger = IdempotencyLedger(self.make_backend(), ttl_seconds=-1, claim_ttl_seconds=60)
+        ledger.claim(self.key)
+        ledger.complete(self.key, 200, '{}')
+        
+        claimed, _ = ledger.claim(self.key)
+        self.assertTrue(claimed)
+
+
+class TestMemoryLedger(LedgerBehaviour, unittest.TestCase):
+    """
+    Test cases for the in-memory LRU ledger.
+    """
+    
+    def make_backend(self):
+        return MemoryLedgerBackend(max_entries=100)
+    
+    def test_lru_eviction(self):
+        backend = MemoryLedgerBackend(max_entries=2)
+        for key in ('a', 'b', 'c'):
+            backend.claim(key, 60)
+        
+        self.assertEqual(backend.count(), 2)
+        self.assertTrue(backend.claim('a', 60)[0])
+
+
+class TestSQLiteLedger(LedgerBehaviour, unittest.TestCase):
+    """
+    Test cases for the SQLite ledger.
+    """
+    
+    def make_backend(self):
+        return SQLiteLedgerBackend(os.path.join(self.temp_dir.name, 'ledger.db'))
+    
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        super().setUp()
+    
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import unittest
+from app.clients.inflow_client import InFlowClient, SALES_ORDER_INCLUDE, build_include
+from app.clients.order_readiness import OrderReadiness
+
+
+class SavingOrder:
+    """
+    Order reads that return each version in turn, then the last one forever.
+    """
+    
+    def __init__(self, *versions):
+        self.versions = list(versions)
+        self.reads = 0
+    
+    def __call__(self):
+        self.reads += 1
+        timestamp, line_count = self.versions[min(self.reads, len(self.versions)) - 1]
+        return {'orderNumber': 'SO-1', 'timestamp': timestamp, 'lines': [{}] * line_count}
+
+
+class TestOrderReadiness(unittest.TestCase):
+    """
+    Test cases for re-reading orders InFlow is still saving.
+    """
+    
+    def test_settled_order_needs_one_confirming_read(self):
+        readiness = OrderReadiness(max_polls=4, initial_delay=0.01)
+        fetch = SavingOrder(('0x01', 3))
+        self.assertEqual(readiness.fetch_when_ready(fetch)['timestamp'], '0x01')
+        self.assertEqual(fetch.reads, 2)
+        self.assertEqual(readiness.get_status()['changed'], 0)
+    
+    def test_follows_order_until_two_reads_agree(self):
+        readiness = OrderReadiness(max_polls=4, initial_delay=0.01)
+        fetch = SavingOrder(('0x01', 1), ('0x02', 3), ('0x03', 5))
+        order = readiness.fetch_when_ready(fetch)
+        self.assertEqual((order['timestamp'], len(order['lines'])), ('0x03', 5))
+        self.assertEqual(fetch.reads, 4)
+        status = readiness.get_status()
+        self.assertEqual((status['changed'], status['unsettled'], status['reads']), (1, 0, 4))
+    
+    def test_gives_up_after_max_polls(self):
+        readiness = OrderReadiness(max_polls=2, initial_delay=0.01)
+        fetch = SavingOrder(('0x01', 1), ('0x02', 2), ('0x03', 3), ('0x04', 4))
+        self.assertEqual(readiness.fetch_when_ready(fetch)['timestamp'], '0x03')
+        self.assertEqual(readiness.get_status()['unsettled'], 1)
+
+
+class TestSalesOrderInclude(unittest.TestCase):
+    """
+    Test cases for the include= set derived from declared consumers.
+    """
+    
+    def test_build_include_is_minimal_and_stable(self):
+        self.assertEqual(build_include(['lines', 'customer', 'lines.product', 'customer']), 'customer,lines.product')
+        self.assertEqual(build_include([]), '')
+    
+    def test_union_of_declared_consumers(self):
+        client = InFlowClient(api_key='x', company_id='test', base_url='http://localhost')
+        self.assertEqual(client.sales_order_include, SALES_ORDER_INCLUDE)
+        
+        client.require_includes('Assembly Fee Validation', ['lines.product'])
+        client.require_includes('logger_service', ['salesRepTeamMember'])
+        client.require_includes('Credit Card Fee Validation', ['lines.product', 'paymentLines'])
+        self.assertEqual(client.sales_order_include, 'lines.product,paymentLines,salesRepTeamMember')
+        
+        client.require_includes('Credit Card Fee Validation', [])
+        self.assertEqual(client.sales_order_include, 'lines.product,salesRepTeamMember')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import hashlib
+import json
+import math
+import unittest
+from datetime import datetime
+from decimal import Decimal
+from unittest.mock import patch
+
+from app.main import app
+from app.services.dynamodb_error_tracker import DynamoDBErrorTracker
+from app.utils import json_codec
+
+
+class TestJsonCodec(unittest.TestCase):
+    """
+    Test cases for the pluggable JSON codec.
+    """
+    
+    def test_round_trip_matches_stdlib(self):
+        order = {'orderNumber': 'SO-000001', 'total': 12.5, 'lines': [{'sku': 'B12', 'qty': 3}],
+                 'remarks': 'Café', 'big': 2 ** 70}
+        encoded = json_codec.dumps(order, sort_keys=True)
+        self.assertEqual(json.loads(encoded), json.loads(json.dumps(order, sort_keys=True)))
+        del order['big']
+        with patch.object(json_codec, 'orjson', None):
+            self.assertEqual(json_codec.dumps(order, indent=True), json.dumps(order, indent=2, ensure_ascii=False))
+            stdlib_encoded = json_codec.dumps(order, sort_keys=True)
+        self.assertEqual(json_codec.dumps(order, sort_keys=True), stdlib_encoded)
+        self.assertEqual(json_codec.dumps(order, indent=True), json.dumps(order, indent=2, ensure_ascii=False))
+        self.assertEqual(json_codec.loads(encoded.encode('utf-8'))['remarks'], 'Café')
+        self.assertEqual(json_codec.dumps({1: 'a'}), '{"1":"a"}')
+        self.assertTrue(math.isnan(json_codec.loads('{"x": NaN}')['x']))
+        self.assertRaises(json_codec.JSONDecodeError, json_codec.loads, b'{not json')
+    
+    def test_unsupported_types_use_default(self):
+        created = datetime(2025, 1, 2, 3, 4, 5)
+        self.assertEqual(json_codec.dumps({'at': created}, default=str), '{"at":"2025-01-02 03:04:05"}')
+        self.assertRaises(TypeError, json_codec.dumps, {'at': created})
+        
+        with app.app_context():
+            body = app.json.response({'fee': Decimal('1.50'), 'day': created}).get_json()
+        self.assertEqual(body, {'fee': '1.50', 'day': 'Thu, 02 Jan 2025 03:04:05 GMT'})
+    
+    def test_dynamodb_error_hash_is_backend_independent(self):
+        details = {'sku': 'B12', 'line_number': 3, 'note': 'Café'}
+        expected_input = f"o1:Rule:msg:{json.dumps(details, sort_keys=True)}"
+        expected = hashlib.sha256(expected_input.encode()).hexdigest()[:16]
+        tracker = DynamoDBErrorTracker.__new__(DynamoDBErrorTracker)
+        self.assertEqual(tracker.generate_error_hash('o1', 'Rule', 'msg', details), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import io
+import json
+import unittest
+from unittest import mock
+
+from app.utils import log
+from app.validators import OrderFetcher
+
+
+ORDER = {
+    'salesOrderId': 'order-1',
+    'orderNumber': 'SO-000001',
+    'lines': [
+        {'product': {'name': 'Base Cabinet', 'sku': 'B12'}, 'quantity': {'standardQuantity': '2'},
+         'unitPrice': '100.00', 'discount': {'value': '0', 'isPercent': True}},
+        {'product': {'name': 'Wall Cabinet', 'sku': 'W3030'}, 'quantity': {'standardQuantity': '1'},
+         'unitPrice': '80.00', 'discount': {'value': '0', 'isPercent': True}},
+    ]
+}
+
+
+class TestStructuredLogging(unittest.TestCase):
+    """
+    Test cases for the structured logger.
+    """
+    
+    def tearDown(self):
+        log.configure_logging()
+    
+    def test_json_format_is_single_line_with_extra_fields(self):
+        """Test that JSON records are one line and carry extra fields"""
+        stream = io.StringIO()
+        log.configure_logging(level='INFO', fmt='json', stream=stream)
+        
+        log.get_logger('test').info("Order %s\nvalidated", 'SO-1', extra={'order_id': 'order-1'})
+        
+        lines = stream.getvalue().splitlines()
+        self.assertEqual(len(lines), 1)
+        entry = json.loads(lines[0])
+        self.assertEqual(entry['msg'], "Order SO-1\nvalidated")
+        self.assertEqual(entry['level'], 'INFO')
+        self.assertEqual(entry['logger'], 'app.test')
+        self.assertEqual(entry['order_id'], 'order-1')
+    
+    def test_payload_sampling(self):
+        """Test that payloads are sampled at INFO and always logged at DEBUG"""
+        logger = log.get_logger('test')
+        
+        log.configure_logging(level='INFO', fmt='text', stream=io.StringIO())
+        with mock.patch.object(log.config, 'LOG_PAYLOAD_SAMPLE_RATE', 0.0):
+            self.assertFalse(log.should_log_payload(logger))
+        with mock.patch.object(log.config, 'LOG_PAYLOAD_SAMPLE_RATE', 1.0):
+            self.assertTrue(log.should_log_payload(logger))
+        
+        log.configure_logging(level='DEBUG', fmt='text', stream=io.StringIO())
+        with mock.patch.object(log.config, 'LOG_PAYLOAD_SAMPLE_RATE', 0.0):
+            self.assertTrue(log.should_log_payload(logger))
+    
+    def test_order_fetcher_output_does_not_depend_on_log_level(self):
+        """Test that per-line details are reported whether or not DEBUG logging is on"""
+        log.configure_logging(level='INFO', fmt='text', stream=io.StringIO())
+        quiet = OrderFetcher().validate(ORDER)
+        
+        log.configure_logging(level='DEBUG', fmt='text', stream=io.StringIO())
+        verbose = OrderFetcher().validate(ORDER)
+        
+        self.assertEqual(verbose.info_messages, quiet.info_messages)
+        self.assertEqual(len(quiet.info_messages), 5)
+        self.assertTrue(quiet.info_messages[-1].startswith('Line 2: Name: Wall Cabinet'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,200 @@
+import asyncio
+import threading
+import time
+import unittest
+from contextlib import contextmanager
+from unittest.mock import MagicMock, patch
+from app.services.order_lock_service import LocalLockBackend, OrderLockService, OrderLockTimeout
+from app.utils.resilience import deadline_scope
+from app.services import error_monitor_service as monitor_module
+from app.services import order_lock_service as lock_module
+from app.services.async_order_processing_service import AsyncOrderProcessingService
+
+
+class TestOrderLockService(unittest.TestCase):
+    """
+    Test cases for per-order locking.
+    """
+    
+    def _hold(self, service, order_id, release: threading.Event):
+        started = threading.Event()
+        def hold():
+            with service.lock(order_id):
+                started.set()
+                release.wait(5)
+        thread = threading.Thread(target=hold)
+        thread.start()
+        started.wait(5)
+        return thread
+    
+    def test_same_order_serializes(self):
+        service = OrderLockService(LocalLockBackend(stripes=64), timeout_seconds=0.1)
+        release = threading.Event()
+        holder = self._hold(service, 'order-1', release)
+        
+        with self.assertRaises(OrderLockTimeout):
+            with service.lock('order-1'):
+                pass
+        
+        release.set()
+        holder.join()
+        with service.lock('order-1'):
+            pass
+        self.assertEqual(service.get_status()['timeouts'], 1)
+    
+    def test_request_deadline_shortens_the_wait(self):
+        service = OrderLockService(LocalLockBackend(stripes=64), timeout_seconds=5)
+        release = threading.Event()
+        holder = self._hold(service, 'order-1', release)
+        
+        started = time.monotonic()
+        with self.assertRaises(OrderLockTimeout), deadline_scope(0.1):
+            with service.lock('order-1'):
+                pass
+        
+        self.assertLess(time.monotonic() - started, 1)
+        release.set()
+        holder.join()
+    
+    def test_other_orders_run_in_parallel(self):
+        backend = LocalLockBackend(stripes=64)
+        service = OrderLockService(backend, timeout_seconds=0.1)
+        other = next(f'order-{n}' for n in range(2, 100)
+                     if backend._stripe(f'order-{n}') is not backend._stripe('order-1'))
+        release = threading.Event()
+        holder = self._hold(service, 'order-1', release)
+        
+        started = time.monotonic()
+        with service.lock(other):
+            elapsed = time.monotonic() - started
+        
+        release.set()
+        holder.join()
+        self.assertLess(elapsed, 0.1)
+    
+    def test_reentrant_within_thread(self):
+        service = OrderLockService(LocalLockBackend(stripes=1), timeout_seconds=0.1)
+        
+        with service.lock('order-1'):
+            with service.lock('order-1'):
+                pass
+        
+        self.assertEqual(service.get_status()['acquired'], 1)
+
+
+class TestErrorMonitorLocking(unittest.TestCase):
+    """
+    Test cases for the error monitor's per-order locking.
+    """
+    
+    def test_orders_are_refetched_under_their_lock(self):
+        held = set()
+        state = {'active': 0, 'peak': 0, 'unlocked_fetches': []}
+        guard = threading.Lock()
+        
+        @contextmanager
+        def fake_lock(order_id):
+            with guard:
+                held.add(order_id)
+            try:
+                yield
+            finally:
+                with guard:
+                    held.discard(order_id)
+        
+        def fetch(order_id):
+            with guard:
+                if order_id not in held:
+                    state['unlocked_fetches'].append(order_id)
+                state['active'] += 1
+                state['peak'] = max(state['peak'], state['active'])
+            time.sleep(0.05)
+            with guard:
+                state['active'] -= 1
+            return {'orderNumber': f'SO-{order_id}'}
+        
+        order_ids = [f'o{i}' for i in range(8)]
+        tracker = MagicMock()
+        tracker.get_all_expired_errors.return_value = [
+            {'order_id': order_id, 'error_hash': f'h-{order_id}', 'order_number': f'SO-{order_id}',
+             'age_minutes': 31.0, 'error_details': {'message': 'bad'}}
+            for order_id in order_ids
+        ]
+        tracker.get_tracked_error_hashes.side_effect = lambda order_id: [f'h-{order_id}']
+        notifier = MagicMock()
+        
+        with patch.object(monitor_module, 'error_tracker_service', tracker), \
+                patch.object(monitor_module, 'lock_order', fake_lock), \
+                patch.object(monitor_module.inflow_client, 'get_sales_order', side_effect=fetch), \
+                patch.object(monitor_module, 'logger_service', MagicMock()), \
+                patch.object(monitor_module, 'notification_service', notifier), \
+                patch.object(monitor_module.config, 'ERROR_MONITOR_FETCH_CONCURRENCY', 4):
+            monitor_module.ErrorMonitorService()._check_expired_errors()
+        
+        self.assertEqual(state['unlocked_fetches'], [])
+        self.assertEqual(state['peak'], 4)
+        self.assertEqual(notifier.send_validation_failure_notification.call_count, 8)
+        self.assertEqual(tracker.clear_error.call_count, 8)
+
+
+class TestAsyncPipelineLocking(unittest.TestCase):
+    """
+    Test cases for the order lock around the async pipeline.
+    """
+    
+    def test_async_runs_hold_the_order_lock(self):
+        service = OrderLockService(LocalLockBackend(stripes=64), timeout_seconds=2)
+        pipeline = AsyncOrderProcessingService(executor_workers=4)
+        active = {'order-1': 0, 'order-2': 0}
+        peak = dict(active)
+        started = []
+        
+        def validate(order_id):
+            with lock_module.lock_order(order_id):  # schedule_validation's lock, on another pool thread
+                time.sleep(0.02)
+        
+        async def run_pipeline(order_id, event_type):
+            started.append((order_id, time.monotonic()))
+            active[order_id] += 1
+            peak[order_id] = max(peak[order_id], active[order_id])
+            await pipeline.run_blocking(validate, order_id)
+            await asyncio.sleep(0.02)
+            active[order_id] -= 1
+            return {'status': 'processed'}
+        
+        # The error monitor holds order-1 on its own thread for a while
+        release = threading.Event()
+        holding = threading.Event()
+        def monitor():
+            with service.lock('order-1'):
+                holding.set()
+                release.wait(5)
+        holder = threading.Thread(target=monitor)
+        
+        async def scenario():
+            holder.start()
+            await asyncio.get_running_loop().run_in_executor(None, holding.wait, 5)
+            asyncio.get_running_loop().call_later(0.1, release.set)
+            released_after = time.monotonic() + 0.1
+            await asyncio.gather(*(pipeline.process_order('order-1') for _ in range(3)),
+                                 pipeline.process_order('order-2'))
+            return released_after
+        
+        try:
+            with patch.object(lock_module, 'order_lock_service', service), \
+                    patch.object(pipeline, '_run_pipeline', run_pipeline):
+                released_after = asyncio.run(scenario())
+        finally:
+            release.set()
+            holder.join()
+            pipeline.executor.shutdown()
+        
+        self.assertEqual(peak, {'order-1': 1, 'order-2': 1})
+        self.assertTrue(all(at >= released_after - 0.01 for order_id, at in started if order_id == 'order-1'))
+        self.assertLess(min(at for order_id, at in started if order_id == 'order-2'), released_after)
+        status = service.get_status()
+        self.assertEqual((status['acquired'], status['timeouts']), (5, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
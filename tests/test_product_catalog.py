@@ -0,0 +1,100 @@
+import os
+import shutil
+import tempfile
+import unittest
+from app.services.product_catalog_service import ProductCatalogService
+from app.validators import AssemblyFeeValidator
+
+
+class FakeProductsClient:
+    """
+    Serves a product list in pages like InFlow's products endpoint.
+    """
+    
+    def __init__(self, products):
+        self.products = products
+    
+    def list_products(self, filters=None, include=None, count=100, skip=0):
+        matches = self.products
+        if filters and 'lastModifiedDateTime' in filters:
+            from_date = filters['lastModifiedDateTime']['fromDate']
+            matches = [p for p in matches if p['lastModifiedDateTime'] >= from_date]
+        return matches[skip:skip + count]
+
+
+def _product(i, category='Base Cabinet', modified='2025-01-01T00:00:00Z'):
+    return {'productId': f'p{i}', 'name': f'SW-B{i}', 'category': {'name': category},
+            'lastModifiedDateTime': modified}
+
+
+class TestProductCatalogService(unittest.TestCase):
+    """
+    Test cases for the local product mirror.
+    """
+    
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.client = FakeProductsClient([_product(i) for i in range(25)])
+    
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def _catalog(self):
+        return ProductCatalogService(self.client, os.path.join(self.temp_dir, 'catalog.db'), page_size=10)
+    
+    def test_full_sync_resumes_within_page_budget(self):
+        catalog = self._catalog()
+        
+        first = catalog.sync(max_pages=2)
+        self.assertEqual((first['mode'], first['products'], first['complete']), ('full', 20, False))
+        self.assertTrue(catalog.get_status()['full_sync_in_progress'])
+        
+        second = catalog.sync_if_due(max_pages=2)
+        self.assertEqual((second['mode'], second['products'], second['complete']), ('full', 5, True))
+        
+        status = catalog.get_status()
+        self.assertEqual(status['products'], 25)
+        self.assertIsNotNone(status['staleness_seconds'])
+        self.assertEqual(catalog.get_category('sw-b7'), 'Base Cabinet')
+        self.assertIsNone(catalog.get_category('SW-UNKNOWN'))
+    
+    def test_incremental_sync_fetches_modified_products(self):
+        catalog = self._catalog()
+        catalog.sync()
+        
+        self.client.products[3] = _product(3, category='Tall Cabinet', modified='2099-01-01T00:00:00Z')
+        summary = catalog.sync()
+        
+        self.assertEqual((summary['mode'], summary['products']), ('incremental', 1))
+        self.assertEqual(catalog.get_category('SW-B3'), 'Tall Cabinet')
+        self.assertEqual(catalog.get_status()['cursor'], '2099-01-01T00:00:00Z')
+    
+    def test_full_sync_drops_deleted_products_and_survives_restart(self):
+        catalog = self._catalog()
+        catalog.sync()
+        
+        del self.client.products[0]
+        catalog.sync(full=True)
+        
+        reopened = self._catalog()
+        self.assertEqual(reopened.get_status()['products'], 24)
+        self.assertIsNone(reopened.get_category('SW-B0'))
+        self.assertEqual(reopened.get_category('SW-B1'), 'Base Cabinet')
+        self.assertIsNone(reopened.sync_if_due())
+    
+    def test_assembly_fee_falls_back_to_csv_for_unknown_categories(self):
+        self.client.products[3] = _product(3, category='Tall Cabinet')
+        self.client.products[12] = _product(12, category='Cabinets / Base')
+        catalog = self._catalog()
+        catalog.sync()
+        validator = AssemblyFeeValidator()
+        validator.product_catalog = catalog
+        
+        self.assertEqual(validator._get_product_category('SW-B3'), 'Tall Cabinet')
+        with self.assertLogs('app.validators', level='WARNING'):
+            self.assertEqual(validator._get_product_category('SW-B12'), 'Base Cabinet')
+        self.assertEqual(validator._calculate_assembly_fee_for_product('SW-B12', 2), 30.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
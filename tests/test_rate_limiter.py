@@ -0,0 +1,103 @@
+import os
+import time
+import unittest
+import uuid
+from app.utils.rate_limiter import TokenBucket, DynamoDBTokenBucket, parse_retry_after
+from app.utils.resilience import DeadlineExceeded
+
+
+class TestTokenBucket(unittest.TestCase):
+    """
+    Test cases for the InFlow client rate limiter.
+    """
+    
+    def test_burst_then_paced(self):
+        bucket = TokenBucket(rate_per_minute=600, burst=3)  # one token per 0.1s
+        
+        for _ in range(3):
+            self.assertEqual(bucket.try_acquire(), 0.0)
+        self.assertGreater(bucket.try_acquire(), 0.05)
+        
+        waited = bucket.acquire()
+        self.assertGreater(waited, 0.05)
+        self.assertEqual(bucket.get_status()['delayed'], 1)
+    
+    def test_throttle_slows_down_and_recovers(self):
+        bucket = TokenBucket(rate_per_minute=600, burst=3)
+        
+        bucket.on_throttled(retry_after=0.2)
+        status = bucket.get_status()
+        self.assertEqual(status['rate_per_minute'], 300)
+        self.assertEqual(status['throttled'], 1)
+        self.assertGreater(bucket.try_acquire(), 0.1)
+        
+        started = time.monotonic()
+        bucket.acquire()
+        self.assertGreaterEqual(time.monotonic() - started, 0.15)
+        
+        for _ in range(20):
+            bucket.on_success()
+        self.assertEqual(bucket.get_status()['rate_per_minute'], 600)
+    
+    def test_acquire_gives_up_at_the_timeout(self):
+        bucket = TokenBucket(rate_per_minute=600, burst=1)
+        bucket.on_throttled(retry_after=30)
+        
+        started = time.monotonic()
+        self.assertRaises(DeadlineExceeded, bucket.acquire, timeout=1)
+        self.assertLess(time.monotonic() - started, 0.5)
+        self.assertEqual(bucket.get_status()['timed_out'], 1)
+    
+    def test_parse_retry_after(self):
+        self.assertEqual(parse_retry_after('30'), 30.0)
+        self.assertIsNone(parse_retry_after(None))
+        self.assertIsNone(parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT'))
+
+
+
+@unittest.skipUnless(os.getenv('DYNAMODB_ENDPOINT_URL'), 'set DYNAMODB_ENDPOINT_URL to run against DynamoDB Local')
+class TestDynamoDBTokenBucket(unittest.TestCase):
+    """
+    Test cases for the shared bucket (run against DynamoDB Local).
+    """
+    
+    def setUp(self):
+        import boto3
+        
+        self.table_name = f'test-rate-limits-{uuid.uuid4().hex[:8]}'
+        dynamodb = boto3.resource('dynamodb', region_name='us-east-2',
+                                  endpoint_url=os.environ['DYNAMODB_ENDPOINT_URL'])
+        self.table = dynamodb.create_table(
+            TableName=self.table_name,
+            AttributeDefinitions=[{'AttributeName': 'bucket_id', 'AttributeType': 'S'}],
+            KeySchema=[{'AttributeName': 'bucket_id', 'KeyType': 'HASH'}],
+            BillingMode='PAY_PER_REQUEST'
+        )
+        self.table.wait_until_exists()
+    
+    def tearDown(self):
+        self.table.delete()
+    
+    def _bucket(self):
+        return DynamoDBTokenBucket('inflow:test', rate_per_minute=60, burst=3, table_name=self.table_name,
+                                   region_name='us-east-2', endpoint_url=os.environ['DYNAMODB_ENDPOINT_URL'])
+    
+    def test_containers_share_one_budget(self):
+        first, second = self._bucket(), self._bucket()
+        
+        taken = [bucket.try_acquire() for bucket in (first, second, first)]
+        self.assertEqual(taken, [0.0, 0.0, 0.0])
+        self.assertGreater(second.try_acquire(), 0.5)
+        self.assertEqual(first.get_status()['errors'], 0)
+    
+    def test_throttle_pauses_every_container(self):
+        first, second = self._bucket(), self._bucket()
+        
+        first.on_throttled(retry_after=30)
+        
+        self.assertGreater(second.try_acquire(), 20)
+        self.assertGreater(second.get_status()['paused_seconds'], 20)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,147 @@
+import time
+import unittest
+from unittest.mock import patch
+
+import requests
+
+from app.utils.resilience import (
+    CircuitBreaker, CircuitOpenError, DeadlineExceeded, RetryPolicy, call_with_retries
+)
+
+
+def _http_error(status):
+    response = requests.Response()
+    response.status_code = status
+    return requests.exceptions.HTTPError(f'{status} Error', response=response)
+
+
+class FlakyCall:
+    """
+    Attempt function that raises the given errors before succeeding.
+    """
+    
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.calls = 0
+    
+    def __call__(self, deadline):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return 'ok'
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    """
+    Test cases for the per-dependency circuit breaker.
+    """
+    
+    def test_opens_after_threshold_and_probes_after_reset(self):
+        breaker = CircuitBreaker('inflow', failure_threshold=2, reset_seconds=0.1)
+        for _ in range(2):
+            breaker.before_call()
+            breaker.record_failure()
+        self.assertEqual(breaker.state, 'open')
+        self.assertRaises(CircuitOpenError, breaker.before_call)
+        
+        time.sleep(0.15)
+        breaker.before_call()  # Probe
+        self.assertEqual(breaker.state, 'half_open')
+        self.assertRaises(CircuitOpenError, breaker.before_call)  # One probe at a time
+        breaker.record_failure()
+        self.assertEqual(breaker.state, 'open')
+        
+        time.sleep(0.15)
+        breaker.before_call()
+        breaker.record_success()
+        status = breaker.get_status()
+        self.assertEqual((status['state'], status['opened'], status['rejected']), ('closed', 2, 2))
+
+
+class TestCallWithRetries(unittest.TestCase):
+    """
+    Test cases for retrying outbound calls.
+    """
+    
+    def setUp(self):
+        self.policy = RetryPolicy(max_attempts=3, base_delay=0.01, max_delay=0.02, deadline_seconds=5)
+        self.breaker = CircuitBreaker('test', failure_threshold=5)
+    
+    def test_jitter_stays_within_bounds(self):
+        policy = RetryPolicy(base_delay=0.5, max_delay=8)
+        delay = None
+        for _ in range(200):
+            delay = policy.next_delay(delay)
+            self.assertGreaterEqual(delay, 0.5)
+            self.assertLessEqual(delay, 8)
+    
+    def test_transient_errors_are_retried(self):
+        call = FlakyCall(_http_error(503), requests.exceptions.ConnectionError('reset'))
+        self.assertEqual(call_with_retries(call, self.breaker, self.policy), 'ok')
+        self.assertEqual(call.calls, 3)
+        self.assertEqual(self.breaker.get_status()['failures'], 2)
+        self.assertEqual(self.breaker.state, 'closed')
+    
+    def test_client_errors_are_not_retried(self):
+        call = FlakyCall(_http_error(404))
+        with self.assertRaises(requests.exceptions.HTTPError):
+            call_with_retries(call, self.breaker, self.policy)
+        self.assertEqual(call.calls, 1)
+        self.assertEqual(self.breaker.get_status()['consecutive_failures'], 0)
+    
+    def test_gives_up_when_attempts_run_out(self):
+        call = FlakyCall(*[_http_error(502)] * 3)
+        with self.assertRaises(requests.exceptions.HTTPError):
+            call_with_retries(call, self.breaker, self.policy)
+        self.assertEqual(call.calls, 3)
+    
+    def test_deadline_bounds_attempt_timeouts(self):
+        timeouts = []
+        
+        def attempt(deadline):
+            timeouts.append(deadline.timeout(30))
+            raise requests.exceptions.Timeout('slow')
+        
+        policy = RetryPolicy(max_attempts=10, base_delay=0.05, max_delay=0.05, deadline_seconds=0.12)
+        with self.assertRaises((requests.exceptions.Timeout, DeadlineExceeded)):
+            call_with_retries(attempt, None, policy)
+        self.assertLess(len(timeouts), 4)
+        self.assertTrue(all(timeout <= 0.12 for timeout in timeouts))
+    
+    def test_open_circuit_fails_fast(self):
+        breaker = CircuitBreaker('test', failure_threshold=2, reset_seconds=60)
+        with self.assertRaises(requests.exceptions.HTTPError):
+            call_with_retries(FlakyCall(*[_http_error(500)] * 3), breaker, self.policy)
+        
+        call = FlakyCall()
+        with patch('app.utils.resilience.time.sleep') as sleep:
+            self.assertRaises(CircuitOpenError, call_with_retries, call, breaker, self.policy)
+        self.assertEqual(call.calls, 0)
+        sleep.assert_not_called()
+
+    
+    def test_deadline_before_send_leaves_breaker_as_it_was(self):
+        breaker = CircuitBreaker('test', failure_threshold=1, reset_seconds=0.1)
+        
+        def opened_meanwhile(deadline):
+            breaker.record_failure()  # Another caller's request failed while this one waited
+            raise DeadlineExceeded("No rate-limit token before the deadline")
+        
+        self.assertRaises(DeadlineExceeded, call_with_retries, opened_meanwhile, breaker, self.policy)
+        self.assertEqual(breaker.state, 'open')
+        
+        def token_wait(deadline):
+            raise DeadlineExceeded("No rate-limit token before the deadline")
+        
+        time.sleep(0.15)
+        self.assertRaises(DeadlineExceeded, call_with_retries, token_wait, breaker, self.policy)
+        self.assertEqual(breaker.state, 'half_open')
+        self.assertEqual(breaker.get_status()['consecutive_failures'], 1)
+        
+        # The probe slot is free again, and a failed probe reopens the circuit
+        with self.assertRaises(requests.exceptions.HTTPError):
+            call_with_retries(FlakyCall(_http_error(500)), breaker, self.policy)
+        self.assertEqual(breaker.state, 'open')
+
+if __name__ == '__main__':
+    unittest.main()
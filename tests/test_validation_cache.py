@@ -0,0 +1,92 @@
+import unittest
+from app.services.validation_cache import ValidationResultCache, compute_order_fingerprint
+from app.services.validation_service import ValidationService
+from app.validators.base import BaseValidator, ValidationResult
+
+
+ORDER = {
+    'salesOrderId': 'order-1',
+    'orderRemarks': 'Promo discount approved',
+    'lines': [
+        {'productId': 'p1', 'product': {'name': 'Base Cabinet', 'sku': 'B12'}, 'discount': {'value': '10'}},
+    ],
+    'pickLines': [{'productId': 'p1', 'quantity': {'standardQuantity': '1'}}],
+    'assignedToTeamMemberId': 'tm-1'
+}
+
+FIELDS = ['orderRemarks', 'lines[].discount', 'lines[].product.sku']
+
+
+class CountingValidator(BaseValidator):
+    """
+    Validator that records how often it runs.
+    """
+    
+    fingerprint_fields = FIELDS
+    
+    def __init__(self):
+        super().__init__("Counting Validation")
+        self.calls = 0
+    
+    def validate(self, order_data, fetched_data=None):
+        self.calls += 1
+        result = ValidationResult(self.rule_name)
+        result.add_issue('Discount needs review', details={'line_number': 1})
+        return result
+
+
+class TestOrderFingerprint(unittest.TestCase):
+    """
+    Test cases for canonical order fingerprints.
+    """
+    
+    def test_ignores_fields_no_validator_reads(self):
+        changed = dict(ORDER, pickLines=[], assignedToTeamMemberId='tm-2')
+        self.assertEqual(
+            compute_order_fingerprint(ORDER, FIELDS),
+            compute_order_fingerprint(changed, FIELDS)
+        )
+    
+    def test_detects_line_discount_change(self):
+        changed = dict(ORDER, lines=[dict(ORDER['lines'][0], discount={'value': '15'})])
+        self.assertNotEqual(
+            compute_order_fingerprint(ORDER, FIELDS),
+            compute_order_fingerprint(changed, FIELDS)
+        )
+
+
+class TestValidationResultCache(unittest.TestCase):
+    """
+    Test cases for the bounded validator result cache.
+    """
+    
+    def test_hit_miss_and_eviction(self):
+        cache = ValidationResultCache(max_entries=1)
+        cache.put('order-1', 'fp-1', {'Rule': {'rule': 'Rule'}})
+        
+        self.assertIsNone(cache.get('order-1', 'fp-2'))
+        self.assertEqual(cache.get('order-1', 'fp-1'), {'Rule': {'rule': 'Rule'}})
+        
+        cache.put('order-2', 'fp-1', {})
+        self.assertIsNone(cache.get('order-1', 'fp-1'))
+        self.assertEqual(cache.get_status()['evictions'], 1)
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
+    
+    def test_service_reuses_results_for_unchanged_content(self):
+        service = ValidationService()
+        validator = CountingValidator()
+        service.register_validator(validator)
+        
+        first = service.run_validators(ORDER)
+        second = service.run_validators(dict(ORDER, pickLines=[]))
+        
+        self.assertEqual(validator.calls, 1)
+        self.assertEqual(second['cached_rules'], ['Counting Validation'])
+        self.assertEqual(first['issues'], second['issues'])
+        
+        service.run_validators(dict(ORDER, orderRemarks=''))
+        self.assertEqual(validator.calls, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
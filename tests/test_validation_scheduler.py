@@ -0,0 +1,81 @@
+import threading
+import time
+import unittest
+from app.services.validation_scheduler import PriorityScheduler, classify_order, parse_weights
+from app.utils.resilience import DeadlineExceeded, deadline_scope
+
+
+class TestClassifyOrder(unittest.TestCase):
+    """
+    Test cases for priority classification.
+    """
+    
+    def test_classes(self):
+        self.assertEqual(classify_order({'isQuote': True}, 'SalesOrderCreatedV1'), 'quote')
+        self.assertEqual(classify_order({'isQuote': False}, 'SalesOrderCreatedV1'), 'new_order')
+        self.assertEqual(classify_order({'paymentStatus': 'Paid'}, 'SalesOrderUpdatedV1'), 'paid_order')
+        self.assertEqual(classify_order({'paymentStatus': 'Owing'}, 'SalesOrderUpdatedV1'), 'order_update')
+    
+    def test_parse_weights(self):
+        self.assertEqual(parse_weights('quote=3, batch=0'), {'quote': 3, 'batch': 1})
+        self.assertEqual(parse_weights(''), {})
+
+
+class TestPriorityScheduler(unittest.TestCase):
+    """
+    Test cases for weighted slot scheduling.
+    """
+    
+    def test_weighted_order_without_starvation(self):
+        scheduler = PriorityScheduler(max_concurrent=1, weights={'manual': 3, 'quote': 1})
+        release = threading.Event()
+        order = []
+        
+        def run(priority_class):
+            with scheduler.slot(priority_class):
+                if priority_class == 'batch':
+                    release.wait(5)
+                order.append(priority_class)
+        
+        holder = threading.Thread(target=run, args=('batch',))
+        holder.start()
+        while scheduler.get_status()['running'] == 0:
+            time.sleep(0.01)
+        
+        workers = [threading.Thread(target=run, args=(c,)) for c in ['quote'] * 3 + ['manual'] * 6]
+        for worker in workers:
+            worker.start()
+        while sum(c['queued'] for c in scheduler.get_status()['classes'].values()) < len(workers):
+            time.sleep(0.01)
+        
+        release.set()
+        for thread in [holder] + workers:
+            thread.join(5)
+        
+        served = order[1:]
+        self.assertEqual(served[0], 'manual')
+        self.assertIn('quote', served[:4])
+        self.assertEqual(served.count('quote'), 3)
+        
+        status = scheduler.get_status()
+        self.assertEqual(status['running'], 0)
+        self.assertEqual(status['classes']['manual']['completed'], 6)
+        self.assertGreater(status['classes']['quote']['wait_ms']['max'], 0)
+    
+    def test_queued_work_gives_up_at_the_request_deadline(self):
+        scheduler = PriorityScheduler(max_concurrent=1)
+        
+        with scheduler.slot('batch'):
+            with self.assertRaises(DeadlineExceeded), deadline_scope(0.1):
+                with scheduler.slot('manual'):
+                    pass
+            status = scheduler.get_status()
+        
+        self.assertEqual(status['classes']['manual']['queued'], 0)
+        self.assertEqual(status['classes']['manual']['timed_out'], 1)
+        with scheduler.slot('manual'):
+            pass
+
+
+if __name__ == '__main__':
+    unittest.main()
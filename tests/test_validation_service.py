@@ -0,0 +1,336 @@
+import pickle
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+from app.services import validation_service as validation_module
+from app.services.timing_service import timing_service, TimingService
+from app.services.validation_service import ValidationService
+from app.validators import DiscountValidator
+from app.validators.base import BaseValidator, ValidationContext, ValidationResult, ORDER_FETCHER_RULE
+from app.validators.plugins import load_validator
+from app.utils.resilience import _call_deadline, current_deadline, deadline_scope
+
+
+ORDER = {'salesOrderId': 'order-1', 'orderNumber': 'SO-000001', 'lines': []}
+
+
+class FakeFetcher(BaseValidator):
+    """
+    Stand-in for the OrderFetcher that formats nothing but a marker.
+    """
+    
+    def __init__(self, fail: bool = False):
+        super().__init__(ORDER_FETCHER_RULE)
+        self.fail = fail
+    
+    def validate(self, order_data):
+        if self.fail:
+            raise RuntimeError('InFlow order could not be formatted')
+        result = ValidationResult(self.rule_name)
+        result.fetched_data = {'order_info': {'order_number': order_data['orderNumber']}}
+        return result
+
+
+def slow_rule(name: str, delay: float, depends_on=(ORDER_FETCHER_RULE,)):
+    """
+    Build a validator that sleeps, then reports which order data it received.
+    """
+    class SlowValidator(BaseValidator):
+        fingerprint_fields = None
+        
+        def __init__(self):
+            super().__init__(name)
+            self.received = 'not run'
+        
+        def validate(self, order_data, fetched_data=None):
+            time.sleep(delay)
+            self.received = fetched_data
+            result = ValidationResult(self.rule_name)
+            result.add_issue(f'{name} issue', severity='warning')
+            return result
+    
+    SlowValidator.depends_on = list(depends_on)
+    return SlowValidator()
+
+
+class TestValidatorDependencies(unittest.TestCase):
+    """
+    Test cases for dependency-driven validator execution.
+    """
+    
+    def test_independent_rules_run_concurrently_in_registration_order(self):
+        service = ValidationService()
+        rules = [slow_rule('Slow A', 0.3), slow_rule('Slow B', 0.3), slow_rule('Slow C', 0.3)]
+        service.register_validator(FakeFetcher())
+        for rule in rules:
+            service.register_validator(rule)
+        
+        started = time.monotonic()
+        run = service.run_validators(ORDER)
+        elapsed = time.monotonic() - started
+        
+        self.assertLess(elapsed, 0.6)
+        self.assertEqual([r['rule'] for r in run['validator_results']],
+                         [ORDER_FETCHER_RULE, 'Slow A', 'Slow B', 'Slow C'])
+        self.assertEqual([i['rule'] for i in run['issues']], ['Slow A', 'Slow B', 'Slow C'])
+        for rule in rules:
+            self.assertEqual(rule.received, {'order_info': {'order_number': 'SO-000001'}})
+    
+    def test_dependents_wait_for_their_dependencies(self):
+        service = ValidationService()
+        first = slow_rule('First', 0.1)
+        second = slow_rule('Second', 0, depends_on=['First'])
+        service.register_validator(second)
+        service.register_validator(FakeFetcher())
+        service.register_validator(first)
+        
+        run = service.run_validators(ORDER)
+        
+        self.assertEqual([r['rule'] for r in run['validator_results']], ['Second', ORDER_FETCHER_RULE, 'First'])
+        self.assertEqual(second.received, {})
+    
+    def test_failed_dependency_is_reported_and_dependents_still_run(self):
+        service = ValidationService()
+        rule = slow_rule('Slow A', 0)
+        service.register_validator(FakeFetcher(fail=True))
+        service.register_validator(rule)
+        
+        run = service.run_validators(ORDER)
+        
+        self.assertIsNone(rule.received)
+        self.assertEqual(run['issues'][0]['rule'], ORDER_FETCHER_RULE)
+        self.assertIn('could not be formatted', run['issues'][0]['message'])
+    
+    def test_cycles_are_rejected_and_unknown_dependencies_ignored(self):
+        service = ValidationService()
+        service.register_validator(slow_rule('A', 0, depends_on=['B']))
+        self.assertEqual(service.dependencies, {'A': []})
+        
+        self.assertRaises(ValueError, service.register_validator, slow_rule('B', 0, depends_on=['A']))
+        self.assertEqual([v.rule_name for v in service.validators], ['A'])
+
+    
+    def test_inapplicable_rules_are_skipped_and_counted(self):
+        service = ValidationService()
+        skipped = slow_rule('Return Lines Only', 0)
+        skipped.applies_to = lambda summary: summary.has_return_lines
+        service.register_validator(FakeFetcher())
+        service.register_validator(skipped)
+        
+        run = service.run_validators(ORDER)
+        
+        self.assertEqual(skipped.received, 'not run')
+        self.assertEqual(run['skipped_rules'], ['Return Lines Only'])
+        self.assertEqual(run['issues'], [])
+        self.assertEqual(service.get_status()['rules']['Return Lines Only'],
+                         {'depends_on': [ORDER_FETCHER_RULE], 'runs': 0, 'skipped': 1, 'cached': 0,
+                          'timed_out': 0, 'errors': 0})
+
+
+
+class ContextValidator(BaseValidator):
+    """
+    Protocol v2 validator that reports the order number from its context.
+    """
+    
+    depends_on = [ORDER_FETCHER_RULE]
+    
+    def __init__(self):
+        super().__init__("Context Validation")
+    
+    def check(self, context):
+        result = ValidationResult(self.rule_name)
+        result.add_info(f"{context.order_number}: {context.fetched_data['order_info']['order_number']}")
+        return result
+
+
+class BrokenValidator(BaseValidator):
+    """
+    Protocol v1 validator whose own code raises TypeError.
+    """
+    
+    def __init__(self):
+        super().__init__("Broken Validation")
+        self.calls = 0
+    
+    def validate(self, order_data, fetched_data=None):
+        self.calls += 1
+        return len(None)
+
+
+class TestValidatorProtocol(unittest.TestCase):
+    """
+    Test cases for validator dispatch and plugin loading.
+    """
+    
+    def test_v2_and_v1_validators_are_dispatched_once(self):
+        service = ValidationService()
+        broken = BrokenValidator()
+        for validator in (FakeFetcher(), ContextValidator(), broken):
+            service.register_validator(validator)
+        
+        run = service.run_validators(ORDER)
+        
+        self.assertEqual(run['validator_results'][1]['info_messages'], ['SO-000001: SO-000001'])
+        self.assertEqual(broken.calls, 1)
+        self.assertEqual(run['issues'][0]['rule'], 'Broken Validation')
+        self.assertRaises(TypeError, service.register_validator, type('EmptyValidator', (BaseValidator,), {})('Empty Validation'))
+    
+    def test_validators_load_by_module_name_and_pickle(self):
+        validator = load_validator('app.validators.rule_1_discount:DiscountValidator')
+        self.assertIsInstance(validator, DiscountValidator)
+        self.assertIsInstance(pickle.loads(pickle.dumps(validator)), DiscountValidator)
+        
+        context = pickle.loads(pickle.dumps(ValidationContext(ORDER)))
+        self.assertEqual((context.order_id, context.summary.line_count), ('order-1', 0))
+        self.assertRaises(ValueError, load_validator, 'app.validators.rule_1_discount')
+        self.assertRaises(ImportError, load_validator, 'app.validators:MissingValidator')
+
+
+
+class AllocatingValidator(BaseValidator):
+    """
+    Validator that holds about 1 MiB while it runs.
+    """
+    
+    def __init__(self):
+        super().__init__("Allocating Validation")
+    
+    def validate(self, order_data):
+        buffer = bytearray(1024 * 1024)
+        return ValidationResult(self.rule_name, passed=len(buffer) > 0)
+
+
+class TestValidationTimings(unittest.TestCase):
+    """
+    Test cases for per-rule timings and memory samples.
+    """
+    
+    def test_stage_percentiles(self):
+        timings = TimingService(window=10)
+        stages = {}
+        for _ in range(3):
+            with timings.stage('fetch', stages):
+                pass
+        
+        status = timings.get_status()
+        self.assertEqual(status['stages_ms']['fetch']['count'], 3)
+        self.assertEqual(set(status['stages_ms']['fetch']), {'count', 'avg', 'p50', 'p95', 'p99', 'max'})
+        self.assertIn('fetch', stages)
+    
+    def test_rules_are_timed_and_memory_sampled(self):
+        service = ValidationService()
+        service.register_validator(FakeFetcher())
+        service.register_validator(AllocatingValidator())
+        calls_before = timing_service.get_status()['rules_ms'].get('Allocating Validation', {}).get('count', 0)
+        
+        with patch.object(timing_service, 'memory_sample_every', 1):
+            run = service.run_validators(ORDER)
+        
+        self.assertEqual(set(run['timings']['rules']), {ORDER_FETCHER_RULE, 'Allocating Validation'})
+        self.assertGreaterEqual(run['timings']['memory_peak_kb']['Allocating Validation'], 1000)
+        status = timing_service.get_status()
+        self.assertEqual(status['rules_ms']['Allocating Validation']['count'], calls_before + 1)
+        self.assertIn('Allocating Validation', status['rules_peak_kb'])
+        
+        self.assertNotIn('memory_peak_kb', service.run_validators(ORDER)['timings'])
+
+
+
+class PollingValidator(BaseValidator):
+    """
+    Protocol v2 validator that works in small steps until its deadline stops it.
+    """
+    
+    def __init__(self):
+        super().__init__("Polling Validation")
+    
+    def check(self, context):
+        while True:
+            context.check_deadline()
+            time.sleep(0.01)
+
+
+class TestValidatorDeadlines(unittest.TestCase):
+    """
+    Test cases for per-rule and per-request deadlines.
+    """
+    
+    def test_slow_rule_times_out_while_others_finish(self):
+        service = ValidationService()
+        stuck = slow_rule('Stuck', 1.0)
+        stuck.timeout_seconds = 0.2
+        service.register_validator(FakeFetcher())
+        service.register_validator(stuck)
+        service.register_validator(slow_rule('Quick', 0))
+        
+        started = time.monotonic()
+        run = service.run_validators(ORDER)
+        
+        self.assertLess(time.monotonic() - started, 0.8)
+        self.assertEqual(run['timed_out_rules'], ['Stuck'])
+        self.assertEqual([i['rule'] for i in run['issues']], ['Quick'])
+        self.assertEqual(run['validator_results'][1]['info_messages'], ['Timed out - result unknown'])
+        self.assertFalse(run['validator_results'][1]['passed'])
+        self.assertEqual(service.get_status()['rules']['Stuck']['timed_out'], 1)
+    
+    def test_request_deadline_bounds_rules_and_outbound_calls(self):
+        service = ValidationService()
+        service.register_validator(PollingValidator())
+        self.assertIsNone(current_deadline())
+        
+        with deadline_scope(0.2) as deadline:
+            with deadline_scope(10):
+                self.assertIs(current_deadline(), deadline)
+            self.assertLessEqual(_call_deadline(30).remaining(), 0.2)
+            run = service.run_validators(ORDER)
+        
+        self.assertEqual(run['timed_out_rules'], ['Polling Validation'])
+        self.assertIsNone(current_deadline())
+    
+    def test_timed_out_rule_keeps_its_tracked_errors(self):
+        tracker = MagicMock()
+        tracker.get_tracked_error_hashes.return_value = ['stuck-hash', 'quick-hash']
+        tracker.get_pending_errors.return_value = {
+            'stuck-hash': {'error_details': {'rule': 'Stuck', 'message': 'Missing fee'}},
+            'quick-hash': {'error_details': {'rule': 'Quick', 'message': 'Missing remark'}}
+        }
+        
+        with patch.object(validation_module, 'error_tracker_service', tracker):
+            tracked = ValidationService()._process_error_tracking('order-1', 'SO-000001', [],
+                                                                  unverified_rules=['Stuck'])
+        
+        self.assertEqual([issue['rule'] for issue in tracked['resolved_issues']], ['Quick'])
+        tracker.clear_error.assert_called_once_with('order-1', 'quick-hash')
+    
+    def test_dependents_of_a_timed_out_rule_are_unverified(self):
+        class SlowFetcher(FakeFetcher):
+            timeout_seconds = 0.2
+            
+            def validate(self, order_data):
+                time.sleep(1.0)
+                return super().validate(order_data)
+        
+        service = ValidationService()
+        dependent = slow_rule('Dependent', 0)
+        service.register_validator(SlowFetcher())
+        service.register_validator(dependent)
+        tracker = MagicMock()
+        tracker.get_tracked_error_hashes.return_value = ['dependent-hash']
+        tracker.get_pending_errors.return_value = {
+            'dependent-hash': {'error_details': {'rule': 'Dependent', 'message': 'Missing fee'}}
+        }
+        
+        with patch.object(validation_module, 'error_tracker_service', tracker):
+            report = service.validate_order(ORDER)
+        
+        self.assertEqual(dependent.received, 'not run')
+        self.assertEqual(report['timed_out_rules'], [ORDER_FETCHER_RULE, 'Dependent'])
+        self.assertEqual(report['validator_results'][1]['info_messages'],
+                         [f'Dependency {ORDER_FETCHER_RULE} timed out - result unknown'])
+        self.assertEqual(report['resolved_issues'], [])
+        tracker.clear_error.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,7 @@
 import unittest
+from app.validators import DiscountRemarkValidator, ReturnReasonValidator, AssemblyFeeValidator
 from app.validators.base import ValidationResult, BaseValidator
+from app.validators.order_summary import OrderSummary
 
 
 class TestValidationResult(unittest.TestCase):
@@ -43,6 +45,28 @@ class TestValidationResult(unittest.TestCase):
         self.assertEqual(len(result_dict['suggested_fixes']), 1)
 
 
+
+class TestApplicability(unittest.TestCase):
+    """
+    Test cases for the order summary and the rules' applicability checks.
+    """
+    
+    def test_rules_apply_only_to_orders_with_their_trigger(self):
+        plain = OrderSummary({'lines': [
+            {'product': {'name': 'Base Cabinet', 'sku': 'B12'}, 'quantity': {'standardQuantity': '2'}}
+        ]})
+        triggered = OrderSummary({'lines': [
+            {'product': {'name': 'Discount', 'sku': 'z_discount'}, 'quantity': {'standardQuantity': '1'}},
+            {'product': {'name': 'Z_ASSEMBLY FEE', 'sku': 'ASM'}, 'quantity': {'standardQuantity': '1'}},
+            {'product': {'name': 'Base Cabinet', 'sku': 'B12'}, 'quantity': {'standardQuantity': '-1'}}
+        ]})
+        
+        for validator in (DiscountRemarkValidator(), ReturnReasonValidator(), AssemblyFeeValidator()):
+            self.assertFalse(validator.applies_to(plain), validator.rule_name)
+            self.assertTrue(validator.applies_to(triggered), validator.rule_name)
+        self.assertEqual((triggered.line_count, triggered.has_return_lines), (3, True))
+
+
 if __name__ == '__main__':
     unittest.main()
 
@@ -0,0 +1,69 @@
+import os
+import tempfile
+import unittest
+from app.services.work_queue_service import SQLiteWorkQueueBackend, WorkQueueService
+
+
+class TestSQLiteWorkQueueBackend(unittest.TestCase):
+    """
+    Test cases for the SQLite work queue backend.
+    """
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.backend = SQLiteWorkQueueBackend(
+            db_path=os.path.join(self.temp_dir.name, 'queue.db'),
+            visibility_timeout=60,
+            max_attempts=2
+        )
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_enqueue_receive_ack(self):
+        self.backend.enqueue({'sales_order_id': 'order-1'})
+
+        messages = self.backend.receive()
+        self.assertEqual(len(messages), 1)
+        self.assertEqual(messages[0].body['sales_order_id'], 'order-1')
+        self.assertEqual(messages[0].attempts, 1)
+
+        # Leased message is hidden from other receivers
+        self.assertEqual(self.backend.receive(), [])
+
+        self.backend.ack(messages[0])
+        self.assertEqual(self.backend.get_depth(), {'ready': 0, 'inflight': 0, 'dead': 0})
+
+    def test_nack_redelivers_and_dead_letters(self):
+        self.backend.enqueue({'sales_order_id': 'order-2'})
+
+        first = self.backend.receive()[0]
+        self.backend.nack(first, delay_seconds=0)
+
+        second = self.backend.receive()[0]
+        self.assertEqual(second.attempts, 2)
+        self.backend.nack(second, delay_seconds=0)
+
+        # max_attempts reached - message is parked instead of redelivered
+        self.assertEqual(self.backend.receive(), [])
+        self.assertEqual(self.backend.get_depth()['dead'], 1)
+
+    def test_stale_receipt_cannot_ack(self):
+        self.backend.enqueue({'sales_order_id': 'order-3'})
+        message = self.backend.receive()[0]
+        message.receipt = 'stale-token'
+
+        self.backend.ack(message)
+        self.assertEqual(self.backend.get_depth()['inflight'], 1)
+
+    def test_service_enqueue_builds_message(self):
+        service = WorkQueueService(self.backend, num_workers=1)
+        service.enqueue('order-4', 'SalesOrderUpdatedV1')
+
+        message = self.backend.receive()[0]
+        self.assertEqual(message.body['sales_order_id'], 'order-4')
+        self.assertEqual(message.body['event_type'], 'SalesOrderUpdatedV1')
+
+
+if __name__ == '__main__':
+    unittest.main()